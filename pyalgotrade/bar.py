@@ -20,8 +20,11 @@
 
 import abc
 
+import numpy as np
 import six
 
+from pyalgotrade.utils import dt
+
 
 class Frequency(object):
 
@@ -242,6 +245,142 @@ class BasicBar(Bar):
         return self.__extra
 
 
+class BarArrays(object):
+    """A sequence of bars held in numpy arrays. :class:`BasicBar` instances get built when they are accessed.
+
+    :param timestamps: The datetimes, as int64 nanoseconds since the epoch (UTC).
+    :type timestamps: numpy.array.
+    :param opens: The opening prices.
+    :type opens: numpy.array.
+    :param highs: The highest prices.
+    :type highs: numpy.array.
+    :param lows: The lowest prices.
+    :type lows: numpy.array.
+    :param closes: The closing prices.
+    :type closes: numpy.array.
+    :param volumes: The volumes.
+    :type volumes: numpy.array.
+    :param adjCloses: The adjusted closing prices. NaN is used for missing values.
+    :type adjCloses: numpy.array.
+    :param frequency: The bars frequency. Check :class:`Frequency`.
+    :param tzInfo: The timezone for the datetimes, or None to get naive datetimes.
+    :type tzInfo: tzinfo.
+    :param extra: A dict that maps extra column names to numpy.arrays with their values, or None.
+    :type extra: dict.
+    """
+
+    def __init__(self, timestamps, opens, highs, lows, closes, volumes, adjCloses, frequency, tzInfo=None, extra=None):
+        self.__timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.__opens = np.asarray(opens, dtype=np.float64)
+        self.__highs = np.asarray(highs, dtype=np.float64)
+        self.__lows = np.asarray(lows, dtype=np.float64)
+        self.__closes = np.asarray(closes, dtype=np.float64)
+        self.__volumes = np.asarray(volumes, dtype=np.float64)
+        self.__adjCloses = np.asarray(adjCloses, dtype=np.float64)
+        self.__frequency = frequency
+        self.__tzInfo = tzInfo
+        if extra is None:
+            extra = {}
+        self.__extra = dict((name, np.asarray(values, dtype=np.float64)) for name, values in six.iteritems(extra))
+        for values in [self.__opens, self.__highs, self.__lows, self.__closes, self.__volumes, self.__adjCloses]:
+            assert(len(values) == len(self.__timestamps))
+        for values in six.itervalues(self.__extra):
+            assert(len(values) == len(self.__timestamps))
+
+    def __len__(self):
+        return len(self.__timestamps)
+
+    def __getitem__(self, pos):
+        adjClose = self.__adjCloses[pos].item()
+        if adjClose != adjClose:
+            adjClose = None
+        extra = dict((name, values[pos].item()) for name, values in six.iteritems(self.__extra))
+        return BasicBar(
+            dt.epoch_ns_to_datetime(self.__timestamps[pos], self.__tzInfo),
+            self.__opens[pos].item(),
+            self.__highs[pos].item(),
+            self.__lows[pos].item(),
+            self.__closes[pos].item(),
+            self.__volumes[pos].item(),
+            adjClose,
+            self.__frequency,
+            extra=extra
+        )
+
+    def getTimestamps(self):
+        return self.__timestamps
+
+    def getOpens(self):
+        return self.__opens
+
+    def getHighs(self):
+        return self.__highs
+
+    def getLows(self):
+        return self.__lows
+
+    def getCloses(self):
+        return self.__closes
+
+    def getVolumes(self):
+        return self.__volumes
+
+    def getAdjCloses(self):
+        return self.__adjCloses
+
+    def getFrequency(self):
+        return self.__frequency
+
+    def getTzInfo(self):
+        return self.__tzInfo
+
+    def getExtraColumns(self):
+        return self.__extra
+
+    def hasAdjClose(self):
+        """Returns True if any of the bars has an adjusted closing price."""
+        return bool(np.any(self.__adjCloses == self.__adjCloses))
+
+    def __take(self, order):
+        return BarArrays(
+            self.__timestamps[order], self.__opens[order], self.__highs[order], self.__lows[order],
+            self.__closes[order], self.__volumes[order], self.__adjCloses[order], self.__frequency, self.__tzInfo,
+            dict((name, values[order]) for name, values in six.iteritems(self.__extra))
+        )
+
+    def isSorted(self):
+        """Returns True if bars are sorted by datetime."""
+        return bool(np.all(self.__timestamps[1:] >= self.__timestamps[:-1]))
+
+    def sorted(self):
+        """Returns a :class:`BarArrays` with the bars sorted by datetime. Bars with the same datetime keep their order."""
+        ret = self
+        if not self.isSorted():
+            ret = self.__take(np.argsort(self.__timestamps, kind="mergesort"))
+        return ret
+
+    def concatenate(self, other):
+        """Returns a :class:`BarArrays` with these bars followed by the ones in other.
+        Both should have the same extra columns."""
+        if set(self.__extra.keys()) != set(other.getExtraColumns().keys()):
+            raise Exception("Extra columns don't match")
+        return BarArrays(
+            np.concatenate([self.__timestamps, other.getTimestamps()]),
+            np.concatenate([self.__opens, other.getOpens()]),
+            np.concatenate([self.__highs, other.getHighs()]),
+            np.concatenate([self.__lows, other.getLows()]),
+            np.concatenate([self.__closes, other.getCloses()]),
+            np.concatenate([self.__volumes, other.getVolumes()]),
+            np.concatenate([self.__adjCloses, other.getAdjCloses()]),
+            self.__frequency,
+            self.__tzInfo,
+            dict(
+                (name, np.concatenate([values, other.getExtraColumns()[name]]))
+                for name, values in six.iteritems(self.__extra)
+            )
+        )
+
+
 class Bars(object):
 
     """A group of :class:`Bar` objects.
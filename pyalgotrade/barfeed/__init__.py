@@ -47,6 +47,7 @@ class BaseBarFeed(feed.BaseFeed):
         super(BaseBarFeed, self).__init__(maxLen)
         self.__frequency = frequency
         self.__useAdjustedValues = False
+        self.__dataSeriesClass = bards.BarDataSeries
         self.__defaultInstrument = None
         self.__currentBars = None
         self.__lastBars = {}
@@ -85,8 +86,22 @@ class BaseBarFeed(feed.BaseFeed):
         """
         raise NotImplementedError()
 
+    def setDataSeriesClass(self, dataSeriesClass):
+        """Sets the class used to build the dataseries for each instrument.
+
+        :param dataSeriesClass: :class:`pyalgotrade.dataseries.bards.BarDataSeries` (the default) or
+            :class:`pyalgotrade.dataseries.bards.ColumnarBarDataSeries` to store values in numpy arrays and
+            build bars on demand.
+
+        .. note::
+            This must be set before registering instruments.
+        """
+        if len(self.getRegisteredInstruments()):
+            raise Exception("The dataseries class must be set before registering instruments")
+        self.__dataSeriesClass = dataSeriesClass
+
     def createDataSeries(self, key, maxLen):
-        ret = bards.BarDataSeries(maxLen)
+        ret = self.__dataSeriesClass(maxLen)
         ret.setUseAdjustedValues(self.__useAdjustedValues)
         return ret
 
@@ -18,13 +18,20 @@
 .. moduleauthor:: Gabriel Martin Becedillas Ruiz <gabriel.becedillas@gmail.com>
 """
 
+import csv
 import datetime
+import itertools
 
+import numpy as np
 import pytz
 import six
 
+from pyalgotrade import utils
 from pyalgotrade.utils import dt
+from pyalgotrade.utils import dtfilter
 from pyalgotrade.utils import csvutils
+from pyalgotrade.utils import dtparser
+from pyalgotrade.utils import fileutils
 from pyalgotrade.barfeed import membf
 from pyalgotrade import bar
 
@@ -40,12 +47,34 @@ class RowParser(object):
     def getDelimiter(self):
         raise NotImplementedError()
 
+    # Returns a function that parses a row given as a list, or None to parse rows as dicts using parseBar.
+    # fieldNames has the names of the columns in the file, so their positions can be resolved once.
+    def getPositionalParser(self, fieldNames):
+        return None
+
+    # Returns the settings that, along with the file, determine the bars that get parsed, so they can be cached, or
+    # None if bars can't be cached. Its repr should be stable across runs. Only pyalgotrade.bar.BasicBar instances
+    # can be rebuilt from the cache. Check pyalgotrade.utils.arraycache.ArrayCache.
+    def getCacheSettings(self):
+        return None
+
+    # Returns the timezone for the datetimes in the bars that get parsed, or None if they are naive. Used to rebuild
+    # cached bars.
+    def getTimezone(self):
+        return None
+
 
 # Interface for bar filters.
 class BarFilter(object):
     def includeBar(self, bar_):
         raise NotImplementedError()
 
+    # Returns a numpy array of booleans that tells which bars to include, given their datetimes as int64 nanoseconds
+    # since the epoch (check pyalgotrade.utils.dtfilter), or None to filter bars one at a time using includeBar.
+    # Subclasses that override includeBar but not includeTimestamps get filtered one bar at a time.
+    def includeTimestamps(self, timestamps, tzInfo):
+        return None
+
 
 class DateRangeFilter(BarFilter):
     def __init__(self, fromDate=None, toDate=None):
@@ -59,6 +88,9 @@ class DateRangeFilter(BarFilter):
             return False
         return True
 
+    def includeTimestamps(self, timestamps, tzInfo):
+        return dtfilter.date_range_mask(timestamps, self.__fromDate, self.__toDate)
+
 
 # US Equities Regular Trading Hours filter
 # Monday ~ Friday
@@ -88,6 +120,218 @@ class USEquitiesRTH(DateRangeFilter):
                 return False
         return ret
 
+    def includeTimestamps(self, timestamps, tzInfo):
+        ret = super(USEquitiesRTH, self).includeTimestamps(timestamps, tzInfo)
+        ret &= dtfilter.session_mask(timestamps, tzInfo, USEquitiesRTH.timezone, self.__fromTime, self.__toTime)
+        return ret
+
+
+# Yields the bars in a CSV file, one at a time.
+def read_bars(path, rowParser, barFilter=None, skipMalformedBars=False):
+    with fileutils.open_file(path) as f:
+        reader = csvutils.FastRowReader(f, fieldnames=rowParser.getFieldNames(), delimiter=rowParser.getDelimiter())
+        fieldNames = reader.getFieldNames()
+        parse_row = rowParser.getPositionalParser(fieldNames)
+        if parse_row is None:
+            def parse_row(row):
+                return rowParser.parseBar(dict(zip(fieldNames, row)))
+
+        def parse_row_skip_malformed(row):
+            ret = None
+            try:
+                ret = parse_row(row)
+            except Exception:
+                pass
+            return ret
+
+        parse_bar = parse_row_skip_malformed if skipMalformedBars else parse_row
+        for row in reader:
+            bar_ = parse_bar(row)
+            if bar_ is not None and (barFilter is None or barFilter.includeBar(bar_)):
+                yield bar_
+
+
+# Returns a pyalgotrade.bar.BarArrays with the bars, or None if they can't be represented that way.
+def bars_to_arrays(bars, frequency, tzInfo):
+    extraNames = set()
+    if len(bars):
+        extraNames = set(bars[0].getExtraColumns().keys())
+    for bar_ in bars:
+        if type(bar_) != bar.BasicBar or bar_.getFrequency() != frequency:
+            return None
+        # Datetimes get rebuilt using tzInfo.
+        if dt.datetime_is_naive(bar_.getDateTime()) != (tzInfo is None):
+            return None
+        extra = bar_.getExtraColumns()
+        if set(extra.keys()) != extraNames:
+            return None
+        for value in six.itervalues(extra):
+            if not isinstance(value, float):
+                return None
+
+    return bar.BarArrays(
+        [dt.datetime_to_epoch_ns(bar_.getDateTime()) for bar_ in bars],
+        [bar_.getOpen() for bar_ in bars],
+        [bar_.getHigh() for bar_ in bars],
+        [bar_.getLow() for bar_ in bars],
+        [bar_.getClose() for bar_ in bars],
+        [bar_.getVolume() for bar_ in bars],
+        [np.nan if bar_.getAdjClose() is None else bar_.getAdjClose() for bar_ in bars],
+        frequency,
+        tzInfo,
+        dict((name, [bar_.getExtraColumns()[name] for bar_ in bars]) for name in extraNames)
+    )
+
+
+# Column names used to cache bars.
+EXTRA_COLUMN_PREFIX = "extra:"
+BAR_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume", "adj_close"]
+
+
+def bar_arrays_to_columns(barArrays):
+    ret = list(zip(BAR_COLUMNS, [
+        barArrays.getTimestamps(), barArrays.getOpens(), barArrays.getHighs(), barArrays.getLows(),
+        barArrays.getCloses(), barArrays.getVolumes(), barArrays.getAdjCloses()
+    ]))
+    for name, values in sorted(barArrays.getExtraColumns().items()):
+        ret.append((EXTRA_COLUMN_PREFIX + name, values))
+    return ret
+
+
+def columns_to_bar_arrays(columns, frequency, tzInfo):
+    args = [columns[name] for name in BAR_COLUMNS]
+    extra = dict(
+        (name[len(EXTRA_COLUMN_PREFIX):], values) for name, values in six.iteritems(columns)
+        if name.startswith(EXTRA_COLUMN_PREFIX)
+    )
+    return bar.BarArrays(*args, frequency=frequency, tzInfo=tzInfo, extra=extra)
+
+
+# Parses rows in bulk, and returns a dict that maps column names (check BAR_COLUMNS) to numpy arrays, or None if the
+# rows can't be parsed that way. Rows that barFilter excludes are dropped before parsing prices.
+def parse_bar_rows(rows, columnIndexes, extraIndexes, dateTimeParser, dailyBarTime, localizer, barFilter=None):
+    dateTimeIndex = columnIndexes["datetime"]
+    try:
+        timestamps = dateTimeParser.parseArray(np.array([row[dateTimeIndex] for row in rows]))
+    except ValueError:
+        return None
+
+    if dailyBarTime is not None:
+        timeOfDay = datetime.datetime.combine(dt.epoch_naive.date(), dailyBarTime)
+        timestamps = timestamps // dtparser.DAY_NS * dtparser.DAY_NS + dt.datetime_to_epoch_ns(timeOfDay)
+    if localizer is not None:
+        timestamps = localizer.localizeTimestamps(timestamps)
+
+    if barFilter is not None:
+        tzInfo = None if localizer is None else localizer.getTimezone()
+        mask = dtfilter.include_timestamps(barFilter, timestamps, tzInfo, "includeBar")
+        if mask is None:
+            return None
+        if not mask.all():
+            rows = list(itertools.compress(rows, mask))
+            timestamps = timestamps[mask]
+
+    if len(rows) == 0:
+        # Every row was filtered out.
+        ret = dict((name, np.empty(0)) for name in BAR_COLUMNS + [EXTRA_COLUMN_PREFIX + name for name in extraIndexes])
+        ret["timestamp"] = timestamps
+        return ret
+
+    # float is faster than numpy's string to float conversion.
+    def parse_column(values):
+        return np.fromiter(map(float, values), np.float64, len(rows))
+
+    columns = list(zip(*rows))
+    try:
+        ret = dict(
+            (name, parse_column(columns[columnIndexes[name]])) for name in ["open", "high", "low", "close", "volume"]
+        )
+        adjCloseIndex = columnIndexes.get("adj_close")
+        if adjCloseIndex is not None:
+            # Empty values are missing ones.
+            ret["adj_close"] = np.fromiter(
+                (float(value) if len(value) else np.nan for value in columns[adjCloseIndex]), np.float64, len(rows)
+            )
+        else:
+            ret["adj_close"] = np.empty(len(rows))
+            ret["adj_close"].fill(np.nan)
+        for name, i in six.iteritems(extraIndexes):
+            ret[EXTRA_COLUMN_PREFIX + name] = parse_column(columns[i])
+    except ValueError:
+        # Some value can only be parsed row by row, or should be kept as a string.
+        return None
+
+    ret["timestamp"] = timestamps
+    return ret
+
+
+def load_bar_arrays(
+    path, columnNames, dateTimeFormat, dailyBarTime, frequency, timezone, barFilter=None, chunkSize=65536
+):
+    """Loads the bars in a CSV file, with the column names in the first row, as
+    :class:`pyalgotrade.barfeed.GenericBarFeed` does. Rows are parsed in bulk, in chunks, without building bar or
+    datetime objects.
+
+    Returns a :class:`pyalgotrade.bar.BarArrays`, or None if the file can't be loaded this way, which is the case
+    for datetime formats that are not fixed width, values that can't be parsed in bulk, extra columns that are
+    not numeric, and filters that can't be applied using includeTimestamps.
+
+    :param barFilter: The bar filter, or None. Prices are not parsed for the rows that get filtered out.
+    :type barFilter: :class:`BarFilter`.
+    :param chunkSize: The number of rows to parse at once.
+    :type chunkSize: int.
+    """
+    if not dtparser.is_fixed_width(dateTimeFormat):
+        return None
+    dateTimeParser = dtparser.FixedWidthParser(dateTimeFormat)
+    localizer = dtparser.Localizer(timezone) if timezone else None
+
+    chunks = []
+    with fileutils.open_file(path) as f:
+        reader = csv.reader(f, delimiter=",")
+        fieldNames = six.next(reader)
+        columnIndexes = {}
+        for name, columnName in six.iteritems(columnNames):
+            if columnName in fieldNames:
+                columnIndexes[name] = fieldNames.index(columnName)
+            elif name != "adj_close":
+                return None
+        extraIndexes = dict(
+            (fieldName, i) for i, fieldName in enumerate(fieldNames) if fieldName not in columnNames.values()
+        )
+
+        rows = list(itertools.islice(reader, chunkSize))
+        while len(rows):
+            # Skip empty rows.
+            if [] in rows:
+                rows = [row for row in rows if len(row)]
+            if len(rows):
+                # Let FastRowReader fail on rows with the wrong number of columns.
+                if set(map(len, rows)) != set([len(fieldNames)]):
+                    return None
+                chunk = parse_bar_rows(
+                    rows, columnIndexes, extraIndexes, dateTimeParser, dailyBarTime, localizer, barFilter
+                )
+                if chunk is None:
+                    return None
+                chunks.append(chunk)
+            rows = list(itertools.islice(reader, chunkSize))
+
+    columns = dict((name, []) for name in BAR_COLUMNS + [EXTRA_COLUMN_PREFIX + name for name in extraIndexes])
+    if len(chunks):
+        columns = dict((name, np.concatenate([chunk[name] for chunk in chunks])) for name in columns)
+    return columns_to_bar_arrays(columns, frequency, timezone)
+
+
+# Like load_bar_arrays, but takes the arguments in a tuple and returns the columns (check bar_arrays_to_columns),
+# so it can be used with pyalgotrade.utils.parallel_map.
+def load_bar_columns(args):
+    ret = None
+    barArrays = load_bar_arrays(*args)
+    if barArrays is not None:
+        ret = bar_arrays_to_columns(barArrays)
+    return ret
+
 
 class BarFeed(membf.BarFeed):
     """Base class for CSV file based :class:`pyalgotrade.barfeed.BarFeed`.
@@ -101,6 +345,7 @@ class BarFeed(membf.BarFeed):
 
         self.__barFilter = None
         self.__dailyTime = datetime.time(0, 0, 0)
+        self.__cache = None
 
     def getDailyBarTime(self):
         return self.__dailyTime
@@ -114,37 +359,59 @@ class BarFeed(membf.BarFeed):
     def setBarFilter(self, barFilter):
         self.__barFilter = barFilter
 
-    def addBarsFromCSV(self, instrument, path, rowParser, skipMalformedBars=False):
-        def parse_bar_skip_malformed(row):
-            ret = None
-            try:
-                ret = rowParser.parseBar(row)
-            except Exception:
-                pass
-            return ret
+    def getCache(self):
+        return self.__cache
 
-        if skipMalformedBars:
-            parse_bar = parse_bar_skip_malformed
-        else:
-            parse_bar = rowParser.parseBar
+    def setCache(self, cache):
+        """Sets the cache for parsed files, or None to disable caching. The same cache can be shared by many feeds.
 
-        # Load the csv file
-        loadedBars = []
-        reader = csvutils.FastDictReader(open(path, "r"), fieldnames=rowParser.getFieldNames(), delimiter=rowParser.getDelimiter())
-        for row in reader:
-            bar_ = parse_bar(row)
-            if bar_ is not None and (self.__barFilter is None or self.__barFilter.includeBar(bar_)):
-                loadedBars.append(bar_)
+        :param cache: The cache.
+        :type cache: :class:`pyalgotrade.utils.arraycache.ArrayCache`.
 
-        self.addBarsFromSequence(instrument, loadedBars)
+        .. note::
+            Files are cached only if no bar filter is set, and if the row parser supports it.
+        """
+        self.__cache = cache
+
+    # Returns the settings used to cache bars parsed with rowParser, or None if they can't be cached.
+    def __getCacheSettings(self, rowParser, skipMalformedBars):
+        ret = None
+        if self.__cache is not None and self.__barFilter is None:
+            rowParserSettings = rowParser.getCacheSettings()
+            if rowParserSettings is not None:
+                rowParserClass = "%s.%s" % (type(rowParser).__module__, type(rowParser).__name__)
+                ret = ("rows", rowParserClass, rowParserSettings, self.getFrequency(), skipMalformedBars)
+        return ret
+
+    def addBarsFromCSV(self, instrument, path, rowParser, skipMalformedBars=False):
+        barArrays = None
+        cacheSettings = self.__getCacheSettings(rowParser, skipMalformedBars)
+        if cacheSettings is not None:
+            columns = self.__cache.load(path, cacheSettings)
+            if columns is not None:
+                barArrays = columns_to_bar_arrays(columns, self.getFrequency(), rowParser.getTimezone())
+
+        if barArrays is None:
+            loadedBars = list(read_bars(path, rowParser, self.__barFilter, skipMalformedBars))
+            if cacheSettings is not None:
+                barArrays = bars_to_arrays(loadedBars, self.getFrequency(), rowParser.getTimezone())
+                if barArrays is not None:
+                    self.__cache.save(path, cacheSettings, bar_arrays_to_columns(barArrays))
+
+        if barArrays is not None:
+            self.addBarsFromArrays(instrument, barArrays)
+        else:
+            self.addBarsFromSequence(instrument, loadedBars)
 
 
 class GenericRowParser(RowParser):
     def __init__(self, columnNames, dateTimeFormat, dailyBarTime, frequency, timezone, barClass=bar.BasicBar):
         self.__dateTimeFormat = dateTimeFormat
+        self.__dateTimeParser = dtparser.get_parser(dateTimeFormat)
         self.__dailyBarTime = dailyBarTime
         self.__frequency = frequency
         self.__timezone = timezone
+        self.__localizer = dtparser.Localizer(timezone) if timezone else None
         self.__haveAdjClose = False
         self.__barClass = barClass
         # Column names.
@@ -158,13 +425,13 @@ class GenericRowParser(RowParser):
         self.__columnNames = columnNames
 
     def _parseDate(self, dateString):
-        ret = datetime.datetime.strptime(dateString, self.__dateTimeFormat)
+        ret = self.__dateTimeParser.parse(dateString)
 
         if self.__dailyBarTime is not None:
             ret = datetime.datetime.combine(ret, self.__dailyBarTime)
         # Localize the datetime if a timezone was given.
-        if self.__timezone:
-            ret = dt.localize(ret, self.__timezone)
+        if self.__localizer is not None:
+            ret = self.__localizer.localize(ret)
         return ret
 
     def barsHaveAdjClose(self):
@@ -177,6 +444,41 @@ class GenericRowParser(RowParser):
     def getDelimiter(self):
         return ","
 
+    def getPositionalParser(self, fieldNames):
+        for columnName in [
+            self.__dateTimeColName, self.__openColName, self.__highColName, self.__lowColName, self.__closeColName,
+            self.__volumeColName
+        ]:
+            # Let parseBar fail on every row.
+            if columnName not in fieldNames:
+                return None
+
+        dateTimeIndex = fieldNames.index(self.__dateTimeColName)
+        openIndex = fieldNames.index(self.__openColName)
+        highIndex = fieldNames.index(self.__highColName)
+        lowIndex = fieldNames.index(self.__lowColName)
+        closeIndex = fieldNames.index(self.__closeColName)
+        volumeIndex = fieldNames.index(self.__volumeColName)
+        adjCloseIndex = None
+        if self.__adjCloseColName in fieldNames:
+            adjCloseIndex = fieldNames.index(self.__adjCloseColName)
+        extraColumns = [
+            (fieldName, i) for i, fieldName in enumerate(fieldNames) if fieldName not in self.__columnNames.values()
+        ]
+
+        def parse_row(row):
+            dateTime = self._parseDate(row[dateTimeIndex])
+            adjClose = None
+            if adjCloseIndex is not None and len(row[adjCloseIndex]) > 0:
+                adjClose = float(row[adjCloseIndex])
+                self.__haveAdjClose = True
+            extra = dict((fieldName, csvutils.float_or_string(row[i])) for fieldName, i in extraColumns)
+            return self.__barClass(
+                dateTime, float(row[openIndex]), float(row[highIndex]), float(row[lowIndex]), float(row[closeIndex]),
+                float(row[volumeIndex]), adjClose, self.__frequency, extra=extra
+            )
+        return parse_row
+
     def parseBar(self, csvRowDict):
         dateTime = self._parseDate(csvRowDict[self.__dateTimeColName])
         open_ = float(csvRowDict[self.__openColName])
@@ -286,14 +588,110 @@ class GenericBarFeed(BarFeed):
         if timezone is None:
             timezone = self.__timezone
 
-        rowParser = GenericRowParser(
-            self.__columnNames, self.__dateTimeFormat, self.getDailyBarTime(), self.getFrequency(),
-            timezone, self.__barClass
+        barArrays = self.__loadCached(path, timezone, skipMalformedBars)
+        if barArrays is None and self.__loadsInBulk(skipMalformedBars):
+            barArrays = load_bar_arrays(path, *self.__getBulkLoadArgs(timezone))
+            if barArrays is not None:
+                self.__saveCached(path, timezone, skipMalformedBars, barArrays)
+        self.__addBars(instrument, path, timezone, skipMalformedBars, barArrays)
+
+    def addBarsFromCSVFiles(self, paths, timezone=None, skipMalformedBars=False, processes=None):
+        """Loads bars for many instruments from CSV formatted files. Files are parsed in parallel, in a pool of
+        processes, and the instruments get registered in the bar feed sorted by identifier.
+
+        :param paths: A dict that maps instrument identifiers to the paths to the CSV files.
+        :type paths: dict.
+        :param timezone: The timezone to use to localize bars. Check :mod:`pyalgotrade.marketsession`.
+        :type timezone: A pytz timezone.
+        :param skipMalformedBars: True to skip errors while parsing bars.
+        :type skipMalformedBars: boolean.
+        :param processes: The number of processes to use, or None to use one per CPU.
+        :type processes: int.
+
+        .. note::
+            * Only files that can be loaded with :func:`load_bar_arrays` are parsed in parallel. The rest are parsed
+              row by row in this process.
+            * The bar filter, if set, must be picklable.
+        """
+
+        if timezone is None:
+            timezone = self.__timezone
+
+        instruments = sorted(paths.keys())
+        loaded = dict(
+            (instrument, self.__loadCached(paths[instrument], timezone, skipMalformedBars))
+            for instrument in instruments
+        )
+        if self.__loadsInBulk(skipMalformedBars):
+            pending = [instrument for instrument in instruments if loaded[instrument] is None]
+            args = [(paths[instrument],) + self.__getBulkLoadArgs(timezone) for instrument in pending]
+            for instrument, columns in zip(pending, utils.parallel_map(load_bar_columns, args, processes)):
+                if columns is not None:
+                    barArrays = columns_to_bar_arrays(dict(columns), self.getFrequency(), timezone)
+                    self.__saveCached(paths[instrument], timezone, skipMalformedBars, barArrays)
+                    loaded[instrument] = barArrays
+
+        for instrument in instruments:
+            self.__addBars(instrument, paths[instrument], timezone, skipMalformedBars, loaded[instrument])
+
+    # Rows are parsed in bulk only if the bars would be the same as the ones built by GenericRowParser.
+    # load_bar_arrays checks if the bar filter can be applied in bulk.
+    def __loadsInBulk(self, skipMalformedBars):
+        return self.__barClass == bar.BasicBar and not skipMalformedBars
+
+    # Returns the arguments for load_bar_arrays, after the path.
+    def __getBulkLoadArgs(self, timezone):
+        return (
+            self.__columnNames, self.__dateTimeFormat, self.getDailyBarTime(), self.getFrequency(), timezone,
+            self.getBarFilter()
         )
 
-        super(GenericBarFeed, self).addBarsFromCSV(instrument, path, rowParser, skipMalformedBars=skipMalformedBars)
+    # Parsed files are cached only if bars can be rebuilt from the cache.
+    def __getCacheSettings(self, timezone, skipMalformedBars):
+        ret = None
+        if self.getCache() is not None and self.getBarFilter() is None and self.__barClass == bar.BasicBar:
+            ret = (
+                "bars", sorted(self.__columnNames.items()), self.__dateTimeFormat, repr(self.getDailyBarTime()),
+                self.getFrequency(), str(timezone), skipMalformedBars
+            )
+        return ret
 
-        if rowParser.barsHaveAdjClose():
+    def __loadCached(self, path, timezone, skipMalformedBars):
+        ret = None
+        cacheSettings = self.__getCacheSettings(timezone, skipMalformedBars)
+        if cacheSettings is not None:
+            columns = self.getCache().load(path, cacheSettings)
+            if columns is not None:
+                ret = columns_to_bar_arrays(columns, self.getFrequency(), timezone)
+        return ret
+
+    def __saveCached(self, path, timezone, skipMalformedBars, barArrays):
+        cacheSettings = self.__getCacheSettings(timezone, skipMalformedBars)
+        if cacheSettings is not None:
+            self.getCache().save(path, cacheSettings, bar_arrays_to_columns(barArrays))
+
+    # Adds bars already loaded in barArrays, or parses the file row by row if barArrays is None.
+    def __addBars(self, instrument, path, timezone, skipMalformedBars, barArrays):
+        if barArrays is not None:
+            haveAdjClose = barArrays.hasAdjClose()
+            self.addBarsFromArrays(instrument, barArrays)
+        else:
+            rowParser = GenericRowParser(
+                self.__columnNames, self.__dateTimeFormat, self.getDailyBarTime(), self.getFrequency(),
+                timezone, self.__barClass
+            )
+            loadedBars = list(read_bars(path, rowParser, self.getBarFilter(), skipMalformedBars))
+            haveAdjClose = rowParser.barsHaveAdjClose()
+
+            if self.__getCacheSettings(timezone, skipMalformedBars) is not None:
+                barArrays = bars_to_arrays(loadedBars, self.getFrequency(), timezone)
+            if barArrays is not None:
+                self.__saveCached(path, timezone, skipMalformedBars, barArrays)
+                self.addBarsFromArrays(instrument, barArrays)
+            else:
+                self.addBarsFromSequence(instrument, loadedBars)
+
+        if haveAdjClose:
             self.__haveAdjClose = True
         elif self.__haveAdjClose:
             raise Exception("Previous bars had adjusted close and these ones don't have.")
@@ -22,7 +22,7 @@
 
 from pyalgotrade.barfeed import csvfeed
 from pyalgotrade.barfeed import common
-from pyalgotrade.utils import dt
+from pyalgotrade.utils import dtparser
 from pyalgotrade import bar
 
 import datetime
@@ -37,13 +37,15 @@ import datetime
 #
 # The csv Date column must have the following format: D-B-YY
 
+month_abbr = {'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4,
+              'May': 5, 'Jun': 6, 'Jul': 7, 'Aug': 8,
+              'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12}
+
+
 def parse_date(date):
     # Sample: 3-Dec-05
     # This custom parsing works faster than:
     # datetime.datetime.strptime(date, "%d-%b-%y")
-    month_abbr = {'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4,
-                  'May': 5, 'Jun': 6, 'Jul': 7, 'Aug': 8,
-                  'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12}
     date = date.split("-")
     year = int(date[2]) + 2000
     if year > datetime.datetime.today().year:
@@ -60,6 +62,7 @@ class RowParser(csvfeed.RowParser):
         self.__dailyBarTime = dailyBarTime
         self.__frequency = frequency
         self.__timezone = timezone
+        self.__localizer = dtparser.Localizer(timezone) if timezone else None
         self.__sanitize = sanitize
 
     def __parseDate(self, dateString):
@@ -68,8 +71,8 @@ class RowParser(csvfeed.RowParser):
         if self.__dailyBarTime is not None:
             ret = datetime.datetime.combine(ret, self.__dailyBarTime)
         # Localize the datetime if a timezone was given.
-        if self.__timezone:
-            ret = dt.localize(ret, self.__timezone)
+        if self.__localizer is not None:
+            ret = self.__localizer.localize(ret)
         return ret
 
     def getFieldNames(self):
@@ -79,6 +82,13 @@ class RowParser(csvfeed.RowParser):
     def getDelimiter(self):
         return ","
 
+    def getCacheSettings(self):
+        # Two digit years are resolved using the current year.
+        return (repr(self.__dailyBarTime), str(self.__timezone), self.__sanitize, datetime.date.today().year)
+
+    def getTimezone(self):
+        return self.__timezone
+
     def parseBar(self, csvRowDict):
         dateTime = self.__parseDate(csvRowDict["Date"])
         close = float(csvRowDict["Close"])
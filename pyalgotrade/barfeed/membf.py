@@ -18,11 +18,12 @@
 .. moduleauthor:: Gabriel Martin Becedillas Ruiz <gabriel.becedillas@gmail.com>
 """
 
+import heapq
+
 import six
 
 from pyalgotrade import barfeed
 from pyalgotrade import bar
-from pyalgotrade import utils
 
 
 # A non real-time BarFeed responsible for:
@@ -38,6 +39,9 @@ class BarFeed(barfeed.BaseBarFeed):
 
         self.__bars = {}
         self.__nextPos = {}
+        # A heap with the next bar for each instrument, as (datetime, instrument, bar) tuples.
+        # It gets built the first time it is needed.
+        self.__heap = None
         self.__started = False
         self.__currDateTime = None
 
@@ -45,6 +49,7 @@ class BarFeed(barfeed.BaseBarFeed):
         self.__nextPos = {}
         for instrument in self.__bars.keys():
             self.__nextPos.setdefault(instrument, 0)
+        self.__heap = None
         self.__currDateTime = None
         super(BarFeed, self).reset()
 
@@ -65,48 +70,91 @@ class BarFeed(barfeed.BaseBarFeed):
         if self.__started:
             raise Exception("Can't add more bars once you started consuming bars")
 
-        self.__bars.setdefault(instrument, [])
         self.__nextPos.setdefault(instrument, 0)
 
         # Add and sort the bars
-        self.__bars[instrument].extend(bars)
-        self.__bars[instrument].sort(key=lambda b: b.getDateTime())
+        currentBars = self.__bars.get(instrument)
+        if currentBars is None:
+            currentBars = []
+        else:
+            currentBars = list(currentBars)
+        currentBars.extend(bars)
+        currentBars.sort(key=lambda b: b.getDateTime())
+        self.__bars[instrument] = currentBars
+        self.__heap = None
 
         self.registerInstrument(instrument)
 
+    def addBarsFromArrays(self, instrument, barArrays):
+        """Adds bars held in numpy arrays. :class:`pyalgotrade.bar.BasicBar` instances get built as they are
+        consumed.
+
+        :param instrument: Instrument identifier.
+        :type instrument: string.
+        :param barArrays: The bars.
+        :type barArrays: :class:`pyalgotrade.bar.BarArrays`.
+        """
+        if self.__started:
+            raise Exception("Can't add more bars once you started consuming bars")
+
+        currentBars = self.__bars.get(instrument)
+        if currentBars is None:
+            self.__nextPos.setdefault(instrument, 0)
+            self.__bars[instrument] = barArrays.sorted()
+            self.__heap = None
+            self.registerInstrument(instrument)
+        elif isinstance(currentBars, bar.BarArrays) and \
+                set(currentBars.getExtraColumns().keys()) == set(barArrays.getExtraColumns().keys()):
+            self.__bars[instrument] = currentBars.concatenate(barArrays).sorted()
+            self.__heap = None
+        else:
+            self.addBarsFromSequence(instrument, barArrays)
+
+    def __getHeap(self):
+        if self.__heap is None:
+            self.__heap = []
+            for instrument, bars in six.iteritems(self.__bars):
+                nextPos = self.__nextPos[instrument]
+                if nextPos < len(bars):
+                    bar_ = bars[nextPos]
+                    self.__heap.append((bar_.getDateTime(), instrument, bar_))
+            heapq.heapify(self.__heap)
+        return self.__heap
+
     def eof(self):
-        ret = True
         # Check if there is at least one more bar to return.
-        for instrument, bars in six.iteritems(self.__bars):
-            nextPos = self.__nextPos[instrument]
-            if nextPos < len(bars):
-                ret = False
-                break
-        return ret
+        return len(self.__getHeap()) == 0
 
     def peekDateTime(self):
         ret = None
-
-        for instrument, bars in six.iteritems(self.__bars):
-            nextPos = self.__nextPos[instrument]
-            if nextPos < len(bars):
-                ret = utils.safe_min(ret, bars[nextPos].getDateTime())
+        heap = self.__getHeap()
+        if len(heap):
+            ret = heap[0][0]
         return ret
 
     def getNextBars(self):
         # All bars must have the same datetime. We will return all the ones with the smallest datetime.
-        smallestDateTime = self.peekDateTime()
-
-        if smallestDateTime is None:
+        heap = self.__getHeap()
+        if len(heap) == 0:
             return None
+        smallestDateTime = heap[0][0]
+
+        # Pop all the instruments that have a bar with the smallest datetime, and push them back with their next bar,
+        # if any.
+        popped = []
+        while len(heap) and heap[0][0] == smallestDateTime:
+            dateTime, instrument, bar_ = heapq.heappop(heap)
+            popped.append((instrument, bar_))
 
-        # Make a second pass to get all the bars that had the smallest datetime.
         ret = {}
-        for instrument, bars in six.iteritems(self.__bars):
-            nextPos = self.__nextPos[instrument]
-            if nextPos < len(bars) and bars[nextPos].getDateTime() == smallestDateTime:
-                ret[instrument] = bars[nextPos]
-                self.__nextPos[instrument] += 1
+        for instrument, bar_ in popped:
+            ret[instrument] = bar_
+            bars = self.__bars[instrument]
+            nextPos = self.__nextPos[instrument] + 1
+            self.__nextPos[instrument] = nextPos
+            if nextPos < len(bars):
+                bar_ = bars[nextPos]
+                heapq.heappush(heap, (bar_.getDateTime(), instrument, bar_))
 
         if self.__currDateTime == smallestDateTime:
             raise Exception("Duplicate bars found for %s on %s" % (list(ret.keys()), smallestDateTime))
@@ -21,7 +21,7 @@
 import pyalgotrade.barfeed
 from pyalgotrade.barfeed import csvfeed
 from pyalgotrade import bar
-from pyalgotrade.utils import dt
+from pyalgotrade.utils import dtparser
 
 import pytz
 
@@ -40,19 +40,6 @@ import datetime
 #
 # The exported data will be in the UTC time zone.
 
-def parse_datetime(dateTime):
-    # Sample: 20081231 230600
-    # This custom parsing works faster than:
-    # datetime.datetime.strptime(dateTime, "%Y%m%d %H%M%S")
-    year = int(dateTime[0:4])
-    month = int(dateTime[4:6])
-    day = int(dateTime[6:8])
-    hour = int(dateTime[9:11])
-    minute = int(dateTime[11:13])
-    sec = int(dateTime[13:15])
-    return datetime.datetime(year, month, day, hour, minute, sec)
-
-
 class Frequency(object):
     MINUTE = pyalgotrade.bar.Frequency.MINUTE
     DAILY = pyalgotrade.bar.Frequency.DAY
@@ -63,13 +50,16 @@ class RowParser(csvfeed.RowParser):
         self.__frequency = frequency
         self.__dailyBarTime = dailyBarTime
         self.__timezone = timezone
+        self.__localizer = dtparser.Localizer(timezone) if timezone else None
+        self.__minuteParser = dtparser.get_parser("%Y%m%d %H%M%S")
+        self.__dayParser = dtparser.get_parser("%Y%m%d")
 
     def __parseDateTime(self, dateTime):
         ret = None
         if self.__frequency == pyalgotrade.bar.Frequency.MINUTE:
-            ret = parse_datetime(dateTime)
+            ret = self.__minuteParser.parse(dateTime)
         elif self.__frequency == pyalgotrade.bar.Frequency.DAY:
-            ret = datetime.datetime.strptime(dateTime, "%Y%m%d")
+            ret = self.__dayParser.parse(dateTime)
             # Time on CSV files is empty. If told to set one, do it.
             if self.__dailyBarTime is not None:
                 ret = datetime.datetime.combine(ret, self.__dailyBarTime)
@@ -77,11 +67,11 @@ class RowParser(csvfeed.RowParser):
             assert(False)
 
         # According to NinjaTrader documentation the exported data will be in UTC.
-        ret = pytz.utc.localize(ret)
-
         # Localize bars if a market session was set.
-        if self.__timezone:
-            ret = dt.localize(ret, self.__timezone)
+        if self.__localizer is not None:
+            ret = self.__localizer.fromUTC(ret)
+        else:
+            ret = pytz.utc.localize(ret)
         return ret
 
     def getFieldNames(self):
@@ -90,6 +80,13 @@ class RowParser(csvfeed.RowParser):
     def getDelimiter(self):
         return ";"
 
+    def getCacheSettings(self):
+        return (repr(self.__dailyBarTime), str(self.__timezone))
+
+    def getTimezone(self):
+        # Bars are in UTC if no timezone was set.
+        return self.__timezone if self.__timezone is not None else pytz.utc
+
     def parseBar(self, csvRowDict):
         dateTime = self.__parseDateTime(csvRowDict["Date Time"])
         close = float(csvRowDict["Close"])
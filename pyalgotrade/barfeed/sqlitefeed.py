@@ -18,24 +18,88 @@
 .. moduleauthor:: Gabriel Martin Becedillas Ruiz <gabriel.becedillas@gmail.com>
 """
 
+from pyalgotrade import barfeed
 from pyalgotrade.barfeed import dbfeed
 from pyalgotrade.barfeed import membf
 from pyalgotrade import bar
 from pyalgotrade.utils import dt
+from pyalgotrade.utils import dtparser
+import pyalgotrade.logger
 
+import contextlib
+import datetime
+import itertools
 import sqlite3
 import os
+import time
+
+import pytz
+
+logger = pyalgotrade.logger.getLogger("sqlitefeed")
+
+# The number of rows to insert with each executemany call.
+DEFAULT_BATCH_SIZE = 10000
+# The number of rows to read with each fetchmany call.
+DEFAULT_FETCH_SIZE = 1000
+
+BAR_COLUMNS = "instrument_id, frequency, timestamp, open, high, low, close, volume, adj_close"
+
+# Upserts were added in SQLite 3.24. Older versions replace the whole row instead, which is the same for the bar table.
+if sqlite3.sqlite_version_info >= (3, 24, 0):
+    UPSERT_BAR_SQL = "insert into bar (%s) values (?, ?, ?, ?, ?, ?, ?, ?, ?)" \
+        " on conflict (instrument_id, frequency, timestamp) do update set open = excluded.open" \
+        ", high = excluded.high, low = excluded.low, close = excluded.close, volume = excluded.volume" \
+        ", adj_close = excluded.adj_close" % BAR_COLUMNS
+else:
+    UPSERT_BAR_SQL = "insert or replace into bar (%s) values (?, ?, ?, ?, ?, ?, ?, ?, ?)" % BAR_COLUMNS
 
 
 def normalize_instrument(instrument):
     return instrument.upper()
 
 
+# Sets up a connection. synchronous = normal is safe with write-ahead logging, that gets enabled
+# before writing.
+def configure_connection(connection):
+    connection.execute("pragma synchronous = normal")
+    connection.execute("pragma cache_size = -65536")
+
+
+# Write-ahead logging makes commits cheaper and lets readers run while rows get written. The journal mode is stored in
+# the database, so it gets set before writing and databases that are only read are left untouched.
+# Temporary b-trees are kept in memory only for writes. Queries may need one to sort their whole result, and that
+# shouldn't have to fit in memory.
+def prepare_for_writes(connection):
+    connection.execute("pragma journal_mode = wal")
+    connection.execute("pragma temp_store = memory")
+
+
+# Returns a function that converts UTC timestamps to datetimes in a timezone, or in UTC if timezone is None.
+def build_timestamp_converter(timezone):
+    if timezone:
+        localizer = dtparser.Localizer(timezone)
+        return lambda timeStamp: localizer.fromUTC(dt.epoch_naive + datetime.timedelta(seconds=timeStamp))
+    return lambda timeStamp: (dt.epoch_naive + datetime.timedelta(seconds=timeStamp)).replace(tzinfo=pytz.utc)
+
+
+# Runs fn with batches of up to batchSize rows, and returns the number of rows.
+def process_in_batches(rows, batchSize, fn):
+    ret = 0
+    rows = iter(rows)
+    batch = list(itertools.islice(rows, batchSize))
+    while len(batch):
+        fn(batch)
+        ret += len(batch)
+        batch = list(itertools.islice(rows, batchSize))
+    return ret
+
+
 # SQLite DB.
 # Timestamps are stored in UTC.
 class Database(dbfeed.Database):
     def __init__(self, dbFilePath):
         self.__instrumentIds = {}
+        self.__preparedForWrites = False
 
         # If the file doesn't exist, we'll create it and initialize it.
         initialize = False
@@ -43,9 +107,46 @@ class Database(dbfeed.Database):
             initialize = True
         self.__connection = sqlite3.connect(dbFilePath)
         self.__connection.isolation_level = None  # To do auto-commit
-        if initialize:
+        configure_connection(self.__connection)
+        # The file may hold ticks only. Check pyalgotrade.tickfeed.sqlitefeed.
+        if initialize or not self.__hasBarTable():
             self.createSchema()
 
+    def __hasBarTable(self):
+        sql = "select count(*) from sqlite_master where type = 'table' and name = 'bar'"
+        return self.__connection.execute(sql).fetchone()[0] > 0
+
+    # Changes to the database that are not needed to read it are done before the first write.
+    def __prepareForWrites(self):
+        if not self.__preparedForWrites:
+            prepare_for_writes(self.__connection)
+            self.createIndexes()
+            self.__preparedForWrites = True
+
+    def createIndexes(self):
+        """Creates the indexes that :meth:`iterBars` uses to read bars sorted by datetime. Without them the whole
+        query result gets sorted before the first bar is returned.
+
+        .. note::
+            Databases created before the indexes were added get them the first time bars are written. Databases that
+            are only read should call this once.
+        """
+        self.__connection.execute("create index if not exists bar_frequency_timestamp on bar (frequency, timestamp)")
+
+    @contextlib.contextmanager
+    def __transaction(self):
+        self.__prepareForWrites()
+        # Instruments added in the transaction are gone if it gets rolled back, so their ids can't stay cached.
+        instrumentIds = dict(self.__instrumentIds)
+        self.__connection.execute("begin")
+        try:
+            yield
+        except Exception:
+            self.__connection.execute("rollback")
+            self.__instrumentIds = instrumentIds
+            raise
+        self.__connection.execute("commit")
+
     def __findInstrumentId(self, instrument):
         cursor = self.__connection.cursor()
         sql = "select instrument_id from instrument where name = ?"
@@ -60,6 +161,14 @@ class Database(dbfeed.Database):
         ret = self.__connection.execute("insert into instrument (name) values (?)", [instrument])
         return ret.lastrowid
 
+    def __getInstrumentId(self, instrument):
+        ret = self.__instrumentIds.get(instrument, None)
+        if ret is None:
+            ret = self.__findInstrumentId(instrument)
+            if ret is not None:
+                self.__instrumentIds[instrument] = ret
+        return ret
+
     def __getOrCreateInstrument(self, instrument):
         # Try to get the instrument id from the cache.
         ret = self.__instrumentIds.get(instrument, None)
@@ -76,12 +185,12 @@ class Database(dbfeed.Database):
 
     def createSchema(self):
         self.__connection.execute(
-            "create table instrument ("
+            "create table if not exists instrument ("
             "instrument_id integer primary key autoincrement"
             ", name text unique not null)")
 
         self.__connection.execute(
-            "create table bar ("
+            "create table if not exists bar ("
             "instrument_id integer references instrument (instrument_id)"
             ", frequency integer not null"
             ", timestamp integer not null"
@@ -92,21 +201,72 @@ class Database(dbfeed.Database):
             ", volume real not null"
             ", adj_close real"
             ", primary key (instrument_id, frequency, timestamp))")
+        self.__prepareForWrites()
+
+    def __getBarRow(self, instrument, bar, frequency, instrumentId=None):
+        if instrumentId is None:
+            instrumentId = self.__getOrCreateInstrument(normalize_instrument(instrument))
+        return (
+            instrumentId, frequency, dt.datetime_to_timestamp(bar.getDateTime()), bar.getOpen(), bar.getHigh(),
+            bar.getLow(), bar.getClose(), bar.getVolume(), bar.getAdjClose()
+        )
+
+    # Upserts rows in a single transaction, batchSize rows at a time, and returns the number of rows.
+    def __addBarRows(self, rows, batchSize):
+        def add_batch(batch):
+            self.__connection.executemany(UPSERT_BAR_SQL, batch)
+
+        begin = time.time()
+        with self.__transaction():
+            ret = process_in_batches(rows, batchSize, add_batch)
+        elapsed = time.time() - begin
+        logger.info("%d bars written in %.2f seconds (%.0f bars/s)" % (ret, elapsed, ret / max(elapsed, 1e-6)))
+        return ret
 
     def addBar(self, instrument, bar, frequency):
-        instrument = normalize_instrument(instrument)
-        instrumentId = self.__getOrCreateInstrument(instrument)
-        timeStamp = dt.datetime_to_timestamp(bar.getDateTime())
+        self.__prepareForWrites()
+        self.__connection.execute(UPSERT_BAR_SQL, self.__getBarRow(instrument, bar, frequency))
 
-        try:
-            sql = "insert into bar (instrument_id, frequency, timestamp, open, high, low, close, volume, adj_close) values (?, ?, ?, ?, ?, ?, ?, ?, ?)"
-            params = [instrumentId, frequency, timeStamp, bar.getOpen(), bar.getHigh(), bar.getLow(), bar.getClose(), bar.getVolume(), bar.getAdjClose()]
-            self.__connection.execute(sql, params)
-        except sqlite3.IntegrityError:
-            sql = "update bar set open = ?, high = ?, low = ?, close = ?, volume = ?, adj_close = ?" \
-                " where instrument_id = ? and frequency = ? and timestamp = ?"
-            params = [bar.getOpen(), bar.getHigh(), bar.getLow(), bar.getClose(), bar.getVolume(), bar.getAdjClose(), instrumentId, frequency, timeStamp]
-            self.__connection.execute(sql, params)
+    def addBars(self, bars, frequency):
+        with self.__transaction():
+            self.__connection.executemany(UPSERT_BAR_SQL, [
+                self.__getBarRow(instrument, bars[instrument], frequency) for instrument in bars.getInstruments()
+            ])
+
+    def addBarsFromSequence(self, instrument, bars, frequency, batchSize=DEFAULT_BATCH_SIZE):
+        """Adds bars for an instrument in a single transaction. Existing bars get updated.
+
+        :param instrument: Instrument identifier.
+        :type instrument: string.
+        :param bars: The bars.
+        :type bars: An iterable of :class:`pyalgotrade.bar.Bar`.
+        :param frequency: The frequency of the bars.
+        :param batchSize: The number of rows to insert at once.
+        :type batchSize: int.
+        :rtype: The number of bars written.
+        """
+        instrumentId = self.__getOrCreateInstrument(normalize_instrument(instrument))
+        return self.__addBarRows(
+            (self.__getBarRow(instrument, bar_, frequency, instrumentId) for bar_ in bars), batchSize
+        )
+
+    def addBarsFromFeed(self, feed, batchSize=DEFAULT_BATCH_SIZE):
+        """Adds all the bars in a feed in a single transaction. Existing bars get updated.
+
+        :param feed: The bar feed.
+        :type feed: :class:`pyalgotrade.barfeed.BaseBarFeed`.
+        :param batchSize: The number of rows to insert at once.
+        :type batchSize: int.
+        :rtype: The number of bars written.
+        """
+        frequency = feed.getFrequency()
+
+        def rows():
+            for dateTime, bars in feed:
+                if bars:
+                    for instrument in bars.getInstruments():
+                        yield self.__getBarRow(instrument, bars[instrument], frequency)
+        return self.__addBarRows(rows(), batchSize)
 
     def getBars(self, instrument, frequency, timezone=None, fromDateTime=None, toDateTime=None):
         instrument = normalize_instrument(instrument)
@@ -125,15 +285,74 @@ class Database(dbfeed.Database):
         sql += " order by bar.timestamp asc"
         cursor = self.__connection.cursor()
         cursor.execute(sql, args)
+        toDateTime = build_timestamp_converter(timezone)
         ret = []
         for row in cursor:
-            dateTime = dt.timestamp_to_datetime(row[0])
-            if timezone:
-                dateTime = dt.localize(dateTime, timezone)
-            ret.append(bar.BasicBar(dateTime, row[1], row[2], row[3], row[4], row[5], row[6], row[7]))
+            ret.append(bar.BasicBar(toDateTime(row[0]), row[1], row[2], row[3], row[4], row[5], row[6], row[7]))
         cursor.close()
         return ret
 
+    def iterBars(
+        self, instruments, frequency, timezone=None, fromDateTime=None, toDateTime=None, fetchSize=DEFAULT_FETCH_SIZE
+    ):
+        """Yields :class:`pyalgotrade.bar.Bars` for many instruments, sorted by datetime. Bars are read with a single
+        query, fetchSize rows at a time, so they don't need to fit in memory.
+
+        :param instruments: Instrument identifiers. Bars are keyed by these identifiers.
+        :type instruments: list.
+        :param frequency: The frequency of the bars.
+        :param timezone: The timezone for the datetimes, or None to get them in UTC.
+        :type timezone: A pytz timezone.
+        :param fromDateTime: The first datetime to include, or None.
+        :type fromDateTime: datetime.datetime.
+        :param toDateTime: The last datetime to include, or None.
+        :type toDateTime: datetime.datetime.
+        :param fetchSize: The number of rows to read at once.
+        :type fetchSize: int.
+        """
+        instruments = dict(
+            (self.__getInstrumentId(normalize_instrument(instrument)), instrument) for instrument in instruments
+        )
+        instruments.pop(None, None)
+        if len(instruments) == 0:
+            return
+
+        # Ids are integers, so they can go in the query. This avoids the limit on the number of parameters.
+        sql = "select instrument_id, timestamp, open, high, low, close, volume, adj_close, frequency from bar" \
+            " where frequency = ? and instrument_id in (%s)" % ", ".join(str(id_) for id_ in sorted(instruments))
+        args = [frequency]
+        if fromDateTime is not None:
+            sql += " and timestamp >= ?"
+            args.append(dt.datetime_to_timestamp(fromDateTime))
+        if toDateTime is not None:
+            sql += " and timestamp <= ?"
+            args.append(dt.datetime_to_timestamp(toDateTime))
+        sql += " order by timestamp asc"
+
+        converter = build_timestamp_converter(timezone)
+        cursor = self.__connection.cursor()
+        try:
+            cursor.execute(sql, args)
+            timeStamp = None
+            bars = {}
+            rows = cursor.fetchmany(fetchSize)
+            while len(rows):
+                for row in rows:
+                    if row[1] != timeStamp:
+                        if len(bars):
+                            yield bar.Bars(bars)
+                        timeStamp = row[1]
+                        dateTime = converter(timeStamp)
+                        bars = {}
+                    bars[instruments[row[0]]] = bar.BasicBar(
+                        dateTime, row[2], row[3], row[4], row[5], row[6], row[7], row[8]
+                    )
+                rows = cursor.fetchmany(fetchSize)
+            if len(bars):
+                yield bar.Bars(bars)
+        finally:
+            cursor.close()
+
     def disconnect(self):
         self.__connection.close()
         self.__connection = None
@@ -154,3 +373,109 @@ class Feed(membf.BarFeed):
     def loadBars(self, instrument, timezone=None, fromDateTime=None, toDateTime=None):
         bars = self.__db.getBars(instrument, self.getFrequency(), timezone, fromDateTime, toDateTime)
         self.addBarsFromSequence(instrument, bars)
+
+
+class StreamingFeed(barfeed.BaseBarFeed):
+    """A BarFeed that reads bars for many instruments from a SQLite database, sorted by datetime, as they are needed.
+    Bars for all instruments are read with a single query, so memory usage doesn't depend on the number of bars.
+
+    :param dbFilePath: The path to the database.
+    :type dbFilePath: string.
+    :param frequency: The frequency of the bars.
+    :param instruments: Instrument identifiers. All of them get registered in the bar feed.
+    :type instruments: list.
+    :param timezone: The timezone for the datetimes, or None to get them in UTC.
+    :type timezone: A pytz timezone.
+    :param fromDateTime: The first datetime to include, or None.
+    :type fromDateTime: datetime.datetime.
+    :param toDateTime: The last datetime to include, or None.
+    :type toDateTime: datetime.datetime.
+    :param maxLen: The maximum number of values that the :class:`pyalgotrade.dataseries.bards.BarDataSeries` will hold.
+        Once a bounded length is full, when new items are added, a corresponding number of items are discarded
+        from the opposite end. If None then dataseries.DEFAULT_MAX_LEN is used.
+    :type maxLen: int.
+    :param fetchSize: The number of rows to read from the database at once.
+    :type fetchSize: int.
+
+    .. note::
+        Bars are read in datetime order using an index. Check :meth:`Database.createIndexes`.
+    """
+
+    def __init__(
+        self, dbFilePath, frequency, instruments, timezone=None, fromDateTime=None, toDateTime=None, maxLen=None,
+        fetchSize=DEFAULT_FETCH_SIZE
+    ):
+        super(StreamingFeed, self).__init__(frequency, maxLen)
+
+        self.__db = Database(dbFilePath)
+        self.__instruments = list(instruments)
+        self.__timezone = timezone
+        self.__fromDateTime = fromDateTime
+        self.__toDateTime = toDateTime
+        self.__fetchSize = fetchSize
+        # A generator with the bars, and the next bars to return. They get built the first time they are needed.
+        self.__barsIterator = None
+        self.__nextBars = None
+        self.__stopped = False
+        self.__currDateTime = None
+
+        for instrument in self.__instruments:
+            self.registerInstrument(instrument)
+
+    def __closeBarsIterator(self):
+        if self.__barsIterator is not None:
+            self.__barsIterator.close()
+        self.__barsIterator = None
+        self.__nextBars = None
+
+    def __peekBars(self):
+        if self.__nextBars is None and not self.__stopped:
+            if self.__barsIterator is None:
+                self.__barsIterator = self.__db.iterBars(
+                    self.__instruments, self.getFrequency(), self.__timezone, self.__fromDateTime, self.__toDateTime,
+                    self.__fetchSize
+                )
+            self.__nextBars = next(self.__barsIterator, None)
+        return self.__nextBars
+
+    def reset(self):
+        self.__closeBarsIterator()
+        self.__stopped = False
+        self.__currDateTime = None
+        super(StreamingFeed, self).reset()
+
+    def getCurrentDateTime(self):
+        return self.__currDateTime
+
+    def barsHaveAdjClose(self):
+        return True
+
+    def getDatabase(self):
+        return self.__db
+
+    def start(self):
+        super(StreamingFeed, self).start()
+
+    def stop(self):
+        self.__closeBarsIterator()
+        self.__stopped = True
+
+    def join(self):
+        pass
+
+    def eof(self):
+        return self.__peekBars() is None
+
+    def peekDateTime(self):
+        ret = None
+        bars = self.__peekBars()
+        if bars is not None:
+            ret = bars.getDateTime()
+        return ret
+
+    def getNextBars(self):
+        ret = self.__peekBars()
+        if ret is not None:
+            self.__nextBars = None
+            self.__currDateTime = ret.getDateTime()
+        return ret
@@ -20,7 +20,7 @@
 
 from pyalgotrade.barfeed import csvfeed
 from pyalgotrade.barfeed import common
-from pyalgotrade.utils import dt
+from pyalgotrade.utils import dtparser
 from pyalgotrade import bar
 
 import datetime
@@ -51,6 +51,7 @@ class RowParser(csvfeed.RowParser):
         self.__dailyBarTime = dailyBarTime
         self.__frequency = frequency
         self.__timezone = timezone
+        self.__localizer = dtparser.Localizer(timezone) if timezone else None
         self.__sanitize = sanitize
         self.__barClass = barClass
 
@@ -60,8 +61,8 @@ class RowParser(csvfeed.RowParser):
         if self.__dailyBarTime is not None:
             ret = datetime.datetime.combine(ret, self.__dailyBarTime)
         # Localize the datetime if a timezone was given.
-        if self.__timezone:
-            ret = dt.localize(ret, self.__timezone)
+        if self.__localizer is not None:
+            ret = self.__localizer.localize(ret)
         return ret
 
     def getFieldNames(self):
@@ -71,6 +72,15 @@ class RowParser(csvfeed.RowParser):
     def getDelimiter(self):
         return ","
 
+    def getCacheSettings(self):
+        ret = None
+        if self.__barClass == bar.BasicBar:
+            ret = (repr(self.__dailyBarTime), str(self.__timezone), self.__sanitize)
+        return ret
+
+    def getTimezone(self):
+        return self.__timezone
+
     def parseBar(self, csvRowDict):
         dateTime = self.__parseDate(csvRowDict["Date"])
         close = float(csvRowDict["Close"])
@@ -19,12 +19,15 @@
 """
 
 import abc
+import bisect
 
+import numpy as np
 import six
 from six.moves import xrange
 
 from pyalgotrade import observer
 from pyalgotrade.utils import collections
+from pyalgotrade.utils import dt
 
 DEFAULT_MAX_LEN = 1024
 
@@ -37,6 +40,110 @@ def get_checked_max_len(maxLen):
     return maxLen
 
 
+def get_shared_datetime_index(dataSeries, maxLen):
+    """Returns the :class:`DateTimeIndex` from dataSeries if a dataseries that gets a new value every time
+    dataSeries does, and that holds up to maxLen values, can share it. Returns None otherwise."""
+    ret = dataSeries.getDateTimeIndex()
+    if ret is not None and ret.getMaxLen() < get_checked_max_len(maxLen):
+        ret = None
+    return ret
+
+
+class DateTimeIndex(object):
+    """Holds datetimes as int64 nanoseconds since the epoch (UTC), so that they can be shared by many dataseries.
+    Datetimes get built when they are accessed.
+
+    :param maxLen: The maximum number of datetimes to hold.
+        Once a bounded length is full, when new items are added, a corresponding number of items are discarded from the
+        opposite end. If None then dataseries.DEFAULT_MAX_LEN is used.
+    :type maxLen: int.
+
+    .. note::
+        * All datetimes should be either naive, or in the same timezone. The timezone of the first one is used to
+          build them back.
+        * Datetimes must be appended in ascending order.
+        * Once :meth:`getDateTimes` is called, datetimes are also kept as they are appended, so that it doesn't have to
+          build them again on every call.
+    """
+
+    def __init__(self, maxLen=None):
+        self.__timestamps = collections.NumPyDeque(get_checked_max_len(maxLen), np.int64)
+        self.__tzInfo = None
+        # The datetimes, built the first time getDateTimes is called.
+        self.__dateTimes = None
+        # The last list returned by getDateTimes for a count other than the number of datetimes, as (count, list).
+        self.__lastDateTimes = None
+
+    def __len__(self):
+        return len(self.__timestamps)
+
+    def getMaxLen(self):
+        return self.__timestamps.getMaxLen()
+
+    def resize(self, maxLen):
+        self.__timestamps.resize(maxLen)
+        if self.__dateTimes is not None:
+            self.__dateTimes.resize(maxLen)
+        self.__lastDateTimes = None
+
+    def append(self, dateTime):
+        if self.__tzInfo is None:
+            self.__tzInfo = dateTime.tzinfo
+        self.__timestamps.append(dt.datetime_to_epoch_ns(dateTime))
+        if self.__dateTimes is not None:
+            self.__dateTimes.append(dateTime)
+            self.__lastDateTimes = None
+
+    def getTimestamps(self):
+        """Returns a numpy.array view (not a copy) with the datetimes as int64 nanoseconds since the epoch (UTC)."""
+        return self.__timestamps.data()
+
+    def getDateTimeAbsolute(self, pos):
+        return dt.epoch_ns_to_datetime(self.__timestamps[pos], self.__tzInfo)
+
+    def __getLast(self, count):
+        ret = self.__timestamps.data()
+        if count is not None:
+            assert(count <= len(ret))
+            ret = ret[len(ret) - count:]
+        return ret
+
+    def __buildDateTimes(self):
+        timestamps = self.__timestamps.data()
+        if self.__tzInfo is None:
+            dateTimes = timestamps.view("datetime64[ns]").astype("datetime64[us]").tolist()
+        else:
+            dateTimes = [dt.epoch_ns_to_datetime(timestamp, self.__tzInfo) for timestamp in timestamps]
+        ret = collections.ListDeque(self.getMaxLen())
+        for dateTime in dateTimes:
+            ret.append(dateTime)
+        return ret
+
+    def getDateTimes(self, count=None):
+        """Returns a list with the last count datetimes, or all of them if count is None."""
+        if self.__dateTimes is None:
+            self.__dateTimes = self.__buildDateTimes()
+        ret = self.__dateTimes.data()
+        if count is not None and count != len(ret):
+            assert(count <= len(ret))
+            if self.__lastDateTimes is None or self.__lastDateTimes[0] != count:
+                self.__lastDateTimes = (count, ret[len(ret) - count:])
+            ret = self.__lastDateTimes[1]
+        return ret
+
+    def getSlice(self, fromDateTime=None, toDateTime=None, count=None):
+        """Returns a slice with the positions, within the last count datetimes (or all of them if count is None),
+        of the datetimes that are >= fromDateTime and <= toDateTime."""
+        timestamps = self.__getLast(count)
+        begin = 0
+        end = len(timestamps)
+        if fromDateTime is not None:
+            begin = int(np.searchsorted(timestamps, dt.datetime_to_epoch_ns(fromDateTime), "left"))
+        if toDateTime is not None:
+            end = int(np.searchsorted(timestamps, dt.datetime_to_epoch_ns(toDateTime), "right"))
+        return slice(begin, max(begin, end))
+
+
 # It is important to inherit object to get __getitem__ to work properly.
 # Check http://code.activestate.com/lists/python-list/621258/
 @six.add_metaclass(abc.ABCMeta)
@@ -76,6 +183,31 @@ class DataSeries(object):
         """Returns a list of :class:`datetime.datetime` associated with each value."""
         raise NotImplementedError()
 
+    def getDateTimeIndex(self):
+        """Returns the :class:`DateTimeIndex` that holds the datetimes, or None if this dataseries doesn't use one."""
+        return None
+
+    def getDateTimeSlice(self, fromDateTime=None, toDateTime=None):
+        """Returns a slice with the positions of the values whose datetimes are >= fromDateTime and <= toDateTime.
+
+        :param fromDateTime: The lower bound. If None, the range starts at the first value.
+        :type fromDateTime: :class:`datetime.datetime`.
+        :param toDateTime: The upper bound. If None, the range ends at the last value.
+        :type toDateTime: :class:`datetime.datetime`.
+        """
+        dateTimeIndex = self.getDateTimeIndex()
+        if dateTimeIndex is not None:
+            return dateTimeIndex.getSlice(fromDateTime, toDateTime, len(self))
+
+        dateTimes = self.getDateTimes()
+        begin = 0
+        end = len(dateTimes)
+        if fromDateTime is not None:
+            begin = bisect.bisect_left(dateTimes, fromDateTime)
+        if toDateTime is not None:
+            end = bisect.bisect_right(dateTimes, toDateTime)
+        return slice(begin, max(begin, end))
+
 
 class SequenceDataSeries(DataSeries):
     """A DataSeries that holds values in a sequence in memory.
@@ -84,15 +216,28 @@ class SequenceDataSeries(DataSeries):
         Once a bounded length is full, when new items are added, a corresponding number of items are discarded from the
         opposite end. If None then dataseries.DEFAULT_MAX_LEN is used.
     :type maxLen: int.
+    :param dateTimeIndex: An optional :class:`DateTimeIndex` to share, instead of holding datetimes.
+        A datetime must be appended to it before each value gets appended to this dataseries, and it can't hold less
+        values than this dataseries.
+    :type dateTimeIndex: :class:`DateTimeIndex`.
     """
 
-    def __init__(self, maxLen=None):
+    def __init__(self, maxLen=None, dateTimeIndex=None):
         super(SequenceDataSeries, self).__init__()
         maxLen = get_checked_max_len(maxLen)
 
         self.__newValueEvent = observer.Event()
         self.__values = collections.ListDeque(maxLen)
-        self.__dateTimes = collections.ListDeque(maxLen)
+        self.__dateTimeIndex = dateTimeIndex
+        if dateTimeIndex is None:
+            self.__dateTimes = collections.ListDeque(maxLen)
+        else:
+            self.__checkMaxLen(maxLen)
+            self.__dateTimes = None
+
+    def __checkMaxLen(self, maxLen):
+        if maxLen > self.__dateTimeIndex.getMaxLen():
+            raise Exception("maxLen can't be bigger than the datetime index maximum length")
 
     def __len__(self):
         return len(self.__values)
@@ -102,8 +247,11 @@ class SequenceDataSeries(DataSeries):
 
     def setMaxLen(self, maxLen):
         """Sets the maximum number of values to hold and resizes accordingly if necessary."""
+        if self.__dateTimes is None:
+            self.__checkMaxLen(maxLen)
+        else:
+            self.__dateTimes.resize(maxLen)
         self.__values.resize(maxLen)
-        self.__dateTimes.resize(maxLen)
 
     def getMaxLen(self):
         """Returns the maximum number of values to hold."""
@@ -131,17 +279,26 @@ class SequenceDataSeries(DataSeries):
         Appends a value with an associated datetime.
 
         .. note::
-            If dateTime is not None, it must be greater than the last one.
+            * If dateTime is not None, it must be greater than the last one.
+            * If a :class:`DateTimeIndex` is shared, dateTime is not stored.
         """
 
         # if dateTime is not None and len(self.__dateTimes) != 0 and self.__dateTimes[-1] >= dateTime:
         #     raise Exception("Invalid datetime. It must be bigger than that last one")
 
-        assert(len(self.__values) == len(self.__dateTimes))
-        self.__dateTimes.append(dateTime)
+        if self.__dateTimes is not None:
+            assert(len(self.__values) == len(self.__dateTimes))
+            self.__dateTimes.append(dateTime)
         self.__values.append(value)
 
-        self.getNewValueEvent().emit(self, dateTime, value)
+        newValueEvent = self.getNewValueEvent()
+        if newValueEvent.hasSubscribers():
+            newValueEvent.emit(self, dateTime, value)
 
     def getDateTimes(self):
+        if self.__dateTimes is None:
+            return self.__dateTimeIndex.getDateTimes(len(self.__values))
         return self.__dateTimes.data()
+
+    def getDateTimeIndex(self):
+        return self.__dateTimeIndex
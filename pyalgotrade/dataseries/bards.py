@@ -18,12 +18,64 @@
 .. moduleauthor:: Gabriel Martin Becedillas Ruiz <gabriel.becedillas@gmail.com>
 """
 
-from pyalgotrade import dataseries
+import abc
 
+import numpy as np
 import six
 
+from pyalgotrade import dataseries
+from pyalgotrade.dataseries import columnar
+from pyalgotrade.utils import collections
+from pyalgotrade import bar
+
+
+@six.add_metaclass(abc.ABCMeta)
+class BaseBarDataSeries(dataseries.DataSeries):
+    """Base class for data series of :class:`pyalgotrade.bar.Bar` instances, like :class:`BarDataSeries` and
+    :class:`ColumnarBarDataSeries`.
+
+    .. note::
+        This is a base class and should not be used directly.
+    """
+
+    @abc.abstractmethod
+    def setUseAdjustedValues(self, useAdjusted):
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def getOpenDataSeries(self):
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def getCloseDataSeries(self):
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def getHighDataSeries(self):
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def getLowDataSeries(self):
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def getVolumeDataSeries(self):
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def getAdjCloseDataSeries(self):
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def getPriceDataSeries(self):
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def getExtraDataSeries(self, name):
+        raise NotImplementedError()
 
-class BarDataSeries(dataseries.SequenceDataSeries):
+
+class BarDataSeries(dataseries.SequenceDataSeries, BaseBarDataSeries):
     """A DataSeries of :class:`pyalgotrade.bar.Bar` instances.
 
     :param maxLen: The maximum number of values to hold.
@@ -33,13 +85,15 @@ class BarDataSeries(dataseries.SequenceDataSeries):
     """
 
     def __init__(self, maxLen=None):
-        super(BarDataSeries, self).__init__(maxLen)
-        self.__openDS = dataseries.SequenceDataSeries(maxLen)
-        self.__closeDS = dataseries.SequenceDataSeries(maxLen)
-        self.__highDS = dataseries.SequenceDataSeries(maxLen)
-        self.__lowDS = dataseries.SequenceDataSeries(maxLen)
-        self.__volumeDS = dataseries.SequenceDataSeries(maxLen)
-        self.__adjCloseDS = dataseries.SequenceDataSeries(maxLen)
+        # Datetimes are held once, and shared with the dataseries for each field.
+        self.__dateTimeIndex = dataseries.DateTimeIndex(maxLen)
+        super(BarDataSeries, self).__init__(maxLen, self.__dateTimeIndex)
+        self.__openDS = dataseries.SequenceDataSeries(maxLen, self.__dateTimeIndex)
+        self.__closeDS = dataseries.SequenceDataSeries(maxLen, self.__dateTimeIndex)
+        self.__highDS = dataseries.SequenceDataSeries(maxLen, self.__dateTimeIndex)
+        self.__lowDS = dataseries.SequenceDataSeries(maxLen, self.__dateTimeIndex)
+        self.__volumeDS = dataseries.SequenceDataSeries(maxLen, self.__dateTimeIndex)
+        self.__adjCloseDS = dataseries.SequenceDataSeries(maxLen, self.__dateTimeIndex)
         self.__extraDS = {}
         self.__useAdjustedValues = False
 
@@ -53,6 +107,14 @@ class BarDataSeries(dataseries.SequenceDataSeries):
     def setUseAdjustedValues(self, useAdjusted):
         self.__useAdjustedValues = useAdjusted
 
+    def setMaxLen(self, maxLen):
+        self.__dateTimeIndex.resize(maxLen)
+        super(BarDataSeries, self).setMaxLen(maxLen)
+        for ds in [self.__openDS, self.__closeDS, self.__highDS, self.__lowDS, self.__volumeDS, self.__adjCloseDS]:
+            ds.setMaxLen(maxLen)
+        for ds in six.itervalues(self.__extraDS):
+            ds.setMaxLen(maxLen)
+
     def append(self, bar):
         self.appendWithDateTime(bar.getDateTime(), bar)
 
@@ -61,6 +123,7 @@ class BarDataSeries(dataseries.SequenceDataSeries):
         assert(bar is not None)
         bar.setUseAdjustedValue(self.__useAdjustedValues)
 
+        self.__dateTimeIndex.append(dateTime)
         super(BarDataSeries, self).appendWithDateTime(dateTime, bar)
 
         self.__openDS.appendWithDateTime(dateTime, bar.getOpen())
@@ -109,3 +172,153 @@ class BarDataSeries(dataseries.SequenceDataSeries):
     def getExtraDataSeries(self, name):
         """Returns a :class:`pyalgotrade.dataseries.DataSeries` for an extra column."""
         return self.__getOrCreateExtraDS(name)
+
+
+class ColumnarBarDataSeries(columnar.ColumnarDataSeries, BaseBarDataSeries):
+    """A DataSeries of :class:`pyalgotrade.bar.Bar` instances that stores open, high, low, close, volume and adjusted
+    close values in numpy arrays.
+
+    :param maxLen: The maximum number of values to hold.
+        Once a bounded length is full, when new items are added, a corresponding number of items are discarded from the
+        opposite end. If None then dataseries.DEFAULT_MAX_LEN is used.
+    :type maxLen: int.
+
+    .. note::
+        * Bars are not stored. :class:`pyalgotrade.bar.BasicBar` instances are built when accessed.
+        * The dataseries for each field are created the first time they are requested, and only those get
+          notified about new values.
+        * All bars are expected to have the same frequency.
+    """
+
+    def __init__(self, maxLen=None):
+        super(ColumnarBarDataSeries, self).__init__(["open", "high", "low", "close", "volume", "adj_close"], maxLen)
+        # Extra columns can hold anything, so they're kept as they are.
+        self.__extra = collections.ListDeque(self.getMaxLen())
+        self.__extraDS = {}
+        self.__frequency = None
+        self.__useAdjustedValues = False
+
+    def buildValue(self, pos):
+        open_, high, low, close, volume, adjClose = self.getColumnValuesAbsolute(pos)
+        extra = self.__extra[pos]
+        if extra is None:
+            extra = {}
+        ret = bar.BasicBar(
+            self.getDateTimeAbsolute(pos), open_, high, low, close, volume, adjClose, self.__frequency, extra=extra
+        )
+        ret.setUseAdjustedValue(self.__useAdjustedValues)
+        return ret
+
+    def getColumnValueAbsolute(self, name, pos):
+        if name in self.__extraDS:
+            extra = self.__extra[pos]
+            ret = None if extra is None else extra.get(name)
+        else:
+            ret = super(ColumnarBarDataSeries, self).getColumnValueAbsolute(name, pos)
+        return ret
+
+    def getColumnArray(self, name):
+        """Returns a numpy.array with the values for a given column. For open, high, low, close, volume and adjusted
+        close this is a view (not a copy). For extra columns it is a copy, where missing values are NaN."""
+        if name in self.getColumnNames():
+            return super(ColumnarBarDataSeries, self).getColumnArray(name)
+
+        values = [None if extra is None else extra.get(name) for extra in self.__extra.data()]
+        try:
+            ret = np.array(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            # Extra columns can hold anything.
+            ret = np.array(values, dtype=object)
+        return ret
+
+    def setMaxLen(self, maxLen):
+        super(ColumnarBarDataSeries, self).setMaxLen(maxLen)
+        self.__extra.resize(maxLen)
+
+    def setUseAdjustedValues(self, useAdjusted):
+        self.__useAdjustedValues = useAdjusted
+
+    def append(self, bar_):
+        self.appendWithDateTime(bar_.getDateTime(), bar_)
+
+    def appendWithDateTime(self, dateTime, bar_):
+        assert(dateTime is not None)
+        assert(bar_ is not None)
+        bar_.setUseAdjustedValue(self.__useAdjustedValues)
+
+        if self.__frequency is None:
+            self.__frequency = bar_.getFrequency()
+        extra = bar_.getExtraColumns()
+        self.__extra.append(extra if extra else None)
+
+        self.appendColumnsWithDateTime(dateTime, bar_, (
+            bar_.getOpen(), bar_.getHigh(), bar_.getLow(), bar_.getClose(), bar_.getVolume(), bar_.getAdjClose()
+        ))
+
+        for name, extraDS in six.iteritems(self.__extraDS):
+            newValueEvent = extraDS.getNewValueEvent()
+            if newValueEvent.hasSubscribers():
+                newValueEvent.emit(extraDS, dateTime, extra.get(name))
+
+    def getOpenDataSeries(self):
+        """Returns a :class:`pyalgotrade.dataseries.DataSeries` with the open prices."""
+        return self.getColumnDataSeries("open")
+
+    def getCloseDataSeries(self):
+        """Returns a :class:`pyalgotrade.dataseries.DataSeries` with the close prices."""
+        return self.getColumnDataSeries("close")
+
+    def getHighDataSeries(self):
+        """Returns a :class:`pyalgotrade.dataseries.DataSeries` with the high prices."""
+        return self.getColumnDataSeries("high")
+
+    def getLowDataSeries(self):
+        """Returns a :class:`pyalgotrade.dataseries.DataSeries` with the low prices."""
+        return self.getColumnDataSeries("low")
+
+    def getVolumeDataSeries(self):
+        """Returns a :class:`pyalgotrade.dataseries.DataSeries` with the volume."""
+        return self.getColumnDataSeries("volume")
+
+    def getAdjCloseDataSeries(self):
+        """Returns a :class:`pyalgotrade.dataseries.DataSeries` with the adjusted close prices."""
+        return self.getColumnDataSeries("adj_close")
+
+    def getPriceDataSeries(self):
+        """Returns a :class:`pyalgotrade.dataseries.DataSeries` with the close or adjusted close prices."""
+        if self.__useAdjustedValues:
+            return self.getAdjCloseDataSeries()
+        else:
+            return self.getCloseDataSeries()
+
+    def getExtraDataSeries(self, name):
+        """Returns a :class:`pyalgotrade.dataseries.DataSeries` for an extra column."""
+        ret = self.__extraDS.get(name)
+        if ret is None:
+            ret = columnar.ColumnDataSeries(self, name)
+            self.__extraDS[name] = ret
+        return ret
+
+    def getOpenArray(self):
+        """Returns a numpy.array view (not a copy) with the open prices."""
+        return self.getColumnArray("open")
+
+    def getHighArray(self):
+        """Returns a numpy.array view (not a copy) with the high prices."""
+        return self.getColumnArray("high")
+
+    def getLowArray(self):
+        """Returns a numpy.array view (not a copy) with the low prices."""
+        return self.getColumnArray("low")
+
+    def getCloseArray(self):
+        """Returns a numpy.array view (not a copy) with the close prices."""
+        return self.getColumnArray("close")
+
+    def getVolumeArray(self):
+        """Returns a numpy.array view (not a copy) with the volume."""
+        return self.getColumnArray("volume")
+
+    def getAdjCloseArray(self):
+        """Returns a numpy.array view (not a copy) with the adjusted close prices. Missing values are NaN."""
+        return self.getColumnArray("adj_close")
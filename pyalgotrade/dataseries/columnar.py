@@ -0,0 +1,202 @@
+# PyAlgoTrade
+#
+# Copyright 2011-2018 Gabriel Martin Becedillas Ruiz
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. moduleauthor:: Gabriel Martin Becedillas Ruiz <gabriel.becedillas@gmail.com>
+"""
+
+import abc
+
+import numpy as np
+import six
+
+from pyalgotrade import dataseries
+from pyalgotrade import observer
+from pyalgotrade.utils import collections
+
+
+def nan_to_none(value):
+    if value != value:
+        value = None
+    return value
+
+
+class ColumnDataSeries(dataseries.DataSeries):
+    """A read-only :class:`pyalgotrade.dataseries.DataSeries` with the values for one of the columns
+    of a :class:`ColumnarDataSeries`. Values are not copied.
+
+    .. note::
+        This class should not be instantiated directly. Use :meth:`ColumnarDataSeries.getColumnDataSeries` instead.
+    """
+
+    def __init__(self, owner, name):
+        super(ColumnDataSeries, self).__init__()
+        self.__owner = owner
+        self.__name = name
+        self.__newValueEvent = observer.Event()
+
+    def __len__(self):
+        return len(self.__owner)
+
+    def getName(self):
+        return self.__name
+
+    def getMaxLen(self):
+        return self.__owner.getMaxLen()
+
+    # Event handler receives:
+    # 1: Dataseries generating the event
+    # 2: The datetime for the new value
+    # 3: The new value
+    def getNewValueEvent(self):
+        return self.__newValueEvent
+
+    def getValueAbsolute(self, pos):
+        ret = None
+        if pos >= 0 and pos < len(self.__owner):
+            ret = self.__owner.getColumnValueAbsolute(self.__name, pos)
+        return ret
+
+    def getDateTimes(self):
+        return self.__owner.getDateTimes()
+
+    def getDateTimeIndex(self):
+        return self.__owner.getDateTimeIndex()
+
+    def getArray(self):
+        """Returns a numpy.array with the values. See :meth:`ColumnarDataSeries.getColumnArray`."""
+        return self.__owner.getColumnArray(self.__name)
+
+
+@six.add_metaclass(abc.ABCMeta)
+class ColumnarDataSeries(dataseries.DataSeries):
+    """Base class for data series that store numeric fields in columns (numpy arrays) instead of holding
+    the objects that get appended. Datetimes are stored in a :class:`pyalgotrade.dataseries.DateTimeIndex`, and both
+    datetimes and values get built when they are accessed.
+
+    :param columnNames: The names of the columns.
+    :type columnNames: list.
+    :param maxLen: The maximum number of values to hold.
+        Once a bounded length is full, when new items are added, a corresponding number of items are discarded from the
+        opposite end. If None then dataseries.DEFAULT_MAX_LEN is used.
+    :type maxLen: int.
+
+    .. note::
+        * This is a base class and should not be used directly.
+        * The dataseries for each column are created on demand, and only those are notified about new values.
+        * All datetimes should be either naive, or in the same timezone.
+        * None values are stored as NaN.
+    """
+
+    def __init__(self, columnNames, maxLen=None):
+        super(ColumnarDataSeries, self).__init__()
+        maxLen = dataseries.get_checked_max_len(maxLen)
+
+        self.__newValueEvent = observer.Event()
+        self.__dateTimeIndex = dataseries.DateTimeIndex(maxLen)
+        self.__columnNames = list(columnNames)
+        self.__columns = [collections.NumPyDeque(maxLen, np.float64) for name in self.__columnNames]
+        self.__columnsByName = dict(zip(self.__columnNames, self.__columns))
+        # Column dataseries created on demand, as (position, dataseries) pairs.
+        self.__columnDS = []
+
+    # Override to build the value at a given position. The position is always valid.
+    @abc.abstractmethod
+    def buildValue(self, pos):
+        raise NotImplementedError()
+
+    def __len__(self):
+        return len(self.__dateTimeIndex)
+
+    def getMaxLen(self):
+        """Returns the maximum number of values to hold."""
+        return self.__dateTimeIndex.getMaxLen()
+
+    def setMaxLen(self, maxLen):
+        """Sets the maximum number of values to hold and resizes accordingly if necessary."""
+        self.__dateTimeIndex.resize(maxLen)
+        for column in self.__columns:
+            column.resize(maxLen)
+
+    # Event handler receives:
+    # 1: Dataseries generating the event
+    # 2: The datetime for the new value
+    # 3: The new value
+    def getNewValueEvent(self):
+        return self.__newValueEvent
+
+    def getColumnNames(self):
+        return self.__columnNames
+
+    def appendColumnsWithDateTime(self, dateTime, value, columnValues):
+        """
+        Appends a value with an associated datetime.
+
+        :param dateTime: The datetime. It can't be None.
+        :param value: The value to notify subscribers. It is not stored.
+        :param columnValues: The values for each column, in the same order as the column names.
+        """
+
+        self.__dateTimeIndex.append(dateTime)
+        for column, columnValue in zip(self.__columns, columnValues):
+            column.append(columnValue)
+
+        if self.__newValueEvent.hasSubscribers():
+            self.__newValueEvent.emit(self, dateTime, value)
+        for pos, columnDS in self.__columnDS:
+            newValueEvent = columnDS.getNewValueEvent()
+            if newValueEvent.hasSubscribers():
+                newValueEvent.emit(columnDS, dateTime, columnValues[pos])
+
+    def getValueAbsolute(self, pos):
+        ret = None
+        if pos >= 0 and pos < len(self.__dateTimeIndex):
+            ret = self.buildValue(pos)
+        return ret
+
+    def getColumnValueAbsolute(self, name, pos):
+        return nan_to_none(self.__columnsByName[name][pos].item())
+
+    def getColumnValuesAbsolute(self, pos):
+        """Returns a list with the values for each column at a given position."""
+        return [nan_to_none(column[pos].item()) for column in self.__columns]
+
+    def getDateTimeAbsolute(self, pos):
+        return self.__dateTimeIndex.getDateTimeAbsolute(pos)
+
+    def getDateTimes(self):
+        return self.__dateTimeIndex.getDateTimes()
+
+    def getDateTimeIndex(self):
+        return self.__dateTimeIndex
+
+    def getTimestampArray(self):
+        """Returns a numpy.array view (not a copy) with the datetimes as int64 nanoseconds since the epoch (UTC)."""
+        return self.__dateTimeIndex.getTimestamps()
+
+    def getColumnArray(self, name):
+        """Returns a numpy.array view (not a copy) with the values for a given column."""
+        return self.__columnsByName[name].data()
+
+    def getColumnDataSeries(self, name):
+        """Returns a :class:`ColumnDataSeries` for a given column. It gets created the first time it is requested."""
+        pos = self.__columnNames.index(name)
+        for columnPos, columnDS in self.__columnDS:
+            if columnPos == pos:
+                return columnDS
+        ret = ColumnDataSeries(self, name)
+        self.__columnDS.append((pos, ret))
+        return ret
@@ -128,7 +128,7 @@ class ResampledBarDataSeries(bards.BarDataSeries, DSResampler):
     """
 
     def __init__(self, dataSeries, frequency, maxLen=None):
-        if not isinstance(dataSeries, bards.BarDataSeries):
+        if not isinstance(dataSeries, bards.BaseBarDataSeries):
             raise Exception("dataSeries must be a dataseries.bards.BarDataSeries instance")
 
         super(ResampledBarDataSeries, self).__init__(maxLen)
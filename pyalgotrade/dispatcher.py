@@ -18,6 +18,8 @@
 .. moduleauthor:: Gabriel Martin Becedillas Ruiz <gabriel.becedillas@gmail.com>
 """
 
+import heapq
+
 from pyalgotrade import utils
 from pyalgotrade import observer
 from pyalgotrade import dispatchprio
@@ -31,6 +33,13 @@ class Dispatcher(object):
         self.__startEvent = observer.Event()
         self.__idleEvent = observer.Event()
         self.__currDateTime = None
+        self.__usePriorityQueue = False
+        # Used when scheduling with a priority queue. (datetime, position, subject) tuples for subjects with a datetime
+        # for their next event, and (position, subject) tuples for the ones that are realtime or hit eof, that get
+        # checked on every iteration. Positions are in self.__subjects, so both get rebuilt when subjects are added.
+        self.__queue = []
+        self.__polledSubjects = []
+        self.__rebuildQueue = True
 
     # Returns the current event datetime. It may be None for events from realtime subjects.
     def getCurrentDateTime(self):
@@ -48,6 +57,26 @@ class Dispatcher(object):
     def getSubjects(self):
         return self.__subjects
 
+    def getUsePriorityQueue(self):
+        return self.__usePriorityQueue
+
+    def setUsePriorityQueue(self, usePriorityQueue):
+        """Sets whether to schedule subjects using a priority queue. Non-realtime subjects are kept in a heap keyed by
+        the datetime for their next event, and get checked only when they dispatch, instead of polling every subject
+        on every iteration. Realtime subjects, the ones with peekDateTime() returning None, are still checked on every
+        iteration, and subjects with events at the same datetime are dispatched in priority order.
+
+        :param usePriorityQueue: True to use a priority queue.
+        :type usePriorityQueue: boolean.
+
+        .. note::
+            * The datetime for the next event from a non-realtime subject should only change when it dispatches.
+            * Subjects that hit eof are still checked on every iteration, since they may have more events later.
+            * For strategies, use getDispatcher().setUsePriorityQueue(True) before running them.
+        """
+        self.__usePriorityQueue = usePriorityQueue
+        self.__rebuildQueue = True
+
     def addSubject(self, subject):
         # Skip the subject if it was already added.
         if subject in self.__subjects:
@@ -64,6 +93,8 @@ class Dispatcher(object):
                     break
                 pos += 1
             self.__subjects.insert(pos, subject)
+        # Positions changed.
+        self.__rebuildQueue = True
 
         subject.onDispatcherRegistered(self)
 
@@ -98,6 +129,59 @@ class Dispatcher(object):
                     eventsDispatched = True
         return eof, eventsDispatched
 
+    # Puts a subject in the queue if it has a datetime for its next event, or with the ones that get polled.
+    # Returns True if the subject is realtime.
+    def __schedule(self, position, subject):
+        eof = subject.eof()
+        dateTime = None
+        if not eof:
+            dateTime = subject.peekDateTime()
+        if dateTime is None:
+            self.__polledSubjects.append((position, subject))
+        else:
+            heapq.heappush(self.__queue, (dateTime, position, subject))
+        return not eof and dateTime is None
+
+    # Same as __dispatch, but using a priority queue. Subjects with a datetime for their next event get checked after
+    # they dispatch, instead of on every iteration.
+    def __dispatchFromQueue(self):
+        if self.__rebuildQueue:
+            self.__rebuildQueue = False
+            self.__queue = []
+            self.__polledSubjects = list(enumerate(self.__subjects))
+
+        # Realtime subjects may have events, and subjects that hit eof may have more events, at any time.
+        polledSubjects = self.__polledSubjects
+        self.__polledSubjects = []
+        realtimeSubjects = [
+            (position, subject) for position, subject in polledSubjects if self.__schedule(position, subject)
+        ]
+        # Subjects that hit eof without dispatching get polled.
+        while len(self.__queue) and self.__queue[0][2].eof():
+            dateTime, position, subject = heapq.heappop(self.__queue)
+            self.__polledSubjects.append((position, subject))
+
+        eof = len(self.__queue) == 0 and len(realtimeSubjects) == 0
+        eventsDispatched = False
+        if not eof:
+            smallestDateTime = self.__queue[0][0] if len(self.__queue) else None
+            self.__currDateTime = smallestDateTime
+
+            # Dispatch realtime subjects and those subjects with the lowest datetime, in priority order.
+            due = [(position, subject, True) for position, subject in realtimeSubjects]
+            while len(self.__queue) and self.__queue[0][0] == smallestDateTime:
+                dateTime, position, subject = heapq.heappop(self.__queue)
+                due.append((position, subject, False))
+            due.sort(key=lambda item: item[0])
+
+            # Realtime subjects were already put with the ones that get polled.
+            for position, subject, realtime in due:
+                if subject.dispatch() is True:
+                    eventsDispatched = True
+                if not realtime:
+                    self.__schedule(position, subject)
+        return eof, eventsDispatched
+
     def run(self):
         try:
             for subject in self.__subjects:
@@ -106,7 +190,10 @@ class Dispatcher(object):
             self.__startEvent.emit()
 
             while not self.__stop:
-                eof, eventsDispatched = self.__dispatch()
+                if self.__usePriorityQueue:
+                    eof, eventsDispatched = self.__dispatchFromQueue()
+                else:
+                    eof, eventsDispatched = self.__dispatch()
                 if eof:
                     self.__stop = True
                 elif not eventsDispatched:
@@ -114,6 +201,7 @@ class Dispatcher(object):
         finally:
             # There are no more events.
             self.__currDateTime = None
+            self.__rebuildQueue = True
 
             for subject in self.__subjects:
                 subject.stop()
@@ -19,12 +19,12 @@
 """
 
 import abc
-import datetime
 
 import six
 
-from pyalgotrade.utils import dt
 from pyalgotrade.utils import csvutils
+from pyalgotrade.utils import dtparser
+from pyalgotrade.utils import fileutils
 from pyalgotrade.feed import memfeed
 
 
@@ -85,11 +85,12 @@ class BaseFeed(memfeed.MemFeed):
     def addValuesFromCSV(self, path):
         # Load the values from the csv file
         values = []
-        reader = csvutils.FastDictReader(open(path, "r"), fieldnames=self.__rowParser.getFieldNames(), delimiter=self.__rowParser.getDelimiter())
-        for row in reader:
-            dateTime, rowValues = self.__rowParser.parseRow(row)
-            if dateTime is not None and (self.__rowFilter is None or self.__rowFilter.includeRow(dateTime, rowValues)):
-                values.append((dateTime, rowValues))
+        with fileutils.open_file(path) as f:
+            reader = csvutils.FastDictReader(f, fieldnames=self.__rowParser.getFieldNames(), delimiter=self.__rowParser.getDelimiter())
+            for row in reader:
+                dateTime, rowValues = self.__rowParser.parseRow(row)
+                if dateTime is not None and (self.__rowFilter is None or self.__rowFilter.includeRow(dateTime, rowValues)):
+                    values.append((dateTime, rowValues))
 
         self.addValues(values)
 
@@ -99,18 +100,20 @@ class BasicRowParser(RowParser):
     def __init__(self, dateTimeColumn, dateTimeFormat, converter, delimiter=",", timezone=None):
         self.__dateTimeColumn = dateTimeColumn
         self.__dateTimeFormat = dateTimeFormat
+        self.__dateTimeParser = dtparser.get_parser(dateTimeFormat)
         self.__converter = converter
         self.__delimiter = delimiter
         self.__timezone = timezone
+        self.__localizer = dtparser.Localizer(timezone) if timezone is not None else None
         self.__timeDelta = None
 
     def parseRow(self, csvRowDict):
-        dateTime = datetime.datetime.strptime(csvRowDict[self.__dateTimeColumn], self.__dateTimeFormat)
+        dateTime = self.__dateTimeParser.parse(csvRowDict[self.__dateTimeColumn])
         # Localize the datetime if a timezone was given.
-        if self.__timezone is not None:
+        if self.__localizer is not None:
             if self.__timeDelta is not None:
                 dateTime += self.__timeDelta
-            dateTime = dt.localize(dateTime, self.__timezone)
+            dateTime = self.__localizer.localize(dateTime)
         # Convert the values
         values = {}
         for key, value in csvRowDict.items():
@@ -137,7 +140,8 @@ class Feed(BaseFeed):
 
     :param dateTimeColumn: The name of the column that has the datetime information.
     :type dateTimeColumn: string.
-    :param dateTimeFormat: The datetime format. datetime.datetime.strptime will be used to parse the column.
+    :param dateTimeFormat: The datetime format, as used by datetime.datetime.strptime. Check
+        :func:`pyalgotrade.utils.dtparser.get_parser`.
     :type dateTimeFormat: string.
     :param converter: A function with two parameters (column name and value) used to convert the string
         value to something else. The default coverter will try to convert the value to a float. If that fails
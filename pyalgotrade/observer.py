@@ -26,47 +26,33 @@ from pyalgotrade import dispatchprio
 
 
 class Event(object):
+    # Handlers are kept in a tuple that gets replaced when handlers are subscribed or unsubscribed, so emit can iterate
+    # over it without any bookkeeping. Handlers subscribed while emitting will be called on the next emission, and
+    # handlers unsubscribed while emitting still get called on the current one.
     def __init__(self):
-        self.__handlers = []
-        self.__deferred = []
-        self.__emitting = 0
+        self.__handlers = ()
 
-    def __subscribeImpl(self, handler):
-        assert not self.__emitting
+    def subscribe(self, handler):
         if handler not in self.__handlers:
-            self.__handlers.append(handler)
+            self.__handlers = self.__handlers + (handler,)
 
-    def __unsubscribeImpl(self, handler):
-        assert not self.__emitting
-        self.__handlers.remove(handler)
+    def unsubscribe(self, handler):
+        handlers = list(self.__handlers)
+        handlers.remove(handler)
+        self.__handlers = tuple(handlers)
 
-    def __applyChanges(self):
-        assert not self.__emitting
-        for action, param in self.__deferred:
-            action(param)
-        self.__deferred = []
+    def hasSubscribers(self):
+        """Returns True if there are handlers subscribed. Publishers can check this to avoid building event arguments
+        that nobody will receive."""
+        return len(self.__handlers) > 0
 
-    def subscribe(self, handler):
-        if self.__emitting:
-            self.__deferred.append((self.__subscribeImpl, handler))
-        elif handler not in self.__handlers:
-            self.__subscribeImpl(handler)
-
-    def unsubscribe(self, handler):
-        if self.__emitting:
-            self.__deferred.append((self.__unsubscribeImpl, handler))
-        else:
-            self.__unsubscribeImpl(handler)
+    def getHandlers(self):
+        """Returns the subscribed handlers, in the order they get called."""
+        return self.__handlers
 
     def emit(self, *args, **kwargs):
-        try:
-            self.__emitting += 1
-            for handler in self.__handlers:
-                handler(*args, **kwargs)
-        finally:
-            self.__emitting -= 1
-            if not self.__emitting:
-                self.__applyChanges()
+        for handler in self.__handlers:
+            handler(*args, **kwargs)
 
 
 @six.add_metaclass(abc.ABCMeta)
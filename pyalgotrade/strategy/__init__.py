@@ -29,6 +29,7 @@ from pyalgotrade import observer
 from pyalgotrade import dispatcher
 import pyalgotrade.strategy.position
 from pyalgotrade import logger
+from pyalgotrade.utils import profiler
 from pyalgotrade.barfeed import resampled
 
 
@@ -56,6 +57,8 @@ class BaseStrategy(object):
         self.__analyzers = []
         self.__namedAnalyzers = {}
         self.__resampledBarFeeds = []
+        self.__profilingEnabled = False
+        self.__profiler = None
         self.__dispatcher = dispatcher.Dispatcher()
         self.__broker.getOrderUpdatedEvent().subscribe(self.__onOrderEvent)
         self.__barFeed.getNewValuesEvent().subscribe(self.__onBars)
@@ -509,9 +512,44 @@ class BaseStrategy(object):
         # 3: Notify that the bars were processed.
         self.__barsProcessedEvent.emit(self, bars)
 
+    def setProfilingEnabled(self, enabled):
+        """Enables or disables measuring the wall time and the number of calls for each phase of :meth:`run`, like
+        loading bars, updating dataseries and indicators, processing orders, :meth:`onBars` and analyzers. When
+        enabled, a report gets logged at the end of the run. This is disabled by default.
+
+        :param enabled: True to enable profiling.
+        :type enabled: boolean.
+        """
+        self.__profilingEnabled = enabled
+
+    def getProfiler(self):
+        """Returns the :class:`pyalgotrade.utils.profiler.Profiler` for the last run, or None if profiling was not
+        enabled."""
+        return self.__profiler
+
+    def __buildProfiler(self):
+        ret = profiler.Profiler()
+        ret.instrument(self.__barFeed, "getNextValues")
+        ret.instrument(self.__barFeed, "getNextValuesAndUpdateDS")
+        ret.instrument(self, "onBars")
+        for analyzer in self.__analyzers:
+            ret.instrument(analyzer, "beforeOnBars")
+        return ret
+
     def run(self):
         """Call once (**and only once**) to run the strategy."""
-        self.__dispatcher.run()
+        if self.__profilingEnabled:
+            # Named before instrumenting, since that replaces onBars with a wrapper.
+            eventsPhase = profiler.get_callable_name(self.onBars)
+            self.__profiler = self.__buildProfiler()
+            self.__profiler.start()
+            try:
+                self.__dispatcher.run()
+            finally:
+                self.__profiler.stop()
+            self.info("Profile:\n%s" % self.__profiler.getReport(eventsPhase))
+        else:
+            self.__dispatcher.run()
 
         if self.__barFeed.getCurrentBars() is not None:
             self.onFinish(self.__barFeed.getCurrentBars())
@@ -78,7 +78,7 @@ class EventBasedFilter(dataseries.SequenceDataSeries):
     """
 
     def __init__(self, dataSeries, eventWindow, maxLen=None):
-        super(EventBasedFilter, self).__init__(maxLen)
+        super(EventBasedFilter, self).__init__(maxLen, dataseries.get_shared_datetime_index(dataSeries, maxLen))
         self.__dataSeries = dataSeries
         self.__dataSeries.getNewValueEvent().subscribe(self.__onNewValue)
         self.__eventWindow = eventWindow
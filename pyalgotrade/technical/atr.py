@@ -62,7 +62,8 @@ class ATR(technical.EventBasedFilter):
     """Average True Range filter as described in http://stockcharts.com/school/doku.php?id=chart_school:technical_indicators:average_true_range_atr
 
     :param barDataSeries: The BarDataSeries instance being filtered.
-    :type barDataSeries: :class:`pyalgotrade.dataseries.bards.BarDataSeries`.
+    :type barDataSeries: :class:`pyalgotrade.dataseries.bards.BarDataSeries` or
+        :class:`pyalgotrade.dataseries.bards.ColumnarBarDataSeries`.
     :param period: The average period. Must be > 1.
     :type period: int.
     :param useAdjustedValues: True to use adjusted Low/High/Close values.
@@ -74,7 +75,7 @@ class ATR(technical.EventBasedFilter):
     """
 
     def __init__(self, barDataSeries, period, useAdjustedValues=False, maxLen=None):
-        if not isinstance(barDataSeries, bards.BarDataSeries):
+        if not isinstance(barDataSeries, bards.BaseBarDataSeries):
             raise Exception("barDataSeries must be a dataseries.bards.BarDataSeries instance")
 
         super(ATR, self).__init__(barDataSeries, ATREventWindow(period, useAdjustedValues), maxLen)
@@ -41,8 +41,9 @@ class BollingerBands(object):
     def __init__(self, dataSeries, period, numStdDev, maxLen=None):
         self.__sma = ma.SMA(dataSeries, period, maxLen=maxLen)
         self.__stdDev = stats.StdDev(dataSeries, period, maxLen=maxLen)
-        self.__upperBand = dataseries.SequenceDataSeries(maxLen)
-        self.__lowerBand = dataseries.SequenceDataSeries(maxLen)
+        dateTimeIndex = dataseries.get_shared_datetime_index(dataSeries, maxLen)
+        self.__upperBand = dataseries.SequenceDataSeries(maxLen, dateTimeIndex)
+        self.__lowerBand = dataseries.SequenceDataSeries(maxLen, dateTimeIndex)
         self.__numStdDev = numStdDev
         # It is important to subscribe after sma and stddev since we'll use those values.
         dataSeries.getNewValueEvent().subscribe(self.__onNewValue)
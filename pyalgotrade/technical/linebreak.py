@@ -58,7 +58,8 @@ class LineBreak(dataseries.SequenceDataSeries):
     This is a DataSeries of :class:`Line` instances.
 
     :param barDataSeries: The DataSeries instance being filtered.
-    :type barDataSeries: :class:`pyalgotrade.dataseries.bards.BarDataSeries`.
+    :type barDataSeries: :class:`pyalgotrade.dataseries.bards.BarDataSeries` or
+        :class:`pyalgotrade.dataseries.bards.ColumnarBarDataSeries`.
     :param reversalLines: The number of lines back to check to calculate a reversal. Must be greater than 1.
     :type reversalLines: int.
     :param useAdjustedValues: True to use adjusted high/low/close values.
@@ -71,7 +72,7 @@ class LineBreak(dataseries.SequenceDataSeries):
     """
 
     def __init__(self, barDataSeries, reversalLines, useAdjustedValues=False, maxLen=None):
-        if not isinstance(barDataSeries, bards.BarDataSeries):
+        if not isinstance(barDataSeries, bards.BaseBarDataSeries):
             raise Exception("barDataSeries must be a dataseries.bards.BarDataSeries instance")
         if reversalLines < 2:
             raise Exception("reversalLines must be greater than 1")
@@ -44,7 +44,8 @@ class MACD(dataseries.SequenceDataSeries):
         assert(fastEMA < slowEMA)
         assert(signalEMA > 0)
 
-        super(MACD, self).__init__(maxLen)
+        dateTimeIndex = dataseries.get_shared_datetime_index(dataSeries, maxLen)
+        super(MACD, self).__init__(maxLen, dateTimeIndex)
 
         # We need to skip some values when calculating the fast EMA in order for both EMA
         # to calculate their first values at the same time.
@@ -54,8 +55,8 @@ class MACD(dataseries.SequenceDataSeries):
         self.__fastEMAWindow = ma.EMAEventWindow(fastEMA)
         self.__slowEMAWindow = ma.EMAEventWindow(slowEMA)
         self.__signalEMAWindow = ma.EMAEventWindow(signalEMA)
-        self.__signal = dataseries.SequenceDataSeries(maxLen)
-        self.__histogram = dataseries.SequenceDataSeries(maxLen)
+        self.__signal = dataseries.SequenceDataSeries(maxLen, dateTimeIndex)
+        self.__histogram = dataseries.SequenceDataSeries(maxLen, dateTimeIndex)
         dataSeries.getNewValueEvent().subscribe(self.__onNewValue)
 
     def getSignal(self):
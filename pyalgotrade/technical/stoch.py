@@ -59,7 +59,8 @@ class StochasticOscillator(technical.EventBasedFilter):
     Note that the value returned by this filter is %K. To access %D use :meth:`getD`.
 
     :param barDataSeries: The BarDataSeries instance being filtered.
-    :type barDataSeries: :class:`pyalgotrade.dataseries.bards.BarDataSeries`.
+    :type barDataSeries: :class:`pyalgotrade.dataseries.bards.BarDataSeries` or
+        :class:`pyalgotrade.dataseries.bards.ColumnarBarDataSeries`.
     :param period: The period. Must be > 1.
     :type period: int.
     :param dSMAPeriod: The %D SMA period. Must be > 1.
@@ -74,7 +75,7 @@ class StochasticOscillator(technical.EventBasedFilter):
 
     def __init__(self, barDataSeries, period, dSMAPeriod=3, useAdjustedValues=False, maxLen=None):
         assert dSMAPeriod > 1, "dSMAPeriod must be > 1"
-        assert isinstance(barDataSeries, bards.BarDataSeries), \
+        assert isinstance(barDataSeries, bards.BaseBarDataSeries), \
             "barDataSeries must be a dataseries.bards.BarDataSeries instance"
 
         super(StochasticOscillator, self).__init__(barDataSeries, SOEventWindow(period, useAdjustedValues), maxLen)
@@ -48,7 +48,8 @@ class VWAP(technical.EventBasedFilter):
     """Volume Weighted Average Price filter.
 
     :param dataSeries: The DataSeries instance being filtered.
-    :type dataSeries: :class:`pyalgotrade.dataseries.bards.BarDataSeries`.
+    :type dataSeries: :class:`pyalgotrade.dataseries.bards.BarDataSeries` or
+        :class:`pyalgotrade.dataseries.bards.ColumnarBarDataSeries`.
     :param period: The number of values to use to calculate the VWAP.
     :type period: int.
     :param useTypicalPrice: True if the typical price should be used instead of the closing price.
@@ -60,7 +61,7 @@ class VWAP(technical.EventBasedFilter):
     """
 
     def __init__(self, dataSeries, period, useTypicalPrice=False, maxLen=None):
-        assert isinstance(dataSeries, bards.BarDataSeries), \
+        assert isinstance(dataSeries, bards.BaseBarDataSeries), \
             "dataSeries must be a dataseries.bards.BarDataSeries instance"
 
         super(VWAP, self).__init__(dataSeries, VWAPEventWindow(period, useTypicalPrice), maxLen)
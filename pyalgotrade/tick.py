@@ -4,9 +4,11 @@
 
 import abc
 
+import numpy as np
 import six
 
 from pyalgotrade import bar
+from pyalgotrade.utils import dt
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -76,6 +78,70 @@ class BasicTick(Tick):
         return bar.Frequency.TRADE
 
 
+class TickArrays(object):
+    """A sequence of ticks held in numpy arrays. :class:`BasicTick` instances get built when they are accessed.
+
+    :param timestamps: The datetimes, as int64 nanoseconds since the epoch (UTC).
+    :type timestamps: numpy.array.
+    :param bids: The bid prices.
+    :type bids: numpy.array.
+    :param asks: The ask prices.
+    :type asks: numpy.array.
+    :param tzInfo: The timezone for the datetimes, or None to get naive datetimes.
+    :type tzInfo: tzinfo.
+    """
+
+    def __init__(self, timestamps, bids, asks, tzInfo=None):
+        assert(len(timestamps) == len(bids) == len(asks))
+        self.__timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.__bids = np.asarray(bids, dtype=np.float64)
+        self.__asks = np.asarray(asks, dtype=np.float64)
+        self.__tzInfo = tzInfo
+
+    def __len__(self):
+        return len(self.__timestamps)
+
+    def __getitem__(self, pos):
+        return BasicTick(
+            dt.epoch_ns_to_datetime(self.__timestamps[pos], self.__tzInfo),
+            self.__bids[pos].item(),
+            self.__asks[pos].item()
+        )
+
+    def getTimestamps(self):
+        return self.__timestamps
+
+    def getBids(self):
+        return self.__bids
+
+    def getAsks(self):
+        return self.__asks
+
+    def getTzInfo(self):
+        return self.__tzInfo
+
+    def isSorted(self):
+        """Returns True if ticks are sorted by datetime."""
+        return bool(np.all(self.__timestamps[1:] >= self.__timestamps[:-1]))
+
+    def sorted(self):
+        """Returns a :class:`TickArrays` with the ticks sorted by datetime. Ticks with the same datetime keep their order."""
+        ret = self
+        if not self.isSorted():
+            order = np.argsort(self.__timestamps, kind="mergesort")
+            ret = TickArrays(self.__timestamps[order], self.__bids[order], self.__asks[order], self.__tzInfo)
+        return ret
+
+    def concatenate(self, other):
+        """Returns a :class:`TickArrays` with these ticks followed by the ones in other."""
+        return TickArrays(
+            np.concatenate([self.__timestamps, other.getTimestamps()]),
+            np.concatenate([self.__bids, other.getBids()]),
+            np.concatenate([self.__asks, other.getAsks()]),
+            self.__tzInfo
+        )
+
+
 class Ticks(object):
     """A group of :class:`Tick` objects.
 
@@ -134,3 +200,52 @@ class Ticks(object):
     def getTick(self, instrument):
         """Returns the :class:`pyalgotrade.tick.Tick` for the given instrument or None if the instrument is not found."""
         return self.__tickDict.get(instrument, None)
+
+
+class InstrumentTick(Ticks):
+    """A :class:`Ticks` holding the :class:`Tick` for a single instrument. Feeds use this for the datetimes where only
+    one instrument has a tick, to avoid building and validating a map.
+
+    :param instrument: Instrument identifier.
+    :type instrument: string.
+    :param tick: The tick.
+    :type tick: :class:`Tick`.
+    """
+
+    def __init__(self, instrument, tick):
+        self.__instrument = instrument
+        self.__tick = tick
+
+    def __getitem__(self, instrument):
+        if instrument != self.__instrument:
+            raise KeyError(instrument)
+        return self.__tick
+
+    def __contains__(self, instrument):
+        return instrument == self.__instrument
+
+    def items(self):
+        return [(self.__instrument, self.__tick)]
+
+    def keys(self):
+        return [self.__instrument]
+
+    def getInstruments(self):
+        return [self.__instrument]
+
+    def getDateTime(self):
+        return self.__tick.getDateTime()
+
+    def getTick(self, instrument):
+        ret = None
+        if instrument == self.__instrument:
+            ret = self.__tick
+        return ret
+
+    def getInstrument(self):
+        """Returns the instrument identifier."""
+        return self.__instrument
+
+    def getSingleTick(self):
+        """Returns the :class:`Tick` for the instrument."""
+        return self.__tick
@@ -7,8 +7,9 @@ import abc
 
 import six
 
+from pyalgotrade import bar
 from pyalgotrade import broker
-from pyalgotrade.broker import fillstrategy
+from pyalgotrade.tickbroker import fillstrategy
 from pyalgotrade import logger
 import pyalgotrade.tick
 
@@ -400,7 +401,7 @@ class Broker(broker.Broker):
         # before waiting for the next tick.
         if not order.getGoodTillCanceled():
             expired = False
-            if self.__tickFeed.getFrequency() >= pyalgotrade.tick.Frequency.DAY:
+            if self.__tickFeed.getFrequency() >= bar.Frequency.DAY:
                 expired = tick_.getDateTime().date() >= order.getAcceptedDateTime().date()
 
             # Cancel the order if it will expire in the next tick.
@@ -421,10 +422,9 @@ class Broker(broker.Broker):
         if order.isActive():
             self.__postProcessOrder(order, tick_)
 
-    def __onTicksImpl(self, order, ticks):
+    def __onTicksImpl(self, order, tick_):
         # IF WE'RE DEALING WITH MULTIPLE INSTRUMENTS WE SKIP ORDER PROCESSING IF THERE IS NO TICK FOR THE ORDER'S
         # INSTRUMENT TO GET THE SAME BEHAVIOUR AS IF WERE BE PROCESSING ONLY ONE INSTRUMENT.
-        tick_ = ticks.getTick(order.getInstrument())
         if tick_ is not None:
             # Switch from SUBMITTED -> ACCEPTED
             if order.isSubmitted():
@@ -445,13 +445,25 @@ class Broker(broker.Broker):
         # Let the fill strategy know that new ticks are being processed.
         self.__fillStrategy.onTicks(self, ticks)
 
+        if len(self.__activeOrders) == 0:
+            return
+
         # This is to froze the orders that will be processed in this event, to avoid new getting orders introduced
         # and processed on this very same event.
         ordersToProcess = list(self.__activeOrders.values())
 
-        for order in ordersToProcess:
-            # This may trigger orders to be added/removed from __activeOrders.
-            self.__onTicksImpl(order, ticks)
+        if isinstance(ticks, pyalgotrade.tick.InstrumentTick):
+            # There is a tick for a single instrument, so there is no need to look it up for each order.
+            instrument = ticks.getInstrument()
+            tick_ = ticks.getSingleTick()
+            for order in ordersToProcess:
+                if order.getInstrument() == instrument:
+                    # This may trigger orders to be added/removed from __activeOrders.
+                    self.__onTicksImpl(order, tick_)
+        else:
+            for order in ordersToProcess:
+                # This may trigger orders to be added/removed from __activeOrders.
+                self.__onTicksImpl(order, ticks.getTick(order.getInstrument()))
 
     def start(self):
         super(Broker, self).start()
@@ -141,7 +141,9 @@ class SequenceDataSeries(DataSeries):
         self.__dateTimes.append(dateTime)
         self.__values.append(value)
 
-        self.getNewValueEvent().emit(self, dateTime, value)
+        newValueEvent = self.getNewValueEvent()
+        if newValueEvent.hasSubscribers():
+            newValueEvent.emit(self, dateTime, value)
 
     def getDateTimes(self):
         return self.__dateTimes.data()
@@ -3,42 +3,51 @@
 .. moduleauthor:: zkn <zkn@outlook.com>
 """
 
-from pyalgotrade import dataseries
+from pyalgotrade.dataseries import columnar
+from pyalgotrade import tick
 
-import six
 
-
-class TickDataSeries(dataseries.SequenceDataSeries):
+class TickDataSeries(columnar.ColumnarDataSeries):
     """A DataSeries of :class:`pyalgotrade.tick.Tick` instances.
 
     :param maxLen: The maximum number of values to hold.
         Once a bounded length is full, when new items are added, a corresponding number of items are discarded from the
         opposite end. If None then dataseries.DEFAULT_MAX_LEN is used.
     :type maxLen: int.
+
+    .. note::
+        Ticks are not stored. Datetimes, bid and ask prices are stored in numpy arrays and
+        :class:`pyalgotrade.tick.BasicTick` instances are built when accessed.
     """
 
     def __init__(self, maxLen=1024*10000):
-        super(TickDataSeries, self).__init__(maxLen)
-        self.__bidDS = dataseries.SequenceDataSeries(maxLen)
-        self.__askDS = dataseries.SequenceDataSeries(maxLen)
+        super(TickDataSeries, self).__init__(["bid", "ask"], maxLen)
 
-    def append(self, tick):
-        self.appendWithDateTime(tick.getDateTime(), tick)
-
-    def appendWithDateTime(self, dateTime, tick):
-        assert(dateTime is not None)
-        assert(tick is not None)
+    def buildValue(self, pos):
+        bid, ask = self.getColumnValuesAbsolute(pos)
+        return tick.BasicTick(self.getDateTimeAbsolute(pos), bid, ask)
 
-        super(TickDataSeries, self).appendWithDateTime(dateTime, tick)
+    def append(self, tick_):
+        self.appendWithDateTime(tick_.getDateTime(), tick_)
 
-        self.__bidDS.appendWithDateTime(dateTime, tick.getBid())
-        self.__askDS.appendWithDateTime(dateTime, tick.getAsk())
+    def appendWithDateTime(self, dateTime, tick_):
+        assert(dateTime is not None)
+        assert(tick_ is not None)
 
+        self.appendColumnsWithDateTime(dateTime, tick_, (tick_.getBid(), tick_.getAsk()))
 
     def getBidDataSeries(self):
-        """Returns a :class:`pyalgotrade.dataseries.DataSeries` with the open prices."""
-        return self.__bidDS
+        """Returns a :class:`pyalgotrade.dataseries.DataSeries` with the bid prices."""
+        return self.getColumnDataSeries("bid")
 
     def getAskDataSeries(self):
-        """Returns a :class:`pyalgotrade.dataseries.DataSeries` with the close prices."""
-        return self.__askDS
+        """Returns a :class:`pyalgotrade.dataseries.DataSeries` with the ask prices."""
+        return self.getColumnDataSeries("ask")
+
+    def getBidArray(self):
+        """Returns a numpy.array view (not a copy) with the bid prices."""
+        return self.getColumnArray("bid")
+
+    def getAskArray(self):
+        """Returns a numpy.array view (not a copy) with the ask prices."""
+        return self.getColumnArray("ask")
@@ -6,6 +6,7 @@
 import abc
 
 from pyalgotrade import bar
+from pyalgotrade import tick
 from pyalgotrade.tickdataseries import tickds
 from pyalgotrade import feed
 from pyalgotrade import dispatchprio
@@ -72,8 +73,11 @@ class BaseTickFeed(feed.BaseFeed):
 
             # Update self.__currentTicks and self.__lastTicks
             self.__currentTicks = ticks
-            for instrument in ticks.getInstruments():
-                self.__lastTicks[instrument] = ticks[instrument]
+            if isinstance(ticks, tick.InstrumentTick):
+                self.__lastTicks[ticks.getInstrument()] = ticks.getSingleTick()
+            else:
+                for instrument in ticks.getInstruments():
+                    self.__lastTicks[instrument] = ticks[instrument]
         return (dateTime, ticks)
 
     def getFrequency(self):
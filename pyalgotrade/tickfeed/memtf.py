@@ -3,11 +3,12 @@
 .. moduleauthor:: zkn <zkn@outlook.com>
 """
 
+import heapq
+
 import six
 
 from pyalgotrade import tickfeed
 from pyalgotrade import tick
-from pyalgotrade import utils
 
 
 # A non real-time TickFeed responsible for:
@@ -23,6 +24,9 @@ class TickFeed(tickfeed.BaseTickFeed):
 
         self.__ticks = {}
         self.__nextPos = {}
+        # A heap with the next tick for each instrument, as (datetime, instrument, tick) tuples.
+        # It gets built the first time it is needed.
+        self.__heap = None
         self.__started = False
         self.__currDateTime = None
 
@@ -30,6 +34,7 @@ class TickFeed(tickfeed.BaseTickFeed):
         self.__nextPos = {}
         for instrument in self.__ticks.keys():
             self.__nextPos.setdefault(instrument, 0)
+        self.__heap = None
         self.__currDateTime = None
         super(TickFeed, self).reset()
 
@@ -50,48 +55,131 @@ class TickFeed(tickfeed.BaseTickFeed):
         if self.__started:
             raise Exception("Can't add more ticks once you started consuming ticks")
 
-        self.__ticks.setdefault(instrument, [])
         self.__nextPos.setdefault(instrument, 0)
 
         # Add and sort the ticks
-        self.__ticks[instrument].extend(ticks)
-        self.__ticks[instrument].sort(key=lambda b: b.getDateTime())
+        currentTicks = self.__ticks.get(instrument)
+        if currentTicks is None:
+            currentTicks = []
+        else:
+            currentTicks = list(currentTicks)
+        currentTicks.extend(ticks)
+        currentTicks.sort(key=lambda b: b.getDateTime())
+        self.__ticks[instrument] = currentTicks
+        self.__heap = None
 
         self.registerInstrument(instrument)
 
+    def addTicksFromArrays(self, instrument, tickArrays):
+        """Adds ticks held in numpy arrays. :class:`pyalgotrade.tick.BasicTick` instances get built as they are
+        consumed.
+
+        :param instrument: Instrument identifier.
+        :type instrument: string.
+        :param tickArrays: The ticks.
+        :type tickArrays: :class:`pyalgotrade.tick.TickArrays`.
+        """
+        if self.__started:
+            raise Exception("Can't add more ticks once you started consuming ticks")
+
+        currentTicks = self.__ticks.get(instrument)
+        if currentTicks is None:
+            self.__nextPos.setdefault(instrument, 0)
+            self.__ticks[instrument] = tickArrays.sorted()
+            self.__heap = None
+            self.registerInstrument(instrument)
+        elif isinstance(currentTicks, tick.TickArrays):
+            self.__ticks[instrument] = currentTicks.concatenate(tickArrays).sorted()
+            self.__heap = None
+        else:
+            self.addTicksFromSequence(instrument, tickArrays)
+
+    def getTickArrays(self, instrument):
+        """Returns the :class:`pyalgotrade.tick.TickArrays` for an instrument, sorted by datetime, or None if ticks
+        were not added using :meth:`addTicksFromArrays`."""
+        ret = self.__ticks.get(instrument)
+        if not isinstance(ret, tick.TickArrays):
+            ret = None
+        return ret
+
+    def getNextPosition(self, instrument):
+        """Returns the position of the next tick to dispatch for an instrument."""
+        return self.__nextPos[instrument]
+
+    def skipTicks(self, instrument, count):
+        """Skips the next count ticks for an instrument. Skipped ticks are not dispatched nor added to the
+        dataseries.
+
+        :param instrument: Instrument identifier.
+        :type instrument: string.
+        :param count: The number of ticks to skip.
+        :type count: int.
+        """
+        assert(count >= 0)
+        if count:
+            self.__nextPos[instrument] = min(self.__nextPos[instrument] + count, len(self.__ticks[instrument]))
+            self.__heap = None
+
+    def __getHeap(self):
+        if self.__heap is None:
+            self.__heap = []
+            for instrument, ticks in six.iteritems(self.__ticks):
+                nextPos = self.__nextPos[instrument]
+                if nextPos < len(ticks):
+                    tick_ = ticks[nextPos]
+                    self.__heap.append((tick_.getDateTime(), instrument, tick_))
+            heapq.heapify(self.__heap)
+        return self.__heap
+
     def eof(self):
-        ret = True
         # Check if there is at least one more tick to return.
-        for instrument, ticks in six.iteritems(self.__ticks):
-            nextPos = self.__nextPos[instrument]
-            if nextPos < len(ticks):
-                ret = False
-                break
-        return ret
+        return len(self.__getHeap()) == 0
 
     def peekDateTime(self):
         ret = None
-
-        for instrument, ticks in six.iteritems(self.__ticks):
-            nextPos = self.__nextPos[instrument]
-            if nextPos < len(ticks):
-                ret = utils.safe_min(ret, ticks[nextPos].getDateTime())
+        heap = self.__getHeap()
+        if len(heap):
+            ret = heap[0][0]
         return ret
 
     def getNextTicks(self):
         # All ticks must have the same datetime. We will return all the ones with the smallest datetime.
-        smallestDateTime = self.peekDateTime()
-
-        if smallestDateTime is None:
+        heap = self.__getHeap()
+        if len(heap) == 0:
             return None
+        smallestDateTime = heap[0][0]
+
+        # The smallest of the remaining entries is one of the children of the root.
+        if (len(heap) < 2 or heap[1][0] != smallestDateTime) and (len(heap) < 3 or heap[2][0] != smallestDateTime):
+            # Only one instrument has a tick with the smallest datetime, so its next tick can replace it in the heap.
+            dateTime, instrument, tick_ = heap[0]
+            ticks = self.__ticks[instrument]
+            nextPos = self.__nextPos[instrument] + 1
+            self.__nextPos[instrument] = nextPos
+            if nextPos < len(ticks):
+                nextTick = ticks[nextPos]
+                heapq.heapreplace(heap, (nextTick.getDateTime(), instrument, nextTick))
+            else:
+                heapq.heappop(heap)
+            self.__currDateTime = smallestDateTime
+            return tick.InstrumentTick(instrument, tick_)
+
+        # Pop all the instruments that have a tick with the smallest datetime, and push them back with their next tick,
+        # if any.
+        popped = []
+        while len(heap) and heap[0][0] == smallestDateTime:
+            dateTime, instrument, tick_ = heapq.heappop(heap)
+            popped.append((instrument, tick_))
 
-        # Make a second pass to get all the ticks that had the smallest datetime.
         ret = {}
-        for instrument, ticks in six.iteritems(self.__ticks):
-            nextPos = self.__nextPos[instrument]
-            if nextPos < len(ticks) and ticks[nextPos].getDateTime() == smallestDateTime:
-                ret[instrument] = ticks[nextPos]
-                self.__nextPos[instrument] += 1
+        for instrument, tick_ in popped:
+            ret[instrument] = tick_
+            ticks = self.__ticks[instrument]
+            nextPos = self.__nextPos[instrument] + 1
+            self.__nextPos[instrument] = nextPos
+            if nextPos < len(ticks):
+                tick_ = ticks[nextPos]
+                heapq.heappush(heap, (tick_.getDateTime(), instrument, tick_))
 
         # if self.__currDateTime == smallestDateTime:
         #     raise Exception("Duplicate ticks found for %s on %s" % (list(ret.keys()), smallestDateTime))
@@ -0,0 +1,270 @@
+
+"""
+.. moduleauthor:: zkn <zkn@outlook.com>
+"""
+
+import datetime
+import functools
+import os
+
+import numpy as np
+from six.moves import xrange
+
+from pyalgotrade import tick
+from pyalgotrade.tickfeed import streamtf
+from pyalgotrade.tickfeed import txtfeed
+from pyalgotrade.utils import arraycache
+from pyalgotrade.utils import dt
+from pyalgotrade.utils import dtfilter
+from pyalgotrade.utils import dtparser
+from pyalgotrade.utils import tickcodec
+
+
+# A tick archive holds one file (partition) per instrument and day, laid out like this:
+#   <rootDir>/<instrument>/<YYYY>/<MM>/<DD>.ticks
+# Each partition holds the ticks for that day sorted by datetime, either as columns written with
+# pyalgotrade.utils.arraycache.write_columns, that get memory-mapped when read, or encoded with
+# pyalgotrade.utils.tickcodec, that takes a fraction of the space. Datetimes are naive.
+
+PARTITION_EXTENSION = ".ticks"
+
+
+def get_partition_path(rootDir, instrument, date):
+    return os.path.join(
+        rootDir, instrument, "%04d" % date.year, "%02d" % date.month, "%02d%s" % (date.day, PARTITION_EXTENSION)
+    )
+
+
+# Returns (number, name) pairs, sorted by number, for the entries in a directory that are named after a number.
+def _list_numbered(path, extension=""):
+    ret = []
+    if os.path.isdir(path):
+        for name in os.listdir(path):
+            if name.endswith(extension):
+                number = name[:len(name) - len(extension)]
+                if number.isdigit():
+                    ret.append((int(number), name))
+    return sorted(ret)
+
+
+def _to_date(dateTime):
+    if isinstance(dateTime, datetime.datetime):
+        dateTime = dateTime.date()
+    return dateTime
+
+
+def get_partitions(rootDir, instrument, fromDate=None, toDate=None):
+    """Returns the partitions for an instrument that may hold ticks between fromDate and toDate (inclusive), as
+    (date, path) pairs sorted by date. Only the directories for the years and months in that range get listed.
+
+    :param rootDir: The root directory for the archive.
+    :type rootDir: string.
+    :param instrument: Instrument identifier.
+    :type instrument: string.
+    :param fromDate: The first date or datetime to include, or None.
+    :type fromDate: datetime.date.
+    :param toDate: The last date or datetime to include, or None.
+    :type toDate: datetime.date.
+    """
+    fromDate = _to_date(fromDate)
+    toDate = _to_date(toDate)
+    fromMonth = (fromDate.year, fromDate.month) if fromDate else None
+    toMonth = (toDate.year, toDate.month) if toDate else None
+
+    ret = []
+    instrumentDir = os.path.join(rootDir, instrument)
+    for year, yearName in _list_numbered(instrumentDir):
+        if (fromDate and year < fromDate.year) or (toDate and year > toDate.year):
+            continue
+        yearDir = os.path.join(instrumentDir, yearName)
+        for month, monthName in _list_numbered(yearDir):
+            if (fromMonth and (year, month) < fromMonth) or (toMonth and (year, month) > toMonth):
+                continue
+            monthDir = os.path.join(yearDir, monthName)
+            for day, dayName in _list_numbered(monthDir, PARTITION_EXTENSION):
+                date = datetime.date(year, month, day)
+                if (fromDate and date < fromDate) or (toDate and date > toDate):
+                    continue
+                ret.append((date, os.path.join(monthDir, dayName)))
+    return ret
+
+
+def read_partition(path):
+    """Reads the ticks in a partition.
+
+    :param path: The path to the partition.
+    :type path: string.
+    :rtype: :class:`pyalgotrade.tick.TickArrays`.
+    """
+    with open(path, "rb") as f:
+        magic = f.read(len(tickcodec.MAGIC))
+    if tickcodec.is_encoded(magic):
+        ret = tick.TickArrays(*tickcodec.read_ticks(path))
+    else:
+        columns = arraycache.read_columns(path)
+        ret = tick.TickArrays(*[columns[name] for name in txtfeed.TICK_COLUMNS])
+    return ret
+
+
+def _take(tickArrays, indices):
+    return tick.TickArrays(
+        tickArrays.getTimestamps()[indices], tickArrays.getBids()[indices], tickArrays.getAsks()[indices],
+        tickArrays.getTzInfo()
+    )
+
+
+def write_partitions(rootDir, instrument, tickArrays, compact=False, pipSize=None):
+    """Writes ticks to an archive, one partition per day. Existing partitions for the same days are replaced.
+
+    :param rootDir: The root directory for the archive.
+    :type rootDir: string.
+    :param instrument: Instrument identifier.
+    :type instrument: string.
+    :param tickArrays: The ticks, with naive datetimes.
+    :type tickArrays: :class:`pyalgotrade.tick.TickArrays`.
+    :param compact: True to encode partitions with :func:`pyalgotrade.utils.tickcodec.encode_ticks`.
+    :type compact: boolean.
+    :param pipSize: The smallest price increment for the instrument, used to encode compact partitions. If None, it is
+        guessed from the prices.
+    :type pipSize: float.
+    :rtype: A list with the dates for the partitions written, sorted.
+    """
+    ret = []
+    if len(tickArrays) == 0:
+        return ret
+
+    tickArrays = tickArrays.sorted()
+    days = tickArrays.getTimestamps() // dtparser.DAY_NS
+    bounds = np.concatenate([[0], np.flatnonzero(np.diff(days)) + 1, [len(days)]])
+    for begin, end in zip(bounds[:-1], bounds[1:]):
+        date = dt.epoch_ns_to_datetime(days[begin] * dtparser.DAY_NS).date()
+        path = get_partition_path(rootDir, instrument, date)
+        dirName = os.path.dirname(path)
+        if not os.path.exists(dirName):
+            os.makedirs(dirName)
+        partition = _take(tickArrays, slice(begin, end))
+        columns = [partition.getTimestamps(), partition.getBids(), partition.getAsks()]
+        if compact:
+            tickcodec.write_ticks(path, *columns, pipSize=pipSize)
+        else:
+            arraycache.write_columns(path, list(zip(txtfeed.TICK_COLUMNS, columns)))
+        ret.append(date)
+    return ret
+
+
+def txt_to_archive(
+    file, rootDir, instrument, dateTimeFormat="%Y.%m.%d %H:%M:%S", compact=False, pipSize=None, chunkSize=16*1024*1024
+):
+    """Converts a TXT file, like the ones loaded with :class:`pyalgotrade.tickfeed.txtfeed.GenericTickFeed`, to
+    partitions in a tick archive. The file is converted in chunks, so it doesn't need to fit in memory.
+
+    :param file: The path to the TXT file.
+    :type file: string.
+    :param rootDir: The root directory for the archive.
+    :type rootDir: string.
+    :param instrument: Instrument identifier.
+    :type instrument: string.
+    :param dateTimeFormat: The format for the datetime column. Only fixed width formats are supported.
+    :type dateTimeFormat: string.
+    :param compact: True to encode partitions with :func:`pyalgotrade.utils.tickcodec.encode_ticks`.
+    :type compact: boolean.
+    :param pipSize: The smallest price increment for the instrument, used to encode compact partitions. If None, it is
+        guessed from the prices.
+    :type pipSize: float.
+    :param chunkSize: The number of bytes to read and convert at once.
+    :type chunkSize: int.
+    :rtype: A list with the dates for the partitions written, sorted.
+
+    .. note::
+        * Rows must be sorted by day, but not necessarily within a day. An exception is raised if ticks for a day
+          show up after that partition was written.
+        * Existing partitions for the same days are replaced.
+    """
+    return txt_files_to_archive([file], rootDir, instrument, dateTimeFormat, compact, pipSize, chunkSize)
+
+
+def txt_files_to_archive(
+    files, rootDir, instrument, dateTimeFormat="%Y.%m.%d %H:%M:%S", compact=False, pipSize=None, chunkSize=16*1024*1024
+):
+    """Like :func:`txt_to_archive`, but converts many TXT files, sorted by datetime, for the same instrument. Ticks
+    for a day may be split across consecutive files, and they all end up in the same partition.
+
+    :param files: The paths to the TXT files.
+    :type files: list.
+    :rtype: A list with the dates for the partitions written, sorted.
+    """
+    ret = []
+    # Ticks for the last day seen are written once all the ticks for that day were read.
+    pending = None
+    lastDay = None
+    for file in files:
+        for chunk in txtfeed.iter_tick_arrays(file, dateTimeFormat, chunkSize=chunkSize):
+            if pending is not None:
+                chunk = pending.concatenate(chunk)
+            if len(chunk) == 0:
+                continue
+
+            days = chunk.getTimestamps() // dtparser.DAY_NS
+            if lastDay is not None and days.min() <= lastDay:
+                raise Exception("Ticks in %s are not sorted by day" % file)
+            pendingDay = days.max()
+            complete = np.flatnonzero(days != pendingDay)
+            if len(complete):
+                ret.extend(write_partitions(rootDir, instrument, _take(chunk, complete), compact, pipSize))
+                lastDay = days[complete].max()
+            pending = _take(chunk, np.flatnonzero(days == pendingDay))
+    if pending is not None:
+        ret.extend(write_partitions(rootDir, instrument, pending, compact, pipSize))
+    return ret
+
+
+# Yields the ticks in some partitions, one partition after the other. Partitions are read as ticks are consumed.
+def read_partitioned_ticks(paths, tickFilter=None):
+    for path in paths:
+        tickArrays = read_partition(path)
+        mask = None
+        if tickFilter is not None:
+            mask = dtfilter.include_timestamps(tickFilter, tickArrays.getTimestamps(), None, "includeTick")
+            if mask is not None:
+                tickArrays = _take(tickArrays, np.flatnonzero(mask))
+        for i in xrange(len(tickArrays)):
+            tick_ = tickArrays[i]
+            if tickFilter is None or mask is not None or tickFilter.includeTick(tick_):
+                yield tick_
+
+
+class PartitionedTickFeed(streamtf.TickFeed):
+    """A :class:`pyalgotrade.tickfeed.BaseTickFeed` that reads ticks from a tick archive, like the ones written with
+    :func:`txt_to_archive`. Only the partitions with ticks between fromDateTime and toDateTime get opened, one at a
+    time for each instrument, as ticks are consumed.
+
+    :param rootDir: The root directory for the archive.
+    :type rootDir: string.
+    :param instruments: Instrument identifiers. All of them get registered in the tick feed.
+    :type instruments: list.
+    :param fromDateTime: The first datetime to include, or None to start with the first tick.
+    :type fromDateTime: datetime.datetime.
+    :param toDateTime: The last datetime to include, or None to end with the last tick.
+    :type toDateTime: datetime.datetime.
+    :param maxLen: The maximum number of values that the :class:`pyalgotrade.dataseries.tickds.TickDataSeries` will hold.
+        Once a bounded length is full, when new items are added, a corresponding number of items are discarded from the
+        opposite end.
+    :type maxLen: int.
+    :param bufferSize: The maximum number of ticks to read ahead for each instrument.
+    :type bufferSize: int.
+
+    .. note::
+        Ticks are included using the same rules as :class:`pyalgotrade.tickfeed.txtfeed.DateRangeFilter`.
+    """
+
+    def __init__(
+        self, rootDir, instruments, fromDateTime=None, toDateTime=None, maxLen=1024*10000, bufferSize=1024
+    ):
+        super(PartitionedTickFeed, self).__init__(maxLen, bufferSize)
+
+        tickFilter = None
+        if fromDateTime is not None or toDateTime is not None:
+            tickFilter = txtfeed.DateRangeFilter(fromDateTime, toDateTime)
+        for instrument in instruments:
+            paths = [path for date, path in get_partitions(rootDir, instrument, fromDateTime, toDateTime)]
+            self.addTickSource(instrument, functools.partial(read_partitioned_ticks, paths, tickFilter))
@@ -0,0 +1,259 @@
+
+"""
+.. moduleauthor:: zkn <zkn@outlook.com>
+"""
+
+import contextlib
+import itertools
+import sqlite3
+import time
+
+import numpy as np
+
+from pyalgotrade.barfeed import sqlitefeed
+from pyalgotrade.tickfeed import streamtf
+from pyalgotrade.tickfeed import txtfeed
+from pyalgotrade import tick
+from pyalgotrade.utils import dt
+import pyalgotrade.logger
+
+logger = pyalgotrade.logger.getLogger("sqlitefeed")
+
+# Rows are keyed by instrument, timestamp and seq. seq is the position of a tick among the ones for the same instrument
+# and timestamp, so ticks with the same datetime are kept.
+INSERT_TICK_SQL = "insert into tick (instrument_id, timestamp, seq, bid, ask) values (?, ?, ?, ?, ?)"
+# Stored ticks get replaced by the ones added for the same datetimes, so that they are not mixed.
+DELETE_TICKS_SQL = "delete from tick where instrument_id = ? and timestamp >= ? and timestamp <= ?"
+
+
+# Returns the position of each timestamp among the equal ones, given sorted timestamps. firstSeq is the position for
+# the timestamps equal to the first one.
+def get_sequence(timestamps, firstSeq=0):
+    ret = np.arange(len(timestamps), dtype=np.int64)
+    if len(timestamps):
+        runStarts = np.concatenate([[0], np.flatnonzero(np.diff(timestamps)) + 1])
+        runLengths = np.diff(np.concatenate([runStarts, [len(timestamps)]]))
+        ret -= np.repeat(runStarts, runLengths)
+        ret[:runLengths[0]] += firstSeq
+    return ret
+
+
+# SQLite DB.
+# Timestamps are stored as int64 nanoseconds since the epoch, for naive datetimes. Tables are created if they don't
+# exist, so ticks can be stored in the same file as bars (check pyalgotrade.barfeed.sqlitefeed), in any order.
+class Database(object):
+    def __init__(self, dbFilePath):
+        self.__instrumentIds = {}
+
+        self.__connection = sqlite3.connect(dbFilePath)
+        self.__connection.isolation_level = None  # To do auto-commit
+        sqlitefeed.configure_connection(self.__connection)
+        self.createSchema()
+
+    @contextlib.contextmanager
+    def __transaction(self):
+        sqlitefeed.prepare_for_writes(self.__connection)
+        # Instruments added in the transaction are gone if it gets rolled back, so their ids can't stay cached.
+        instrumentIds = dict(self.__instrumentIds)
+        self.__connection.execute("begin")
+        try:
+            yield
+        except Exception:
+            self.__connection.execute("rollback")
+            self.__instrumentIds = instrumentIds
+            raise
+        self.__connection.execute("commit")
+
+    def __findInstrumentId(self, instrument):
+        ret = self.__connection.execute("select instrument_id from instrument where name = ?", [instrument]).fetchone()
+        if ret is not None:
+            ret = ret[0]
+        return ret
+
+    def __getInstrumentId(self, instrument, create=False):
+        instrument = sqlitefeed.normalize_instrument(instrument)
+        ret = self.__instrumentIds.get(instrument, None)
+        if ret is None:
+            ret = self.__findInstrumentId(instrument)
+            if ret is None and create:
+                ret = self.__connection.execute("insert into instrument (name) values (?)", [instrument]).lastrowid
+            if ret is not None:
+                self.__instrumentIds[instrument] = ret
+        return ret
+
+    def createSchema(self):
+        self.__connection.execute(
+            "create table if not exists instrument ("
+            "instrument_id integer primary key autoincrement"
+            ", name text unique not null)")
+
+        # Without a rowid, rows are stored sorted by the primary key, so range queries for an instrument read
+        # contiguous pages.
+        self.__connection.execute(
+            "create table if not exists tick ("
+            "instrument_id integer not null references instrument (instrument_id)"
+            ", timestamp integer not null"
+            ", seq integer not null"
+            ", bid real not null"
+            ", ask real not null"
+            ", primary key (instrument_id, timestamp, seq)) without rowid")
+
+    # Writes sorted ticks in chunks, in a single transaction, and returns the number of ticks.
+    def __addTickChunks(self, instrument, chunks, batchSize):
+        def add_batch(batch):
+            self.__connection.executemany(INSERT_TICK_SQL, batch)
+
+        begin = time.time()
+        ret = 0
+        with self.__transaction():
+            instrumentId = self.__getInstrumentId(instrument, create=True)
+            lastTimestamp = None
+            lastSeq = 0
+            for tickArrays in chunks:
+                if len(tickArrays) == 0:
+                    continue
+                timestamps = tickArrays.getTimestamps()
+                if lastTimestamp is not None and timestamps[0] < lastTimestamp:
+                    raise Exception("Ticks are not sorted by datetime")
+                # Ticks with the same datetime may be split across chunks.
+                if timestamps[0] == lastTimestamp:
+                    firstSeq = lastSeq + 1
+                    deleteFrom = lastTimestamp + 1
+                else:
+                    firstSeq = 0
+                    deleteFrom = timestamps[0]
+                self.__connection.execute(DELETE_TICKS_SQL, [instrumentId, int(deleteFrom), int(timestamps[-1])])
+                seq = get_sequence(timestamps, firstSeq)
+                rows = zip(
+                    itertools.repeat(instrumentId), timestamps.tolist(), seq.tolist(), tickArrays.getBids().tolist(),
+                    tickArrays.getAsks().tolist()
+                )
+                ret += sqlitefeed.process_in_batches(rows, batchSize, add_batch)
+                lastTimestamp = timestamps[-1]
+                lastSeq = seq[-1]
+        elapsed = time.time() - begin
+        logger.info("%d ticks written in %.2f seconds (%.0f ticks/s)" % (ret, elapsed, ret / max(elapsed, 1e-6)))
+        return ret
+
+    def addTicks(self, instrument, tickArrays, batchSize=sqlitefeed.DEFAULT_BATCH_SIZE):
+        """Adds ticks for an instrument in a single transaction.
+
+        :param instrument: Instrument identifier.
+        :type instrument: string.
+        :param tickArrays: The ticks, with naive datetimes.
+        :type tickArrays: :class:`pyalgotrade.tick.TickArrays`.
+        :param batchSize: The number of rows to insert at once.
+        :type batchSize: int.
+        :rtype: The number of ticks written.
+
+        .. note::
+            Ticks with the same datetime are kept in the order they are given. Ticks already stored between the first
+            and the last datetime given get replaced, so adding the same ticks twice doesn't duplicate them.
+        """
+        return self.__addTickChunks(instrument, [tickArrays.sorted()], batchSize)
+
+    def addTicksFromTXT(
+        self, instrument, file, dateTimeFormat="%Y.%m.%d %H:%M:%S", batchSize=sqlitefeed.DEFAULT_BATCH_SIZE,
+        chunkSize=16*1024*1024
+    ):
+        """Adds ticks for an instrument from a TXT file, like the ones loaded with
+        :class:`pyalgotrade.tickfeed.txtfeed.GenericTickFeed`, in a single transaction. The file is read in chunks, so
+        it doesn't need to fit in memory.
+
+        :param instrument: Instrument identifier.
+        :type instrument: string.
+        :param file: The path to the TXT file. Rows must be sorted by datetime.
+        :type file: string.
+        :param dateTimeFormat: The format for the datetime column. Only fixed width formats are supported.
+        :type dateTimeFormat: string.
+        :param batchSize: The number of rows to insert at once.
+        :type batchSize: int.
+        :param chunkSize: The number of bytes to read and parse at once.
+        :type chunkSize: int.
+        :rtype: The number of ticks written.
+
+        .. note::
+            Ticks already stored get replaced like in :meth:`addTicks`.
+        """
+        chunks = (
+            chunk.sorted() for chunk in txtfeed.iter_tick_arrays(file, dateTimeFormat, chunkSize=chunkSize)
+        )
+        return self.__addTickChunks(instrument, chunks, batchSize)
+
+    def __queryTicks(self, instrument, fromDateTime, toDateTime):
+        instrumentId = self.__getInstrumentId(instrument)
+        sql = "select timestamp, bid, ask from tick where instrument_id = ?"
+        args = [instrumentId]
+        if fromDateTime is not None:
+            sql += " and timestamp >= ?"
+            args.append(dt.datetime_to_epoch_ns(fromDateTime))
+        if toDateTime is not None:
+            sql += " and timestamp <= ?"
+            args.append(dt.datetime_to_epoch_ns(toDateTime))
+        sql += " order by timestamp asc, seq asc"
+        return self.__connection.execute(sql, args)
+
+    def getTicks(self, instrument, fromDateTime=None, toDateTime=None):
+        """Returns the ticks for an instrument between fromDateTime and toDateTime (inclusive).
+
+        :rtype: :class:`pyalgotrade.tick.TickArrays`.
+        """
+        rows = self.__queryTicks(instrument, fromDateTime, toDateTime).fetchall()
+        if len(rows) == 0:
+            return tick.TickArrays([], [], [])
+        timestamps, bids, asks = zip(*rows)
+        return tick.TickArrays(timestamps, bids, asks)
+
+    def iterTicks(self, instrument, fromDateTime=None, toDateTime=None, fetchSize=sqlitefeed.DEFAULT_FETCH_SIZE):
+        """Yields the :class:`pyalgotrade.tick.BasicTick` for an instrument between fromDateTime and toDateTime
+        (inclusive), sorted by datetime. Rows are read fetchSize at a time.
+        """
+        cursor = self.__queryTicks(instrument, fromDateTime, toDateTime)
+        try:
+            rows = cursor.fetchmany(fetchSize)
+            while len(rows):
+                for timestamp, bid, ask in rows:
+                    yield tick.BasicTick(dt.epoch_ns_to_datetime(timestamp), bid, ask)
+                rows = cursor.fetchmany(fetchSize)
+        finally:
+            cursor.close()
+
+    def disconnect(self):
+        self.__connection.close()
+        self.__connection = None
+
+
+class Feed(streamtf.TickFeed):
+    """A :class:`pyalgotrade.tickfeed.BaseTickFeed` that reads ticks from a SQLite database as they are needed.
+    Ticks for each instrument are read with an indexed range query, and merged by datetime.
+
+    :param dbFilePath: The path to the database. It gets created if it doesn't exist.
+    :type dbFilePath: string.
+    :param maxLen: The maximum number of values that the :class:`pyalgotrade.dataseries.tickds.TickDataSeries` will hold.
+        Once a bounded length is full, when new items are added, a corresponding number of items are discarded from the
+        opposite end.
+    :type maxLen: int.
+    :param bufferSize: The maximum number of ticks to read ahead for each instrument.
+    :type bufferSize: int.
+    """
+
+    def __init__(self, dbFilePath, maxLen=1024*10000, bufferSize=1024):
+        super(Feed, self).__init__(maxLen, bufferSize)
+
+        self.__db = Database(dbFilePath)
+
+    def getDatabase(self):
+        return self.__db
+
+    def loadTicks(self, instrument, fromDateTime=None, toDateTime=None):
+        """Adds ticks for an instrument between fromDateTime and toDateTime (inclusive). The instrument gets registered
+        in the tick feed, and ticks are read from the database as they are needed.
+
+        :param instrument: Instrument identifier.
+        :type instrument: string.
+        :param fromDateTime: The first datetime to include, or None.
+        :type fromDateTime: datetime.datetime.
+        :param toDateTime: The last datetime to include, or None.
+        :type toDateTime: datetime.datetime.
+        """
+        self.addTickSource(instrument, lambda: self.__db.iterTicks(instrument, fromDateTime, toDateTime))
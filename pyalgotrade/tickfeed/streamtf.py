@@ -0,0 +1,208 @@
+
+"""
+.. moduleauthor:: zkn <zkn@outlook.com>
+"""
+
+import heapq
+import itertools
+
+import six
+
+from pyalgotrade import tickfeed
+from pyalgotrade import tick
+
+
+# Yields the ticks from each source, one source after the other. Sources are opened as ticks are consumed, and closed
+# once exhausted or when the generator gets closed.
+def read_sources(sources):
+    for source in sources:
+        ticks = source()
+        try:
+            for tick_ in ticks:
+                yield tick_
+        finally:
+            close = getattr(ticks, "close", None)
+            if close is not None:
+                close()
+
+
+# Reads ticks for a single instrument, a few at a time, from one or more sources.
+class TickReader(object):
+    def __init__(self, instrument, bufferSize):
+        assert(bufferSize > 0)
+        self.__instrument = instrument
+        self.__bufferSize = bufferSize
+        self.__sources = []
+        self.__ticks = None
+        self.__buffer = []
+        self.__pos = 0
+        self.__lastDateTime = None
+
+    def addSource(self, source):
+        self.__sources.append(source)
+
+    def open(self):
+        self.close()
+        self.__ticks = read_sources(self.__sources)
+
+    def close(self):
+        if self.__ticks is not None:
+            self.__ticks.close()
+        self.__ticks = None
+        self.__buffer = []
+        self.__pos = 0
+        self.__lastDateTime = None
+
+    def __fillBuffer(self):
+        self.__buffer = list(itertools.islice(self.__ticks, self.__bufferSize))
+        self.__pos = 0
+
+        # Ticks are expected to be sorted.
+        lastDateTime = self.__lastDateTime
+        for tick_ in self.__buffer:
+            dateTime = tick_.getDateTime()
+            if lastDateTime is not None and dateTime < lastDateTime:
+                raise Exception("Ticks for %s are not sorted. %s came after %s" % (
+                    self.__instrument, dateTime, lastDateTime
+                ))
+            lastDateTime = dateTime
+        self.__lastDateTime = lastDateTime
+
+    def peek(self):
+        """Returns the next tick, or None if there are no more ticks."""
+        if self.__pos == len(self.__buffer) and self.__ticks is not None:
+            self.__fillBuffer()
+            if len(self.__buffer) == 0:
+                self.close()
+
+        ret = None
+        if self.__pos < len(self.__buffer):
+            ret = self.__buffer[self.__pos]
+        return ret
+
+    def pop(self):
+        ret = self.__buffer[self.__pos]
+        self.__pos += 1
+        return ret
+
+
+class TickFeed(tickfeed.BaseTickFeed):
+    """A non real-time TickFeed that reads ticks as they are needed instead of holding them all in memory.
+    Ticks from different instruments are merged as they are read.
+
+    :param maxLen: The maximum number of values that the :class:`pyalgotrade.dataseries.tickds.TickDataSeries` will hold.
+        Once a bounded length is full, when new items are added, a corresponding number of items are discarded from the
+        opposite end.
+    :type maxLen: int.
+    :param bufferSize: The maximum number of ticks to read ahead for each instrument.
+    :type bufferSize: int.
+
+    .. note::
+        * Ticks for each instrument must be sorted by datetime. An exception is raised when they are not.
+        * Memory usage depends on the number of instruments and the buffer size, and not on the number of ticks.
+    """
+
+    def __init__(self, maxLen=1024*10000, bufferSize=1024):
+        super(TickFeed, self).__init__(maxLen)
+
+        self.__bufferSize = bufferSize
+        self.__readers = {}
+        # A heap with the datetime of the next tick for each instrument, as (datetime, instrument) pairs.
+        # It gets built the first time it is needed.
+        self.__heap = None
+        self.__started = False
+        self.__currDateTime = None
+
+    def __closeReaders(self):
+        for reader in six.itervalues(self.__readers):
+            reader.close()
+
+    def reset(self):
+        self.__closeReaders()
+        self.__heap = None
+        self.__currDateTime = None
+        super(TickFeed, self).reset()
+
+    def getCurrentDateTime(self):
+        return self.__currDateTime
+
+    def start(self):
+        super(TickFeed, self).start()
+        self.__started = True
+
+    def stop(self):
+        self.__closeReaders()
+        self.__heap = []
+
+    def join(self):
+        pass
+
+    def addTickSource(self, instrument, source):
+        """Adds a source of ticks for a given instrument. The instrument gets registered in the tick feed.
+
+        :param instrument: Instrument identifier.
+        :type instrument: string.
+        :param source: A callable that returns an iterable with :class:`pyalgotrade.tick.Tick` instances sorted by
+            datetime. It gets called every time the feed needs to start reading, so a generator function is a good fit.
+            If many sources are added for the same instrument, they are read one after the other.
+        """
+        if self.__started:
+            raise Exception("Can't add more ticks once you started consuming ticks")
+
+        reader = self.__readers.get(instrument)
+        if reader is None:
+            reader = TickReader(instrument, self.__bufferSize)
+            self.__readers[instrument] = reader
+        reader.addSource(source)
+        self.__heap = None
+
+        self.registerInstrument(instrument)
+
+    def __getHeap(self):
+        if self.__heap is None:
+            self.__heap = []
+            for instrument, reader in six.iteritems(self.__readers):
+                reader.open()
+                tick_ = reader.peek()
+                if tick_ is not None:
+                    self.__heap.append((tick_.getDateTime(), instrument))
+            heapq.heapify(self.__heap)
+        return self.__heap
+
+    def eof(self):
+        return len(self.__getHeap()) == 0
+
+    def peekDateTime(self):
+        ret = None
+        heap = self.__getHeap()
+        if len(heap):
+            ret = heap[0][0]
+        return ret
+
+    def getNextTicks(self):
+        # All ticks must have the same datetime. We will return all the ones with the smallest datetime.
+        heap = self.__getHeap()
+        if len(heap) == 0:
+            return None
+        smallestDateTime = heap[0][0]
+
+        instruments = []
+        while len(heap) and heap[0][0] == smallestDateTime:
+            instruments.append(heapq.heappop(heap)[1])
+
+        ret = []
+        for instrument in instruments:
+            reader = self.__readers[instrument]
+            ret.append((instrument, reader.pop()))
+            tick_ = reader.peek()
+            if tick_ is not None:
+                heapq.heappush(heap, (tick_.getDateTime(), instrument))
+
+        self.__currDateTime = smallestDateTime
+        if len(ret) == 1:
+            return tick.InstrumentTick(*ret[0])
+        return tick.Ticks(dict(ret))
+
+    def loadAll(self):
+        for dateTime, ticks in self:
+            pass
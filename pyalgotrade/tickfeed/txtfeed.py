@@ -5,11 +5,17 @@
 
 import datetime
 
+import numpy as np
 import pytz
 import six
 
+from pyalgotrade import utils
 from pyalgotrade.utils import dt
+from pyalgotrade.utils import dtfilter
+from pyalgotrade.utils import dtparser
+from pyalgotrade.utils import fileutils
 from pyalgotrade.tickfeed import memtf
+from pyalgotrade.tickfeed import streamtf
 from pyalgotrade import tick
 from pyalgotrade import bar
 
@@ -39,6 +45,12 @@ class TickFilter(object):
     def includeTick(self, tick_):
         raise NotImplementedError()
 
+    # Returns a numpy array of booleans that tells which ticks to include, given their datetimes as int64 nanoseconds
+    # since the epoch (check pyalgotrade.utils.dtfilter), or None to filter ticks one at a time using includeTick.
+    # Subclasses that override includeTick but not includeTimestamps get filtered one tick at a time.
+    def includeTimestamps(self, timestamps, tzInfo):
+        return None
+
 
 class DateRangeFilter(TickFilter):
     def __init__(self, fromDate=None, toDate=None):
@@ -52,6 +64,9 @@ class DateRangeFilter(TickFilter):
             return False
         return True
 
+    def includeTimestamps(self, timestamps, tzInfo):
+        return dtfilter.date_range_mask(timestamps, self.__fromDate, self.__toDate)
+
 
 # US Equities Regular Trading Hours filter
 # Monday ~ Friday
@@ -81,6 +96,143 @@ class USEquitiesRTH(DateRangeFilter):
                 return False
         return ret
 
+    def includeTimestamps(self, timestamps, tzInfo):
+        ret = super(USEquitiesRTH, self).includeTimestamps(timestamps, tzInfo)
+        ret &= dtfilter.session_mask(timestamps, tzInfo, USEquitiesRTH.timezone, self.__fromTime, self.__toTime)
+        return ret
+
+
+# Yields the ticks in a TXT file, one at a time.
+def read_ticks(file, rowParser, tickFilter=None, skipMalformedTicks=False):
+    def parse_tick_skip_malformed(row):
+        ret = None
+        try:
+            ret = rowParser.parseTick(row)
+        except Exception:
+            pass
+        return ret
+
+    if skipMalformedTicks:
+        parse_tick = parse_tick_skip_malformed
+    else:
+        parse_tick = rowParser.parseTick
+
+    delimiter = rowParser.getDelimiter()
+    with fileutils.open_file(file) as f:
+        for row in f:
+            row = row.rstrip()
+            # Skip empty rows.
+            if len(row) == 0:
+                continue
+            tick_ = parse_tick(row.split(delimiter))
+            if tick_ is not None and (tickFilter is None or tickFilter.includeTick(tick_)):
+                yield tick_
+
+
+# Parses rows with bid, ask and datetime columns in bulk, and returns a pyalgotrade.tick.TickArrays.
+# Rows that tickFilter excludes are dropped before parsing prices.
+def parse_tick_rows(data, dateTimeParser, delimiter=b",", tickFilter=None):
+    data = data.replace(b"\r", b"")
+    # Skip empty rows.
+    while data.find(b"\n\n") != -1:
+        data = data.replace(b"\n\n", b"\n")
+    data = data.strip(b"\n")
+    if len(data) == 0:
+        return tick.TickArrays([], [], [])
+
+    # Fields from all rows are split at once, so every row needs exactly 2 delimiters. Otherwise a row with a missing
+    # column and one with an extra column would shift the ones in between.
+    buf = np.frombuffer(data, dtype=np.uint8)
+    rowEnds = np.flatnonzero(buf == ord(b"\n"))
+    delimiterRows = np.searchsorted(rowEnds, np.flatnonzero(buf == ord(delimiter)))
+    if (np.bincount(delimiterRows, minlength=len(rowEnds) + 1) != 2).any():
+        raise ValueError("Every row should have 3 columns")
+
+    fields = data.replace(b"\n", delimiter).split(delimiter)
+    timestamps = dateTimeParser.parseArray(np.array(fields[2::3]))
+    bids = np.array(fields[0::3])
+    asks = np.array(fields[1::3])
+    if tickFilter is not None:
+        mask = dtfilter.include_timestamps(tickFilter, timestamps, None, "includeTick")
+        if mask is None:
+            raise ValueError("The tick filter can't be applied in bulk")
+        timestamps = timestamps[mask]
+        bids = bids[mask]
+        asks = asks[mask]
+    return tick.TickArrays(timestamps, bids.astype(np.float64), asks.astype(np.float64))
+
+
+# Like load_tick_arrays, but yields a pyalgotrade.tick.TickArrays for every chunk, so files that don't fit in memory can
+# be processed.
+def iter_tick_arrays(file, dateTimeFormat="%Y.%m.%d %H:%M:%S", tickFilter=None, chunkSize=16*1024*1024):
+    dateTimeParser = dtparser.FixedWidthParser(dateTimeFormat)
+    with fileutils.open_file(file, "rb") as f:
+        remainder = b""
+        data = f.read(chunkSize)
+        while len(data):
+            # Only parse full rows. The last one is parsed along with the next chunk.
+            data = remainder + data
+            end = data.rfind(b"\n") + 1
+            remainder = data[end:]
+            yield parse_tick_rows(data[:end], dateTimeParser, tickFilter=tickFilter)
+            data = f.read(chunkSize)
+        yield parse_tick_rows(remainder, dateTimeParser, tickFilter=tickFilter)
+
+
+def load_tick_arrays(file, dateTimeFormat="%Y.%m.%d %H:%M:%S", tickFilter=None, chunkSize=16*1024*1024):
+    """Loads the ticks in a TXT file with bid, ask and datetime columns. Rows are parsed in bulk, in chunks, without
+    building tick or datetime objects.
+
+    :param file: The path to the TXT file.
+    :type file: string.
+    :param dateTimeFormat: The format for the datetime column. Only fixed width formats are supported.
+        Check :class:`pyalgotrade.utils.dtparser.FixedWidthParser`.
+    :type dateTimeFormat: string.
+    :param tickFilter: The tick filter, or None. Prices are not parsed for the rows that get filtered out.
+    :type tickFilter: :class:`TickFilter`.
+    :param chunkSize: The number of bytes to read and parse at once.
+    :type chunkSize: int.
+    :rtype: :class:`pyalgotrade.tick.TickArrays`.
+
+    .. note::
+        A ValueError is raised if a row can't be parsed, or if the tick filter can't be applied using
+        includeTimestamps.
+    """
+    chunks = list(iter_tick_arrays(file, dateTimeFormat, tickFilter, chunkSize))
+    return tick.TickArrays(
+        np.concatenate([chunk.getTimestamps() for chunk in chunks]),
+        np.concatenate([chunk.getBids() for chunk in chunks]),
+        np.concatenate([chunk.getAsks() for chunk in chunks])
+    )
+
+
+# Like load_tick_arrays, but takes the arguments in a tuple and returns None if a row can't be parsed, so it can be
+# used with pyalgotrade.utils.parallel_map.
+def load_tick_arrays_or_none(args):
+    ret = None
+    try:
+        ret = load_tick_arrays(*args)
+    except ValueError:
+        pass
+    return ret
+
+
+# Returns a pyalgotrade.tick.TickArrays with the ticks, or None if they can't be represented that way.
+def ticks_to_arrays(ticks):
+    for tick_ in ticks:
+        # Datetimes get rebuilt as naive datetimes.
+        if type(tick_) != tick.BasicTick or not dt.datetime_is_naive(tick_.getDateTime()):
+            return None
+    return tick.TickArrays(
+        [dt.datetime_to_epoch_ns(tick_.getDateTime()) for tick_ in ticks],
+        [tick_.getBid() for tick_ in ticks],
+        [tick_.getAsk() for tick_ in ticks]
+    )
+
+
+# Column names used to cache ticks.
+TICK_COLUMNS = ["timestamp", "bid", "ask"]
+
 
 class TickFeed(memtf.TickFeed):
     """Base class for TXT file based :class:`pyalgotrade.tickfeed.TickFeed`.
@@ -94,6 +246,7 @@ class TickFeed(memtf.TickFeed):
 
         self.__tickFilter = None
         self.__dailyTime = datetime.time(0, 0, 0)
+        self.__cache = None
 
     def getDailyTickTime(self):
         return self.__dailyTime
@@ -107,35 +260,57 @@ class TickFeed(memtf.TickFeed):
     def setTickFilter(self, tickFilter):
         self.__tickFilter = tickFilter
 
-    def addTicksFromTXT(self, instrument, file, rowParser, skipMalformedTicks=False):
-        def parse_tick_skip_malformed(row):
-            ret = None
-            try:
-                ret = rowParser.parseTick(row)
-            except Exception:
-                pass
-            return ret
-
-        if skipMalformedTicks:
-            parse_tick = parse_tick_skip_malformed
-        else:
-            parse_tick = rowParser.parseTick
+    def getCache(self):
+        return self.__cache
+
+    def setCache(self, cache):
+        """Sets the cache for parsed files, or None to disable caching.
 
-        # Load the txt file
-        loadedTicks = []
-        with open(file, 'r') as f:
-            for row in f:
-                row = row.rstrip('\n').rstrip().split(',')
-                tick_ = parse_tick(row)
-                if tick_ is not None and (self.__tickFilter is None or self.__tickFilter.includeTick(tick_)):
-                    loadedTicks.append(tick_)
+        :param cache: The cache.
+        :type cache: :class:`pyalgotrade.utils.arraycache.ArrayCache`.
+        """
+        self.__cache = cache
 
+    def addTicksFromTXT(self, instrument, file, rowParser, skipMalformedTicks=False):
+        loadedTicks = list(read_ticks(file, rowParser, self.__tickFilter, skipMalformedTicks))
         self.addTicksFromSequence(instrument, loadedTicks)
 
 
+class StreamingTickFeed(streamtf.TickFeed):
+    """Base class for TXT file based :class:`pyalgotrade.tickfeed.TickFeed` that read ticks as they are needed,
+    instead of loading whole files in memory.
+
+    :param maxLen: The maximum number of values that the :class:`pyalgotrade.dataseries.tickds.TickDataSeries` will hold.
+        Once a bounded length is full, when new items are added, a corresponding number of items are discarded from the
+        opposite end.
+    :type maxLen: int.
+    :param bufferSize: The maximum number of ticks to read ahead from each file.
+    :type bufferSize: int.
+
+    .. note::
+        * This is a base class and should not be used directly.
+        * Rows in each file must be sorted by datetime. An exception is raised when they are not.
+    """
+
+    def __init__(self, maxLen=1024*10000, bufferSize=1024):
+        super(StreamingTickFeed, self).__init__(maxLen, bufferSize)
+
+        self.__tickFilter = None
+
+    def getTickFilter(self):
+        return self.__tickFilter
+
+    def setTickFilter(self, tickFilter):
+        self.__tickFilter = tickFilter
+
+    def addTicksFromTXT(self, instrument, file, rowParser, skipMalformedTicks=False):
+        self.addTickSource(instrument, lambda: read_ticks(file, rowParser, self.__tickFilter, skipMalformedTicks))
+
+
 class GenericRowParser(RowParser):
     def __init__(self, dateTimeFormat, tickClass=tick.BasicTick):
         self.__dateTimeFormat = dateTimeFormat
+        self.__dateTimeParser = dtparser.get_parser(dateTimeFormat)
         self.__frequency = bar.Frequency.TRADE
         self.__tickClass = tickClass
         # Column names.
@@ -144,7 +319,7 @@ class GenericRowParser(RowParser):
         self.__askColName = "ask"
 
     def _parseDate(self, dateString):
-        ret = datetime.datetime.strptime(dateString, self.__dateTimeFormat)
+        ret = self.__dateTimeParser.parse(dateString)
         return ret
 
     def getFieldNames(self):
@@ -188,7 +363,7 @@ class GenericTickFeed(TickFeed):
     """
 
     def __init__(self, maxLen=1024*10000):
-        super(GenericTickFeed, self).__init__(maxLen)
+        super(GenericTickFeed, self).__init__(bar.Frequency.TRADE, maxLen)
         self.__tickClass = tick.BasicTick
         self.__dateTimeFormat = "%Y.%m.%d %H:%M:%S"
 
@@ -212,7 +387,129 @@ class GenericTickFeed(TickFeed):
         :param skipMalformedTicks: True to skip errors while parsing ticks.
         :type skipMalformedTicks: boolean.
         """
+        tickArrays = self.__loadCached(file, skipMalformedTicks)
+        if tickArrays is None and self.__loadsInBulk():
+            tickArrays = load_tick_arrays_or_none((file, self.__dateTimeFormat, self.getTickFilter()))
+            if tickArrays is not None:
+                self.__saveCached(file, skipMalformedTicks, tickArrays)
+        self.__addTicks(instrument, file, skipMalformedTicks, tickArrays)
+
+    def addTicksFromTXTFiles(self, files, skipMalformedTicks=False, processes=None):
+        """Loads ticks for many instruments from TXT formatted files. Files are parsed in parallel, in a pool of
+        processes, and the instruments get registered in the tick feed sorted by identifier.
+
+        :param files: A dict that maps instrument identifiers to the paths to the TXT files.
+        :type files: dict.
+        :param skipMalformedTicks: True to skip errors while parsing ticks.
+        :type skipMalformedTicks: boolean.
+        :param processes: The number of processes to use, or None to use one per CPU.
+        :type processes: int.
+
+        .. note::
+            * Only files that can be loaded with :func:`load_tick_arrays` are parsed in parallel. The rest are parsed
+              row by row in this process.
+            * The tick filter, if set, must be picklable.
+        """
+        instruments = sorted(files.keys())
+        loaded = dict(
+            (instrument, self.__loadCached(files[instrument], skipMalformedTicks)) for instrument in instruments
+        )
+        if self.__loadsInBulk():
+            pending = [instrument for instrument in instruments if loaded[instrument] is None]
+            args = [(files[instrument], self.__dateTimeFormat, self.getTickFilter()) for instrument in pending]
+            for instrument, tickArrays in zip(pending, utils.parallel_map(load_tick_arrays_or_none, args, processes)):
+                if tickArrays is not None:
+                    self.__saveCached(files[instrument], skipMalformedTicks, tickArrays)
+                    loaded[instrument] = tickArrays
+
+        for instrument in instruments:
+            self.__addTicks(instrument, files[instrument], skipMalformedTicks, loaded[instrument])
+
+    # load_tick_arrays checks if the tick filter can be applied in bulk.
+    def __loadsInBulk(self):
+        return self.__tickClass == tick.BasicTick and dtparser.is_fixed_width(self.__dateTimeFormat)
+
+    # Parsed files are cached only if ticks can be rebuilt from the cache.
+    def __getCacheSettings(self, skipMalformedTicks):
+        ret = None
+        if self.getCache() is not None and self.getTickFilter() is None and self.__tickClass == tick.BasicTick:
+            ret = ("ticks", self.__dateTimeFormat, skipMalformedTicks)
+        return ret
+
+    def __loadCached(self, file, skipMalformedTicks):
+        ret = None
+        cacheSettings = self.__getCacheSettings(skipMalformedTicks)
+        if cacheSettings is not None:
+            columns = self.getCache().load(file, cacheSettings)
+            if columns is not None:
+                ret = tick.TickArrays(*[columns[name] for name in TICK_COLUMNS])
+        return ret
+
+    def __saveCached(self, file, skipMalformedTicks, tickArrays):
+        cacheSettings = self.__getCacheSettings(skipMalformedTicks)
+        if cacheSettings is not None:
+            self.getCache().save(file, cacheSettings, list(zip(TICK_COLUMNS, [
+                tickArrays.getTimestamps(), tickArrays.getBids(), tickArrays.getAsks()
+            ])))
+
+    # Adds ticks already loaded in tickArrays, or parses the file row by row if tickArrays is None.
+    def __addTicks(self, instrument, file, skipMalformedTicks, tickArrays):
+        if tickArrays is None:
+            rowParser = GenericRowParser(
+                self.__dateTimeFormat, self.__tickClass
+            )
+            loadedTicks = list(read_ticks(file, rowParser, self.getTickFilter(), skipMalformedTicks))
+            if self.__getCacheSettings(skipMalformedTicks) is not None:
+                tickArrays = ticks_to_arrays(loadedTicks)
+                if tickArrays is not None:
+                    self.__saveCached(file, skipMalformedTicks, tickArrays)
+
+        if tickArrays is not None:
+            self.addTicksFromArrays(instrument, tickArrays)
+        else:
+            self.addTicksFromSequence(instrument, loadedTicks)
+
+
+class StreamingGenericTickFeed(StreamingTickFeed):
+    """A :class:`StreamingTickFeed` that reads ticks from the same files as :class:`GenericTickFeed`.
+
+    :param maxLen: The maximum number of values that the :class:`pyalgotrade.dataseries.tickds.TickDataSeries` will hold.
+        Once a bounded length is full, when new items are added, a corresponding number of items are discarded from the
+        opposite end.
+    :type maxLen: int.
+    :param bufferSize: The maximum number of ticks to read ahead from each file.
+    :type bufferSize: int.
+    """
+
+    def __init__(self, maxLen=1024*10000, bufferSize=1024):
+        super(StreamingGenericTickFeed, self).__init__(maxLen, bufferSize)
+        self.__tickClass = tick.BasicTick
+        self.__dateTimeFormat = "%Y.%m.%d %H:%M:%S"
+
+    def setDateTimeFormat(self, dateTimeFormat):
+        """
+        Set the format string to use with strptime to parse datetime column.
+        """
+        self.__dateTimeFormat = dateTimeFormat
+
+    def setTickClass(self, tickClass):
+        self.__tickClass = tickClass
+
+    def addTicksFromTXT(self, instrument, file, skipMalformedTicks=False):
+        """Adds a TXT formatted file to read ticks from, for a given instrument.
+        The instrument gets registered in the tick feed.
+
+        :param instrument: Instrument identifier.
+        :type instrument: string.
+        :param file: The path to the TXT file. Many files may be added for the same instrument, and they will be read
+            in the order they were added.
+        :type file: string.
+        :param skipMalformedTicks: True to skip errors while parsing ticks.
+        :type skipMalformedTicks: boolean.
+        """
         rowParser = GenericRowParser(
             self.__dateTimeFormat, self.__tickClass
         )
-        super(GenericTickFeed, self).addTicksFromTXT(instrument, file, rowParser, skipMalformedTicks=skipMalformedTicks)
+        super(StreamingGenericTickFeed, self).addTicksFromTXT(
+            instrument, file, rowParser, skipMalformedTicks=skipMalformedTicks
+        )
@@ -4,16 +4,19 @@
 """
 
 import abc
+import collections
 import logging
 
 import six
 
 import pyalgotrade.tickbroker
 from pyalgotrade.tickbroker import backtesting
+from pyalgotrade.tickfeed import memtf
 from pyalgotrade import observer
 from pyalgotrade import dispatcher
 import pyalgotrade.strategy.position
 from pyalgotrade import logger
+from pyalgotrade.utils import profiler
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -40,6 +43,8 @@ class BaseTickStrategy(object):
         self.__analyzers = []
         self.__namedAnalyzers = {}
         # self.__resampledTickFeeds = []
+        self.__profilingEnabled = False
+        self.__profiler = None
         self.__dispatcher = dispatcher.Dispatcher()
         self.__broker.getOrderUpdatedEvent().subscribe(self.__onOrderEvent)
         self.__tickFeed.getNewValuesEvent().subscribe(self.__onTicks)
@@ -483,17 +488,54 @@ class BaseTickStrategy(object):
         # THE ORDER HERE IS VERY IMPORTANT
 
         # 1: Let analyzers process ticks.
-        self.__notifyAnalyzers(lambda s: s.beforeOnTicks(self, ticks))
+        if len(self.__analyzers):
+            self.__notifyAnalyzers(lambda s: s.beforeOnTicks(self, ticks))
 
         # 2: Let the strategy process current ticks and submit orders.
         self.onTicks(ticks)
 
         # 3: Notify that the ticks were processed.
-        self.__ticksProcessedEvent.emit(self, ticks)
+        if self.__ticksProcessedEvent.hasSubscribers():
+            self.__ticksProcessedEvent.emit(self, ticks)
+
+    def setProfilingEnabled(self, enabled):
+        """Enables or disables measuring the wall time and the number of calls for each phase of :meth:`run`, like
+        loading ticks, updating dataseries and indicators, processing orders, :meth:`onTicks` and analyzers. When
+        enabled, a report gets logged at the end of the run. This is disabled by default.
+
+        :param enabled: True to enable profiling.
+        :type enabled: boolean.
+        """
+        self.__profilingEnabled = enabled
+
+    def getProfiler(self):
+        """Returns the :class:`pyalgotrade.utils.profiler.Profiler` for the last run, or None if profiling was not
+        enabled."""
+        return self.__profiler
+
+    def __buildProfiler(self):
+        ret = profiler.Profiler()
+        ret.instrument(self.__tickFeed, "getNextValues")
+        ret.instrument(self.__tickFeed, "getNextValuesAndUpdateDS")
+        ret.instrument(self, "onTicks")
+        for analyzer in self.__analyzers:
+            ret.instrument(analyzer, "beforeOnTicks")
+        return ret
 
     def run(self):
         """Call once (**and only once**) to run the strategy."""
-        self.__dispatcher.run()
+        if self.__profilingEnabled:
+            # Named before instrumenting, since that replaces onTicks with a wrapper.
+            eventsPhase = profiler.get_callable_name(self.onTicks)
+            self.__profiler = self.__buildProfiler()
+            self.__profiler.start()
+            try:
+                self.__dispatcher.run()
+            finally:
+                self.__profiler.stop()
+            self.info("Profile:\n%s" % self.__profiler.getReport(eventsPhase))
+        else:
+            self.__dispatcher.run()
 
         if self.__tickFeed.getCurrentTicks() is not None:
             self.onFinish(self.__tickFeed.getCurrentTicks())
@@ -578,3 +620,103 @@ class BacktestingTickStrategy(BaseTickStrategy):
         level = logging.DEBUG if debugOn else logging.INFO
         self.getLogger().setLevel(level)
         self.getBroker().getLogger().setLevel(level)
+
+
+class BatchedBacktestingTickStrategy(BacktestingTickStrategy):
+    """Base class for backtesting strategies that process ticks in batches, as numpy arrays, instead of one at a time.
+    Subclasses implement :meth:`onTickBatch` instead of :meth:`onTicks`, and return the market orders to submit.
+
+    Only the ticks where orders get submitted, and the ones after that until the broker has no active orders, get
+    dispatched. The rest of the ticks are skipped, so the cost per tick is that of the vectorized trading logic.
+
+    :param tickFeed: The tick feed to use to backtest the strategy. Ticks for a single instrument should be added using
+        :meth:`pyalgotrade.tickfeed.memtf.TickFeed.addTicksFromArrays`.
+    :type tickFeed: :class:`pyalgotrade.tickfeed.memtf.TickFeed`.
+    :param cash_or_brk: The starting capital or a broker instance.
+    :type cash_or_brk: int/float or :class:`pyalgotrade.broker.Broker`.
+    :param batchSize: The maximum number of ticks to pass to :meth:`onTickBatch` at once.
+    :type batchSize: int.
+
+    .. note::
+        * This is a base class and should not be used directly.
+        * Skipped ticks are not added to the feed dataseries, and analyzers only get notified about the dispatched
+          ones. The last tick is always dispatched, so the strategy finishes with the last prices.
+    """
+
+    def __init__(self, tickFeed, cash_or_brk=1000000, batchSize=1024*64):
+        if not isinstance(tickFeed, memtf.TickFeed):
+            raise Exception("Ticks can only be processed in batches using a memtf.TickFeed")
+        assert(batchSize > 0)
+
+        super(BatchedBacktestingTickStrategy, self).__init__(tickFeed, cash_or_brk)
+        self.__batchSize = batchSize
+        self.__instrument = None
+        self.__tickArrays = None
+        # The end of the last batch, and the (position, quantity) pairs for the orders to submit, sorted by position.
+        self.__batchEnd = 0
+        self.__orders = collections.deque()
+
+    @abc.abstractmethod
+    def onTickBatch(self, timestamps, bids, asks):
+        """Override (**mandatory**) to process a batch of consecutive ticks and return the orders to submit.
+
+        :param timestamps: The datetimes, as int64 nanoseconds since the epoch.
+        :type timestamps: numpy.array.
+        :param bids: The bid prices.
+        :type bids: numpy.array.
+        :param asks: The ask prices.
+        :type asks: numpy.array.
+        :rtype: A sequence of (position, quantity) pairs, or None. position is the position of a tick in the batch, and
+            quantity is the amount of shares, positive to buy and negative to sell. A market order for quantity is
+            submitted when that tick is processed, the same way it would be if :meth:`marketOrder` were called from
+            :meth:`onTicks`.
+        """
+        raise NotImplementedError()
+
+    def __getTickArrays(self):
+        if self.__tickArrays is None:
+            instruments = self.getFeed().getRegisteredInstruments()
+            if len(instruments) != 1:
+                raise Exception("Ticks can only be processed in batches for a single instrument")
+            self.__instrument = instruments[0]
+            self.__tickArrays = self.getFeed().getTickArrays(self.__instrument)
+            if self.__tickArrays is None:
+                raise Exception("Ticks should be added using addTicksFromArrays to be processed in batches")
+        return self.__tickArrays
+
+    def __loadNextBatch(self):
+        tickArrays = self.__getTickArrays()
+        begin = self.__batchEnd
+        end = min(begin + self.__batchSize, len(tickArrays))
+        orders = self.onTickBatch(
+            tickArrays.getTimestamps()[begin:end], tickArrays.getBids()[begin:end], tickArrays.getAsks()[begin:end]
+        )
+
+        positions = []
+        for pos, quantity in orders if orders is not None else []:
+            if pos < 0 or pos >= end - begin:
+                raise Exception("Invalid position %s for a batch with %d ticks" % (pos, end - begin))
+            positions.append((begin + int(pos), quantity))
+        # sorted is stable, so orders for the same tick are submitted in the order they were returned.
+        self.__orders.extend(sorted(positions, key=lambda order: order[0]))
+        self.__batchEnd = end
+
+    def onTicks(self, ticks):
+        # The position of the ticks being processed. Ticks are dispatched only after the ones that were skipped.
+        tickArrays = self.__getTickArrays()
+        pos = self.getFeed().getNextPosition(self.__instrument) - 1
+        if pos >= self.__batchEnd:
+            self.__loadNextBatch()
+
+        while len(self.__orders) and self.__orders[0][0] == pos:
+            self.marketOrder(self.__instrument, self.__orders.popleft()[1])
+
+        # Active orders get processed tick by tick. Otherwise, skip to the next tick with orders to submit.
+        if len(self.getBroker().getActiveOrders()) == 0:
+            while len(self.__orders) == 0 and self.__batchEnd < len(tickArrays):
+                self.__loadNextBatch()
+            if len(self.__orders):
+                nextPos = self.__orders[0][0]
+            else:
+                nextPos = len(tickArrays) - 1
+            self.getFeed().skipTicks(self.__instrument, max(nextPos - pos - 1, 0))
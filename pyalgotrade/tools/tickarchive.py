@@ -0,0 +1,75 @@
+# PyAlgoTrade
+#
+# Copyright 2011-2018 Gabriel Martin Becedillas Ruiz
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. moduleauthor:: Gabriel Martin Becedillas Ruiz <gabriel.becedillas@gmail.com>
+"""
+
+import argparse
+import os
+
+from pyalgotrade.tickfeed import partitionedtf
+import pyalgotrade.logger
+
+
+def encode_files(files, rootDir, instrument, dateTimeFormat="%Y.%m.%d %H:%M:%S", compact=True, pipSize=None):
+    """Converts TXT tick files for an instrument to partitions in a tick archive.
+    Check :func:`pyalgotrade.tickfeed.partitionedtf.txt_files_to_archive`.
+
+    :param files: The paths to the TXT files, sorted by datetime.
+    :type files: list.
+    :param rootDir: The root directory for the archive.
+    :type rootDir: string.
+    :param instrument: Instrument identifier.
+    :type instrument: string.
+    :param dateTimeFormat: The format for the datetime column.
+    :type dateTimeFormat: string.
+    :param compact: True to encode partitions with :func:`pyalgotrade.utils.tickcodec.encode_ticks`.
+    :type compact: boolean.
+    :param pipSize: The smallest price increment for the instrument. If None, it is guessed from the prices.
+    :type pipSize: float.
+    :rtype: A (number of partitions written, bytes read, bytes written) tuple.
+    """
+    dates = partitionedtf.txt_files_to_archive(files, rootDir, instrument, dateTimeFormat, compact, pipSize)
+    bytesRead = sum(os.path.getsize(file) for file in files)
+    bytesWritten = sum(os.path.getsize(partitionedtf.get_partition_path(rootDir, instrument, date)) for date in dates)
+    return len(dates), bytesRead, bytesWritten
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Converts TXT tick files to a tick archive")
+
+    parser.add_argument("--root", required=True, help="The root directory for the archive")
+    parser.add_argument("--instrument", required=True, help="The instrument identifier")
+    parser.add_argument("--pip-size", type=float, help="The smallest price increment. Guessed from prices if not set")
+    parser.add_argument("--datetime-format", default="%Y.%m.%d %H:%M:%S", help="The format for the datetime column")
+    parser.add_argument("--raw", action='store_true', help="Store columns as they are instead of encoding them")
+    parser.add_argument("files", nargs="+", help="The TXT files, sorted by datetime")
+
+    args = parser.parse_args()
+
+    logger = pyalgotrade.logger.getLogger("tickarchive")
+
+    partitions, bytesRead, bytesWritten = encode_files(
+        args.files, args.root, args.instrument, args.datetime_format, not args.raw, args.pip_size
+    )
+    logger.info("Wrote %d partitions for %s. %d bytes read, %d bytes written" % (
+        partitions, args.instrument, bytesRead, bytesWritten
+    ))
+
+
+if __name__ == "__main__":
+    main()
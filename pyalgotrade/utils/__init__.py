@@ -18,6 +18,8 @@
 .. moduleauthor:: Gabriel Martin Becedillas Ruiz <gabriel.becedillas@gmail.com>
 """
 
+import multiprocessing
+
 
 def get_change_percentage(actual, prev):
     if actual is None or prev is None or prev == 0:
@@ -44,3 +46,25 @@ def safe_max(left, right):
         return left
     else:
         return max(left, right)
+
+
+def parallel_map(func, args, processes=None):
+    """Returns [func(arg) for arg in args], calling func in a pool of processes.
+    func must be a module level function, and both args and the results must be picklable.
+
+    :param processes: The number of processes to use, or None to use one per CPU.
+    :type processes: int.
+    """
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    processes = min(processes, len(args))
+    if processes <= 1:
+        return [func(arg) for arg in args]
+
+    pool = multiprocessing.Pool(processes)
+    try:
+        ret = pool.map(func, args)
+    finally:
+        pool.close()
+        pool.join()
+    return ret
@@ -0,0 +1,236 @@
+# PyAlgoTrade
+#
+# Copyright 2011-2018 Gabriel Martin Becedillas Ruiz
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. moduleauthor:: Gabriel Martin Becedillas Ruiz <gabriel.becedillas@gmail.com>
+"""
+
+import hashlib
+import json
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+
+# File layout:
+# - MAGIC
+# - The header length, as a little endian uint32.
+# - The header, as JSON, with the number of rows and the name, dtype and offset for each column.
+# - The columns, one after the other, each one starting at an offset that is a multiple of ALIGNMENT.
+MAGIC = b"PATCOLS1"
+ALIGNMENT = 64
+# Bump this if the layout or the contents of cached files change.
+VERSION = 1
+CACHE_EXTENSION = ".cache"
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_columns(path, columns):
+    """Writes columns to a binary file. The file is written to a temporary file first and then renamed, so readers
+    never see a partially written file.
+
+    :param path: The path to the file.
+    :type path: string.
+    :param columns: (name, values) pairs. All values should have the same length.
+    :type columns: list.
+    """
+    columns = [(name, np.ascontiguousarray(values)) for name, values in columns]
+    length = len(columns[0][1]) if len(columns) else 0
+    header = {"length": length, "columns": []}
+    for name, values in columns:
+        if len(values) != length:
+            raise ValueError("All columns should have the same length")
+        if values.dtype.hasobject:
+            raise ValueError("Column %s can't be stored" % name)
+        header["columns"].append({"name": name, "dtype": values.dtype.str})
+
+    # Offsets depend on the header length, and the header length depends on the offsets. Reserve enough room for the
+    # offsets by using the largest possible ones first.
+    header["offsets"] = [2**62] * len(columns)
+    offset = _align(len(MAGIC) + 4 + len(json.dumps(header).encode("utf-8")))
+    offsets = []
+    for name, values in columns:
+        offsets.append(offset)
+        offset = _align(offset + values.nbytes)
+    header["offsets"] = offsets
+    encodedHeader = json.dumps(header).encode("utf-8")
+
+    dirName = os.path.dirname(os.path.abspath(path))
+    fd, tmpPath = tempfile.mkstemp(dir=dirName, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<I", len(encodedHeader)))
+            f.write(encodedHeader)
+            for (name, values), offset in zip(columns, offsets):
+                f.write(b"\0" * (offset - f.tell()))
+                f.write(values.tobytes())
+        try:
+            os.rename(tmpPath, path)
+        except OSError:
+            # Windows won't rename over an existing file.
+            os.remove(path)
+            os.rename(tmpPath, path)
+    except Exception:
+        if os.path.exists(tmpPath):
+            os.remove(tmpPath)
+        raise
+
+
+def read_columns(path):
+    """Reads columns written with :func:`write_columns`. Values are memory-mapped in read-only mode, not loaded.
+
+    :param path: The path to the file.
+    :type path: string.
+    :rtype: A dict that maps column names to numpy.memmap instances.
+
+    .. note::
+        A ValueError is raised if the file is not valid.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("%s is not a valid column file" % path)
+        headerLength = struct.unpack("<I", f.read(4))[0]
+        header = json.loads(f.read(headerLength).decode("utf-8"))
+    fileSize = os.path.getsize(path)
+
+    ret = {}
+    length = header["length"]
+    for column, offset in zip(header["columns"], header["offsets"]):
+        dtype = np.dtype(str(column["dtype"]))
+        if offset + length * dtype.itemsize > fileSize:
+            raise ValueError("%s is truncated" % path)
+        if length:
+            values = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(length,))
+        else:
+            # Empty files can't be mapped.
+            values = np.empty(0, dtype=dtype)
+        ret[str(column["name"])] = values
+    return ret
+
+
+class ArrayCache(object):
+    """Caches columns parsed from a source file in a binary file. Cached files are memory-mapped when loaded, so
+    loading is almost instant, and processes loading the same file share memory through the OS page cache.
+
+    :param cacheDir: The directory for cached files. If None, cached files are stored along with source files.
+    :type cacheDir: string.
+    :param maxSize: The maximum number of bytes for the files in cacheDir. If a file gets cached and that is exceeded,
+        the least recently used files are removed. If None, files are never removed.
+    :type maxSize: int.
+
+    .. note::
+        * Cached files are keyed by the source path, its size and modification time, and the settings used to parse it.
+          Changing any of those results in a cache miss.
+        * Stale cached files are not removed, unless maxSize is set. In that case they get evicted as other files are
+          cached, since they are never used again.
+        * A cached file is used when its modification time gets updated, so that is when it was last used.
+    """
+
+    def __init__(self, cacheDir=None, maxSize=None):
+        if maxSize is not None and cacheDir is None:
+            raise Exception("maxSize can only be set along with cacheDir")
+
+        self.__cacheDir = cacheDir
+        self.__maxSize = maxSize
+        if cacheDir is not None and not os.path.exists(cacheDir):
+            os.makedirs(cacheDir)
+
+    def getMaxSize(self):
+        return self.__maxSize
+
+    def getCachePath(self, sourcePath, settings):
+        """Returns the path to the cached file for a given source file.
+
+        :param sourcePath: The path to the source file.
+        :type sourcePath: string.
+        :param settings: The settings used to parse the source file. Its repr should be stable across runs.
+        """
+        sourcePath = os.path.abspath(sourcePath)
+        stat = os.stat(sourcePath)
+        key = repr((VERSION, sourcePath, stat.st_size, repr(stat.st_mtime), settings))
+        key = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+        fileName = "%s.%s%s" % (os.path.basename(sourcePath), key, CACHE_EXTENSION)
+        if self.__cacheDir is None:
+            ret = os.path.join(os.path.dirname(sourcePath), fileName)
+        else:
+            ret = os.path.join(self.__cacheDir, fileName)
+        return ret
+
+    def load(self, sourcePath, settings):
+        """Returns a dict that maps column names to memory-mapped numpy arrays, or None if the source file was
+        not cached, or if the cached file is not valid.
+        """
+        ret = None
+        cachePath = self.getCachePath(sourcePath, settings)
+        if os.path.exists(cachePath):
+            try:
+                ret = read_columns(cachePath)
+                if self.__maxSize is not None:
+                    os.utime(cachePath, None)
+            except Exception:
+                pass
+        return ret
+
+    def save(self, sourcePath, settings, columns):
+        """Caches columns for a given source file.
+
+        :param columns: (name, values) pairs. All values should have the same length.
+        :type columns: list.
+        """
+        write_columns(self.getCachePath(sourcePath, settings), columns)
+        if self.__maxSize is not None:
+            self.evict(self.__maxSize)
+
+    def evict(self, maxSize):
+        """Removes the least recently used files in the cache directory until they take up to maxSize bytes.
+
+        :param maxSize: The maximum number of bytes for the files in the cache directory.
+        :type maxSize: int.
+        :rtype: The number of files removed.
+        """
+        assert(self.__cacheDir is not None)
+
+        cachedFiles = []
+        for fileName in os.listdir(self.__cacheDir):
+            if fileName.endswith(CACHE_EXTENSION):
+                path = os.path.join(self.__cacheDir, fileName)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    # Removed by another process.
+                    continue
+                cachedFiles.append((stat.st_mtime, path, stat.st_size))
+
+        ret = 0
+        totalSize = sum(size for lastUsed, path, size in cachedFiles)
+        for lastUsed, path, size in sorted(cachedFiles):
+            if totalSize <= maxSize:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                # Removed by another process, or mapped by this one on Windows.
+                continue
+            totalSize -= size
+            ret += 1
+        return ret
@@ -19,6 +19,7 @@
 """
 
 import numpy as np
+from six.moves import xrange
 
 
 def lt(v1, v2):
@@ -57,50 +58,59 @@ def intersect(values1, values2, skipNone=False):
 
 
 # Like a collections.deque but using a numpy.array.
+# Values live in a buffer that grows up to twice maxLen, and the window slides to the right as values get appended.
+# Once the end of the buffer is reached the window is moved back to the beginning, so the copy is done once every maxLen
+# appends and data() can always return a contiguous view.
 class NumPyDeque(object):
+    # Big maxLens (like the ones used for tick data) are not preallocated.
+    INITIAL_CAPACITY = 1024
+
     def __init__(self, maxLen, dtype=float):
         assert maxLen > 0, "Invalid maximum length"
 
-        self.__values = np.empty(maxLen, dtype=dtype)
+        self.__values = np.empty(min(maxLen * 2, NumPyDeque.INITIAL_CAPACITY), dtype=dtype)
         self.__maxLen = maxLen
-        self.__nextPos = 0
+        self.__start = 0
+        self.__end = 0
 
     def getMaxLen(self):
         return self.__maxLen
 
-    def append(self, value):
-        if self.__nextPos < self.__maxLen:
-            self.__values[self.__nextPos] = value
-            self.__nextPos += 1
+    # Move the values to the beginning of a buffer with the given capacity.
+    def __relocate(self, capacity):
+        size = self.__end - self.__start
+        if capacity != len(self.__values):
+            values = np.empty(capacity, dtype=self.__values.dtype)
         else:
-            # Shift items to the left and put the last value.
-            # I'm not using np.roll to avoid creating a new array.
-            self.__values[0:-1] = self.__values[1:]
-            self.__values[self.__nextPos - 1] = value
+            values = self.__values
+        values[0:size] = self.__values[self.__start:self.__end]
+        self.__values = values
+        self.__start = 0
+        self.__end = size
+
+    def append(self, value):
+        if self.__end == len(self.__values):
+            self.__relocate(min(len(self.__values) * 2, self.__maxLen * 2))
+
+        self.__values[self.__end] = value
+        self.__end += 1
+        if self.__end - self.__start > self.__maxLen:
+            self.__start += 1
 
     def data(self):
-        # If all values are not initialized, return a portion of the array.
-        if self.__nextPos < self.__maxLen:
-            ret = self.__values[0:self.__nextPos]
-        else:
-            ret = self.__values
-        return ret
+        return self.__values[self.__start:self.__end]
 
     def resize(self, maxLen):
         assert maxLen > 0, "Invalid maximum length"
 
-        # Create empty, copy last values and swap.
-        values = np.empty(maxLen, dtype=self.__values.dtype)
-        lastValues = self.__values[0:self.__nextPos]
-        values[0:min(maxLen, len(lastValues))] = lastValues[-1*min(maxLen, len(lastValues)):]
-        self.__values = values
-
+        # Drop the oldest values if necessary and copy the rest into a new buffer.
+        if len(self) > maxLen:
+            self.__start = self.__end - maxLen
         self.__maxLen = maxLen
-        if self.__nextPos >= self.__maxLen:
-            self.__nextPos = self.__maxLen
+        self.__relocate(max(min(maxLen * 2, NumPyDeque.INITIAL_CAPACITY), len(self) + 1))
 
     def __len__(self):
-        return self.__nextPos
+        return self.__end - self.__start
 
     def __getitem__(self, key):
         return self.data()[key]
@@ -109,28 +119,50 @@ class NumPyDeque(object):
 # I'm not using collections.deque because:
 # 1: Random access is slower.
 # 2: Slicing is not supported.
+# Once full, values are stored in a circular buffer so appending is O(1) regardless of maxLen.
 class ListDeque(object):
     def __init__(self, maxLen):
         assert maxLen > 0, "Invalid maximum length"
 
         self.__values = []
         self.__maxLen = maxLen
+        # Position of the oldest value. Only != 0 once the buffer is full and wrapped around.
+        self.__head = 0
+        # The values in order, built by data() when the buffer wrapped around and kept until the next append.
+        self.__ordered = None
 
     def getMaxLen(self):
         return self.__maxLen
 
     def append(self, value):
-        self.__values.append(value)
-        # Check bounds
-        if len(self.__values) > self.__maxLen:
-            self.__values.pop(0)
+        if len(self.__values) < self.__maxLen:
+            self.__values.append(value)
+        else:
+            # Overwrite the oldest value and move the head forward.
+            self.__values[self.__head] = value
+            self.__head += 1
+            if self.__head == self.__maxLen:
+                self.__head = 0
+            self.__ordered = None
+
+    # Rotate the values so that the oldest one is at position 0.
+    def __unwrap(self):
+        if self.__head != 0:
+            self.__values = self.data()
+            self.__head = 0
+            self.__ordered = None
 
     def data(self):
-        return self.__values
+        if self.__head == 0:
+            return self.__values
+        if self.__ordered is None:
+            self.__ordered = self.__values[self.__head:] + self.__values[:self.__head]
+        return self.__ordered
 
     def resize(self, maxLen):
         assert maxLen > 0, "Invalid maximum length"
 
+        self.__unwrap()
         self.__maxLen = maxLen
         self.__values = self.__values[-1*maxLen:]
 
@@ -138,4 +170,20 @@ class ListDeque(object):
         return len(self.__values)
 
     def __getitem__(self, key):
+        head = self.__head
+        if head == 0:
+            return self.__values[key]
+
+        # The buffer wrapped around, so positions need to be translated.
+        size = len(self.__values)
+        if isinstance(key, slice):
+            values = self.__values
+            return [values[(head + i) % size] for i in xrange(*key.indices(size))]
+        if key < 0:
+            key += size
+        if key < 0 or key >= size:
+            raise IndexError("Index out of range")
+        key += head
+        if key >= size:
+            key -= size
         return self.__values[key]
@@ -46,7 +46,7 @@ class FastDictReader(object):
 
         # Check that the row has the right number of columns.
         assert len(self.__fieldNames) == len(row), "Expected columns: %s. Actual columns: %s" % (
-            self.__fieldNames, list(row.keys())
+            self.__fieldNames, row
         )
 
         # Copy the row values into the dict.
@@ -65,6 +65,39 @@ class FastDictReader(object):
         return self._next_impl()
 
 
+# Like FastDictReader, but rows are returned as lists. Use getFieldNames to resolve column positions.
+class FastRowReader(object):
+    def __init__(self, f, fieldnames=None, dialect="excel", *args, **kwargs):
+        self.__fieldNames = fieldnames
+        self.reader = csv.reader(f, dialect, *args, **kwargs)
+        if self.__fieldNames is None:
+            self.__fieldNames = six.next(self.reader)
+
+    def getFieldNames(self):
+        return self.__fieldNames
+
+    def _next_impl(self):
+        # Skip empty rows.
+        row = six.next(self.reader)
+        while row == []:
+            row = six.next(self.reader)
+
+        # Check that the row has the right number of columns.
+        assert len(self.__fieldNames) == len(row), "Expected columns: %s. Actual columns: %s" % (
+            self.__fieldNames, row
+        )
+        return row
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self._next_impl()
+
+    def next(self):
+        return self._next_impl()
+
+
 def download_csv(url, url_params=None, content_type="text/csv"):
     response = requests.get(url, params=url_params)
 
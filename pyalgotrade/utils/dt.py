@@ -54,7 +54,11 @@ def as_utc(dateTime):
 
 def datetime_to_timestamp(dateTime):
     """ Converts a datetime.datetime to a UTC timestamp."""
-    diff = as_utc(dateTime) - epoch_utc
+    # Subtracting aware datetimes takes their UTC offsets into account, so there is no need to localize them.
+    if datetime_is_naive(dateTime):
+        diff = dateTime.replace(tzinfo=None) - epoch_naive
+    else:
+        diff = dateTime - epoch_utc
     return diff.total_seconds()
 
 
@@ -66,6 +70,24 @@ def timestamp_to_datetime(timeStamp, localized=True):
     return ret
 
 
+def datetime_to_epoch_ns(dateTime):
+    """ Converts a datetime.datetime to an integer number of nanoseconds since the epoch (UTC).
+    Naive datetimes are treated as if they were in UTC."""
+    if dateTime.tzinfo is not None:
+        dateTime = dateTime.astimezone(pytz.utc).replace(tzinfo=None)
+    diff = dateTime - epoch_naive
+    return ((diff.days * 86400 + diff.seconds) * 1000000 + diff.microseconds) * 1000
+
+
+def epoch_ns_to_datetime(epochNs, tzInfo=None):
+    """ Converts an integer number of nanoseconds since the epoch (UTC) to a datetime.datetime.
+    If tzInfo is None a naive datetime is returned."""
+    ret = epoch_naive + datetime.timedelta(microseconds=int(epochNs) // 1000)
+    if tzInfo is not None:
+        ret = localize(pytz.utc.localize(ret), tzInfo)
+    return ret
+
+
 def get_first_monday(year):
     ret = datetime.date(year, 1, 1)
     if ret.weekday() != 0:
@@ -82,4 +104,5 @@ def get_last_monday(year):
     return ret
 
 
-epoch_utc = as_utc(datetime.datetime(1970, 1, 1))
+epoch_naive = datetime.datetime(1970, 1, 1)
+epoch_utc = as_utc(epoch_naive)
@@ -0,0 +1,117 @@
+# PyAlgoTrade
+#
+# Copyright 2011-2018 Gabriel Martin Becedillas Ruiz
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. moduleauthor:: Gabriel Martin Becedillas Ruiz <gabriel.becedillas@gmail.com>
+"""
+
+import datetime
+
+import numpy as np
+from six.moves import xrange
+
+from pyalgotrade.utils import dt
+from pyalgotrade.utils import dtparser
+
+
+# Filters for datetimes held in numpy arrays, as int64 nanoseconds since the epoch. Datetimes are in UTC, unless tzInfo
+# is None, in which case they are naive datetimes.
+
+
+def include_timestamps(filter_, timestamps, tzInfo, rowMethodName):
+    """Returns filter_.includeTimestamps(timestamps, tzInfo), or None if the filter has to be applied one row at a time.
+    That is the case when a subclass overrides the method that filters rows, rowMethodName, but not
+    includeTimestamps, since the mask would skip the subclass' own logic.
+    """
+    mro = type(filter_).__mro__
+
+    def get_implementor(methodName):
+        for i, cls in enumerate(mro):
+            if methodName in vars(cls):
+                return i
+        return len(mro)
+
+    if get_implementor(rowMethodName) < get_implementor("includeTimestamps"):
+        return None
+    return filter_.includeTimestamps(timestamps, tzInfo)
+
+
+def date_range_mask(timestamps, fromDate=None, toDate=None):
+    """Returns a numpy array of booleans that is True for the datetimes between fromDate and toDate (inclusive).
+
+    .. note::
+        Naive fromDate and toDate are taken to be in UTC, just like naive datetimes in the timestamps. To filter
+        datetimes that are in some other timezone, fromDate and toDate should be timezone aware.
+    """
+    ret = np.ones(len(timestamps), dtype=bool)
+    if toDate:
+        ret &= timestamps <= dt.datetime_to_epoch_ns(toDate)
+    if fromDate:
+        ret &= timestamps >= dt.datetime_to_epoch_ns(fromDate)
+    return ret
+
+
+def session_boundaries(firstDate, lastDate, timezone, fromTime, toTime):
+    """Returns a sorted numpy array with the UTC session boundaries, as int64 nanoseconds since the epoch, for every
+    day between firstDate and lastDate (inclusive). The array holds open and close + 1ns pairs, so a datetime is in
+    a session if the number of boundaries before or at it is odd.
+    """
+    ret = []
+    for i in xrange((lastDate - firstDate).days + 1):
+        date = firstDate + datetime.timedelta(days=i)
+        ret.append(dt.datetime_to_epoch_ns(timezone.localize(datetime.datetime.combine(date, fromTime))))
+        ret.append(dt.datetime_to_epoch_ns(timezone.localize(datetime.datetime.combine(date, toTime))) + 1)
+    return np.array(ret, dtype=np.int64)
+
+
+def session_mask(timestamps, tzInfo, timezone, fromTime, toTime):
+    """Returns a numpy array of booleans that is True for the datetimes that fall on a weekday, between fromTime and
+    toTime (inclusive) in a given timezone. Naive datetimes are assumed to be in that timezone, and weekdays are
+    checked using the datetimes' own timezone.
+
+    :param timestamps: The datetimes.
+    :type timestamps: numpy.array.
+    :param tzInfo: The timezone for the datetimes, or None if they are naive.
+    :param timezone: The session timezone.
+    :type timezone: A pytz timezone.
+    :param fromTime: The session start time.
+    :type fromTime: datetime.time.
+    :param toTime: The session end time.
+    :type toTime: datetime.time.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    if len(timestamps) == 0:
+        return np.ones(0, dtype=bool)
+
+    localTimestamps = timestamps
+    if tzInfo is not None:
+        localTimestamps = dtparser.Localizer(tzInfo).toLocalTimestamps(timestamps)
+    days = localTimestamps // dtparser.DAY_NS
+    # 1970-01-01 was a Thursday.
+    ret = (days + 3) % 7 <= 4
+
+    if tzInfo is None:
+        timeOfDay = localTimestamps - days * dtparser.DAY_NS
+        epochDate = dt.epoch_naive.date()
+        ret &= timeOfDay >= dt.datetime_to_epoch_ns(datetime.datetime.combine(epochDate, fromTime))
+        ret &= timeOfDay <= dt.datetime_to_epoch_ns(datetime.datetime.combine(epochDate, toTime))
+    else:
+        # Add a day on both sides to cover any UTC offset.
+        firstDate = dt.epoch_ns_to_datetime(timestamps.min()).date() - datetime.timedelta(days=1)
+        lastDate = dt.epoch_ns_to_datetime(timestamps.max()).date() + datetime.timedelta(days=1)
+        boundaries = session_boundaries(firstDate, lastDate, timezone, fromTime, toTime)
+        ret &= np.searchsorted(boundaries, timestamps, side="right") % 2 == 1
+    return ret
@@ -0,0 +1,470 @@
+# PyAlgoTrade
+#
+# Copyright 2011-2018 Gabriel Martin Becedillas Ruiz
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. moduleauthor:: Gabriel Martin Becedillas Ruiz <gabriel.becedillas@gmail.com>
+"""
+
+import bisect
+import datetime
+
+import numpy as np
+import pytz
+from six.moves import xrange
+
+from pyalgotrade.utils import dt
+
+
+# strptime directives supported by FixedWidthParser, and their widths.
+DIRECTIVE_WIDTHS = {
+    "%Y": 4,
+    "%m": 2,
+    "%d": 2,
+    "%H": 2,
+    "%M": 2,
+    "%S": 2,
+    "%f": 6,
+}
+
+
+# Nanoseconds in a day.
+DAY_NS = 86400 * 1000000000
+
+# Even if the UTC offset changes during a day, local datetimes for that day are at most this far apart in UTC.
+MAX_UTC_DISTANCE_IN_A_DAY = datetime.timedelta(hours=26)
+
+# Used by Localizer for days that were seen only once.
+SEEN_ONCE = object()
+
+
+# Days in each month for non leap years. Index 0 is not used.
+DAYS_IN_MONTH = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+
+def days_from_civil(year, month, day):
+    """Returns the number of days since 1970-01-01 for dates in the proleptic Gregorian calendar. Works on numpy arrays.
+    Check http://howardhinnant.github.io/date_algorithms.html#days_from_civil."""
+    year = year - (month <= 2)
+    era = year // 400
+    yearOfEra = year - era * 400
+    dayOfYear = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    dayOfEra = yearOfEra * 365 + yearOfEra // 4 - yearOfEra // 100 + dayOfYear
+    return era * 146097 + dayOfEra - 719468
+
+
+def compile_format(dateTimeFormat):
+    """Returns a tuple with three elements for a fixed width strptime format:
+
+    1. A dict that maps directives to their offsets.
+    2. A list of (offset, literal) pairs.
+    3. The number of characters in a formatted datetime.
+
+    A ValueError is raised if the format is not supported.
+    """
+    fields = {}
+    literals = []
+
+    offset = 0
+    i = 0
+    while i < len(dateTimeFormat):
+        if dateTimeFormat[i] == "%":
+            directive = dateTimeFormat[i:i+2]
+            if directive not in DIRECTIVE_WIDTHS or directive in fields:
+                raise ValueError("Unsupported datetime format %s" % dateTimeFormat)
+            fields[directive] = offset
+            offset += DIRECTIVE_WIDTHS[directive]
+            i += 2
+        else:
+            literals.append((offset, dateTimeFormat[i]))
+            offset += 1
+            i += 1
+
+    for directive in ["%Y", "%m", "%d"]:
+        if directive not in fields:
+            raise ValueError("Unsupported datetime format %s" % dateTimeFormat)
+    return fields, literals, offset
+
+
+def is_fixed_width(dateTimeFormat):
+    """Returns True if :class:`FixedWidthParser` supports a given strptime format."""
+    try:
+        FixedWidthParser(dateTimeFormat)
+        ret = True
+    except ValueError:
+        ret = False
+    return ret
+
+
+class FixedWidthParser(object):
+    """Parses datetimes formatted with a strptime format where every field has a fixed width, like "%Y-%m-%d %H:%M:%S".
+    Only %Y, %m, %d, %H, %M, %S and %f directives are supported, and %Y, %m and %d are required.
+
+    :param dateTimeFormat: The strptime format.
+    :type dateTimeFormat: string.
+
+    .. note::
+        A ValueError is raised if the format is not supported.
+    """
+
+    def __init__(self, dateTimeFormat):
+        self.__dateTimeFormat = dateTimeFormat
+        self.__fields, self.__literals, self.__width = compile_format(dateTimeFormat)
+
+        self.__literalOffsets = np.array([literalOffset for literalOffset, literal in self.__literals], dtype=np.intp)
+        self.__literalChars = np.array([ord(literal) for literalOffset, literal in self.__literals], dtype=np.uint8)
+        self.__digitOffsets = np.array(
+            sorted(set(xrange(self.__width)) - set(self.__literalOffsets.tolist())), dtype=np.intp
+        )
+
+    def getWidth(self):
+        """Returns the number of characters in a formatted datetime."""
+        return self.__width
+
+    def __invalid(self, values, mask):
+        value = values[np.flatnonzero(mask)[0]]
+        if isinstance(value, bytes):
+            value = value.decode("ascii", "replace")
+        return ValueError("time data %r does not match format %r" % (str(value), self.__dateTimeFormat))
+
+    def parseArray(self, values):
+        """Parses datetimes in bulk.
+
+        :param values: The formatted datetimes.
+        :type values: A numpy.array of bytes (dtype S), or a list of bytes.
+        :rtype: A numpy.array of int64 nanoseconds since the epoch. Datetimes are assumed to be in UTC.
+        """
+        values = np.asarray(values)
+        if len(values) == 0:
+            return np.empty(0, dtype=np.int64)
+        if values.dtype.kind != "S" or values.dtype.itemsize != self.__width:
+            lengths = np.char.str_len(values)
+            if np.all(lengths == self.__width):
+                values = values.astype("S%d" % self.__width)
+            else:
+                raise self.__invalid(values, lengths != self.__width)
+
+        chars = np.frombuffer(values.tobytes(), dtype=np.uint8).reshape(len(values), self.__width)
+
+        invalid = np.any(chars[:, self.__literalOffsets] != self.__literalChars, axis=1)
+        # Characters other than digits wrap around and end up > 9.
+        digits = chars[:, self.__digitOffsets] - np.uint8(ord("0"))
+        invalid |= np.any(digits > 9, axis=1)
+
+        def field(directive):
+            ret = 0
+            offset = self.__fields.get(directive)
+            if offset is not None:
+                # The position in the digits array.
+                offset = int(np.searchsorted(self.__digitOffsets, offset))
+                width = DIRECTIVE_WIDTHS[directive]
+                ret = digits[:, offset:offset + width].astype(np.int64).dot(10 ** np.arange(width - 1, -1, -1))
+            return ret
+
+        year = field("%Y")
+        month = field("%m")
+        day = field("%d")
+        hour = field("%H")
+        minute = field("%M")
+        second = field("%S")
+        microsecond = field("%f")
+
+        invalid |= (month < 1) | (month > 12) | (day < 1) | (hour > 23) | (minute > 59) | (second > 59)
+        if not np.any(invalid):
+            leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+            invalid = day > DAYS_IN_MONTH[month] + (leap & (month == 2))
+        if np.any(invalid):
+            raise self.__invalid(values, invalid)
+
+        return (
+            (days_from_civil(year, month, day) * 86400 + (hour * 60 + minute) * 60 + second) * 1000000000 +
+            microsecond * 1000
+        )
+
+
+class DateTimeParser(object):
+    """Base class for parsers that turn strings into :class:`datetime.datetime` instances, one at a time.
+
+    .. note::
+        This is a base class and should not be used directly. Use :func:`get_parser` instead.
+    """
+
+    def __call__(self, dateString):
+        return self.parse(dateString)
+
+    def parse(self, dateString):
+        """Returns a :class:`datetime.datetime`. A ValueError is raised if dateString can't be parsed."""
+        raise NotImplementedError()
+
+
+class StrptimeParser(DateTimeParser):
+    """A :class:`DateTimeParser` that uses datetime.datetime.strptime."""
+
+    def __init__(self, dateTimeFormat):
+        self.__dateTimeFormat = dateTimeFormat
+
+    def parse(self, dateString):
+        return datetime.datetime.strptime(dateString, self.__dateTimeFormat)
+
+
+class SlicingParser(DateTimeParser):
+    """A :class:`DateTimeParser` for fixed width formats that slices strings and converts fields with int.
+    The date is reused while consecutive strings share it, which is the case for intraday files.
+    Strings that don't have the expected width or literals are parsed with strptime, so the
+    results and the errors are the same as with strptime.
+
+    :param dateTimeFormat: The strptime format. Check :class:`FixedWidthParser` for supported formats.
+    :type dateTimeFormat: string.
+    """
+
+    def __init__(self, dateTimeFormat):
+        self.__dateTimeFormat = dateTimeFormat
+        fields, literals, self.__width = compile_format(dateTimeFormat)
+
+        def get_slice(directive):
+            ret = None
+            offset = fields.get(directive)
+            if offset is not None:
+                ret = slice(offset, offset + DIRECTIVE_WIDTHS[directive])
+            return ret
+
+        self.__year = get_slice("%Y")
+        self.__month = get_slice("%m")
+        self.__day = get_slice("%d")
+        # The slices for hour, minute, second and microsecond, up to the last one available. None for missing ones.
+        self.__time = [get_slice(directive) for directive in ["%H", "%M", "%S", "%f"]]
+        while len(self.__time) and self.__time[-1] is None:
+            self.__time.pop()
+        self.__timeComplete = None not in self.__time
+
+        # The date part spans from the first to the last date field. If time fields are in between, the whole string is
+        # used as the key and the date is not reused.
+        dateSlices = [self.__year, self.__month, self.__day]
+        dateStart = min(dateSlice.start for dateSlice in dateSlices)
+        dateEnd = max(dateSlice.stop for dateSlice in dateSlices)
+        for timeSlice in self.__time:
+            if timeSlice is not None and timeSlice.start < dateEnd and timeSlice.stop > dateStart:
+                dateStart, dateEnd = 0, self.__width
+        self.__dateKey = slice(dateStart, dateEnd)
+        self.__dateLiterals = [(offset, literal) for offset, literal in literals if dateStart <= offset < dateEnd]
+        self.__timeLiterals = [(offset, literal) for offset, literal in literals if not dateStart <= offset < dateEnd]
+
+        self.__lastDateKey = None
+        self.__lastDate = None
+
+    def __parseDate(self, dateString):
+        for offset, literal in self.__dateLiterals:
+            if dateString[offset] != literal:
+                raise ValueError()
+        fields = [dateString[self.__year], dateString[self.__month], dateString[self.__day]]
+        # int is more permissive than strptime (signs, whitespace).
+        if not "".join(fields).isdigit():
+            raise ValueError()
+        year, month, day = [int(field) for field in fields]
+        # Validate the date.
+        datetime.date(year, month, day)
+        return year, month, day
+
+    def parse(self, dateString):
+        if len(dateString) != self.__width:
+            return datetime.datetime.strptime(dateString, self.__dateTimeFormat)
+
+        try:
+            dateKey = dateString[self.__dateKey]
+            if dateKey != self.__lastDateKey:
+                self.__lastDate = self.__parseDate(dateString)
+                self.__lastDateKey = dateKey
+            year, month, day = self.__lastDate
+
+            for offset, literal in self.__timeLiterals:
+                if dateString[offset] != literal:
+                    raise ValueError()
+            if self.__timeComplete:
+                time = [dateString[timeSlice] for timeSlice in self.__time]
+            else:
+                time = ["0" if timeSlice is None else dateString[timeSlice] for timeSlice in self.__time]
+            if len(time) and not "".join(time).isdigit():
+                raise ValueError()
+            return datetime.datetime(year, month, day, *[int(field) for field in time])
+        except ValueError:
+            # Let strptime either parse it or raise the appropriate error.
+            return datetime.datetime.strptime(dateString, self.__dateTimeFormat)
+
+
+def get_parser(dateTimeFormat):
+    """Returns the fastest :class:`DateTimeParser` available for a strptime format.
+
+    :param dateTimeFormat: The strptime format.
+    :type dateTimeFormat: string.
+    """
+    if is_fixed_width(dateTimeFormat):
+        ret = SlicingParser(dateTimeFormat)
+    else:
+        ret = StrptimeParser(dateTimeFormat)
+    return ret
+
+
+class Localizer(object):
+    """Localizes datetimes to a pytz timezone, like :func:`pyalgotrade.utils.dt.localize`, but faster.
+    The UTC offset for each day is calculated the second time the day is seen, and reused for days without DST
+    transitions, so there is no overhead for daily data. Days with DST transitions are found using the transition times
+    in the timezone.
+
+    :param timezone: The timezone.
+    :type timezone: A pytz timezone.
+    """
+
+    def __init__(self, timezone):
+        self.__timezone = timezone
+        # Sorted naive UTC datetimes where the UTC offset changes. Timezones without them, like UTC, have a fixed
+        # offset.
+        self.__transitions = getattr(timezone, "_utc_transition_times", [])
+        # Date -> tzinfo for naive datetimes, None if the day has a DST transition, or SEEN_ONCE.
+        self.__localTzInfos = {}
+        # UTC date -> (UTC offset, tzinfo), None if the day has a DST transition, or SEEN_ONCE.
+        self.__utcOffsets = {}
+
+    def getTimezone(self):
+        return self.__timezone
+
+    # Returns True if the UTC offset changes between two naive UTC datetimes.
+    def __hasTransition(self, utcBegin, utcEnd):
+        pos = bisect.bisect_right(self.__transitions, utcBegin)
+        return pos < len(self.__transitions) and self.__transitions[pos] < utcEnd
+
+    # Sets the tzinfo for a date, given a datetime in that date localized to the timezone, and returns it.
+    def __setLocalTzInfo(self, date, localized):
+        utc = localized.replace(tzinfo=None) - localized.utcoffset()
+        ret = localized.tzinfo
+        if self.__hasTransition(utc - MAX_UTC_DISTANCE_IN_A_DAY, utc + MAX_UTC_DISTANCE_IN_A_DAY):
+            ret = None
+        self.__localTzInfos[date] = ret
+        return ret
+
+    def __getLocalTzInfo(self, date):
+        ret = self.__localTzInfos.get(date, SEEN_ONCE)
+        if ret is SEEN_ONCE:
+            noon = self.__timezone.localize(datetime.datetime.combine(date, datetime.time(12)))
+            ret = self.__setLocalTzInfo(date, noon)
+        return ret
+
+    # Sets the UTC offset and tzinfo for a UTC date, given a datetime in that date converted to the timezone, and
+    # returns them.
+    def __setUTCOffset(self, date, converted):
+        ret = (converted.utcoffset(), converted.tzinfo)
+        dayStart = datetime.datetime.combine(date, datetime.time.min)
+        if self.__hasTransition(dayStart, dayStart + datetime.timedelta(days=1)):
+            ret = None
+        self.__utcOffsets[date] = ret
+        return ret
+
+    def __getUTCOffset(self, date):
+        ret = self.__utcOffsets.get(date, SEEN_ONCE)
+        if ret is SEEN_ONCE:
+            noon = datetime.datetime.combine(date, datetime.time(12))
+            ret = self.__setUTCOffset(date, pytz.utc.localize(noon).astimezone(self.__timezone))
+        return ret
+
+    def localize(self, dateTime):
+        """Returns a datetime adjusted to the timezone. Check :func:`pyalgotrade.utils.dt.localize`."""
+        if dateTime.tzinfo is not None:
+            return self.fromUTC(dateTime.astimezone(pytz.utc).replace(tzinfo=None))
+
+        date = dateTime.date()
+        tzInfo = self.__localTzInfos.get(date)
+        if tzInfo is not None and tzInfo is not SEEN_ONCE:
+            return dateTime.replace(tzinfo=tzInfo)
+
+        ret = self.__timezone.localize(dateTime)
+        if tzInfo is SEEN_ONCE:
+            self.__setLocalTzInfo(date, ret)
+        elif date not in self.__localTzInfos:
+            self.__localTzInfos[date] = SEEN_ONCE
+        return ret
+
+    def fromUTC(self, dateTime):
+        """Returns a naive UTC datetime converted to the timezone."""
+        date = dateTime.date()
+        utcOffset = self.__utcOffsets.get(date)
+        if utcOffset is not None and utcOffset is not SEEN_ONCE:
+            return (dateTime + utcOffset[0]).replace(tzinfo=utcOffset[1])
+
+        ret = pytz.utc.localize(dateTime).astimezone(self.__timezone)
+        if utcOffset is SEEN_ONCE:
+            self.__setUTCOffset(date, ret)
+        elif date not in self.__utcOffsets:
+            self.__utcOffsets[date] = SEEN_ONCE
+        return ret
+
+    def localizeTimestamps(self, timestamps):
+        """Converts naive datetimes, as int64 nanoseconds since the epoch, to UTC. Check :meth:`localize`.
+
+        :param timestamps: The naive datetimes.
+        :type timestamps: numpy.array.
+        :rtype: A numpy.array with int64 nanoseconds since the epoch (UTC).
+        """
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        days, dayPositions = np.unique(timestamps // DAY_NS, return_inverse=True)
+        # The UTC offset for each day, in nanoseconds, or 0 for days with a DST transition.
+        offsets = np.zeros(len(days), dtype=np.int64)
+        transitionDays = []
+        for i, day in enumerate(days):
+            date = dt.epoch_ns_to_datetime(day * DAY_NS).date()
+            tzInfo = self.__getLocalTzInfo(date)
+            if tzInfo is not None:
+                utcOffset = datetime.datetime.combine(date, datetime.time.min).replace(tzinfo=tzInfo).utcoffset()
+                offsets[i] = int(utcOffset.total_seconds()) * 1000000000
+            else:
+                transitionDays.append(i)
+        ret = timestamps - offsets[dayPositions]
+
+        # Days with a DST transition are localized one by one.
+        if len(transitionDays):
+            positions = np.flatnonzero(np.isin(dayPositions, transitionDays))
+            ret[positions] = [
+                dt.datetime_to_epoch_ns(self.__timezone.localize(dt.epoch_ns_to_datetime(timestamp)))
+                for timestamp in timestamps[positions]
+            ]
+        return ret
+
+    def toLocalTimestamps(self, timestamps):
+        """Converts UTC datetimes, as int64 nanoseconds since the epoch, to naive datetimes in the timezone.
+        Check :meth:`fromUTC`.
+
+        :param timestamps: The UTC datetimes.
+        :type timestamps: numpy.array.
+        :rtype: A numpy.array with the naive datetimes, as int64 nanoseconds since the epoch.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        days, dayPositions = np.unique(timestamps // DAY_NS, return_inverse=True)
+        # The UTC offset for each day, in nanoseconds, or 0 for days with a DST transition.
+        offsets = np.zeros(len(days), dtype=np.int64)
+        transitionDays = []
+        for i, day in enumerate(days):
+            utcOffset = self.__getUTCOffset(dt.epoch_ns_to_datetime(day * DAY_NS).date())
+            if utcOffset is not None:
+                offsets[i] = int(utcOffset[0].total_seconds()) * 1000000000
+            else:
+                transitionDays.append(i)
+        ret = timestamps + offsets[dayPositions]
+
+        # Days with a DST transition are converted one by one.
+        if len(transitionDays):
+            positions = np.flatnonzero(np.isin(dayPositions, transitionDays))
+            ret[positions] = [
+                dt.datetime_to_epoch_ns(self.fromUTC(dt.epoch_ns_to_datetime(timestamp)).replace(tzinfo=None))
+                for timestamp in timestamps[positions]
+            ]
+        return ret
@@ -0,0 +1,90 @@
+# PyAlgoTrade
+#
+# Copyright 2011-2018 Gabriel Martin Becedillas Ruiz
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. moduleauthor:: Gabriel Martin Becedillas Ruiz <gabriel.becedillas@gmail.com>
+"""
+
+import bz2
+import gzip
+import io
+
+import six
+
+
+# The number of bytes to decompress at once.
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+
+def open_gzip(path):
+    return gzip.GzipFile(path, "rb")
+
+
+def open_bz2(path):
+    return bz2.BZ2File(path, "rb")
+
+
+def open_xz(path):
+    # lzma is not available in Python 2.
+    import lzma
+    return lzma.LZMAFile(path, "rb")
+
+
+# File extension -> function that opens the file for binary reading, decompressing it on the fly.
+DECOMPRESSORS = {
+    ".gz": open_gzip,
+    ".bz2": open_bz2,
+    ".xz": open_xz,
+}
+
+
+def is_compressed(path):
+    """Returns True if the file will be decompressed by :func:`open_file`, based on its extension."""
+    return get_decompressor(path) is not None
+
+
+def get_decompressor(path):
+    ret = None
+    for extension, decompressor in six.iteritems(DECOMPRESSORS):
+        if path.lower().endswith(extension):
+            ret = decompressor
+    return ret
+
+
+def open_file(path, mode="r", bufferSize=DEFAULT_BUFFER_SIZE):
+    """Opens a file for reading. Files with .gz, .bz2 or .xz extensions are decompressed on the fly, reading
+    bufferSize bytes at a time, so no decompressed copy is written to disk.
+
+    :param path: The path to the file.
+    :type path: string.
+    :param mode: "r" for text or "rb" for binary.
+    :type mode: string.
+    :param bufferSize: The number of bytes to decompress at once, for compressed files. Ignored in Python 2.
+    :type bufferSize: int.
+    """
+    assert mode in ["r", "rb"], "Invalid mode %s" % mode
+
+    decompressor = get_decompressor(path)
+    if decompressor is None:
+        return open(path, mode)
+
+    ret = decompressor(path)
+    # Python 2 decompressors return byte strings, which is what csv readers expect there.
+    if six.PY3:
+        ret = io.BufferedReader(ret, buffer_size=bufferSize)
+        if mode == "r":
+            ret = io.TextIOWrapper(ret)
+    return ret
@@ -0,0 +1,172 @@
+# PyAlgoTrade
+#
+# Copyright 2011-2018 Gabriel Martin Becedillas Ruiz
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. moduleauthor:: Gabriel Martin Becedillas Ruiz <gabriel.becedillas@gmail.com>
+"""
+
+import timeit
+
+import six
+
+from pyalgotrade import observer
+
+
+def get_callable_name(func):
+    """Returns a name like ClassName.methodName for a bound method, or the function name otherwise."""
+    self_ = getattr(func, "__self__", None)
+    name = getattr(func, "__name__", type(func).__name__)
+    if self_ is not None:
+        name = "%s.%s" % (type(self_).__name__, name)
+    return name
+
+
+class Profiler(object):
+    """Measures the cumulative wall time and the number of calls for the phases of a run.
+
+    Phases are methods instrumented with :meth:`instrument`, and the handlers for every
+    :class:`pyalgotrade.observer.Event`, named after their class and method, like **SMA.__onNewValue**. Phases with the
+    same name, like the handlers for many indicators of the same class, are measured together.
+
+    .. note::
+        * Times are inclusive, so the time for a phase includes the time for the phases it calls. For example, the time
+          for the bar feed event handler in the strategy includes the time for **onBars**.
+        * Only one profiler can be started at a time.
+    """
+
+    # The Profiler that is started, if any.
+    __active = None
+
+    def __init__(self):
+        # Maps phase names to [calls, seconds].
+        self.__phases = {}
+        self.__handlerNames = {}
+        # (object, method name) for the instrumented methods.
+        self.__instrumented = []
+        self.__emit = None
+        self.__begin = None
+        self.__elapsed = 0
+
+    def addCall(self, phase, seconds):
+        stats = self.__phases.get(phase)
+        if stats is None:
+            stats = [0, 0]
+            self.__phases[phase] = stats
+        stats[0] += 1
+        stats[1] += seconds
+
+    def wrap(self, phase, func):
+        """Returns a callable that measures calls to func as a phase."""
+        def wrapper(*args, **kwargs):
+            begin = timeit.default_timer()
+            ret = func(*args, **kwargs)
+            self.addCall(phase, timeit.default_timer() - begin)
+            return ret
+        return wrapper
+
+    def instrument(self, obj, methodName, phase=None):
+        """Measures calls to a method of an object, until the profiler is stopped.
+
+        :param obj: The object.
+        :param methodName: The name of the method.
+        :type methodName: string.
+        :param phase: The name for the phase. If None, the class and method names are used.
+        :type phase: string.
+
+        .. note::
+            Only calls made through the object attribute get measured. Bound methods obtained before this call, like
+            the ones subscribed to events, are not affected.
+        """
+        method = getattr(obj, methodName)
+        if phase is None:
+            phase = get_callable_name(method)
+        setattr(obj, methodName, self.wrap(phase, method))
+        self.__instrumented.append((obj, methodName))
+
+    def __getHandlerName(self, handler):
+        ret = self.__handlerNames.get(handler)
+        if ret is None:
+            ret = get_callable_name(handler)
+            self.__handlerNames[handler] = ret
+        return ret
+
+    def __profiledEmit(self, event, *args, **kwargs):
+        for handler in event.getHandlers():
+            begin = timeit.default_timer()
+            handler(*args, **kwargs)
+            self.addCall(self.__getHandlerName(handler), timeit.default_timer() - begin)
+
+    def start(self):
+        """Starts measuring event handlers and wall time."""
+        if Profiler.__active is not None:
+            raise Exception("Another profiler was already started")
+        Profiler.__active = self
+
+        # Event.emit gets replaced only while profiling, so there is no cost when the profiler is not in use.
+        self.__emit = observer.Event.__dict__["emit"]
+        profiledEmit = self.__profiledEmit
+        observer.Event.emit = lambda event, *args, **kwargs: profiledEmit(event, *args, **kwargs)
+        self.__begin = timeit.default_timer()
+
+    def stop(self):
+        """Stops measuring and removes all the instrumentation."""
+        if Profiler.__active is not self:
+            raise Exception("The profiler was not started")
+        self.__elapsed += timeit.default_timer() - self.__begin
+        observer.Event.emit = self.__emit
+        Profiler.__active = None
+
+        # Removing the instance attributes makes the class methods visible again.
+        for obj, methodName in reversed(self.__instrumented):
+            delattr(obj, methodName)
+        self.__instrumented = []
+
+    def getElapsed(self):
+        """Returns the wall time, in seconds, between :meth:`start` and :meth:`stop`."""
+        return self.__elapsed
+
+    def getCalls(self, phase):
+        """Returns the number of calls for a phase."""
+        return self.__phases.get(phase, [0, 0])[0]
+
+    def getTime(self, phase):
+        """Returns the cumulative wall time, in seconds, for a phase."""
+        return self.__phases.get(phase, [0, 0])[1]
+
+    def getPhases(self):
+        """Returns a list of (phase, calls, seconds) tuples, sorted by time in descending order."""
+        ret = [(phase, calls, seconds) for phase, (calls, seconds) in six.iteritems(self.__phases)]
+        return sorted(ret, key=lambda stats: (-stats[2], stats[0]))
+
+    def getReport(self, eventsPhase=None):
+        """Returns a table with the calls and the time for each phase.
+
+        :param eventsPhase: The phase that gets called once per event, used to calculate the events per second.
+        :type eventsPhase: string.
+        :rtype: string.
+        """
+        elapsed = self.getElapsed()
+        if eventsPhase is not None:
+            events = self.getCalls(eventsPhase)
+            lines = ["%d events in %.3f seconds (%.0f events/s)" % (events, elapsed, events / max(elapsed, 1e-9))]
+        else:
+            lines = ["%.3f seconds" % elapsed]
+        lines.append("%12s %10s %12s %7s  %s" % ("calls", "seconds", "us/call", "%", "phase"))
+        for phase, calls, seconds in self.getPhases():
+            lines.append("%12d %10.3f %12.3f %6.1f%%  %s" % (
+                calls, seconds, seconds * 1e6 / calls, seconds * 100 / max(elapsed, 1e-9), phase
+            ))
+        return "\n".join(lines)
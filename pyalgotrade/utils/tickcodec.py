@@ -0,0 +1,215 @@
+# PyAlgoTrade
+#
+# Copyright 2011-2018 Gabriel Martin Becedillas Ruiz
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. moduleauthor:: Gabriel Martin Becedillas Ruiz <gabriel.becedillas@gmail.com>
+"""
+
+import struct
+
+import numpy as np
+
+
+# Compact encoding for bid/ask ticks. Encoded ticks look like this:
+# - MAGIC
+# - A header with the number of ticks, the price scale, the time unit and the length of each stream, packed
+#   using HEADER_FORMAT.
+# - The timestamp stream: the differences between consecutive timestamps, in time units.
+# - The bid stream: the differences between consecutive bids, in pips.
+# - The spread stream: ask - bid, in pips.
+# Streams hold zigzag encoded varints, and the first value in a stream is a difference from 0.
+# Prices are stored as integer pips, where a pip is 1 / scale, and decoded by dividing by scale, so decoded prices are
+# exactly the same as the encoded ones.
+MAGIC = b"PATTICK1"
+HEADER_FORMAT = "<QqqQQQ"
+# The maximum number of decimal places checked when guessing the pip size.
+MAX_DECIMALS = 9
+
+
+def zigzag_encode(values):
+    """Maps int64 values to uint64 values so that numbers close to 0 are small: 0, -1, 1, -2, 2 map to 0, 1, 2, 3, 4."""
+    values = np.asarray(values, dtype=np.int64)
+    return ((values << 1) ^ (values >> 63)).view(np.uint64)
+
+
+def zigzag_decode(values):
+    values = np.asarray(values, dtype=np.uint64)
+    return (values >> np.uint64(1)).view(np.int64) ^ -(values & np.uint64(1)).view(np.int64)
+
+
+def varint_encode(values):
+    """Encodes uint64 values as varints (LEB128), 7 bits per byte, and returns the bytes."""
+    values = np.asarray(values, dtype=np.uint64)
+    sizes = np.ones(len(values), dtype=np.int64)
+    for bits in range(7, 64, 7):
+        sizes += values >= np.uint64(1 << bits)
+    starts = np.cumsum(sizes) - sizes
+    ret = np.zeros(int(sizes.sum()), dtype=np.uint8)
+    for i in range(int(sizes.max()) if len(sizes) else 0):
+        selected = np.flatnonzero(sizes > i)
+        encoded = (values[selected] >> np.uint64(7 * i)) & np.uint64(0x7f)
+        # The high bit is set for every byte but the last one.
+        encoded |= np.where(sizes[selected] > i + 1, 0x80, 0).astype(np.uint64)
+        ret[starts[selected] + i] = encoded
+    return ret.tobytes()
+
+
+def varint_decode(data, count):
+    """Decodes count varints from bytes, and returns them as a numpy array of uint64 values.
+
+    .. note::
+        A ValueError is raised if data doesn't hold exactly count varints.
+    """
+    data = np.frombuffer(data, dtype=np.uint8)
+    isLast = data < 0x80
+    ends = np.flatnonzero(isLast)
+    if len(ends) != count or (len(data) and not isLast[-1]):
+        raise ValueError("Invalid varint stream")
+    if count == 0:
+        return np.zeros(0, dtype=np.uint64)
+
+    starts = np.empty(count, dtype=np.int64)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    if np.any(ends - starts > 9):
+        raise ValueError("Invalid varint stream")
+    # The position of each byte in its varint.
+    positions = np.arange(len(data), dtype=np.int64) - np.repeat(starts, ends - starts + 1)
+    shifted = (data & 0x7f).astype(np.uint64) << (positions * 7).astype(np.uint64)
+    return np.add.reduceat(shifted, starts)
+
+
+def guess_pip_size(prices):
+    """Returns the largest pip size, 1 / 10 ** decimals, that all prices are a multiple of. A ValueError is raised if
+    there is none with up to MAX_DECIMALS decimals."""
+    prices = np.asarray(prices, dtype=np.float64)
+    for decimals in range(MAX_DECIMALS + 1):
+        scale = 10 ** decimals
+        if np.array_equal(np.round(prices * scale) / scale, prices):
+            return 1.0 / scale
+    raise ValueError("Prices have more than %d decimals" % MAX_DECIMALS)
+
+
+# Returns the differences between consecutive values. The first one is the difference from 0.
+def _deltas(values):
+    ret = np.empty(len(values), dtype=np.int64)
+    if len(values):
+        ret[0] = values[0]
+        ret[1:] = np.diff(values)
+    return ret
+
+
+def _to_pips(prices, scale):
+    ret = np.round(prices * scale)
+    if not np.array_equal(ret / scale, prices):
+        raise ValueError("Prices are not a multiple of the pip size")
+    return ret.astype(np.int64)
+
+
+def encode_ticks(timestamps, bids, asks, pipSize=None):
+    """Encodes ticks.
+
+    :param timestamps: The datetimes, as int64 nanoseconds since the epoch.
+    :type timestamps: numpy.array.
+    :param bids: The bid prices.
+    :type bids: numpy.array.
+    :param asks: The ask prices.
+    :type asks: numpy.array.
+    :param pipSize: The smallest price increment, like 0.00001. It should be 1 / 10 ** decimals. If None, it is
+        guessed from the prices.
+    :type pipSize: float.
+    :rtype: bytes.
+
+    .. note::
+        Encoding is lossless. A ValueError is raised if prices are not a multiple of the pip size.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    bids = np.asarray(bids, dtype=np.float64)
+    asks = np.asarray(asks, dtype=np.float64)
+    assert(len(timestamps) == len(bids) == len(asks))
+
+    if pipSize is None:
+        pipSize = guess_pip_size(np.concatenate([bids, asks]))
+    scale = int(round(1 / pipSize))
+    bidPips = _to_pips(bids, scale)
+    askPips = _to_pips(asks, scale)
+
+    timeDeltas = _deltas(timestamps)
+    # Timestamps usually have a coarser resolution than nanoseconds, so deltas are stored in the largest unit that
+    # divides all of them.
+    timeUnit = int(np.gcd.reduce(timeDeltas)) if len(timeDeltas) else 1
+    timeUnit = max(abs(timeUnit), 1)
+
+    streams = [
+        varint_encode(zigzag_encode(timeDeltas // timeUnit)),
+        varint_encode(zigzag_encode(_deltas(bidPips))),
+        varint_encode(zigzag_encode(askPips - bidPips)),
+    ]
+    header = struct.pack(HEADER_FORMAT, len(timestamps), scale, timeUnit, *[len(stream) for stream in streams])
+    return b"".join([MAGIC, header] + streams)
+
+
+def is_encoded(data):
+    """Returns True if data starts like ticks encoded with :func:`encode_ticks`."""
+    return data[:len(MAGIC)] == MAGIC
+
+
+def decode_ticks(data):
+    """Decodes ticks encoded with :func:`encode_ticks`.
+
+    :param data: The encoded ticks.
+    :type data: bytes.
+    :rtype: A (timestamps, bids, asks) tuple of numpy arrays.
+
+    .. note::
+        A ValueError is raised if data is not valid.
+    """
+    if not is_encoded(data):
+        raise ValueError("Ticks are not encoded")
+    offset = len(MAGIC)
+    headerSize = struct.calcsize(HEADER_FORMAT)
+    if len(data) < offset + headerSize:
+        raise ValueError("Invalid header")
+    count, scale, timeUnit, timesLen, bidsLen, spreadsLen = struct.unpack(
+        HEADER_FORMAT, data[offset:offset + headerSize]
+    )
+    offset += headerSize
+    if len(data) != offset + timesLen + bidsLen + spreadsLen:
+        raise ValueError("Invalid stream lengths")
+
+    streams = []
+    for length in [timesLen, bidsLen, spreadsLen]:
+        streams.append(zigzag_decode(varint_decode(data[offset:offset + length], count)))
+        offset += length
+    timeDeltas, bidDeltas, spreads = streams
+
+    timestamps = np.cumsum(timeDeltas) * timeUnit
+    bidPips = np.cumsum(bidDeltas)
+    bids = bidPips / float(scale)
+    asks = (bidPips + spreads) / float(scale)
+    return timestamps, bids, asks
+
+
+def write_ticks(path, timestamps, bids, asks, pipSize=None):
+    """Encodes ticks with :func:`encode_ticks` and writes them to a file."""
+    with open(path, "wb") as f:
+        f.write(encode_ticks(timestamps, bids, asks, pipSize))
+
+
+def read_ticks(path):
+    """Reads ticks written with :func:`write_ticks`, and returns a (timestamps, bids, asks) tuple of numpy arrays."""
+    with open(path, "rb") as f:
+        return decode_ticks(f.read())
@@ -19,11 +19,22 @@
 """
 
 import datetime
+import os
+import shutil
 
 from . import common
 
 from pyalgotrade import barfeed
 from pyalgotrade.barfeed import common as bfcommon
+from pyalgotrade.barfeed import csvfeed
+from pyalgotrade.barfeed import googlefeed
+from pyalgotrade.barfeed import membf
+from pyalgotrade.barfeed import ninjatraderfeed
+from pyalgotrade.barfeed import quandlfeed
+from pyalgotrade.barfeed import yahoofeed
+from pyalgotrade import marketsession
+from pyalgotrade.utils import arraycache
+from pyalgotrade.utils import dt
 from pyalgotrade import bar
 from pyalgotrade import dispatcher
 
@@ -81,6 +92,437 @@ class OptimizerBarFeedTestCase(common.TestCase):
         self.assertEquals(barFeed.barsHaveAdjClose(), False)
 
 
+class TestMemBarFeed(membf.BarFeed):
+    def barsHaveAdjClose(self):
+        return True
+
+
+class MemBarFeedTestCase(common.TestCase):
+    def __buildBars(self, dateTimes):
+        return [bar.BasicBar(dateTime, 1, 1, 1, 1, 1, 1, bar.Frequency.DAY) for dateTime in dateTimes]
+
+    def testMerge(self):
+        barFeed = TestMemBarFeed(bar.Frequency.DAY)
+        day = lambda i: datetime.datetime(2001, 1, i)
+        barFeed.addBarsFromSequence("a", self.__buildBars([day(1), day(3), day(4)]))
+        barFeed.addBarsFromSequence("b", self.__buildBars([day(2), day(3)]))
+        barFeed.addBarsFromSequence("c", self.__buildBars([day(5), day(3)]))
+        barFeed.addBarsFromSequence("b", self.__buildBars([day(1)]))
+
+        for i in range(2):
+            barFeed.start()
+            events = []
+            self.assertEqual(barFeed.peekDateTime(), day(1))
+            while not barFeed.eof():
+                bars = barFeed.getNextBars()
+                events.append((bars.getDateTime(), sorted(bars.getInstruments())))
+            self.assertEqual(barFeed.peekDateTime(), None)
+            self.assertEqual(barFeed.getNextBars(), None)
+            self.assertEqual(events, [
+                (day(1), ["a", "b"]),
+                (day(2), ["b"]),
+                (day(3), ["a", "b", "c"]),
+                (day(4), ["a"]),
+                (day(5), ["c"]),
+            ])
+            barFeed.reset()
+
+    def testDuplicateBars(self):
+        barFeed = TestMemBarFeed(bar.Frequency.DAY)
+        barFeed.addBarsFromSequence("a", self.__buildBars([datetime.datetime(2001, 1, 1), datetime.datetime(2001, 1, 1)]))
+        with self.assertRaisesRegexp(Exception, "Duplicate bars found for.*"):
+            barFeed.loadAll()
+
+
+def bar_values(barFeed, instrument):
+    return [
+        (b.getDateTime(), b.getOpen(), b.getHigh(), b.getLow(), b.getClose(), b.getVolume(), b.getAdjClose(),
+            b.getFrequency(), b.getExtraColumns())
+        for b in barFeed[instrument]
+    ]
+
+
+class GenericBarFeedCacheTestCase(common.TestCase):
+    def __buildFeed(self, cache, timezone=None):
+        ret = csvfeed.GenericBarFeed(bar.Frequency.DAY, timezone)
+        ret.setColumnName("datetime", "Date")
+        ret.setDateTimeFormat("%Y-%m-%d")
+        ret.setCache(cache)
+        return ret
+
+    def testCachedBarsAreTheSame(self):
+        with common.TmpDir() as tmpPath:
+            cache = arraycache.ArrayCache(tmpPath)
+            for timezone in [None, marketsession.USEquities.getTimezone()]:
+                expected = self.__buildFeed(None, timezone)
+                expected.addBarsFromCSV("orcl", common.get_data_file_path("orcl-2000-yahoofinance.csv"))
+                expected.loadAll()
+
+                # The first time the file gets parsed and cached, and the second time the cache is used.
+                for i in range(2):
+                    barFeed = self.__buildFeed(cache, timezone)
+                    barFeed.addBarsFromCSV("orcl", common.get_data_file_path("orcl-2000-yahoofinance.csv"))
+                    barFeed.loadAll()
+                    self.assertTrue(barFeed.barsHaveAdjClose())
+                    self.assertEqual(bar_values(barFeed, "orcl"), bar_values(expected, "orcl"))
+                    self.assertEqual(len(barFeed["orcl"]), 252)
+            self.assertEqual(len(os.listdir(tmpPath)), 2)
+
+    def testCacheGetsUsed(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "orcl.csv")
+            shutil.copy(common.get_data_file_path("orcl-2000-yahoofinance.csv"), path)
+            cache = arraycache.ArrayCache()
+            barFeed = self.__buildFeed(cache)
+            barFeed.addBarsFromCSV("orcl", path)
+
+            # Replace the cached bars.
+            cachePath = [fileName for fileName in os.listdir(tmpPath) if fileName.endswith(".cache")]
+            self.assertEqual(len(cachePath), 1)
+            cachePath = os.path.join(tmpPath, cachePath[0])
+            columns = arraycache.read_columns(cachePath)
+            columns = [(name, values[:10].copy()) for name, values in csvfeed.bar_arrays_to_columns(
+                csvfeed.columns_to_bar_arrays(columns, bar.Frequency.DAY, None)
+            )]
+            arraycache.write_columns(cachePath, columns)
+
+            barFeed = self.__buildFeed(cache)
+            barFeed.addBarsFromCSV("orcl", path)
+            barFeed.loadAll()
+            self.assertEqual(len(barFeed["orcl"]), 10)
+
+    def testExtraColumns(self):
+        with common.TmpDir() as tmpPath:
+            cache = arraycache.ArrayCache(tmpPath)
+            path = os.path.join(tmpPath, "bars.csv")
+            with open(path, "w") as f:
+                f.write("Date,Open,High,Low,Close,Volume,Adj Close,Numeric\n")
+                f.write("2000-01-03,10,12,9,11,1000,,1.5\n")
+                f.write("2000-01-04,11,13,10,12,1000,,2.5\n")
+
+            for i in range(2):
+                barFeed = self.__buildFeed(cache)
+                barFeed.addBarsFromCSV("a", path)
+                barFeed.loadAll()
+                self.assertFalse(barFeed.barsHaveAdjClose())
+                self.assertEqual(barFeed["a"][-1].getAdjClose(), None)
+                self.assertEqual([b.getExtraColumns() for b in barFeed["a"]], [{"Numeric": 1.5}, {"Numeric": 2.5}])
+            self.assertEqual(len([fileName for fileName in os.listdir(tmpPath) if fileName.endswith(".cache")]), 1)
+
+            # Bars with non numeric extra columns are not cached.
+            path = os.path.join(tmpPath, "strings.csv")
+            with open(path, "w") as f:
+                f.write("Date,Open,High,Low,Close,Volume,Adj Close,Text\n")
+                f.write("2000-01-03,10,12,9,11,1000,,abc\n")
+            barFeed = self.__buildFeed(cache)
+            barFeed.addBarsFromCSV("a", path)
+            barFeed.loadAll()
+            self.assertEqual(barFeed["a"][-1].getExtraColumns(), {"Text": "abc"})
+            self.assertEqual(len([fileName for fileName in os.listdir(tmpPath) if fileName.endswith(".cache")]), 1)
+
+    def testBarFilterDisablesCache(self):
+        with common.TmpDir() as tmpPath:
+            cache = arraycache.ArrayCache(tmpPath)
+            barFeed = self.__buildFeed(cache)
+            barFeed.setBarFilter(csvfeed.DateRangeFilter(datetime.datetime(2000, 12, 1)))
+            barFeed.addBarsFromCSV("orcl", common.get_data_file_path("orcl-2000-yahoofinance.csv"))
+            barFeed.loadAll()
+            self.assertEqual(len(barFeed["orcl"]), 20)
+            self.assertEqual(os.listdir(tmpPath), [])
+
+
+class RowParserCacheTestCase(common.TestCase):
+    # (feed class, constructor args, file name) for the feeds that parse files with a row parser.
+    FEEDS = [
+        (yahoofeed.Feed, [], "orcl-2000-yahoofinance.csv"),
+        (googlefeed.Feed, [], "orcl-2010-googlefinance.csv"),
+        (ninjatraderfeed.Feed, [bar.Frequency.MINUTE], "nt-spy-minute-2011-03.csv"),
+        (quandlfeed.Feed, [], "WIKI-ORCL-2000-quandl.csv"),
+    ]
+
+    def __loadBars(self, feedClass, args, path, cache, timezone=None):
+        barFeed = feedClass(*args, timezone=timezone)
+        barFeed.setCache(cache)
+        barFeed.addBarsFromCSV("orcl", path)
+        barFeed.loadAll()
+        return barFeed
+
+    def testCachedBarsAreTheSame(self):
+        with common.TmpDir() as tmpPath:
+            # One cache for every feed.
+            cache = arraycache.ArrayCache(tmpPath)
+            for feedClass, args, fileName in RowParserCacheTestCase.FEEDS:
+                path = common.get_data_file_path(fileName)
+                for timezone in [None, marketsession.USEquities.getTimezone()]:
+                    expected = self.__loadBars(feedClass, args, path, None, timezone)
+                    # The first time the file gets parsed and cached, and the second time the cache is used.
+                    for i in range(2):
+                        barFeed = self.__loadBars(feedClass, args, path, cache, timezone)
+                        self.assertEqual(barFeed.barsHaveAdjClose(), expected.barsHaveAdjClose())
+                        self.assertEqual(bar_values(barFeed, "orcl"), bar_values(expected, "orcl"))
+                        self.assertTrue(len(barFeed["orcl"]) > 0)
+            self.assertEqual(len(os.listdir(tmpPath)), len(RowParserCacheTestCase.FEEDS) * 2)
+
+    def testCacheGetsUsed(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "orcl.csv")
+            shutil.copy(common.get_data_file_path("orcl-2000-yahoofinance.csv"), path)
+            cache = arraycache.ArrayCache(os.path.join(tmpPath, "cache"))
+            self.__loadBars(yahoofeed.Feed, [], path, cache)
+
+            # Replace the cached bars.
+            cachePath = os.path.join(tmpPath, "cache", os.listdir(os.path.join(tmpPath, "cache"))[0])
+            columns = arraycache.read_columns(cachePath)
+            arraycache.write_columns(cachePath, [
+                (name, values[:10].copy()) for name, values in csvfeed.bar_arrays_to_columns(
+                    csvfeed.columns_to_bar_arrays(columns, bar.Frequency.DAY, None)
+                )
+            ])
+            self.assertEqual(len(self.__loadBars(yahoofeed.Feed, [], path, cache)["orcl"]), 10)
+
+            # Other settings get cached separately.
+            barFeed = yahoofeed.Feed()
+            barFeed.setCache(cache)
+            barFeed.setDailyBarTime(datetime.time(16))
+            barFeed.addBarsFromCSV("orcl", path)
+            barFeed.loadAll()
+            self.assertEqual(len(barFeed["orcl"]), 252)
+            self.assertEqual(barFeed["orcl"][0].getDateTime(), datetime.datetime(2000, 1, 3, 16))
+            self.assertEqual(len(os.listdir(os.path.join(tmpPath, "cache"))), 2)
+
+    def testCustomBarClassIsNotCached(self):
+        class CustomBar(bar.BasicBar):
+            pass
+
+        with common.TmpDir() as tmpPath:
+            cache = arraycache.ArrayCache(tmpPath)
+            for i in range(2):
+                barFeed = yahoofeed.Feed()
+                barFeed.setCache(cache)
+                barFeed.setBarClass(CustomBar)
+                barFeed.addBarsFromCSV("orcl", common.get_data_file_path("orcl-2000-yahoofinance.csv"))
+                barFeed.loadAll()
+                self.assertTrue(isinstance(barFeed["orcl"][0], CustomBar))
+            self.assertEqual(os.listdir(tmpPath), [])
+
+    def testBarFilterDisablesCache(self):
+        with common.TmpDir() as tmpPath:
+            cache = arraycache.ArrayCache(tmpPath)
+            barFeed = googlefeed.Feed()
+            barFeed.setCache(cache)
+            barFeed.setBarFilter(csvfeed.DateRangeFilter(datetime.datetime(2010, 12, 1)))
+            barFeed.addBarsFromCSV("orcl", common.get_data_file_path("orcl-2010-googlefinance.csv"))
+            barFeed.loadAll()
+            self.assertTrue(len(barFeed["orcl"]) < 30)
+            self.assertEqual(os.listdir(tmpPath), [])
+
+
+class GenericBarFeedBulkLoadTestCase(common.TestCase):
+    def __writeBars(self, path, startDateTime, count, extra=""):
+        with open(path, "w") as f:
+            f.write("Date Time,Open,High,Low,Close,Volume,Adj Close%s\n" % extra)
+            dateTime = startDateTime
+            for i in range(count):
+                adjClose = "" if i % 3 else str(i + 0.25)
+                f.write("%s,%s,%s,%s,%s,%s,%s%s\n" % (
+                    dateTime.strftime("%Y-%m-%d %H:%M:%S"), i, i + 2, i - 1, i + 1, i * 10, adjClose,
+                    ",%s" % (i / 2.0) if extra else ""
+                ))
+                dateTime += datetime.timedelta(minutes=7)
+
+    def __rowByRow(self, path, timezone=None, dailyBarTime=None):
+        columnNames = {
+            "datetime": "Date Time", "open": "Open", "high": "High", "low": "Low", "close": "Close",
+            "volume": "Volume", "adj_close": "Adj Close",
+        }
+        rowParser = csvfeed.GenericRowParser(
+            columnNames, "%Y-%m-%d %H:%M:%S", dailyBarTime, bar.Frequency.MINUTE, timezone
+        )
+        return list(csvfeed.read_bars(path, rowParser))
+
+    def __assertSameBars(self, barArrays, bars, timezone=None):
+        self.assertEqual(len(barArrays), len(bars))
+        for i in range(len(bars)):
+            expected = bars[i]
+            actual = barArrays[i]
+            actualDateTime = actual.getDateTime()
+            expectedDateTime = expected.getDateTime()
+            # Datetimes that don't exist because of DST get normalized when bars are loaded in bulk.
+            if timezone is not None:
+                actualDateTime = timezone.normalize(actualDateTime)
+                expectedDateTime = timezone.normalize(expectedDateTime)
+            self.assertEqual(actualDateTime, expectedDateTime)
+            self.assertEqual(actualDateTime.utcoffset(), expectedDateTime.utcoffset())
+            self.assertEqual(actual.getOpen(), expected.getOpen())
+            self.assertEqual(actual.getHigh(), expected.getHigh())
+            self.assertEqual(actual.getLow(), expected.getLow())
+            self.assertEqual(actual.getClose(), expected.getClose())
+            self.assertEqual(actual.getVolume(), expected.getVolume())
+            self.assertEqual(actual.getAdjClose(), expected.getAdjClose())
+            self.assertEqual(actual.getExtraColumns(), expected.getExtraColumns())
+
+    def testSameAsRowByRow(self):
+        columnNames = {
+            "datetime": "Date Time", "open": "Open", "high": "High", "low": "Low", "close": "Close",
+            "volume": "Volume", "adj_close": "Adj Close",
+        }
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "bars.csv")
+            # Cover the DST transition.
+            self.__writeBars(path, datetime.datetime(2018, 3, 10), 1000, extra=",Extra")
+            for timezone in [None, marketsession.USEquities.getTimezone()]:
+                for dailyBarTime in [None, datetime.time(16)]:
+                    barArrays = csvfeed.load_bar_arrays(
+                        path, columnNames, "%Y-%m-%d %H:%M:%S", dailyBarTime, bar.Frequency.MINUTE, timezone,
+                        chunkSize=100
+                    )
+                    self.__assertSameBars(barArrays, self.__rowByRow(path, timezone, dailyBarTime), timezone)
+
+    def testNotLoadedInBulk(self):
+        columnNames = {
+            "datetime": "Date Time", "open": "Open", "high": "High", "low": "Low", "close": "Close",
+            "volume": "Volume", "adj_close": "Adj Close",
+        }
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "bars.csv")
+            with open(path, "w") as f:
+                f.write("Date Time,Open,High,Low,Close,Volume,Adj Close,Text\n")
+                f.write("2000-01-03 00:00:00,10,12,9,11,1000,,abc\n")
+            self.assertIsNone(csvfeed.load_bar_arrays(
+                path, columnNames, "%Y-%m-%d %H:%M:%S", None, bar.Frequency.MINUTE, None
+            ))
+            self.assertIsNone(csvfeed.load_bar_arrays(
+                path, columnNames, "%d-%b-%y", None, bar.Frequency.MINUTE, None
+            ))
+
+            barFeed = csvfeed.GenericBarFeed(bar.Frequency.MINUTE)
+            barFeed.addBarsFromCSV("a", path)
+            barFeed.loadAll()
+            self.assertEqual(barFeed["a"][-1].getExtraColumns(), {"Text": "abc"})
+
+    def testFilters(self):
+        class RowByRowFilter(csvfeed.BarFilter):
+            def includeBar(self, bar_):
+                return bar_.getDateTime().hour != 10
+
+        # Subclasses that only override includeBar should get their bars filtered with it.
+        class EvenMinutesFilter(csvfeed.USEquitiesRTH):
+            def includeBar(self, bar_):
+                return super(EvenMinutesFilter, self).includeBar(bar_) and bar_.getDateTime().minute % 2 == 0
+
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "bars.csv")
+            self.__writeBars(path, datetime.datetime(2018, 3, 12), 2000, extra=",Extra")
+            for timezone in [None, marketsession.USEquities.getTimezone(), marketsession.TSE.getTimezone()]:
+                fromDate = datetime.datetime(2018, 3, 13, 10)
+                toDate = datetime.datetime(2018, 3, 19, 14)
+                if timezone is not None:
+                    fromDate = dt.localize(fromDate, timezone)
+                    toDate = dt.localize(toDate, timezone)
+
+                for barFilter in [
+                    csvfeed.DateRangeFilter(fromDate, toDate),
+                    csvfeed.USEquitiesRTH(),
+                    csvfeed.USEquitiesRTH(fromDate, toDate),
+                    RowByRowFilter(),
+                    EvenMinutesFilter(fromDate, toDate),
+                ]:
+                    barFeed = csvfeed.GenericBarFeed(bar.Frequency.MINUTE, timezone, maxLen=2000)
+                    barFeed.setBarFilter(barFilter)
+                    barFeed.addBarsFromCSV("a", path)
+                    barFeed.loadAll()
+                    expected = [b for b in self.__rowByRow(path, timezone) if barFilter.includeBar(b)]
+                    self.assertTrue(len(expected) > 0)
+                    self.__assertSameBars(barFeed["a"], expected, timezone)
+
+    def testDateRangeFilterSubclass(self):
+        class CloseAbove30Filter(csvfeed.DateRangeFilter):
+            def includeBar(self, bar_):
+                return super(CloseAbove30Filter, self).includeBar(bar_) and bar_.getClose() > 30
+
+        barFeed = csvfeed.GenericBarFeed(bar.Frequency.DAY)
+        barFeed.setColumnName("datetime", "Date")
+        barFeed.setColumnName("adj_close", "Adj Close")
+        barFeed.setDateTimeFormat("%Y-%m-%d")
+        barFeed.setBarFilter(CloseAbove30Filter())
+        barFeed.addBarsFromCSV("orcl", common.get_data_file_path("orcl-2000-yahoofinance.csv"))
+        barFeed.loadAll()
+        closes = barFeed["orcl"].getCloseDataSeries()
+        self.assertTrue(0 < len(closes) < 252)
+        self.assertTrue(min(closes) > 30)
+
+    def testCompressedFiles(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "bars.csv")
+            self.__writeBars(path, datetime.datetime(2018, 3, 12), 100, extra=",Extra")
+            expected = self.__rowByRow(path)
+            for extension in [".gz", ".bz2", ".xz"]:
+                compressedPath = path + extension
+                common.compress_file(path, compressedPath)
+                self.__assertSameBars(self.__rowByRow(compressedPath), expected)
+
+                barFeed = csvfeed.GenericBarFeed(bar.Frequency.MINUTE)
+                barFeed.addBarsFromCSV("a", compressedPath)
+                barFeed.loadAll()
+                self.__assertSameBars(barFeed["a"], expected)
+
+    def testFeed(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "bars.csv")
+            self.__writeBars(path, datetime.datetime(2018, 3, 10), 100)
+            barFeed = csvfeed.GenericBarFeed(bar.Frequency.MINUTE)
+            barFeed.addBarsFromCSV("a", path)
+            self.assertTrue(barFeed.barsHaveAdjClose())
+            barFeed.loadAll()
+            self.__assertSameBars(barFeed["a"], self.__rowByRow(path))
+
+
+class GenericBarFeedParallelLoadTestCase(common.TestCase):
+    def __buildFeed(self):
+        ret = csvfeed.GenericBarFeed(bar.Frequency.DAY, marketsession.USEquities.getTimezone())
+        ret.setColumnName("datetime", "Date")
+        ret.setDateTimeFormat("%Y-%m-%d")
+        return ret
+
+    def testSameAsSerial(self):
+        paths = {
+            "orcl": common.get_data_file_path("orcl-2000-yahoofinance.csv"),
+            "spy": common.get_data_file_path("spy-2010-yahoofinance.csv"),
+            "nikkei": common.get_data_file_path("nikkei-2010-yahoofinance.csv"),
+        }
+        expected = self.__buildFeed()
+        for instrument in sorted(paths.keys()):
+            expected.addBarsFromCSV(instrument, paths[instrument])
+        expected.loadAll()
+
+        barFeed = self.__buildFeed()
+        barFeed.addBarsFromCSVFiles(paths, processes=2)
+        self.assertEqual(barFeed.getRegisteredInstruments(), ["nikkei", "orcl", "spy"])
+        self.assertTrue(barFeed.barsHaveAdjClose())
+        barFeed.loadAll()
+        for instrument in paths:
+            self.assertEqual(bar_values(barFeed, instrument), bar_values(expected, instrument))
+
+    def testRowByRowFallbackAndCache(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "strings.csv")
+            with open(path, "w") as f:
+                f.write("Date,Open,High,Low,Close,Volume,Adj Close,Text\n")
+                f.write("2000-01-03,10,12,9,11,1000,10,abc\n")
+            paths = {"orcl": common.get_data_file_path("orcl-2000-yahoofinance.csv"), "text": path}
+
+            cache = arraycache.ArrayCache(os.path.join(tmpPath, "cache"))
+            for i in range(2):
+                barFeed = self.__buildFeed()
+                barFeed.setCache(cache)
+                barFeed.addBarsFromCSVFiles(paths, processes=2)
+                barFeed.loadAll()
+                self.assertEqual(len(barFeed["orcl"]), 252)
+                self.assertEqual(barFeed["text"][-1].getExtraColumns(), {"Text": "abc"})
+            # Bars with non numeric extra columns are not cached.
+            self.assertEqual(len(os.listdir(os.path.join(tmpPath, "cache"))), 1)
+
+
 class CommonTestCase(common.TestCase):
     def testSanitize(self):
         self.assertEqual(bfcommon.sanitize_ohlc(10, 12, 9, 10), (10, 12, 9, 10))
@@ -0,0 +1,742 @@
+# PyAlgoTrade
+#
+# Copyright 2011-2018 Gabriel Martin Becedillas Ruiz
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. moduleauthor:: Gabriel Martin Becedillas Ruiz <gabriel.becedillas@gmail.com>
+"""
+
+# Micro-benchmarks for hot paths. They take a while and their timings depend on the machine running them, so they only
+# run if the PYALGOTRADE_BENCHMARKS environment variable is set. Timings are logged and only checked loosely.
+
+import datetime
+import os
+import timeit
+import unittest
+
+import numpy as np
+import six
+from six.moves import xrange
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2.7
+    tracemalloc = None
+
+from . import common
+
+import pyalgotrade.logger
+from pyalgotrade import bar
+from pyalgotrade import dataseries
+from pyalgotrade import dispatcher
+from pyalgotrade import observer
+from pyalgotrade.dataseries import bards
+from pyalgotrade.barfeed import csvfeed
+from pyalgotrade.barfeed import membf
+from pyalgotrade.barfeed import sqlitefeed
+from pyalgotrade.barfeed import yahoofeed
+from pyalgotrade.technical import ma
+from pyalgotrade import tick
+from pyalgotrade import tickstrategy
+from pyalgotrade.tickdataseries import tickds
+from pyalgotrade.tickfeed import memtf
+from pyalgotrade.tickfeed import sqlitefeed as sqlitetf
+from pyalgotrade.tickfeed import txtfeed
+from pyalgotrade.utils import arraycache
+from pyalgotrade.utils import collections
+from pyalgotrade.utils import tickcodec
+
+
+logger = pyalgotrade.logger.getLogger("benchmark")
+
+
+def best_of(func, number, repeat=3):
+    # Returns the best time per call, in seconds.
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / float(number)
+
+
+def allocated_bytes(func):
+    # Returns the number of bytes still allocated after calling func, and the value returned by func.
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        ret = func()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return after - before, ret
+
+
+def peak_allocated_bytes(func):
+    # Returns the peak number of bytes allocated while calling func.
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peak - before
+
+
+def write_ticks_txt(path, count):
+    with open(path, "w") as f:
+        for tick_ in build_ticks(count):
+            f.write("%.5f,%.5f,%s\n" % (tick_.getBid(), tick_.getAsk(), tick_.getDateTime().strftime("%Y.%m.%d %H:%M:%S")))
+
+
+def build_bars(count, startDateTime=datetime.datetime(2000, 1, 1)):
+    return [
+        bar.BasicBar(startDateTime + datetime.timedelta(minutes=i), 10, 12, 9, 11, 1000, 11, bar.Frequency.MINUTE)
+        for i in xrange(count)
+    ]
+
+
+def build_ticks(count, startDateTime=datetime.datetime(2018, 1, 1)):
+    return [
+        tick.BasicTick(startDateTime + datetime.timedelta(milliseconds=i * 250), 1.2 + i * 1e-6, 1.2002 + i * 1e-6)
+        for i in xrange(count)
+    ]
+
+
+@unittest.skipUnless(os.environ.get("PYALGOTRADE_BENCHMARKS"), "PYALGOTRADE_BENCHMARKS is not set")
+class BenchmarkTestCase(common.TestCase):
+    pass
+
+
+class DataSeriesBenchmarkTestCase(BenchmarkTestCase):
+    APPENDS = 100000
+
+    def __appendCostOnceFull(self, maxLen):
+        d = collections.ListDeque(maxLen)
+        append = d.append
+        for i in xrange(maxLen):
+            append(None)
+
+        def run():
+            for i in xrange(DataSeriesBenchmarkTestCase.APPENDS):
+                append(None)
+        return best_of(run, 1) / DataSeriesBenchmarkTestCase.APPENDS
+
+    def testListDequeAppendCostIsFlat(self):
+        costs = []
+        for maxLen in [1000, 100000, 1000000, 10000000]:
+            cost = self.__appendCostOnceFull(maxLen)
+            logger.info("ListDeque(%d).append: %.3f us" % (maxLen, cost * 1e6))
+            costs.append(cost)
+        # Using ListDeque.pop(0) the cost for 10M entries was orders of magnitude bigger than for 1K entries.
+        self.assertLess(costs[-1], costs[0] * 5)
+
+    def testNumPyDequeAppendCostIsFlat(self):
+        costs = []
+        for maxLen in [10, 1000, 100000]:
+            d = collections.NumPyDeque(maxLen)
+            for i in xrange(maxLen * 2):
+                d.append(i)
+            cost = best_of(lambda: d.append(1), 200000)
+            logger.info("NumPyDeque(%d).append: %.3f us" % (maxLen, cost * 1e6))
+            costs.append(cost)
+        # Shifting all values on every append made this O(maxLen).
+        self.assertLess(costs[-1], costs[0] * 5)
+
+    def testSequenceDataSeriesAppendCostIsFlat(self):
+        costs = []
+        for maxLen in [1000, 100000]:
+            ds = dataseries.SequenceDataSeries(maxLen)
+            for i in xrange(maxLen):
+                ds.append(i)
+            cost = best_of(lambda: ds.appendWithDateTime(None, 1), 50000)
+            logger.info("SequenceDataSeries(%d).appendWithDateTime: %.3f us" % (maxLen, cost * 1e6))
+            costs.append(cost)
+        self.assertLess(costs[-1], costs[0] * 5)
+
+
+class EventBenchmarkTestCase(BenchmarkTestCase):
+    def testEmitCost(self):
+        def handler(*args):
+            pass
+
+        costs = {}
+        for handlerCount in [0, 1, 5]:
+            event = observer.Event()
+            for i in xrange(handlerCount):
+                # Handlers need to be different to get subscribed.
+                event.subscribe(lambda *args: handler(*args))
+            costs[handlerCount] = best_of(lambda: event.emit(None, None, None), 200000)
+            logger.info("Event.emit with %d handlers: %.3f us" % (handlerCount, costs[handlerCount] * 1e6))
+
+        ds = dataseries.SequenceDataSeries()
+        appendCost = best_of(lambda: ds.appendWithDateTime(None, 1), 200000)
+        logger.info("SequenceDataSeries.appendWithDateTime with no subscribers: %.3f us" % (appendCost * 1e6))
+        # With no handlers emit has nothing to do, and with handlers the cost should be dominated by calling them.
+        self.assertLess(costs[0], costs[1])
+        self.assertLess(costs[1], costs[5])
+
+
+class BarDataSeriesBenchmarkTestCase(BenchmarkTestCase):
+    BARS = 50000
+
+    @unittest.skipIf(tracemalloc is None, "tracemalloc not available")
+    def testMemoryPerBar(self):
+        def load(dataSeriesClass):
+            ds = dataSeriesClass(BarDataSeriesBenchmarkTestCase.BARS)
+            for bar_ in build_bars(BarDataSeriesBenchmarkTestCase.BARS):
+                ds.append(bar_)
+            return ds
+
+        columnarBytes, ds = allocated_bytes(lambda: load(bards.ColumnarBarDataSeries))
+        objectBytes, ds = allocated_bytes(lambda: load(bards.BarDataSeries))
+        logger.info("ColumnarBarDataSeries: %.1f bytes/bar. BarDataSeries: %.1f bytes/bar" % (
+            columnarBytes / float(BarDataSeriesBenchmarkTestCase.BARS),
+            objectBytes / float(BarDataSeriesBenchmarkTestCase.BARS)
+        ))
+        self.assertLess(columnarBytes * 2, objectBytes)
+
+    def testAppendCost(self):
+        bars = build_bars(BarDataSeriesBenchmarkTestCase.BARS)
+
+        def append(dataSeriesClass):
+            ds = dataSeriesClass(BarDataSeriesBenchmarkTestCase.BARS)
+            for bar_ in bars:
+                ds.appendWithDateTime(bar_.getDateTime(), bar_)
+
+        columnarCost = best_of(lambda: append(bards.ColumnarBarDataSeries), 1) / BarDataSeriesBenchmarkTestCase.BARS
+        objectsCost = best_of(lambda: append(bards.BarDataSeries), 1) / BarDataSeriesBenchmarkTestCase.BARS
+        logger.info("ColumnarBarDataSeries append: %.3f us/bar. BarDataSeries: %.3f us/bar" % (
+            columnarCost * 1e6, objectsCost * 1e6
+        ))
+
+
+class DateTimeIndexBenchmarkTestCase(BenchmarkTestCase):
+    VALUES = 50000
+
+    def __load(self, shareDateTimes):
+        count = DateTimeIndexBenchmarkTestCase.VALUES
+        dateTimeIndex = dataseries.DateTimeIndex(count) if shareDateTimes else None
+        closeDS = dataseries.SequenceDataSeries(count, dateTimeIndex)
+        smas = [ma.SMA(closeDS, period, maxLen=count) for period in [5, 10, 20, 50, 100]]
+        startDateTime = datetime.datetime(2000, 1, 1)
+        for i in xrange(count):
+            dateTime = startDateTime + datetime.timedelta(minutes=i)
+            if dateTimeIndex is not None:
+                dateTimeIndex.append(dateTime)
+            closeDS.appendWithDateTime(dateTime, 10)
+        return closeDS, smas
+
+    @unittest.skipIf(tracemalloc is None, "tracemalloc not available")
+    def testMemoryWithIndicators(self):
+        sharedBytes, ret = allocated_bytes(lambda: self.__load(True))
+        notSharedBytes, ret = allocated_bytes(lambda: self.__load(False))
+        logger.info("Close and 5 SMAs. Shared datetimes: %.1f bytes/value. Not shared: %.1f bytes/value" % (
+            sharedBytes / float(DateTimeIndexBenchmarkTestCase.VALUES),
+            notSharedBytes / float(DateTimeIndexBenchmarkTestCase.VALUES)
+        ))
+        self.assertLess(sharedBytes, notSharedBytes)
+
+    def testDateTimeSlice(self):
+        closeDS, smas = self.__load(True)
+        fromDateTime = datetime.datetime(2000, 1, 10)
+        toDateTime = datetime.datetime(2000, 1, 11)
+        sharedCost = best_of(lambda: smas[0].getDateTimeSlice(fromDateTime, toDateTime), 100)
+        closeDS, smas = self.__load(False)
+        notSharedCost = best_of(lambda: smas[0].getDateTimeSlice(fromDateTime, toDateTime), 100)
+        logger.info("getDateTimeSlice. Shared datetimes: %.3f us. Not shared: %.3f us" % (sharedCost * 1e6, notSharedCost * 1e6))
+
+
+class TickDataSeriesBenchmarkTestCase(BenchmarkTestCase):
+    TICKS = 50000
+
+    @unittest.skipIf(tracemalloc is None, "tracemalloc not available")
+    def testMemoryPerTick(self):
+        def load_columnar():
+            ds = tickds.TickDataSeries()
+            for tick_ in build_ticks(TickDataSeriesBenchmarkTestCase.TICKS):
+                ds.append(tick_)
+            return ds
+
+        def load_objects():
+            # The way ticks used to be stored: the tick itself plus two dataseries for bid and ask prices.
+            ticksDS = dataseries.SequenceDataSeries(1024*10000)
+            bidDS = dataseries.SequenceDataSeries(1024*10000)
+            askDS = dataseries.SequenceDataSeries(1024*10000)
+            for tick_ in build_ticks(TickDataSeriesBenchmarkTestCase.TICKS):
+                ticksDS.appendWithDateTime(tick_.getDateTime(), tick_)
+                bidDS.appendWithDateTime(tick_.getDateTime(), tick_.getBid())
+                askDS.appendWithDateTime(tick_.getDateTime(), tick_.getAsk())
+            return ticksDS, bidDS, askDS
+
+        columnarBytes, ds = allocated_bytes(load_columnar)
+        objectBytes, dss = allocated_bytes(load_objects)
+        logger.info("TickDataSeries: %.1f bytes/tick. Objects: %.1f bytes/tick" % (
+            columnarBytes / float(TickDataSeriesBenchmarkTestCase.TICKS),
+            objectBytes / float(TickDataSeriesBenchmarkTestCase.TICKS)
+        ))
+        self.assertLess(columnarBytes * 5, objectBytes)
+
+    def testAppendCost(self):
+        ticks = build_ticks(TickDataSeriesBenchmarkTestCase.TICKS)
+
+        def append_columnar():
+            ds = tickds.TickDataSeries()
+            for tick_ in ticks:
+                ds.appendWithDateTime(tick_.getDateTime(), tick_)
+
+        def append_objects():
+            ticksDS = dataseries.SequenceDataSeries(1024*10000)
+            bidDS = dataseries.SequenceDataSeries(1024*10000)
+            askDS = dataseries.SequenceDataSeries(1024*10000)
+            for tick_ in ticks:
+                ticksDS.appendWithDateTime(tick_.getDateTime(), tick_)
+                bidDS.appendWithDateTime(tick_.getDateTime(), tick_.getBid())
+                askDS.appendWithDateTime(tick_.getDateTime(), tick_.getAsk())
+
+        columnarCost = best_of(append_columnar, 1) / TickDataSeriesBenchmarkTestCase.TICKS
+        objectsCost = best_of(append_objects, 1) / TickDataSeriesBenchmarkTestCase.TICKS
+        logger.info("TickDataSeries append: %.3f us/tick. Objects: %.3f us/tick" % (columnarCost * 1e6, objectsCost * 1e6))
+
+    def testGetNextValuesAndUpdateDS(self):
+        ticks = build_ticks(TickDataSeriesBenchmarkTestCase.TICKS)
+
+        def run():
+            feed = memtf.TickFeed()
+            feed.addTicksFromSequence("EURUSD", ticks)
+            feed.start()
+            while not feed.eof():
+                feed.getNextValuesAndUpdateDS()
+
+        elapsed = best_of(run, 1, repeat=1)
+        logger.info("memtf.TickFeed.getNextValuesAndUpdateDS: %.0f ticks/s" % (TickDataSeriesBenchmarkTestCase.TICKS / elapsed))
+
+
+class MemBarFeed(membf.BarFeed):
+    def barsHaveAdjClose(self):
+        return True
+
+
+class MergeBenchmarkTestCase(BenchmarkTestCase):
+    EVENTS = 20000
+
+    def __mergeCost(self, instrumentCount, feed, addValues, getNextValues, build):
+        # Every instrument has values on different datetimes, so each event has a single instrument. This is the worst
+        # case for scanning all instruments on every event.
+        startDateTime = datetime.datetime(2018, 1, 1)
+        valuesPerInstrument = MergeBenchmarkTestCase.EVENTS // instrumentCount
+        for i in xrange(instrumentCount):
+            dateTimes = [
+                startDateTime + datetime.timedelta(seconds=j * instrumentCount + i) for j in xrange(valuesPerInstrument)
+            ]
+            addValues("instrument-%d" % i, build(dateTimes))
+
+        def run():
+            feed.reset()
+            events = 0
+            while getNextValues() is not None:
+                events += 1
+            return events
+
+        return best_of(run, 1) / (valuesPerInstrument * instrumentCount)
+
+    def testBarFeed(self):
+        costs = []
+        for instrumentCount in [1, 10, 100, 1000]:
+            feed = MemBarFeed(bar.Frequency.SECOND)
+            cost = self.__mergeCost(
+                instrumentCount, feed, feed.addBarsFromSequence, feed.getNextBars,
+                lambda dateTimes: [bar.BasicBar(dateTime, 1, 1, 1, 1, 1, 1, bar.Frequency.SECOND) for dateTime in dateTimes]
+            )
+            logger.info("membf.BarFeed.getNextBars with %d instruments: %.3f us" % (instrumentCount, cost * 1e6))
+            costs.append(cost)
+        # Scanning every instrument made this about 1000 times slower for 1000 instruments.
+        self.assertLess(costs[-1], costs[0] * 10)
+
+    def testTickFeed(self):
+        costs = []
+        for instrumentCount in [1, 10, 100, 1000]:
+            feed = memtf.TickFeed()
+            cost = self.__mergeCost(
+                instrumentCount, feed, feed.addTicksFromSequence, feed.getNextTicks,
+                lambda dateTimes: [tick.BasicTick(dateTime, 1, 1.0001) for dateTime in dateTimes]
+            )
+            logger.info("memtf.TickFeed.getNextTicks with %d instruments: %.3f us" % (instrumentCount, cost * 1e6))
+            costs.append(cost)
+        self.assertLess(costs[-1], costs[0] * 10)
+
+
+class DispatcherBenchmarkTestCase(BenchmarkTestCase):
+    EVENTS = 10000
+
+    def __dispatchCost(self, subjectCount, usePriorityQueue):
+        # Every subject is a bar feed with bars on different datetimes, so each event comes from a single subject.
+        startDateTime = datetime.datetime(2018, 1, 1)
+        barsPerSubject = DispatcherBenchmarkTestCase.EVENTS // subjectCount
+        feeds = []
+        for i in xrange(subjectCount):
+            feed = MemBarFeed(bar.Frequency.SECOND)
+            feed.addBarsFromSequence("instrument", [
+                bar.BasicBar(
+                    startDateTime + datetime.timedelta(seconds=j * subjectCount + i), 1, 1, 1, 1, 1, 1,
+                    bar.Frequency.SECOND
+                ) for j in xrange(barsPerSubject)
+            ])
+            feeds.append(feed)
+
+        def run():
+            disp = dispatcher.Dispatcher()
+            disp.setUsePriorityQueue(usePriorityQueue)
+            for feed in feeds:
+                feed.reset()
+                disp.addSubject(feed)
+            disp.run()
+
+        return best_of(run, 1) / (barsPerSubject * subjectCount)
+
+    def testPriorityQueue(self):
+        for subjectCount in [1, 10, 100]:
+            polling = self.__dispatchCost(subjectCount, False)
+            queue = self.__dispatchCost(subjectCount, True)
+            logger.info("Dispatching from %d subjects. Polling: %.3f us. Priority queue: %.3f us" % (
+                subjectCount, polling * 1e6, queue * 1e6
+            ))
+        self.assertLess(queue * 5, polling)
+
+
+class SMACrossOverBatchStrategy(tickstrategy.BatchedBacktestingTickStrategy):
+    def __init__(self, tickFeed, period):
+        super(SMACrossOverBatchStrategy, self).__init__(tickFeed)
+        self.setDebugMode(False)
+        self.__period = period
+        self.__long = False
+
+    def onTickBatch(self, timestamps, bids, asks):
+        sma = np.convolve(bids, np.ones(self.__period) / self.__period, "same")
+        above = bids > sma
+        ret = []
+        for pos in np.flatnonzero(above[1:] != above[:-1]) + 1:
+            if above[pos] != self.__long:
+                self.__long = not self.__long
+                ret.append((pos, 1000 if self.__long else -1000))
+        return ret
+
+
+class NoOpTickStrategy(tickstrategy.BacktestingTickStrategy):
+    def __init__(self, tickFeed):
+        super(NoOpTickStrategy, self).__init__(tickFeed)
+        self.setDebugMode(False)
+
+    def onTicks(self, ticks):
+        pass
+
+
+class BatchedTickStrategyBenchmarkTestCase(BenchmarkTestCase):
+    def __buildFeed(self, count):
+        timestamps = 1514764800 * 10**9 + np.arange(count, dtype=np.int64) * 10**9
+        bids = np.round(1.2 + np.sin(np.arange(count) / 500.0) * 0.01, 5)
+        ret = memtf.TickFeed()
+        ret.addTicksFromArrays("EURUSD", tick.TickArrays(timestamps, bids, bids + 0.0002))
+        return ret
+
+    def __ticksPerSecond(self, strat, count):
+        begin = timeit.default_timer()
+        strat.run()
+        return count / (timeit.default_timer() - begin)
+
+    def testThroughput(self):
+        batched = self.__ticksPerSecond(SMACrossOverBatchStrategy(self.__buildFeed(1000000), 1000), 1000000)
+        # Dispatching every tick, without any trading logic.
+        perTick = self.__ticksPerSecond(NoOpTickStrategy(self.__buildFeed(50000)), 50000)
+        logger.info("SMA crossover in batches: %.0f ticks/s. Dispatching every tick: %.0f ticks/s" % (batched, perTick))
+        self.assertLess(perTick * 10, batched)
+
+
+class InstrumentTickBenchmarkTestCase(BenchmarkTestCase):
+    def testBuildCost(self):
+        tick_ = build_ticks(1)[0]
+        ticksCost = best_of(lambda: tick.Ticks({"EURUSD": tick_}), 200000)
+        instrumentTickCost = best_of(lambda: tick.InstrumentTick("EURUSD", tick_), 200000)
+        logger.info("Ticks: %.3f us. InstrumentTick: %.3f us" % (ticksCost * 1e6, instrumentTickCost * 1e6))
+        self.assertLess(instrumentTickCost * 2, ticksCost)
+
+
+class StreamingTickFeedBenchmarkTestCase(BenchmarkTestCase):
+    TICKS = 20000
+
+    @unittest.skipIf(tracemalloc is None, "tracemalloc not available")
+    def testPeakMemory(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "EURUSD.txt")
+            write_ticks_txt(path, StreamingTickFeedBenchmarkTestCase.TICKS)
+
+            def load(tickFeed):
+                tickFeed.addTicksFromTXT("EURUSD", path)
+                tickFeed.loadAll()
+
+            # Only the last 1024 ticks are kept in the dataseries, so the difference is in how files are read.
+            memBytes = peak_allocated_bytes(lambda: load(txtfeed.GenericTickFeed(maxLen=1024)))
+            streamingBytes = peak_allocated_bytes(lambda: load(txtfeed.StreamingGenericTickFeed(maxLen=1024)))
+            logger.info("Peak memory loading %d ticks. GenericTickFeed: %.1f KB. StreamingGenericTickFeed: %.1f KB" % (
+                StreamingTickFeedBenchmarkTestCase.TICKS, memBytes / 1024.0, streamingBytes / 1024.0
+            ))
+            self.assertLess(streamingBytes * 5, memBytes)
+
+
+class TickLoadBenchmarkTestCase(BenchmarkTestCase):
+    TICKS = 100000
+
+    def testLoadThroughput(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "EURUSD.txt")
+            write_ticks_txt(path, TickLoadBenchmarkTestCase.TICKS)
+            rowParser = txtfeed.GenericRowParser("%Y.%m.%d %H:%M:%S")
+
+            rowByRow = best_of(lambda: list(txtfeed.read_ticks(path, rowParser)), 1)
+            bulk = best_of(lambda: txtfeed.load_tick_arrays(path), 1)
+            logger.info("Parsing TXT ticks. Row by row: %.0f ticks/s. Bulk: %.0f ticks/s" % (
+                TickLoadBenchmarkTestCase.TICKS / rowByRow, TickLoadBenchmarkTestCase.TICKS / bulk
+            ))
+            self.assertLess(bulk, rowByRow)
+
+
+class BarLoadBenchmarkTestCase(BenchmarkTestCase):
+    BARS = 50000
+
+    def testLoadCSV(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "bars.csv")
+            with open(path, "w") as f:
+                f.write("Date Time,Open,High,Low,Close,Volume,Adj Close\n")
+                for bar_ in build_bars(BarLoadBenchmarkTestCase.BARS):
+                    f.write("%s,%s,%s,%s,%s,%s,\n" % (
+                        bar_.getDateTime().strftime("%Y-%m-%d %H:%M:%S"), bar_.getOpen(), bar_.getHigh(),
+                        bar_.getLow(), bar_.getClose(), bar_.getVolume()
+                    ))
+            rowParser = csvfeed.GenericRowParser({
+                "datetime": "Date Time", "open": "Open", "high": "High", "low": "Low", "close": "Close",
+                "volume": "Volume", "adj_close": "Adj Close",
+            }, "%Y-%m-%d %H:%M:%S", None, bar.Frequency.MINUTE, None)
+
+            rowByRow = best_of(lambda: list(csvfeed.read_bars(path, rowParser)), 1)
+            bulk = best_of(lambda: csvfeed.GenericBarFeed(bar.Frequency.MINUTE).addBarsFromCSV("orcl", path), 1)
+            logger.info("Loading CSV bars. Row by row: %.0f bars/s. Bulk: %.0f bars/s" % (
+                BarLoadBenchmarkTestCase.BARS / rowByRow, BarLoadBenchmarkTestCase.BARS / bulk
+            ))
+            self.assertLess(bulk * 2, rowByRow)
+
+
+class CompressedLoadBenchmarkTestCase(BenchmarkTestCase):
+    TICKS = 100000
+
+    def testLoadThroughput(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "EURUSD.txt")
+            write_ticks_txt(path, CompressedLoadBenchmarkTestCase.TICKS)
+            extensions = [".gz", ".bz2"]
+            if six.PY3:
+                extensions.append(".xz")
+
+            timings = [("raw", best_of(lambda: txtfeed.load_tick_arrays(path), 1))]
+            for extension in extensions:
+                compressedPath = path + extension
+                common.compress_file(path, compressedPath)
+                self.assertEqual(
+                    len(txtfeed.load_tick_arrays(compressedPath)), CompressedLoadBenchmarkTestCase.TICKS
+                )
+                timings.append((extension, best_of(lambda: txtfeed.load_tick_arrays(compressedPath), 1)))
+            logger.info("Loading TXT ticks. %s" % ". ".join(
+                "%s: %.0f ticks/s" % (name, CompressedLoadBenchmarkTestCase.TICKS / elapsed)
+                for name, elapsed in timings
+            ))
+
+
+class CompactTickBenchmarkTestCase(BenchmarkTestCase):
+    TICKS = 100000
+
+    def testSizeAndDecodeThroughput(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "EURUSD.txt")
+            write_ticks_txt(path, CompactTickBenchmarkTestCase.TICKS)
+            compactPath = os.path.join(tmpPath, "EURUSD.ticks")
+            tickArrays = txtfeed.load_tick_arrays(path)
+            tickcodec.write_ticks(
+                compactPath, tickArrays.getTimestamps(), tickArrays.getBids(), tickArrays.getAsks(), 0.00001
+            )
+
+            parsed = best_of(lambda: txtfeed.load_tick_arrays(path), 1)
+            decoded = best_of(lambda: tickcodec.read_ticks(compactPath), 1)
+            txtSize = os.path.getsize(path)
+            compactSize = os.path.getsize(compactPath)
+            logger.info("TXT: %.1f bytes/tick, %.0f ticks/s. Compact: %.1f bytes/tick, %.0f ticks/s" % (
+                txtSize / float(CompactTickBenchmarkTestCase.TICKS), CompactTickBenchmarkTestCase.TICKS / parsed,
+                compactSize / float(CompactTickBenchmarkTestCase.TICKS), CompactTickBenchmarkTestCase.TICKS / decoded
+            ))
+            self.assertLess(compactSize * 5, txtSize)
+            self.assertLess(decoded * 2, parsed)
+
+
+class SQLiteIngestionBenchmarkTestCase(BenchmarkTestCase):
+    BARS = 20000
+
+    def testBulkIngestion(self):
+        bars = build_bars(SQLiteIngestionBenchmarkTestCase.BARS)
+        with common.TmpDir() as tmpPath:
+            db = sqlitefeed.Database(os.path.join(tmpPath, "row-by-row.sqlite"))
+            begin = timeit.default_timer()
+            for bar_ in bars:
+                db.addBar("orcl", bar_, bar.Frequency.MINUTE)
+            rowByRow = timeit.default_timer() - begin
+            db.disconnect()
+
+            db = sqlitefeed.Database(os.path.join(tmpPath, "bulk.sqlite"))
+            begin = timeit.default_timer()
+            db.addBarsFromSequence("orcl", bars, bar.Frequency.MINUTE)
+            bulk = timeit.default_timer() - begin
+            db.disconnect()
+
+            logger.info("Writing SQLite bars. Row by row: %.0f bars/s. Bulk: %.0f bars/s" % (
+                SQLiteIngestionBenchmarkTestCase.BARS / rowByRow, SQLiteIngestionBenchmarkTestCase.BARS / bulk
+            ))
+            self.assertLess(bulk * 2, rowByRow)
+
+
+class SQLiteFeedBenchmarkTestCase(BenchmarkTestCase):
+    INSTRUMENTS = 20
+    BARS = 1000
+
+    @unittest.skipIf(tracemalloc is None, "tracemalloc not available")
+    def testStreamingFeedMemory(self):
+        instruments = ["instrument-%d" % i for i in xrange(SQLiteFeedBenchmarkTestCase.INSTRUMENTS)]
+        with common.TmpDir() as tmpPath:
+            dbFilePath = os.path.join(tmpPath, "bars.sqlite")
+            db = sqlitefeed.Database(dbFilePath)
+            for instrument in instruments:
+                db.addBarsFromSequence(instrument, build_bars(SQLiteFeedBenchmarkTestCase.BARS), bar.Frequency.MINUTE)
+            db.disconnect()
+
+            def load_in_memory():
+                barFeed = sqlitefeed.Feed(dbFilePath, bar.Frequency.MINUTE, maxLen=10)
+                for instrument in instruments:
+                    barFeed.loadBars(instrument)
+                barFeed.loadAll()
+                barFeed.getDatabase().disconnect()
+
+            def stream():
+                barFeed = sqlitefeed.StreamingFeed(dbFilePath, bar.Frequency.MINUTE, instruments, maxLen=10)
+                for dateTime, bars in barFeed:
+                    pass
+                barFeed.getDatabase().disconnect()
+
+            inMemory = best_of(load_in_memory, 1, repeat=1)
+            streaming = best_of(stream, 1, repeat=1)
+            inMemoryBytes = peak_allocated_bytes(load_in_memory)
+            streamingBytes = peak_allocated_bytes(stream)
+            logger.info("Reading %d SQLite bars. In memory: %.0f bars/s, %.0f KB. Streaming: %.0f bars/s, %.0f KB" % (
+                len(instruments) * SQLiteFeedBenchmarkTestCase.BARS,
+                len(instruments) * SQLiteFeedBenchmarkTestCase.BARS / inMemory, inMemoryBytes / 1024.0,
+                len(instruments) * SQLiteFeedBenchmarkTestCase.BARS / streaming, streamingBytes / 1024.0
+            ))
+            self.assertLess(streamingBytes * 5, inMemoryBytes)
+
+
+class SQLiteTickBenchmarkTestCase(BenchmarkTestCase):
+    TICKS = 200000
+
+    def testRangeQuery(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "EURUSD.txt")
+            write_ticks_txt(path, SQLiteTickBenchmarkTestCase.TICKS)
+            db = sqlitetf.Database(os.path.join(tmpPath, "ticks.sqlite"))
+            imported = best_of(lambda: db.addTicksFromTXT("EURUSD", path), 1, repeat=1)
+            self.assertEqual(len(db.getTicks("EURUSD")), SQLiteTickBenchmarkTestCase.TICKS)
+
+            # Ticks are 250ms apart, so there are 14400 ticks in an hour.
+            fromDateTime = datetime.datetime(2018, 1, 1, 5)
+            toDateTime = datetime.datetime(2018, 1, 1, 5, 59, 59)
+            full = best_of(lambda: db.getTicks("EURUSD"), 1)
+            subRange = best_of(lambda: db.getTicks("EURUSD", fromDateTime, toDateTime), 1)
+            self.assertEqual(len(db.getTicks("EURUSD", fromDateTime, toDateTime)), 14400)
+            db.disconnect()
+            logger.info("%d SQLite ticks. Import: %.0f ticks/s. Full read: %.1f ms. One hour: %.1f ms" % (
+                SQLiteTickBenchmarkTestCase.TICKS, SQLiteTickBenchmarkTestCase.TICKS / imported, full * 1e3,
+                subRange * 1e3
+            ))
+            self.assertLess(subRange * 5, full)
+
+
+class CacheBenchmarkTestCase(BenchmarkTestCase):
+    TICKS = 100000
+    BARS = 20000
+
+    def testTickStartup(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "EURUSD.txt")
+            write_ticks_txt(path, CacheBenchmarkTestCase.TICKS)
+            cache = arraycache.ArrayCache(os.path.join(tmpPath, "cache"))
+
+            def load(cache):
+                tickFeed = txtfeed.GenericTickFeed()
+                tickFeed.setCache(cache)
+                tickFeed.addTicksFromTXT("EURUSD", path)
+
+            parsed = best_of(lambda: load(None), 1)
+            load(cache)
+            cached = best_of(lambda: load(cache), 1)
+            logger.info("Loading %d ticks. Parsed: %.1f ms. Cached: %.1f ms" % (CacheBenchmarkTestCase.TICKS, parsed * 1e3, cached * 1e3))
+            self.assertLess(cached * 5, parsed)
+
+    def testBarStartup(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "bars.csv")
+            with open(path, "w") as f:
+                f.write("Date Time,Open,High,Low,Close,Volume,Adj Close\n")
+                for bar_ in build_bars(CacheBenchmarkTestCase.BARS):
+                    f.write("%s,%s,%s,%s,%s,%s,\n" % (
+                        bar_.getDateTime().strftime("%Y-%m-%d %H:%M:%S"), bar_.getOpen(), bar_.getHigh(),
+                        bar_.getLow(), bar_.getClose(), bar_.getVolume()
+                    ))
+            cache = arraycache.ArrayCache(os.path.join(tmpPath, "cache"))
+
+            def load(cache):
+                barFeed = csvfeed.GenericBarFeed(bar.Frequency.MINUTE)
+                barFeed.setCache(cache)
+                barFeed.addBarsFromCSV("orcl", path)
+
+            parsed = best_of(lambda: load(None), 1)
+            load(cache)
+            cached = best_of(lambda: load(cache), 1)
+            logger.info("Loading %d bars. Parsed: %.1f ms. Cached: %.1f ms" % (CacheBenchmarkTestCase.BARS, parsed * 1e3, cached * 1e3))
+            self.assertLess(cached * 5, parsed)
+
+    def testRowParserStartup(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "bars.csv")
+            with open(path, "w") as f:
+                f.write("Date,Open,High,Low,Close,Volume,Adj Close\n")
+                for i in xrange(CacheBenchmarkTestCase.BARS):
+                    dateTime = datetime.date(1950, 1, 1) + datetime.timedelta(days=i)
+                    f.write("%s,10,12,9,11,1000,11\n" % dateTime.strftime("%Y-%m-%d"))
+            cache = arraycache.ArrayCache(os.path.join(tmpPath, "cache"))
+
+            def load(cache):
+                barFeed = yahoofeed.Feed()
+                barFeed.setCache(cache)
+                barFeed.addBarsFromCSV("orcl", path)
+
+            parsed = best_of(lambda: load(None), 1)
+            load(cache)
+            cached = best_of(lambda: load(cache), 1)
+            logger.info("Loading %d Yahoo! Finance bars. Parsed: %.1f ms. Cached: %.1f ms" % (
+                CacheBenchmarkTestCase.BARS, parsed * 1e3, cached * 1e3
+            ))
+            self.assertLess(cached * 5, parsed)
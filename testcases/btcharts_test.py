@@ -19,6 +19,7 @@
 """
 
 import datetime
+import os
 
 from . import common
 
@@ -46,6 +47,18 @@ class TestCase(common.TestCase):
         self.assertEquals(loaded[-1][1]["BTC"].getPrice(), 5.1)
         self.assertEquals(loaded[-1][1]["BTC"].getVolume(), 0.39215686)
 
+    def testLoadCompressedFile(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "bitstampUSD.csv.gz")
+            common.compress_file(common.get_data_file_path("bitstampUSD.csv"), path)
+            feed = barfeed.CSVTradeFeed()
+            feed.addBarsFromCSV(path)
+            loaded = [(dateTime, bars) for dateTime, bars in feed]
+
+            self.assertEquals(len(loaded), 9999)
+            self.assertEquals(loaded[-1][0], dt.as_utc(datetime.datetime(2012, 5, 31, 8, 41, 18, 5)))
+            self.assertEquals(loaded[-1][1]["BTC"].getPrice(), 5.1)
+
     def testLoadFilterFrom(self):
         feed = barfeed.CSVTradeFeed()
         feed.addBarsFromCSV(common.get_data_file_path("bitstampUSD.csv"), "bitstampUSD", fromDateTime=dt.as_utc(datetime.datetime(2012, 5, 29)))
@@ -18,7 +18,9 @@
 .. moduleauthor:: Gabriel Martin Becedillas Ruiz <gabriel.becedillas@gmail.com>
 """
 
+import bz2
 import csv
+import gzip
 import os
 import shutil
 import subprocess
@@ -126,6 +128,23 @@ def get_data_file_path(fileName):
     return os.path.join(os.path.split(__file__)[0], "data", fileName)
 
 
+def compress_file(path, compressedPath):
+    """Compresses a file using the compression that matches the extension of compressedPath (.gz, .bz2 or .xz)."""
+    openers = {".gz": gzip.GzipFile, ".bz2": bz2.BZ2File}
+    extension = os.path.splitext(compressedPath)[1]
+    if extension == ".xz":
+        import lzma
+        opener = lzma.LZMAFile
+    else:
+        opener = openers[extension]
+    with open(path, "rb") as src:
+        dst = opener(compressedPath, "wb")
+        try:
+            shutil.copyfileobj(src, dst)
+        finally:
+            dst.close()
+
+
 def test_from_csv(testcase, filename, filterClassBuilder, roundDecimals=2, maxLen=None):
     inputValues, expectedValues = load_test_csv(get_data_file_path(filename))
     inputDS = dataseries.SequenceDataSeries(maxLen=maxLen)
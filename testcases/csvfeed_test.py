@@ -58,6 +58,19 @@ class TestCase(common.TestCase):
         self.assertEqual(feed["Volume"][-1], 31655500)
         self.assertEqual(feed["Adj Close"][-1], 28.41)
 
+    def testCompressedFile(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "orcl-2000-yahoofinance.csv.xz")
+            common.compress_file(common.get_data_file_path("orcl-2000-yahoofinance.csv"), path)
+            feed = csvfeed.Feed("Date", "%Y-%m-%d")
+            feed.addValuesFromCSV(path)
+
+            disp = dispatcher.Dispatcher()
+            disp.addSubject(feed)
+            disp.run()
+            self.assertEqual(len(feed["Close"]), 252)
+            self.assertEqual(feed["Close"][-1], 29.06)
+
     def testFeedWithQuandl(self):
         class RowFilter(csvfeed.RowFilter):
             def includeRow(self, dateTime, values):
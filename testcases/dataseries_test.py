@@ -20,6 +20,7 @@
 
 import datetime
 
+import numpy as np
 from six.moves import xrange
 
 from . import common
@@ -27,7 +28,10 @@ from . import common
 from pyalgotrade import dataseries
 from pyalgotrade.dataseries import bards
 from pyalgotrade.dataseries import aligned
+from pyalgotrade.tickdataseries import tickds
 from pyalgotrade import bar
+from pyalgotrade import tick
+from pyalgotrade import marketsession
 
 
 class TestSequenceDataSeries(common.TestCase):
@@ -215,6 +219,151 @@ class TestBarDataSeries(common.TestCase):
             self.assertEqual(ds.getDateTimes()[i], firstDt + datetime.timedelta(seconds=i))
 
 
+class TestColumnarBarDataSeries(common.TestCase):
+    def testEmpty(self):
+        ds = bards.ColumnarBarDataSeries()
+        self.assertEqual(len(ds), 0)
+        with self.assertRaises(IndexError):
+            ds[-1]
+        with self.assertRaises(IndexError):
+            ds[0]
+        self.assertEqual(len(ds.getCloseArray()), 0)
+        self.assertEqual(len(ds.getCloseDataSeries()), 0)
+
+    def testValues(self):
+        ds = bards.ColumnarBarDataSeries()
+        firstDt = datetime.datetime(2018, 1, 2, 9, 30)
+        for i in xrange(10):
+            ds.append(bar.BasicBar(firstDt + datetime.timedelta(minutes=i), 2 + i, 4 + i, 1 + i, 3 + i, 10, None, bar.Frequency.MINUTE))
+
+        self.assertEqual(len(ds), 10)
+        self.assertEqual(ds[-1].getDateTime(), firstDt + datetime.timedelta(minutes=9))
+        self.assertEqual(ds[-1].getOpen(), 11)
+        self.assertEqual(ds[-1].getHigh(), 13)
+        self.assertEqual(ds[-1].getLow(), 10)
+        self.assertEqual(ds[-1].getClose(), 12)
+        self.assertEqual(ds[-1].getVolume(), 10)
+        self.assertEqual(ds[-1].getAdjClose(), None)
+        self.assertEqual(ds[-1].getFrequency(), bar.Frequency.MINUTE)
+        self.assertEqual(ds.getDateTimes(), [firstDt + datetime.timedelta(minutes=i) for i in xrange(10)])
+        self.assertEqual(ds.getCloseArray().tolist(), list(xrange(3, 13)))
+        self.assertEqual(ds.getAdjCloseDataSeries()[-1], None)
+
+    def testNestedDataSeries(self):
+        ds = bards.ColumnarBarDataSeries()
+        for i in xrange(10):
+            ds.append(bar.BasicBar(datetime.datetime(2018, 1, 1) + datetime.timedelta(seconds=i), 2, 4, 1, 3, 10, 3, bar.Frequency.SECOND))
+
+        for i in xrange(10):
+            self.assertEqual(ds.getOpenDataSeries()[i], 2)
+            self.assertEqual(ds.getCloseDataSeries()[i], 3)
+            self.assertEqual(ds.getHighDataSeries()[i], 4)
+            self.assertEqual(ds.getLowDataSeries()[i], 1)
+            self.assertEqual(ds.getVolumeDataSeries()[i], 10)
+            self.assertEqual(ds.getAdjCloseDataSeries()[i], 3)
+            self.assertEqual(ds.getPriceDataSeries()[i], 3)
+        self.assertEqual(ds.getCloseDataSeries().getDateTimes(), ds.getDateTimes())
+
+    def testExtraColumns(self):
+        ds = bards.ColumnarBarDataSeries()
+        now = datetime.datetime(2018, 1, 1)
+        values = []
+        ds.getExtraDataSeries("foo").getNewValueEvent().subscribe(lambda ds_, dateTime, value: values.append(value))
+        ds.append(bar.BasicBar(now, 1, 1, 1, 1, 1, 1, bar.Frequency.DAY, extra={"foo": 5}))
+        ds.append(bar.BasicBar(now + datetime.timedelta(days=1), 1, 1, 1, 1, 1, 1, bar.Frequency.DAY))
+
+        self.assertEqual(values, [5, None])
+        self.assertEqual(ds.getExtraDataSeries("foo")[:], [5, None])
+        self.assertEqual(ds[0].getExtraColumns(), {"foo": 5})
+        self.assertEqual(ds[1].getExtraColumns(), {})
+
+        array = ds.getExtraDataSeries("foo").getArray()
+        self.assertEqual(array[0], 5)
+        self.assertTrue(np.isnan(array[1]))
+        self.assertTrue(np.isnan(ds.getColumnArray("bar")).all())
+
+    def testBounded(self):
+        ds = bards.ColumnarBarDataSeries(maxLen=3)
+        now = datetime.datetime(2018, 1, 1)
+        for i in xrange(10):
+            ds.append(bar.BasicBar(now + datetime.timedelta(days=i), i, i, i, i, i, i, bar.Frequency.DAY, extra={"i": i}))
+        self.assertEqual(len(ds), 3)
+        self.assertEqual(ds.getCloseArray().tolist(), [7, 8, 9])
+        self.assertEqual(ds[0].getDateTime(), now + datetime.timedelta(days=7))
+        self.assertEqual(ds[0].getExtraColumns(), {"i": 7})
+
+        ds.setMaxLen(2)
+        self.assertEqual(ds.getCloseDataSeries()[:], [8, 9])
+        self.assertEqual(ds.getExtraDataSeries("i")[:], [8, 9])
+
+    def testEventsOnlyForRequestedColumns(self):
+        ds = bards.ColumnarBarDataSeries()
+        values = []
+        ds.getCloseDataSeries().getNewValueEvent().subscribe(lambda ds_, dateTime, value: values.append(value))
+        ds.append(bar.BasicBar(datetime.datetime(2018, 1, 1), 1, 4, 1, 3, 10, 3, bar.Frequency.DAY))
+        self.assertEqual(values, [3])
+
+
+class TestTickDataSeries(common.TestCase):
+    def testEmpty(self):
+        ds = tickds.TickDataSeries()
+        self.assertEqual(len(ds), 0)
+        with self.assertRaises(IndexError):
+            ds[-1]
+        with self.assertRaises(IndexError):
+            ds[0]
+        self.assertEqual(len(ds.getBidArray()), 0)
+        self.assertEqual(ds.getDateTimes(), [])
+
+    def testValues(self):
+        ds = tickds.TickDataSeries()
+        firstDt = datetime.datetime(2018, 1, 2, 3, 4, 5, 678)
+        for i in xrange(10):
+            ds.append(tick.BasicTick(firstDt + datetime.timedelta(seconds=i), 1 + i, 2 + i))
+
+        self.assertEqual(len(ds), 10)
+        for i in xrange(-10, 10):
+            self.assertEqual(ds[i].getDateTime(), firstDt + datetime.timedelta(seconds=i % 10))
+            self.assertEqual(ds[i].getBid(), 1 + i % 10)
+            self.assertEqual(ds[i].getAsk(), 2 + i % 10)
+        self.assertEqual([t.getBid() for t in ds[-3:]], [8, 9, 10])
+        self.assertEqual(ds.getDateTimes(), [firstDt + datetime.timedelta(seconds=i) for i in xrange(10)])
+
+        self.assertEqual(ds.getBidArray().tolist(), list(xrange(1, 11)))
+        self.assertEqual(ds.getAskArray().tolist(), list(xrange(2, 12)))
+        self.assertEqual(ds.getTimestampArray()[1] - ds.getTimestampArray()[0], 10**9)
+        self.assertEqual(ds.getBidDataSeries()[-1], 10)
+        self.assertEqual(ds.getAskDataSeries()[:2], [2, 3])
+        self.assertEqual(ds.getBidDataSeries().getDateTimes(), ds.getDateTimes())
+
+    def testBounded(self):
+        ds = tickds.TickDataSeries(maxLen=3)
+        now = datetime.datetime(2018, 1, 1)
+        for i in xrange(10):
+            ds.append(tick.BasicTick(now + datetime.timedelta(seconds=i), i, i))
+        self.assertEqual(len(ds), 3)
+        self.assertEqual(ds.getBidArray().tolist(), [7, 8, 9])
+        self.assertEqual(ds[0].getDateTime(), now + datetime.timedelta(seconds=7))
+
+        ds.setMaxLen(2)
+        self.assertEqual(ds.getBidDataSeries()[:], [8, 9])
+
+    def testLocalizedDateTimes(self):
+        ds = tickds.TickDataSeries()
+        dateTime = marketsession.USEquities.timezone.localize(datetime.datetime(2018, 7, 2, 9, 30))
+        ds.append(tick.BasicTick(dateTime, 1, 2))
+        self.assertEqual(ds[0].getDateTime(), dateTime)
+        self.assertEqual(ds[0].getDateTime().utcoffset(), dateTime.utcoffset())
+        self.assertEqual(ds.getDateTimes(), [dateTime])
+
+    def testEventsOnlyForRequestedColumns(self):
+        ds = tickds.TickDataSeries()
+        values = []
+        ds.getAskDataSeries().getNewValueEvent().subscribe(lambda ds_, dateTime, value: values.append(value))
+        ds.append(tick.BasicTick(datetime.datetime(2018, 1, 1), 1, 2))
+        self.assertEqual(values, [2])
+
+
 class TestDateAlignedDataSeries(common.TestCase):
     def testNotAligned(self):
         size = 20
@@ -407,6 +556,118 @@ class TestDateAlignedDataSeries(common.TestCase):
         self.assertEqual(ads2[:], [2, 3])
 
 
+class TestDateTimeIndex(common.TestCase):
+    def testEmpty(self):
+        dateTimeIndex = dataseries.DateTimeIndex()
+        self.assertEqual(len(dateTimeIndex), 0)
+        self.assertEqual(dateTimeIndex.getDateTimes(), [])
+        self.assertEqual(dateTimeIndex.getSlice(datetime.datetime(2018, 1, 1)), slice(0, 0))
+
+    def testBounded(self):
+        dateTimeIndex = dataseries.DateTimeIndex(3)
+        now = datetime.datetime(2018, 1, 1)
+        for i in xrange(10):
+            dateTimeIndex.append(now + datetime.timedelta(seconds=i))
+        self.assertEqual(len(dateTimeIndex), 3)
+        self.assertEqual(dateTimeIndex.getDateTimes(), [now + datetime.timedelta(seconds=i) for i in xrange(7, 10)])
+        self.assertEqual(dateTimeIndex.getDateTimes(2), [now + datetime.timedelta(seconds=i) for i in xrange(8, 10)])
+        self.assertEqual(dateTimeIndex.getDateTimeAbsolute(0), now + datetime.timedelta(seconds=7))
+
+    def testSlice(self):
+        dateTimeIndex = dataseries.DateTimeIndex()
+        now = datetime.datetime(2018, 1, 1)
+        for i in xrange(10):
+            dateTimeIndex.append(now + datetime.timedelta(seconds=i * 2))
+        self.assertEqual(dateTimeIndex.getSlice(), slice(0, 10))
+        self.assertEqual(dateTimeIndex.getSlice(now + datetime.timedelta(seconds=2), now + datetime.timedelta(seconds=6)), slice(1, 4))
+        self.assertEqual(dateTimeIndex.getSlice(now + datetime.timedelta(seconds=3), now + datetime.timedelta(seconds=5)), slice(2, 3))
+        self.assertEqual(dateTimeIndex.getSlice(now + datetime.timedelta(seconds=5), now + datetime.timedelta(seconds=5)), slice(3, 3))
+        self.assertEqual(dateTimeIndex.getSlice(toDateTime=now + datetime.timedelta(seconds=2)), slice(0, 2))
+        # Positions are relative to the last 4 datetimes.
+        self.assertEqual(dateTimeIndex.getSlice(now + datetime.timedelta(seconds=14), count=4), slice(1, 4))
+
+    def testLocalized(self):
+        dateTimeIndex = dataseries.DateTimeIndex()
+        # Across a DST change.
+        dateTimes = [
+            marketsession.USEquities.timezone.localize(datetime.datetime(2018, 3, 9, 16)),
+            marketsession.USEquities.timezone.localize(datetime.datetime(2018, 3, 12, 16)),
+        ]
+        for dateTime in dateTimes:
+            dateTimeIndex.append(dateTime)
+        self.assertEqual(dateTimeIndex.getDateTimes(), dateTimes)
+        self.assertEqual([dateTime.utcoffset() for dateTime in dateTimeIndex.getDateTimes()], [dateTime.utcoffset() for dateTime in dateTimes])
+
+    def testDateTimesAreKept(self):
+        dateTimeIndex = dataseries.DateTimeIndex(3)
+        now = datetime.datetime(2018, 1, 1)
+        dateTimeIndex.append(now)
+        dateTimeIndex.append(now + datetime.timedelta(seconds=1))
+        dateTimes = dateTimeIndex.getDateTimes()
+        # Datetimes are not built again on every call.
+        self.assertIs(dateTimeIndex.getDateTimes(), dateTimes)
+        self.assertIs(dateTimeIndex.getDateTimes(1), dateTimeIndex.getDateTimes(1))
+
+        for i in xrange(2, 5):
+            dateTimeIndex.append(now + datetime.timedelta(seconds=i))
+            self.assertEqual(dateTimeIndex.getDateTimes(), [now + datetime.timedelta(seconds=j) for j in xrange(i - 2, i + 1)])
+            self.assertEqual(dateTimeIndex.getDateTimes(1), [now + datetime.timedelta(seconds=i)])
+        dateTimeIndex.resize(2)
+        self.assertEqual(dateTimeIndex.getDateTimes(), [now + datetime.timedelta(seconds=j) for j in xrange(3, 5)])
+
+
+class TestSharedDateTimeIndex(common.TestCase):
+    def testSequenceDataSeries(self):
+        dateTimeIndex = dataseries.DateTimeIndex(5)
+        ds1 = dataseries.SequenceDataSeries(5, dateTimeIndex)
+        ds2 = dataseries.SequenceDataSeries(2, dateTimeIndex)
+        now = datetime.datetime(2018, 1, 1)
+        for i in xrange(10):
+            dateTime = now + datetime.timedelta(days=i)
+            dateTimeIndex.append(dateTime)
+            ds1.appendWithDateTime(dateTime, i)
+            ds2.appendWithDateTime(dateTime, i * 2)
+
+        self.assertEqual(ds1.getDateTimeIndex(), dateTimeIndex)
+        self.assertEqual(ds1.getDateTimes(), [now + datetime.timedelta(days=i) for i in xrange(5, 10)])
+        self.assertEqual(ds2.getDateTimes(), [now + datetime.timedelta(days=i) for i in xrange(8, 10)])
+        self.assertEqual(ds2[:], [16, 18])
+        self.assertEqual(ds1[ds1.getDateTimeSlice(now + datetime.timedelta(days=7))], [7, 8, 9])
+        self.assertEqual(ds2[ds2.getDateTimeSlice(toDateTime=now + datetime.timedelta(days=8))], [16])
+
+    def testMaxLenTooBig(self):
+        dateTimeIndex = dataseries.DateTimeIndex(5)
+        with self.assertRaisesRegexp(Exception, "maxLen can't be bigger than the datetime index maximum length"):
+            dataseries.SequenceDataSeries(6, dateTimeIndex)
+        ds = dataseries.SequenceDataSeries(5, dateTimeIndex)
+        with self.assertRaisesRegexp(Exception, "maxLen can't be bigger than the datetime index maximum length"):
+            ds.setMaxLen(6)
+
+    def testNotShared(self):
+        ds = dataseries.SequenceDataSeries()
+        now = datetime.datetime(2018, 1, 1)
+        for i in xrange(10):
+            ds.appendWithDateTime(now + datetime.timedelta(days=i), i)
+        self.assertEqual(ds.getDateTimeIndex(), None)
+        self.assertEqual(ds[ds.getDateTimeSlice(now + datetime.timedelta(days=2), now + datetime.timedelta(days=4))], [2, 3, 4])
+
+    def testBarDataSeries(self):
+        ds = bards.BarDataSeries(3)
+        now = datetime.datetime(2018, 1, 1)
+        for i in xrange(10):
+            ds.append(bar.BasicBar(now + datetime.timedelta(days=i), i, i, i, i, i, i, bar.Frequency.DAY))
+
+        dateTimes = [now + datetime.timedelta(days=i) for i in xrange(7, 10)]
+        self.assertEqual(ds.getDateTimes(), dateTimes)
+        for nestedDS in [ds.getOpenDataSeries(), ds.getCloseDataSeries(), ds.getAdjCloseDataSeries()]:
+            self.assertEqual(nestedDS.getDateTimeIndex(), ds.getDateTimeIndex())
+            self.assertEqual(nestedDS.getDateTimes(), dateTimes)
+
+        ds.setMaxLen(2)
+        self.assertEqual(ds.getCloseDataSeries().getDateTimes(), dateTimes[1:])
+        self.assertEqual(ds.getCloseDataSeries()[:], [8, 9])
+
+
 class TestUpdatedDefaultMaxLen(common.TestCase):
     def setUp(self):
         super(TestUpdatedDefaultMaxLen, self).setUp()
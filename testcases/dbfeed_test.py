@@ -18,7 +18,10 @@
 .. moduleauthor:: Gabriel Martin Becedillas Ruiz <gabriel.becedillas@gmail.com>
 """
 
+import datetime
 import os
+import shutil
+import sqlite3
 
 from six.moves import xrange
 
@@ -29,6 +32,7 @@ from pyalgotrade.barfeed import yahoofeed
 from pyalgotrade.barfeed import sqlitefeed
 from pyalgotrade import bar
 from pyalgotrade import marketsession
+from pyalgotrade.utils import dt
 
 
 class TemporarySQLiteFeed:
@@ -127,3 +131,200 @@ class SQLiteFeedTestCase(common.TestCase):
             self.assertEqual(len(barDS.getHighDataSeries()), 2)
             self.assertEqual(len(barDS.getLowDataSeries()), 2)
             self.assertEqual(len(barDS.getAdjCloseDataSeries()), 2)
+
+
+def build_bars(count, open_=10):
+    return [
+        bar.BasicBar(datetime.datetime(2000, 1, 3) + datetime.timedelta(days=i), open_, 12, 9, 11, 1000, 11, bar.Frequency.DAY)
+        for i in xrange(count)
+    ]
+
+
+class BulkIngestionTestCase(common.TestCase):
+    def testUpsert(self):
+        with common.TmpDir() as tmpPath:
+            db = sqlitefeed.Database(os.path.join(tmpPath, "bars.sqlite"))
+            self.assertEqual(db.addBarsFromSequence("orcl", build_bars(10), bar.Frequency.DAY, batchSize=3), 10)
+            # Existing bars get updated, and new ones get inserted.
+            self.assertEqual(db.addBarsFromSequence("orcl", build_bars(15, open_=10.5), bar.Frequency.DAY), 15)
+            bars = db.getBars("orcl", bar.Frequency.DAY)
+            self.assertEqual(len(bars), 15)
+            self.assertEqual(set(bar_.getOpen() for bar_ in bars), set([10.5]))
+
+            db.addBar("orcl", build_bars(1, open_=9.5)[0], bar.Frequency.DAY)
+            bars = db.getBars("orcl", bar.Frequency.DAY)
+            self.assertEqual(len(bars), 15)
+            self.assertEqual(bars[0].getOpen(), 9.5)
+            db.disconnect()
+
+    def testSameAsYahooFeed(self):
+        with common.TmpDir() as tmpPath:
+            yahooFeed = yahoofeed.Feed()
+            yahooFeed.addBarsFromCSV("orcl", common.get_data_file_path("orcl-2000-yahoofinance.csv"))
+            yahooFeed.addBarsFromCSV("spy", common.get_data_file_path("spy-2011-yahoofinance.csv"))
+            db = sqlitefeed.Database(os.path.join(tmpPath, "bars.sqlite"))
+            self.assertEqual(db.addBarsFromFeed(yahooFeed, batchSize=100), len(yahooFeed["orcl"]) + len(yahooFeed["spy"]))
+            for instrument in ["orcl", "spy"]:
+                self.assertEqual(
+                    [(dt.unlocalize(bar_.getDateTime()), bar_.getClose()) for bar_ in db.getBars(instrument, bar.Frequency.DAY)],
+                    [(bar_.getDateTime(), bar_.getClose()) for bar_ in yahooFeed[instrument]]
+                )
+            db.disconnect()
+
+    def testRollbackOnError(self):
+        class NoOpenBar(bar.BasicBar):
+            def getOpen(self, adjusted=False):
+                return None
+
+        with common.TmpDir() as tmpPath:
+            db = sqlitefeed.Database(os.path.join(tmpPath, "bars.sqlite"))
+            bars = build_bars(10)
+            bars.append(NoOpenBar(datetime.datetime(2001, 1, 1), 10, 12, 9, 11, 1000, 11, bar.Frequency.DAY))
+            with self.assertRaises(sqlite3.IntegrityError):
+                db.addBarsFromSequence("orcl", bars, bar.Frequency.DAY, batchSize=4)
+            self.assertEqual(db.getBars("orcl", bar.Frequency.DAY), [])
+            db.disconnect()
+
+    def testInstrumentsAddedInRolledBackTransaction(self):
+        class NoOpenBar(bar.BasicBar):
+            def getOpen(self, adjusted=False):
+                return None
+
+        with common.TmpDir() as tmpPath:
+            dbFilePath = os.path.join(tmpPath, "bars.sqlite")
+            db = sqlitefeed.Database(dbFilePath)
+            badBar = NoOpenBar(datetime.datetime(2001, 1, 1), 10, 12, 9, 11, 1000, 11, bar.Frequency.DAY)
+            with self.assertRaises(sqlite3.IntegrityError):
+                db.addBars(bar.Bars({"new": badBar}), bar.Frequency.DAY)
+            # The instrument was rolled back, so it gets added again.
+            db.addBar("new", build_bars(1)[0], bar.Frequency.DAY)
+            self.assertEqual(len(db.getBars("new", bar.Frequency.DAY)), 1)
+            db.disconnect()
+
+            db = sqlitefeed.Database(dbFilePath)
+            self.assertEqual(len(db.getBars("new", bar.Frequency.DAY)), 1)
+            db.disconnect()
+
+    def testWriteAheadLogging(self):
+        with common.TmpDir() as tmpPath:
+            dbFilePath = os.path.join(tmpPath, "bars.sqlite")
+            sqlitefeed.Database(dbFilePath).disconnect()
+            connection = sqlite3.connect(dbFilePath)
+            self.assertEqual(connection.execute("pragma journal_mode").fetchone()[0], "wal")
+            connection.close()
+
+    def testReadingDoesNotModifyTheDatabase(self):
+        with common.TmpDir() as tmpPath:
+            dbFilePath = os.path.join(tmpPath, "multiinstrument.sqlite")
+            shutil.copy(common.get_data_file_path("multiinstrument.sqlite"), dbFilePath)
+            with open(dbFilePath, "rb") as f:
+                contents = f.read()
+
+            db = sqlitefeed.Database(dbFilePath)
+            self.assertTrue(len(db.getBars("spy", bar.Frequency.DAY)) > 0)
+            self.assertTrue(len(list(db.iterBars(["spy", "goog"], bar.Frequency.DAY))) > 0)
+            db.disconnect()
+            with open(dbFilePath, "rb") as f:
+                self.assertEqual(f.read(), contents)
+
+            # The index and write-ahead logging are added with the first write.
+            db = sqlitefeed.Database(dbFilePath)
+            db.addBarsFromSequence("orcl", build_bars(1), bar.Frequency.DAY)
+            db.disconnect()
+            connection = sqlite3.connect(dbFilePath)
+            self.assertEqual(connection.execute("pragma journal_mode").fetchone()[0], "wal")
+            self.assertEqual(connection.execute(
+                "select count(*) from sqlite_master where name = 'bar_frequency_timestamp'"
+            ).fetchone()[0], 1)
+            connection.close()
+
+    def testCreateIndexes(self):
+        with common.TmpDir() as tmpPath:
+            dbFilePath = os.path.join(tmpPath, "multiinstrument.sqlite")
+            shutil.copy(common.get_data_file_path("multiinstrument.sqlite"), dbFilePath)
+            # The query that iterBars runs.
+            sql = "explain query plan select instrument_id, timestamp, open, high, low, close, volume, adj_close" \
+                ", frequency from bar where frequency = ? and instrument_id in (1, 2) order by timestamp asc"
+            connection = sqlite3.connect(dbFilePath)
+            self.assertIn("TEMP B-TREE", str(connection.execute(sql, [bar.Frequency.DAY]).fetchall()))
+            connection.close()
+
+            db = sqlitefeed.Database(dbFilePath)
+            db.createIndexes()
+            db.disconnect()
+            connection = sqlite3.connect(dbFilePath)
+            plan = str(connection.execute(sql, [bar.Frequency.DAY]).fetchall())
+            self.assertIn("bar_frequency_timestamp", plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+            connection.close()
+
+
+def bars_to_tuples(barFeed):
+    return [
+        (dateTime, sorted((instrument, bars[instrument].getClose()) for instrument in bars.getInstruments()))
+        for dateTime, bars in barFeed
+    ]
+
+
+class StreamingFeedTestCase(common.TestCase):
+    INSTRUMENTS = ["spy", "goog", "nikkei"]
+
+    def __buildDatabase(self, dbFilePath):
+        yahooFeed = yahoofeed.Feed()
+        for instrument in StreamingFeedTestCase.INSTRUMENTS:
+            yahooFeed.addBarsFromCSV(instrument, common.get_data_file_path("%s-2011-yahoofinance.csv" % instrument))
+        db = sqlitefeed.Database(dbFilePath)
+        db.addBarsFromFeed(yahooFeed)
+        db.disconnect()
+
+    def testSameAsInMemory(self):
+        with common.TmpDir() as tmpPath:
+            dbFilePath = os.path.join(tmpPath, "bars.sqlite")
+            self.__buildDatabase(dbFilePath)
+
+            for timezone, fromDateTime, toDateTime in [
+                (None, None, None),
+                (marketsession.USEquities.timezone, datetime.datetime(2011, 3, 1), datetime.datetime(2011, 6, 30)),
+            ]:
+                memFeed = sqlitefeed.Feed(dbFilePath, bar.Frequency.DAY)
+                for instrument in StreamingFeedTestCase.INSTRUMENTS:
+                    memFeed.loadBars(instrument, timezone, fromDateTime, toDateTime)
+                expected = bars_to_tuples(memFeed)
+                self.assertTrue(len(expected) > 50)
+                # Not all instruments trade on the same days.
+                self.assertTrue(any(len(closes) < 3 for dateTime, closes in expected))
+
+                streamingFeed = sqlitefeed.StreamingFeed(
+                    dbFilePath, bar.Frequency.DAY, StreamingFeedTestCase.INSTRUMENTS + ["unknown"], timezone,
+                    fromDateTime, toDateTime, fetchSize=7
+                )
+                self.assertEqual(
+                    sorted(streamingFeed.getRegisteredInstruments()), sorted(StreamingFeedTestCase.INSTRUMENTS + ["unknown"])
+                )
+                self.assertEqual(bars_to_tuples(streamingFeed), expected)
+                if timezone is not None:
+                    self.assertEqual(streamingFeed["spy"][0].getDateTime().tzinfo.zone, timezone.zone)
+                self.assertEqual(len(streamingFeed["spy"]), len(memFeed["spy"]))
+                self.assertEqual(len(streamingFeed["unknown"]), 0)
+
+                # Bars are read again after a reset.
+                streamingFeed.reset()
+                self.assertEqual(bars_to_tuples(streamingFeed), expected)
+                streamingFeed.getDatabase().disconnect()
+                memFeed.getDatabase().disconnect()
+
+    def testStop(self):
+        with common.TmpDir() as tmpPath:
+            dbFilePath = os.path.join(tmpPath, "bars.sqlite")
+            self.__buildDatabase(dbFilePath)
+
+            streamingFeed = sqlitefeed.StreamingFeed(dbFilePath, bar.Frequency.DAY, ["spy"], fetchSize=2)
+            streamingFeed.start()
+            self.assertEqual(streamingFeed.peekDateTime().date(), datetime.date(2011, 1, 3))
+            self.assertEqual(streamingFeed.getNextBars().getDateTime().date(), datetime.date(2011, 1, 3))
+            self.assertEqual(streamingFeed.getCurrentDateTime().date(), datetime.date(2011, 1, 3))
+            self.assertFalse(streamingFeed.eof())
+            streamingFeed.stop()
+            self.assertTrue(streamingFeed.eof())
+            self.assertEqual(streamingFeed.getNextBars(), None)
+            streamingFeed.getDatabase().disconnect()
@@ -86,6 +86,27 @@ class TestCase(common.TestCase):
 
         self.__testDifferentTimezonesImpl(feed)
 
+    def testDifferentTimezones_PriorityQueue(self):
+        results = []
+        for usePriorityQueue in [False, True]:
+            feed = yahoofeed.Feed()
+            for year in [2010, 2011]:
+                feed.addBarsFromCSV("^n225", common.get_data_file_path("nikkei-%d-yahoofinance.csv" % year), marketsession.TSE.getTimezone())
+                feed.addBarsFromCSV("spy", common.get_data_file_path("spy-%d-yahoofinance.csv" % year), marketsession.USEquities.getTimezone())
+            strat = NikkeiSpyStrategy(feed, 34)
+            strat.getDispatcher().setUsePriorityQueue(usePriorityQueue)
+            # Resampled bar feeds are realtime subjects.
+            monthlyBars = []
+            strat.resampleBarFeed(
+                bar.Frequency.MONTH,
+                lambda bars: monthlyBars.append((bars.getDateTime(), sorted(bars.getInstruments())))
+            )
+            strat.run()
+            self.assertEqual(round(strat.getResult(), 2), 1033854.48)
+            self.assertTrue(len(monthlyBars) > 20)
+            results.append(monthlyBars)
+        self.assertEqual(results[0], results[1])
+
     def testDifferentTimezones_DBFeed(self):
         feed = sqlitefeed.Feed(common.get_data_file_path("multiinstrument.sqlite"), bar.Frequency.DAY)
         feed.loadBars("^n225")
@@ -98,6 +98,9 @@ class RealtimeFeed(observer.Subject):
 
 
 class DispatcherTestCase(common.TestCase):
+    def buildDispatcher(self):
+        return dispatcher.Dispatcher()
+
     def test1NrtFeed(self):
         values = []
         now = datetime.datetime.now()
@@ -105,7 +108,7 @@ class DispatcherTestCase(common.TestCase):
         nrtFeed = NonRealtimeFeed(copy.copy(datetimes))
         nrtFeed.getEvent().subscribe(lambda x: values.append(x))
 
-        disp = dispatcher.Dispatcher()
+        disp = self.buildDispatcher()
         disp.addSubject(nrtFeed)
         disp.run()
 
@@ -121,7 +124,7 @@ class DispatcherTestCase(common.TestCase):
         nrtFeed2 = NonRealtimeFeed(copy.copy(datetimes2))
         nrtFeed2.getEvent().subscribe(lambda x: values.append(x))
 
-        disp = dispatcher.Dispatcher()
+        disp = self.buildDispatcher()
         disp.addSubject(nrtFeed1)
         disp.addSubject(nrtFeed2)
         disp.run()
@@ -137,7 +140,7 @@ class DispatcherTestCase(common.TestCase):
         nrtFeed = RealtimeFeed(copy.copy(datetimes))
         nrtFeed.getEvent().subscribe(lambda x: values.append(x))
 
-        disp = dispatcher.Dispatcher()
+        disp = self.buildDispatcher()
         disp.addSubject(nrtFeed)
         disp.run()
 
@@ -153,7 +156,7 @@ class DispatcherTestCase(common.TestCase):
         nrtFeed2 = RealtimeFeed(copy.copy(datetimes2))
         nrtFeed2.getEvent().subscribe(lambda x: values.append(x))
 
-        disp = dispatcher.Dispatcher()
+        disp = self.buildDispatcher()
         disp.addSubject(nrtFeed1)
         disp.addSubject(nrtFeed2)
         disp.run()
@@ -173,7 +176,7 @@ class DispatcherTestCase(common.TestCase):
         nrtFeed2 = NonRealtimeFeed(copy.copy(datetimes2))
         nrtFeed2.getEvent().subscribe(lambda x: values.append(x))
 
-        disp = dispatcher.Dispatcher()
+        disp = self.buildDispatcher()
         disp.addSubject(nrtFeed1)
         disp.addSubject(nrtFeed2)
         disp.run()
@@ -189,19 +192,19 @@ class DispatcherTestCase(common.TestCase):
         feed2 = RealtimeFeed([], 3)
         feed1 = RealtimeFeed([], 0)
 
-        disp = dispatcher.Dispatcher()
+        disp = self.buildDispatcher()
         disp.addSubject(feed3)
         disp.addSubject(feed2)
         disp.addSubject(feed1)
         self.assertEqual(disp.getSubjects(), [feed1, feed2, feed3])
 
-        disp = dispatcher.Dispatcher()
+        disp = self.buildDispatcher()
         disp.addSubject(feed1)
         disp.addSubject(feed2)
         disp.addSubject(feed3)
         self.assertEqual(disp.getSubjects(), [feed1, feed2, feed3])
 
-        disp = dispatcher.Dispatcher()
+        disp = self.buildDispatcher()
         disp.addSubject(feed3)
         disp.addSubject(feed4)
         disp.addSubject(feed2)
@@ -216,7 +219,7 @@ class DispatcherTestCase(common.TestCase):
         feed1.getEvent().subscribe(lambda x: values.append(x))
         feed2.getEvent().subscribe(lambda x: values.append(x))
 
-        disp = dispatcher.Dispatcher()
+        disp = self.buildDispatcher()
         disp.addSubject(feed2)
         disp.addSubject(feed1)
         self.assertEqual(disp.getSubjects(), [feed1, feed2])
@@ -224,6 +227,85 @@ class DispatcherTestCase(common.TestCase):
         # Check that although feed2 is realtime, feed1 was dispatched before.
         self.assertTrue(values[0] < values[1])
 
+    def testSameTimestampInPriorityOrder(self):
+        values = []
+        now = datetime.datetime(2018, 1, 1)
+        feeds = [
+            NonRealtimeFeed([now, now + datetime.timedelta(seconds=2)], None),
+            NonRealtimeFeed([now, now + datetime.timedelta(seconds=1)], 3),
+            RealtimeFeed([now + datetime.timedelta(days=1)] * 3, 1),
+            NonRealtimeFeed([now + datetime.timedelta(seconds=1)] * 2, 0),
+        ]
+        for i, feed in enumerate(feeds):
+            feed.getEvent().subscribe(lambda dateTime, i=i: values.append((i, dateTime)))
+
+        disp = self.buildDispatcher()
+        dateTimes = []
+        for feed in feeds:
+            disp.addSubject(feed)
+            feed.getEvent().subscribe(lambda dateTime: dateTimes.append(disp.getCurrentDateTime()))
+        disp.run()
+        second = lambda i: now + datetime.timedelta(seconds=i)
+        self.assertEqual(values, [
+            # The realtime feed gets dispatched on every iteration.
+            (2, now + datetime.timedelta(days=1)), (1, now), (0, now),
+            (3, second(1)), (2, now + datetime.timedelta(days=1)), (1, second(1)),
+            (3, second(1)), (2, now + datetime.timedelta(days=1)),
+            (0, second(2)),
+        ])
+        self.assertEqual(dateTimes, [now] * 3 + [second(1)] * 3 + [second(1)] * 2 + [second(2)])
+
+
+class PriorityQueueDispatcherTestCase(DispatcherTestCase):
+    def buildDispatcher(self):
+        ret = dispatcher.Dispatcher()
+        ret.setUsePriorityQueue(True)
+        return ret
+
+    def testSubjectsAreCheckedAfterTheyDispatch(self):
+        class CountingFeed(NonRealtimeFeed):
+            calls = 0
+
+            def eof(self):
+                CountingFeed.calls += 1
+                return super(CountingFeed, self).eof()
+
+            def peekDateTime(self):
+                CountingFeed.calls += 1
+                return super(CountingFeed, self).peekDateTime()
+
+        now = datetime.datetime(2018, 1, 1)
+        results = []
+        for disp in [dispatcher.Dispatcher(), self.buildDispatcher()]:
+            CountingFeed.calls = 0
+            values = []
+            # 100 feeds with 10 events each, and only one event per datetime.
+            for i in xrange(100):
+                feed = CountingFeed([now + datetime.timedelta(days=i + j * 100) for j in xrange(10)])
+                feed.getEvent().subscribe(lambda dateTime: values.append(dateTime))
+                disp.addSubject(feed)
+            disp.run()
+            self.assertEqual(values, [now + datetime.timedelta(days=i) for i in xrange(1000)])
+            results.append(CountingFeed.calls)
+        self.assertLess(results[1] * 10, results[0])
+
+    def testSubjectsAddedAfterTheFirstIteration(self):
+        values = []
+        now = datetime.datetime(2018, 1, 1)
+        disp = self.buildDispatcher()
+        feed1 = NonRealtimeFeed([now, now + datetime.timedelta(seconds=2)])
+        feed2 = NonRealtimeFeed([now + datetime.timedelta(seconds=1)], 0)
+        feed1.getEvent().subscribe(lambda dateTime: values.append(dateTime))
+        feed2.getEvent().subscribe(lambda dateTime: values.append(dateTime))
+
+        def onFirstEvent(dateTime):
+            if dateTime == now:
+                disp.addSubject(feed2)
+        feed1.getEvent().subscribe(onFirstEvent)
+        disp.addSubject(feed1)
+        disp.run()
+        self.assertEqual(values, [now + datetime.timedelta(seconds=i) for i in xrange(3)])
+
 
 class EventTestCase(common.TestCase):
     def testEmitOrder(self):
@@ -303,3 +385,40 @@ class EventTestCase(common.TestCase):
 
         event.emit()
         self.assertTrue(handlersData == [1, 1])
+
+    def testUnsubscribeOtherWhileEmiting(self):
+        handlersData = []
+        event = observer.Event()
+
+        def handler2():
+            handlersData.append(2)
+
+        def handler1():
+            handlersData.append(1)
+            event.unsubscribe(handler1)
+            event.unsubscribe(handler2)
+
+        event.subscribe(handler1)
+        event.subscribe(handler2)
+        # handler2 was subscribed when emit started, so it still gets called.
+        event.emit()
+        self.assertEqual(handlersData, [1, 2])
+        event.emit()
+        self.assertEqual(handlersData, [1, 2])
+
+    def testUnsubscribeNotSubscribed(self):
+        event = observer.Event()
+        with self.assertRaises(ValueError):
+            event.unsubscribe(lambda: None)
+
+    def testHasSubscribers(self):
+        def handler():
+            pass
+
+        event = observer.Event()
+        self.assertFalse(event.hasSubscribers())
+        event.emit()
+        event.subscribe(handler)
+        self.assertTrue(event.hasSubscribers())
+        event.unsubscribe(handler)
+        self.assertFalse(event.hasSubscribers())
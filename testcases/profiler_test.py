@@ -0,0 +1,135 @@
+# PyAlgoTrade
+#
+# Copyright 2011-2018 Gabriel Martin Becedillas Ruiz
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. moduleauthor:: Gabriel Martin Becedillas Ruiz <gabriel.becedillas@gmail.com>
+"""
+
+from . import common
+from . import tickstrategy_test
+
+from pyalgotrade import observer
+from pyalgotrade import strategy
+from pyalgotrade.barfeed import yahoofeed
+from pyalgotrade.stratanalyzer import returns
+from pyalgotrade.technical import ma
+from pyalgotrade.utils import profiler
+
+
+class SMAStrategy(strategy.BacktestingStrategy):
+    def __init__(self, feed):
+        super(SMAStrategy, self).__init__(feed)
+        self.setDebugMode(False)
+        self.__sma = ma.SMA(feed["orcl"].getCloseDataSeries(), 20)
+        self.__position = None
+
+    def onBars(self, bars):
+        if self.__sma[-1] is None:
+            return
+        if self.__position is None and bars["orcl"].getClose() > self.__sma[-1]:
+            self.__position = self.enterLong("orcl", 10, True)
+        elif self.__position is not None and bars["orcl"].getClose() < self.__sma[-1]:
+            if not self.__position.exitActive():
+                self.__position.exitMarket()
+
+
+def build_strategy():
+    feed = yahoofeed.Feed()
+    feed.addBarsFromCSV("orcl", common.get_data_file_path("orcl-2000-yahoofinance.csv"))
+    return SMAStrategy(feed)
+
+
+class ProfilerTestCase(common.TestCase):
+    def testInstrument(self):
+        class Counter(object):
+            def increment(self, value):
+                return value + 1
+
+        counter = Counter()
+        event = observer.Event()
+        event.subscribe(counter.increment)
+        prof = profiler.Profiler()
+        prof.instrument(counter, "increment")
+        prof.start()
+        self.assertEqual(counter.increment(1), 2)
+        event.emit(1)
+        prof.stop()
+
+        self.assertEqual(prof.getCalls("Counter.increment"), 2)
+        self.assertGreater(prof.getTime("Counter.increment"), 0)
+        self.assertGreaterEqual(prof.getElapsed(), prof.getTime("Counter.increment"))
+        # Instrumentation is removed once stopped.
+        self.assertNotIn("increment", counter.__dict__)
+        event.emit(1)
+        self.assertEqual(prof.getCalls("Counter.increment"), 2)
+
+    def testOnlyOneActive(self):
+        prof = profiler.Profiler()
+        prof.start()
+        try:
+            with self.assertRaisesRegexp(Exception, "Another profiler was already started"):
+                profiler.Profiler().start()
+        finally:
+            prof.stop()
+        with self.assertRaisesRegexp(Exception, "The profiler was not started"):
+            prof.stop()
+
+
+class StrategyProfilingTestCase(common.TestCase):
+    def testDisabledByDefault(self):
+        emit = observer.Event.__dict__["emit"]
+        strat = build_strategy()
+        strat.run()
+        self.assertEqual(strat.getProfiler(), None)
+        self.assertIs(observer.Event.__dict__["emit"], emit)
+
+    def testBarStrategy(self):
+        expected = build_strategy()
+        expected.run()
+
+        strat = build_strategy()
+        strat.setProfilingEnabled(True)
+        strat.attachAnalyzer(returns.Returns())
+        emit = observer.Event.__dict__["emit"]
+        strat.run()
+        self.assertEqual(strat.getResult(), expected.getResult())
+        self.assertIs(observer.Event.__dict__["emit"], emit)
+        self.assertNotIn("onBars", strat.__dict__)
+
+        prof = strat.getProfiler()
+        bars = 252
+        self.assertEqual(prof.getCalls("SMAStrategy.onBars"), bars)
+        self.assertEqual(prof.getCalls("Returns.beforeOnBars"), bars)
+        self.assertEqual(prof.getCalls("Feed.getNextValuesAndUpdateDS"), bars)
+        self.assertEqual(prof.getCalls("Feed.getNextValues"), bars)
+        self.assertEqual(prof.getCalls("Broker.onBars"), bars)
+        self.assertEqual(prof.getCalls("SMA.__onNewValue"), bars)
+        self.assertGreaterEqual(prof.getTime("Feed.getNextValuesAndUpdateDS"), prof.getTime("Feed.getNextValues"))
+
+        report = prof.getReport("SMAStrategy.onBars").split("\n")
+        self.assertTrue(report[0].startswith("252 events in "))
+        self.assertEqual(len(report), len(prof.getPhases()) + 2)
+
+    def testTickStrategy(self):
+        strat = tickstrategy_test.OnTicksStrategy(tickstrategy_test.build_feed(100), [(10, 5), (20, -5)])
+        strat.setProfilingEnabled(True)
+        strat.run()
+
+        prof = strat.getProfiler()
+        self.assertEqual(prof.getCalls("OnTicksStrategy.onTicks"), 100)
+        self.assertEqual(prof.getCalls("TickFeed.getNextValues"), 100)
+        self.assertEqual(prof.getCalls("Broker.onTicks"), 100)
+        self.assertEqual(prof.getCalls("OnTicksStrategy.__onOrderEvent"), 6)
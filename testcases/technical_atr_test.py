@@ -70,3 +70,19 @@ class TestCase(common.TestCase):
         with self.assertRaisesRegexp(Exception, "barDataSeries must be a dataseries.bards.BarDataSeries instance"):
             ds = dataseries.SequenceDataSeries()
             atr.ATR(ds, 14, True)
+
+    def testColumnarDataSeries(self):
+        def load(barDataSeries):
+            atrDS = atr.ATR(barDataSeries, 14)
+            now = datetime.datetime(2000, 1, 1)
+            for i in xrange(30):
+                price = 48 + (i % 7) * 0.3
+                barDataSeries.append(bar.BasicBar(
+                    now + datetime.timedelta(days=i), price, price + 0.5, price - 0.5, price, 100, price, bar.Frequency.DAY
+                ))
+            return atrDS
+
+        expected = load(bards.BarDataSeries())
+        atrDS = load(bards.ColumnarBarDataSeries())
+        self.assertEqual(atrDS[:], expected[:])
+        self.assertNotEqual(atrDS[-1], None)
@@ -32,9 +32,11 @@ from pyalgotrade.dataseries import bards
 class LineBreakTestCase(common.TestCase):
     Instrument = "orcl"
 
-    def __getFeed(self):
+    def __getFeed(self, dataSeriesClass=None):
         # Load the feed and process all bars.
         barFeed = yahoofeed.Feed()
+        if dataSeriesClass is not None:
+            barFeed.setDataSeriesClass(dataSeriesClass)
         barFeed.addBarsFromCSV(LineBreakTestCase.Instrument, common.get_data_file_path("orcl-2001-yahoofinance.csv"))
         return barFeed
 
@@ -92,6 +94,16 @@ class LineBreakTestCase(common.TestCase):
         self.assertEqual(lineBreak[-1].isWhite(), False)
         self.assertEqual(lineBreak[-1].isBlack(), True)
 
+    def testColumnarDataSeries(self):
+        barFeed = self.__getFeed(bards.ColumnarBarDataSeries)
+        lineBreak = linebreak.LineBreak(barFeed[LineBreakTestCase.Instrument], 3)
+        barFeed.loadAll()
+
+        self.assertEqual(len(lineBreak), 33)
+        self.assertEqual(lineBreak[32].getLow(), 10.76)
+        self.assertEqual(lineBreak[32].getHigh(), 10.92)
+        self.assertEqual(lineBreak[32].isBlack(), True)
+
     def testInvalidDataSeries(self):
         with self.assertRaisesRegexp(Exception, "barDataSeries must be a dataseries.bards.BarDataSeries instance"):
             ds = dataseries.SequenceDataSeries()
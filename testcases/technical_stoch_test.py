@@ -116,6 +116,22 @@ class TestCase(common.TestCase):
             self.assertEqual(round(stochFilter[i], 4), kValues[i])
             self.assertEqual(round(stochFilter.getD()[i], 4), dValues[i])
 
+    def testColumnarDataSeries(self):
+        highPrices = [127.0090, 127.6159, 126.5911, 127.3472, 128.1730, 128.4317, 127.3671, 126.4220, 126.8995, 126.8498]
+        lowPrices = [125.3574, 126.1633, 124.9296, 126.0937, 126.8199, 126.4817, 126.0340, 124.8301, 126.3921, 125.7156]
+        closePrices = [126.0, 127.0, 125.5, 127.2, 127.8, 127.0, 126.5, 125.0, 126.8, 126.0]
+
+        barDS = bards.BarDataSeries()
+        expected = stoch.StochasticOscillator(barDS, 5)
+        self.__fillBarDataSeries(barDS, closePrices, highPrices, lowPrices)
+        barDS = bards.ColumnarBarDataSeries()
+        stochFilter = stoch.StochasticOscillator(barDS, 5)
+        self.__fillBarDataSeries(barDS, closePrices, highPrices, lowPrices)
+
+        self.assertEqual(stochFilter[:], expected[:])
+        self.assertEqual(stochFilter.getD()[:], expected.getD()[:])
+        self.assertNotEqual(stochFilter.getD()[-1], None)
+
     def testZeroDivision(self):
         highPrices = [1, 1, 1]
         lowPrices = [1, 1, 1]
@@ -18,10 +18,15 @@
 .. moduleauthor:: Gabriel Martin Becedillas Ruiz <gabriel.becedillas@gmail.com>
 """
 
+import datetime
+
 from . import common
 
 from pyalgotrade import technical
 from pyalgotrade import dataseries
+from pyalgotrade.dataseries import bards
+from pyalgotrade.technical import ma
+from pyalgotrade import bar
 
 
 class TestEventWindow(technical.EventWindow):
@@ -68,3 +73,27 @@ class DataSeriesFilterTest(common.TestCase):
         for i in range(0, len(testFilter)):
             self.assertEqual(testFilter[i], ds[i])
             self.assertEqual(testFilter.getDataSeries()[i], ds[i])
+
+    def testSharedDateTimeIndex(self):
+        barDS = bards.BarDataSeries()
+        sma = ma.SMA(barDS.getCloseDataSeries(), 2)
+        smaOfSma = ma.SMA(sma, 2)
+        now = datetime.datetime(2018, 1, 1)
+        for i in range(5):
+            barDS.append(bar.BasicBar(now + datetime.timedelta(days=i), i, i, i, i, i, i, bar.Frequency.DAY))
+
+        self.assertEqual(sma.getDateTimeIndex(), barDS.getDateTimeIndex())
+        self.assertEqual(smaOfSma.getDateTimeIndex(), barDS.getDateTimeIndex())
+        self.assertEqual(sma.getDateTimes(), barDS.getDateTimes())
+        self.assertEqual(smaOfSma.getDateTimes(), barDS.getDateTimes())
+
+        # Filters created later hold less values.
+        lateSMA = ma.SMA(barDS.getCloseDataSeries(), 2)
+        barDS.append(bar.BasicBar(now + datetime.timedelta(days=5), 5, 5, 5, 5, 5, 5, bar.Frequency.DAY))
+        self.assertEqual(lateSMA.getDateTimes(), [now + datetime.timedelta(days=5)])
+        self.assertEqual(sma[sma.getDateTimeSlice(now + datetime.timedelta(days=4))], [3.5, 4.5])
+
+    def testNotSharedIfTooSmall(self):
+        barDS = bards.BarDataSeries(10)
+        self.assertEqual(ma.SMA(barDS.getCloseDataSeries(), 2, maxLen=10).getDateTimeIndex(), barDS.getDateTimeIndex())
+        self.assertEqual(ma.SMA(barDS.getCloseDataSeries(), 2, maxLen=11).getDateTimeIndex(), None)
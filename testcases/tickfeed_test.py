@@ -0,0 +1,725 @@
+
+"""
+.. moduleauthor:: zkn <zkn@outlook.com>
+"""
+
+import datetime
+import os
+import sqlite3
+
+from . import common
+
+from pyalgotrade import bar
+from pyalgotrade import tick
+from pyalgotrade.barfeed import sqlitefeed as barsqlitefeed
+from pyalgotrade.tickfeed import memtf
+from pyalgotrade.tickfeed import partitionedtf
+from pyalgotrade.tickfeed import sqlitefeed
+from pyalgotrade.tickfeed import streamtf
+from pyalgotrade.tickfeed import txtfeed
+from pyalgotrade.tools import tickarchive
+from pyalgotrade.utils import arraycache
+from pyalgotrade.utils import dt
+
+
+def build_ticks(dateTimes):
+    return [tick.BasicTick(dateTime, 1, 1.0001) for dateTime in dateTimes]
+
+
+class MemTickFeedTestCase(common.TestCase):
+    def testMerge(self):
+        tickFeed = memtf.TickFeed()
+        second = lambda i: datetime.datetime(2018, 1, 1, 0, 0, i)
+        tickFeed.addTicksFromSequence("EURUSD", build_ticks([second(1), second(3), second(3)]))
+        tickFeed.addTicksFromSequence("USDJPY", build_ticks([second(2), second(3)]))
+
+        for i in range(2):
+            tickFeed.start()
+            events = []
+            while not tickFeed.eof():
+                ticks = tickFeed.getNextTicks()
+                events.append((ticks.getDateTime(), sorted(ticks.getInstruments())))
+            self.assertEqual(tickFeed.getNextTicks(), None)
+            # Ticks for the same instrument and datetime are returned one at a time.
+            self.assertEqual(events, [
+                (second(1), ["EURUSD"]),
+                (second(2), ["USDJPY"]),
+                (second(3), ["EURUSD", "USDJPY"]),
+                (second(3), ["EURUSD"]),
+            ])
+            tickFeed.reset()
+
+    def testDataSeries(self):
+        tickFeed = memtf.TickFeed()
+        tickFeed.addTicksFromSequence("EURUSD", build_ticks([datetime.datetime(2018, 1, 1, 0, 0, i) for i in range(10)]))
+        tickFeed.loadAll()
+        self.assertEqual(len(tickFeed["EURUSD"]), 10)
+        self.assertEqual(tickFeed["EURUSD"][-1].getDateTime(), datetime.datetime(2018, 1, 1, 0, 0, 9))
+
+    def testSingleInstrumentTicks(self):
+        second = lambda i: datetime.datetime(2018, 1, 1, 0, 0, i)
+        for streaming in [False, True]:
+            if streaming:
+                tickFeed = streamtf.TickFeed()
+                tickFeed.addTickSource("EURUSD", lambda: build_ticks([second(1), second(2)]))
+                tickFeed.addTickSource("USDJPY", lambda: build_ticks([second(2)]))
+            else:
+                tickFeed = memtf.TickFeed()
+                tickFeed.addTicksFromSequence("EURUSD", build_ticks([second(1), second(2)]))
+                tickFeed.addTicksFromSequence("USDJPY", build_ticks([second(2)]))
+            events = [ticks for dateTime, ticks in tickFeed]
+            # Datetimes with a single tick don't need a map.
+            self.assertEqual([type(ticks) for ticks in events], [tick.InstrumentTick, tick.Ticks])
+            self.assertEqual(tickFeed.getLastTick("EURUSD").getDateTime(), second(2))
+            self.assertEqual(tickFeed.getLastTick("USDJPY").getDateTime(), second(2))
+
+    def testInstrumentTick(self):
+        tick_ = tick.BasicTick(datetime.datetime(2018, 1, 1), 1, 1.0001)
+        ticks = tick.InstrumentTick("EURUSD", tick_)
+        expected = tick.Ticks({"EURUSD": tick_})
+        self.assertTrue(isinstance(ticks, tick.Ticks))
+        for instrument in ["EURUSD", "USDJPY"]:
+            self.assertEqual(instrument in ticks, instrument in expected)
+            self.assertEqual(ticks.getTick(instrument), expected.getTick(instrument))
+        self.assertEqual(ticks["EURUSD"], tick_)
+        with self.assertRaises(KeyError):
+            ticks["USDJPY"]
+        self.assertEqual(ticks.items(), expected.items())
+        self.assertEqual(ticks.keys(), expected.keys())
+        self.assertEqual(ticks.getInstruments(), expected.getInstruments())
+        self.assertEqual(ticks.getDateTime(), expected.getDateTime())
+        self.assertEqual(ticks.getInstrument(), "EURUSD")
+        self.assertEqual(ticks.getSingleTick(), tick_)
+
+
+def load_all(tickFeed):
+    ret = []
+    for dateTime, ticks in tickFeed:
+        ret.append((dateTime, dict((instrument, (ticks[instrument].getBid(), ticks[instrument].getAsk())) for instrument in ticks.getInstruments())))
+    return ret
+
+
+class StreamingTickFeedTestCase(common.TestCase):
+    def testSameAsInMemory(self):
+        memFeed = txtfeed.GenericTickFeed()
+        streamingFeed = txtfeed.StreamingGenericTickFeed(bufferSize=7)
+        for tickFeed in [memFeed, streamingFeed]:
+            tickFeed.addTicksFromTXT("EURUSD", common.get_data_file_path("eurusd-2018-01-02-ticks.txt"))
+            tickFeed.addTicksFromTXT("USDJPY", common.get_data_file_path("usdjpy-2018-01-02-ticks.txt"))
+
+        expected = load_all(memFeed)
+        self.assertEqual(load_all(streamingFeed), expected)
+        self.assertEqual(len(streamingFeed["EURUSD"]), 150)
+        self.assertEqual(len(streamingFeed["USDJPY"]), 150)
+
+        # Files are read again after a reset.
+        streamingFeed.reset()
+        self.assertEqual(load_all(streamingFeed), expected)
+
+    def testReadAheadIsBounded(self):
+        consumed = {"count": 0}
+
+        def source():
+            for i in range(100):
+                consumed["count"] += 1
+                yield tick.BasicTick(datetime.datetime(2018, 1, 1) + datetime.timedelta(seconds=i), 1, 1)
+
+        tickFeed = streamtf.TickFeed(bufferSize=10)
+        tickFeed.addTickSource("EURUSD", source)
+        tickFeed.start()
+        tickFeed.getNextTicks()
+        self.assertEqual(consumed["count"], 10)
+        for i in range(10):
+            tickFeed.getNextTicks()
+        self.assertEqual(consumed["count"], 20)
+
+    def testManySourcesForOneInstrument(self):
+        def build_source(fromSecond, toSecond):
+            return lambda: build_ticks([datetime.datetime(2018, 1, 1, 0, 0, i) for i in range(fromSecond, toSecond)])
+
+        tickFeed = streamtf.TickFeed(bufferSize=3)
+        tickFeed.addTickSource("EURUSD", build_source(0, 5))
+        tickFeed.addTickSource("EURUSD", build_source(5, 10))
+        tickFeed.loadAll()
+        self.assertEqual(tickFeed["EURUSD"].getDateTimes(), [datetime.datetime(2018, 1, 1, 0, 0, i) for i in range(10)])
+
+    def testNotSorted(self):
+        tickFeed = streamtf.TickFeed(bufferSize=2)
+        tickFeed.addTickSource("EURUSD", lambda: build_ticks([datetime.datetime(2018, 1, 1, 0, 0, i) for i in [1, 2, 3, 2]]))
+        with self.assertRaisesRegexp(Exception, "Ticks for EURUSD are not sorted.*"):
+            tickFeed.loadAll()
+
+    def testEmptyRowsAndStop(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "ticks.txt")
+            with open(path, "w") as f:
+                f.write("1.2,1.3,2018.01.01 00:00:00\n1.2,1.3,2018.01.01 00:00:01\n\n")
+
+            tickFeed = txtfeed.StreamingGenericTickFeed()
+            tickFeed.addTicksFromTXT("EURUSD", path)
+            tickFeed.loadAll()
+            tickFeed.stop()
+            self.assertEqual(len(tickFeed["EURUSD"]), 2)
+            self.assertTrue(tickFeed.eof())
+
+    def testAddAfterStart(self):
+        tickFeed = streamtf.TickFeed()
+        tickFeed.start()
+        with self.assertRaisesRegexp(Exception, "Can't add more ticks once you started consuming ticks"):
+            tickFeed.addTickSource("EURUSD", lambda: [])
+
+
+class BulkTickLoaderTestCase(common.TestCase):
+    def testSameAsRowByRow(self):
+        path = common.get_data_file_path("eurusd-2018-01-02-ticks.txt")
+        rowParser = txtfeed.GenericRowParser("%Y.%m.%d %H:%M:%S")
+        expected = [(t.getDateTime(), t.getBid(), t.getAsk()) for t in txtfeed.read_ticks(path, rowParser)]
+
+        for chunkSize in [10, 1000, 1024 * 1024]:
+            tickArrays = txtfeed.load_tick_arrays(path, chunkSize=chunkSize)
+            self.assertEqual([(t.getDateTime(), t.getBid(), t.getAsk()) for t in tickArrays], expected)
+
+    def testFeedUsesBulkLoader(self):
+        class SlowTick(tick.BasicTick):
+            pass
+
+        bulkFeed = txtfeed.GenericTickFeed()
+        slowFeed = txtfeed.GenericTickFeed()
+        slowFeed.setTickClass(SlowTick)
+        for tickFeed in [bulkFeed, slowFeed]:
+            tickFeed.addTicksFromTXT("EURUSD", common.get_data_file_path("eurusd-2018-01-02-ticks.txt"))
+            tickFeed.addTicksFromTXT("USDJPY", common.get_data_file_path("usdjpy-2018-01-02-ticks.txt"))
+        self.assertEqual(load_all(bulkFeed), load_all(slowFeed))
+
+    def testMalformedRows(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "ticks.txt")
+            with open(path, "w") as f:
+                f.write("1.2,1.3,2018.01.01 00:00:00\n\n1.2,1.3,2018.01.01 00:00:01\nbad\n")
+
+            with self.assertRaises(ValueError):
+                txtfeed.load_tick_arrays(path)
+
+            # The feed falls back to parsing row by row.
+            tickFeed = txtfeed.GenericTickFeed()
+            tickFeed.addTicksFromTXT("EURUSD", path, skipMalformedTicks=True)
+            tickFeed.loadAll()
+            self.assertEqual(len(tickFeed["EURUSD"]), 2)
+
+            tickFeed = txtfeed.GenericTickFeed()
+            with self.assertRaises(Exception):
+                tickFeed.addTicksFromTXT("EURUSD", path)
+
+    def testRowsWithWrongColumnCount(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "ticks.txt")
+            # A row with an extra column followed by one with a missing column. Taking fields 3 at a time, datetimes are
+            # still in the right place.
+            with open(path, "w") as f:
+                f.write("1.2,1.3,2018.01.01 00:00:00\n1.4,1.5,2018.01.01 00:00:01,1.55\n1.6,2018.01.01 00:00:02\n")
+
+            with self.assertRaisesRegexp(ValueError, "Every row should have 3 columns"):
+                txtfeed.load_tick_arrays(path)
+
+            # The feed falls back to parsing row by row, that ignores the extra column.
+            tickFeed = txtfeed.GenericTickFeed()
+            tickFeed.addTicksFromTXT("EURUSD", path, skipMalformedTicks=True)
+            tickFeed.loadAll()
+            self.assertEqual([(t.getBid(), t.getAsk()) for t in tickFeed["EURUSD"]], [(1.2, 1.3), (1.4, 1.5)])
+
+    def testFilters(self):
+        class RowByRowFilter(txtfeed.TickFilter):
+            def includeTick(self, tick_):
+                return tick_.getDateTime().second != 0
+
+        # Subclasses that only override includeTick should get their ticks filtered with it.
+        class BidAboveFilter(txtfeed.DateRangeFilter):
+            def includeTick(self, tick_):
+                return super(BidAboveFilter, self).includeTick(tick_) and tick_.getBid() > 1.2
+
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "ticks.txt")
+            with open(path, "w") as f:
+                dateTime = datetime.datetime(2018, 1, 5)
+                for i in range(1000):
+                    f.write("%s,%s,%s\n" % (1 + i / 1000.0, 1.0001 + i / 1000.0, dateTime.strftime("%Y.%m.%d %H:%M:%S")))
+                    dateTime += datetime.timedelta(minutes=13, seconds=i % 2)
+
+            rowParser = txtfeed.GenericRowParser("%Y.%m.%d %H:%M:%S")
+            fromDate = datetime.datetime(2018, 1, 6, 1)
+            toDate = datetime.datetime(2018, 1, 10, 10)
+            for tickFilter in [
+                txtfeed.DateRangeFilter(fromDate, toDate), txtfeed.USEquitiesRTH(), RowByRowFilter(),
+                BidAboveFilter(fromDate, toDate)
+            ]:
+                expected = [
+                    (t.getDateTime(), t.getBid(), t.getAsk()) for t in txtfeed.read_ticks(path, rowParser, tickFilter)
+                ]
+                self.assertTrue(0 < len(expected) < 1000)
+                if not isinstance(tickFilter, (RowByRowFilter, BidAboveFilter)):
+                    tickArrays = txtfeed.load_tick_arrays(path, tickFilter=tickFilter, chunkSize=1000)
+                    self.assertEqual([(t.getDateTime(), t.getBid(), t.getAsk()) for t in tickArrays], expected)
+
+                tickFeed = txtfeed.GenericTickFeed()
+                tickFeed.setTickFilter(tickFilter)
+                tickFeed.addTicksFromTXT("EURUSD", path)
+                self.assertEqual([
+                    (dateTime, ticks["EURUSD"].getBid(), ticks["EURUSD"].getAsk()) for dateTime, ticks in tickFeed
+                ], expected)
+
+            for tickFilter in [RowByRowFilter(), BidAboveFilter(fromDate, toDate)]:
+                with self.assertRaises(ValueError):
+                    txtfeed.load_tick_arrays(path, tickFilter=tickFilter)
+
+    def testCompressedFiles(self):
+        class SlowTick(tick.BasicTick):
+            pass
+
+        path = common.get_data_file_path("eurusd-2018-01-02-ticks.txt")
+        expected = txtfeed.GenericTickFeed()
+        expected.addTicksFromTXT("EURUSD", path)
+        expected = load_all(expected)
+
+        with common.TmpDir() as tmpPath:
+            for extension in [".gz", ".bz2", ".xz"]:
+                compressedPath = os.path.join(tmpPath, "ticks.txt" + extension)
+                common.compress_file(path, compressedPath)
+                # Bulk loaded, parsed row by row, and streamed.
+                tickFeed = txtfeed.GenericTickFeed()
+                tickFeed.addTicksFromTXT("EURUSD", compressedPath)
+                self.assertEqual(load_all(tickFeed), expected)
+                tickFeed = txtfeed.GenericTickFeed()
+                tickFeed.setTickClass(SlowTick)
+                tickFeed.addTicksFromTXT("EURUSD", compressedPath)
+                self.assertEqual(load_all(tickFeed), expected)
+                tickFeed = txtfeed.StreamingGenericTickFeed()
+                tickFeed.addTicksFromTXT("EURUSD", compressedPath)
+                self.assertEqual(load_all(tickFeed), expected)
+
+    def testAddTicksFromArrays(self):
+        second = lambda i: dt.datetime_to_epoch_ns(datetime.datetime(2018, 1, 1, 0, 0, i))
+        tickFeed = memtf.TickFeed()
+        tickFeed.addTicksFromArrays("EURUSD", tick.TickArrays([second(3), second(1)], [3, 1], [3.1, 1.1]))
+        tickFeed.addTicksFromArrays("EURUSD", tick.TickArrays([second(2)], [2], [2.1]))
+        tickFeed.addTicksFromSequence("USDJPY", build_ticks([datetime.datetime(2018, 1, 1, 0, 0, 2)]))
+        tickFeed.loadAll()
+        self.assertEqual(tickFeed["EURUSD"].getBidArray().tolist(), [1, 2, 3])
+        self.assertEqual(len(tickFeed["USDJPY"]), 1)
+
+        # Mixing arrays and ticks.
+        tickFeed = memtf.TickFeed()
+        tickFeed.addTicksFromSequence("EURUSD", build_ticks([datetime.datetime(2018, 1, 1, 0, 0, 2)]))
+        tickFeed.addTicksFromArrays("EURUSD", tick.TickArrays([second(1)], [1], [1.1]))
+        tickFeed.loadAll()
+        self.assertEqual(tickFeed["EURUSD"].getBidArray().tolist(), [1, 1])
+
+
+class ParallelTickLoadTestCase(common.TestCase):
+    def testSameAsSerial(self):
+        files = {
+            "EURUSD": common.get_data_file_path("eurusd-2018-01-02-ticks.txt"),
+            "USDJPY": common.get_data_file_path("usdjpy-2018-01-02-ticks.txt"),
+        }
+        expected = txtfeed.GenericTickFeed()
+        for instrument in sorted(files.keys()):
+            expected.addTicksFromTXT(instrument, files[instrument])
+
+        tickFeed = txtfeed.GenericTickFeed()
+        tickFeed.addTicksFromTXTFiles(files, processes=2)
+        self.assertEqual(tickFeed.getRegisteredInstruments(), ["EURUSD", "USDJPY"])
+        self.assertEqual(load_all(tickFeed), load_all(expected))
+
+    def testMalformedRowsAndCache(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "ticks.txt")
+            with open(path, "w") as f:
+                f.write("1.2,1.3,2018.01.01 00:00:00\nbad\n1.2,1.3,2018.01.01 00:00:01\n")
+            files = {"EURUSD": common.get_data_file_path("eurusd-2018-01-02-ticks.txt"), "BAD": path}
+
+            cache = arraycache.ArrayCache(os.path.join(tmpPath, "cache"))
+            for i in range(2):
+                tickFeed = txtfeed.GenericTickFeed()
+                tickFeed.setCache(cache)
+                tickFeed.addTicksFromTXTFiles(files, skipMalformedTicks=True, processes=2)
+                tickFeed.loadAll()
+                self.assertEqual(len(tickFeed["BAD"]), 2)
+            self.assertEqual(len(os.listdir(os.path.join(tmpPath, "cache"))), 2)
+
+            tickFeed = txtfeed.GenericTickFeed()
+            with self.assertRaises(Exception):
+                tickFeed.addTicksFromTXTFiles(files, processes=2)
+
+
+class TickCacheTestCase(common.TestCase):
+    def testCachedTicksAreTheSame(self):
+        with common.TmpDir() as tmpPath:
+            expected = txtfeed.GenericTickFeed()
+            expected.addTicksFromTXT("EURUSD", common.get_data_file_path("eurusd-2018-01-02-ticks.txt"))
+            expected = load_all(expected)
+
+            cache = arraycache.ArrayCache(tmpPath)
+            for i in range(2):
+                tickFeed = txtfeed.GenericTickFeed()
+                tickFeed.setCache(cache)
+                tickFeed.addTicksFromTXT("EURUSD", common.get_data_file_path("eurusd-2018-01-02-ticks.txt"))
+                self.assertEqual(load_all(tickFeed), expected)
+            self.assertEqual(len(os.listdir(tmpPath)), 1)
+
+    def testRowByRowTicksGetCached(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "ticks.txt")
+            with open(path, "w") as f:
+                f.write("1.2,1.3,2018-01-01 00:00:00\nbad\n1.2,1.3,2018-01-01 00:00:01\n")
+
+            cache = arraycache.ArrayCache(os.path.join(tmpPath, "cache"))
+            for i in range(2):
+                tickFeed = txtfeed.GenericTickFeed()
+                tickFeed.setDateTimeFormat("%Y-%m-%d %H:%M:%S")
+                tickFeed.setCache(cache)
+                tickFeed.addTicksFromTXT("EURUSD", path, skipMalformedTicks=True)
+                tickFeed.loadAll()
+                self.assertEqual(tickFeed["EURUSD"].getDateTimes(), [
+                    datetime.datetime(2018, 1, 1, 0, 0, 0), datetime.datetime(2018, 1, 1, 0, 0, 1)
+                ])
+            self.assertEqual(len(os.listdir(os.path.join(tmpPath, "cache"))), 1)
+
+
+def write_multi_day_ticks(path, startDateTime, count, step):
+    with open(path, "w") as f:
+        dateTime = startDateTime
+        for i in range(count):
+            f.write("%.5f,%.5f,%s\n" % (1 + i / 1000.0, 1.0001 + i / 1000.0, dateTime.strftime("%Y.%m.%d %H:%M:%S")))
+            dateTime += step
+
+
+class PartitionedTickFeedTestCase(common.TestCase):
+    def __buildArchive(self, tmpPath):
+        rootDir = os.path.join(tmpPath, "archive")
+        files = {}
+        for instrument, startDateTime in [
+            ("EURUSD", datetime.datetime(2017, 12, 30)), ("USDJPY", datetime.datetime(2018, 1, 2, 0, 7))
+        ]:
+            files[instrument] = os.path.join(tmpPath, "%s.txt" % instrument)
+            write_multi_day_ticks(files[instrument], startDateTime, 1000, datetime.timedelta(minutes=29))
+            partitionedtf.txt_to_archive(files[instrument], rootDir, instrument, chunkSize=1000)
+        return rootDir, files
+
+    def testLayout(self):
+        with common.TmpDir() as tmpPath:
+            rootDir, files = self.__buildArchive(tmpPath)
+            partitions = partitionedtf.get_partitions(rootDir, "EURUSD")
+            self.assertEqual(partitions[0], (
+                datetime.date(2017, 12, 30), os.path.join(rootDir, "EURUSD", "2017", "12", "30.ticks")
+            ))
+            self.assertEqual(partitions[-1][0], datetime.date(2018, 1, 19))
+            self.assertEqual(len(partitions), 21)
+            self.assertEqual(
+                sum(len(partitionedtf.read_partition(path)) for date, path in partitions),
+                len(txtfeed.load_tick_arrays(files["EURUSD"]))
+            )
+            self.assertEqual([date for date, path in partitionedtf.get_partitions(
+                rootDir, "EURUSD", datetime.datetime(2017, 12, 31, 23), datetime.date(2018, 1, 2)
+            )], [datetime.date(2017, 12, 31), datetime.date(2018, 1, 1), datetime.date(2018, 1, 2)])
+            self.assertEqual(partitionedtf.get_partitions(rootDir, "UNKNOWN"), [])
+
+    def testSameAsTXT(self):
+        with common.TmpDir() as tmpPath:
+            rootDir, files = self.__buildArchive(tmpPath)
+            for fromDateTime, toDateTime in [
+                (None, None),
+                (datetime.datetime(2018, 1, 3, 1, 30), datetime.datetime(2018, 1, 9, 10)),
+                (None, datetime.datetime(2018, 1, 1)),
+                (datetime.datetime(2018, 1, 15), None),
+            ]:
+                expected = txtfeed.GenericTickFeed()
+                if fromDateTime is not None or toDateTime is not None:
+                    expected.setTickFilter(txtfeed.DateRangeFilter(fromDateTime, toDateTime))
+                for instrument, path in files.items():
+                    expected.addTicksFromTXT(instrument, path)
+                expected = load_all(expected)
+                self.assertTrue(len(expected) > 0)
+
+                tickFeed = partitionedtf.PartitionedTickFeed(
+                    rootDir, ["EURUSD", "USDJPY"], fromDateTime, toDateTime, bufferSize=10
+                )
+                self.assertEqual(sorted(tickFeed.getRegisteredInstruments()), ["EURUSD", "USDJPY"])
+                self.assertEqual(load_all(tickFeed), expected)
+
+    def testReadWithFilterSubclass(self):
+        class EvenMinutesFilter(txtfeed.DateRangeFilter):
+            def includeTick(self, tick_):
+                return super(EvenMinutesFilter, self).includeTick(tick_) and tick_.getDateTime().minute % 2 == 0
+
+        with common.TmpDir() as tmpPath:
+            rootDir, files = self.__buildArchive(tmpPath)
+            tickFilter = EvenMinutesFilter(datetime.datetime(2018, 1, 3), datetime.datetime(2018, 1, 9))
+            paths = [path for date, path in partitionedtf.get_partitions(rootDir, "EURUSD")]
+            expected = [
+                (t.getDateTime(), t.getBid(), t.getAsk())
+                for t in txtfeed.load_tick_arrays(files["EURUSD"]) if tickFilter.includeTick(t)
+            ]
+            self.assertTrue(len(expected) > 0)
+            self.assertEqual([
+                (t.getDateTime(), t.getBid(), t.getAsk())
+                for t in partitionedtf.read_partitioned_ticks(paths, tickFilter)
+            ], expected)
+
+    def testCompactPartitions(self):
+        with common.TmpDir() as tmpPath:
+            rootDir, files = self.__buildArchive(tmpPath)
+            compactRootDir = os.path.join(tmpPath, "compact")
+            for instrument, path in files.items():
+                partitionedtf.txt_to_archive(path, compactRootDir, instrument, compact=True, chunkSize=1000)
+
+            fromDateTime = datetime.datetime(2018, 1, 3, 1, 30)
+            for instrument, path in files.items():
+                for (date, rawPath), (compactDate, compactPath) in zip(
+                    partitionedtf.get_partitions(rootDir, instrument),
+                    partitionedtf.get_partitions(compactRootDir, instrument)
+                ):
+                    self.assertEqual(date, compactDate)
+                    self.assertLess(os.path.getsize(compactPath) * 3, os.path.getsize(rawPath))
+            self.assertEqual(
+                load_all(partitionedtf.PartitionedTickFeed(compactRootDir, ["EURUSD", "USDJPY"], fromDateTime)),
+                load_all(partitionedtf.PartitionedTickFeed(rootDir, ["EURUSD", "USDJPY"], fromDateTime))
+            )
+
+    def testEncoderTool(self):
+        with common.TmpDir() as tmpPath:
+            rootDir, files = self.__buildArchive(tmpPath)
+            compactRootDir = os.path.join(tmpPath, "compact")
+            partitions, bytesRead, bytesWritten = tickarchive.encode_files(
+                [files["EURUSD"]], compactRootDir, "EURUSD", pipSize=0.0001
+            )
+            self.assertEqual(partitions, 21)
+            self.assertLess(bytesWritten * 5, bytesRead)
+            self.assertEqual(
+                load_all(partitionedtf.PartitionedTickFeed(compactRootDir, ["EURUSD"])),
+                load_all(partitionedtf.PartitionedTickFeed(rootDir, ["EURUSD"]))
+            )
+
+    def testEncodeFilesSplitWithinADay(self):
+        with common.TmpDir() as tmpPath:
+            with open(common.get_data_file_path("eurusd-2018-01-02-ticks.txt")) as f:
+                rows = f.readlines()
+            files = []
+            for i, fileRows in enumerate([rows[:len(rows) // 2], rows[len(rows) // 2:]]):
+                files.append(os.path.join(tmpPath, "%d.txt" % i))
+                with open(files[-1], "w") as f:
+                    f.writelines(fileRows)
+
+            rootDir = os.path.join(tmpPath, "archive")
+            partitions, bytesRead, bytesWritten = tickarchive.encode_files(files, rootDir, "EURUSD")
+            self.assertEqual(partitions, 1)
+            expected = txtfeed.load_tick_arrays(common.get_data_file_path("eurusd-2018-01-02-ticks.txt"))
+            partition = partitionedtf.read_partition(
+                partitionedtf.get_partition_path(rootDir, "EURUSD", datetime.date(2018, 1, 2))
+            )
+            self.assertEqual(len(partition), len(expected))
+            self.assertEqual(partition.getTimestamps().tolist(), expected.getTimestamps().tolist())
+
+    def testPartitionsOutOfRangeAreNotOpened(self):
+        with common.TmpDir() as tmpPath:
+            rootDir, files = self.__buildArchive(tmpPath)
+            # Corrupt every partition except for the ones on 2018-01-05.
+            for instrument in files:
+                for date, path in partitionedtf.get_partitions(rootDir, instrument):
+                    if date != datetime.date(2018, 1, 5):
+                        with open(path, "wb") as f:
+                            f.write(b"garbage")
+
+            fromDateTime = datetime.datetime(2018, 1, 5, 6)
+            toDateTime = datetime.datetime(2018, 1, 5, 18)
+            tickFeed = partitionedtf.PartitionedTickFeed(rootDir, ["EURUSD", "USDJPY"], fromDateTime, toDateTime)
+            dateTimes = [dateTime for dateTime, ticks in tickFeed]
+            self.assertTrue(len(dateTimes) > 0)
+            self.assertTrue(fromDateTime <= dateTimes[0] and dateTimes[-1] <= toDateTime)
+
+            with self.assertRaises(ValueError):
+                partitionedtf.PartitionedTickFeed(rootDir, ["EURUSD"]).loadAll()
+
+    def testConvertUnsortedDays(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "ticks.txt")
+            rootDir = os.path.join(tmpPath, "archive")
+            # Ticks within a day may be unsorted.
+            with open(path, "w") as f:
+                f.write("1,1.1,2018.01.01 00:00:02\n1,1.1,2018.01.01 00:00:01\n1,1.1,2018.01.02 00:00:00\n")
+            self.assertEqual(
+                partitionedtf.txt_to_archive(path, rootDir, "EURUSD"),
+                [datetime.date(2018, 1, 1), datetime.date(2018, 1, 2)]
+            )
+            tickFeed = partitionedtf.PartitionedTickFeed(rootDir, ["EURUSD"])
+            self.assertEqual([dateTime for dateTime, ticks in tickFeed], [
+                datetime.datetime(2018, 1, 1, 0, 0, 1), datetime.datetime(2018, 1, 1, 0, 0, 2),
+                datetime.datetime(2018, 1, 2)
+            ])
+
+            # Days may not.
+            with open(path, "w") as f:
+                for day in [1, 2, 3, 1]:
+                    f.write("1,1.1,2018.01.%02d 00:00:00\n" % day)
+            with self.assertRaisesRegexp(Exception, "not sorted by day"):
+                partitionedtf.txt_to_archive(path, rootDir, "EURUSD", chunkSize=20)
+
+
+class SQLiteTickFeedTestCase(common.TestCase):
+    def __buildDatabase(self, tmpPath):
+        dbPath = os.path.join(tmpPath, "ticks.sqlite")
+        files = {}
+        for instrument, startDateTime in [
+            ("EURUSD", datetime.datetime(2017, 12, 30)), ("USDJPY", datetime.datetime(2018, 1, 2, 0, 7))
+        ]:
+            files[instrument] = os.path.join(tmpPath, "%s.txt" % instrument)
+            write_multi_day_ticks(files[instrument], startDateTime, 1000, datetime.timedelta(minutes=29))
+        db = sqlitefeed.Database(dbPath)
+        for instrument, path in files.items():
+            self.assertEqual(db.addTicksFromTXT(instrument, path, chunkSize=1000), 1000)
+        db.disconnect()
+        return dbPath, files
+
+    def testSameAsTXT(self):
+        with common.TmpDir() as tmpPath:
+            dbPath, files = self.__buildDatabase(tmpPath)
+            for fromDateTime, toDateTime in [
+                (None, None),
+                (datetime.datetime(2018, 1, 3, 1, 30), datetime.datetime(2018, 1, 9, 10)),
+                (None, datetime.datetime(2018, 1, 1)),
+                (datetime.datetime(2018, 1, 15), None),
+            ]:
+                expected = txtfeed.GenericTickFeed()
+                if fromDateTime is not None or toDateTime is not None:
+                    expected.setTickFilter(txtfeed.DateRangeFilter(fromDateTime, toDateTime))
+                for instrument, path in files.items():
+                    expected.addTicksFromTXT(instrument, path)
+                expected = load_all(expected)
+                self.assertTrue(len(expected) > 0)
+
+                tickFeed = sqlitefeed.Feed(dbPath, bufferSize=10)
+                for instrument in files:
+                    tickFeed.loadTicks(instrument, fromDateTime, toDateTime)
+                self.assertEqual(sorted(tickFeed.getRegisteredInstruments()), ["EURUSD", "USDJPY"])
+                self.assertEqual(load_all(tickFeed), expected)
+                # The feed can be consumed again.
+                tickFeed.reset()
+                self.assertEqual(load_all(tickFeed), expected)
+                tickFeed.getDatabase().disconnect()
+
+    def testGetTicks(self):
+        with common.TmpDir() as tmpPath:
+            dbPath, files = self.__buildDatabase(tmpPath)
+            db = sqlitefeed.Database(dbPath)
+            tickArrays = txtfeed.load_tick_arrays(files["EURUSD"])
+            ticks = db.getTicks("EURUSD")
+            self.assertEqual(ticks.getTimestamps().tolist(), tickArrays.getTimestamps().tolist())
+            self.assertEqual(ticks.getBids().tolist(), tickArrays.getBids().tolist())
+            self.assertEqual(ticks.getAsks().tolist(), tickArrays.getAsks().tolist())
+            fromDateTime = datetime.datetime(2018, 1, 3, 1, 30)
+            toDateTime = datetime.datetime(2018, 1, 9, 10)
+            ticks = db.getTicks("EURUSD", fromDateTime, toDateTime)
+            self.assertEqual(len(ticks), sum(
+                1 for i in range(len(tickArrays)) if fromDateTime <= tickArrays[i].getDateTime() <= toDateTime
+            ))
+            self.assertEqual(ticks[0].getDateTime(), datetime.datetime(2018, 1, 3, 1, 38))
+            self.assertEqual(len(db.getTicks("UNKNOWN")), 0)
+            self.assertEqual(list(db.iterTicks("UNKNOWN")), [])
+            db.disconnect()
+
+    def testSameDateTime(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "ticks.txt")
+            with open(path, "w") as f:
+                for i, second in enumerate([1, 1, 1, 2, 2, 3]):
+                    f.write("%d,%d.5,2018.01.01 00:00:%02d\n" % (i, i, second))
+
+            db = sqlitefeed.Database(os.path.join(tmpPath, "ticks.sqlite"))
+            # Ticks with the same datetime are kept, in order, even if they are split across chunks, and adding them
+            # again replaces them.
+            for i in range(2):
+                self.assertEqual(db.addTicksFromTXT("EURUSD", path, chunkSize=30), 6)
+                ticks = list(db.iterTicks("EURUSD", fetchSize=4))
+                self.assertEqual([tick_.getBid() for tick_ in ticks], [0, 1, 2, 3, 4, 5])
+                self.assertEqual([tick_.getAsk() for tick_ in ticks], [0.5, 1.5, 2.5, 3.5, 4.5, 5.5])
+                self.assertEqual(
+                    [tick_.getDateTime().second for tick_ in ticks], [1, 1, 1, 2, 2, 3]
+                )
+            db.disconnect()
+
+    def testAddTicksReplacesOverlappingRange(self):
+        def build_ticks(rows):
+            dateTimes, bids = zip(*rows)
+            return tick.TickArrays(
+                [dt.datetime_to_epoch_ns(dateTime) for dateTime in dateTimes], bids, [bid + 0.5 for bid in bids]
+            )
+
+        with common.TmpDir() as tmpPath:
+            db = sqlitefeed.Database(os.path.join(tmpPath, "ticks.sqlite"))
+            db.addTicks("EURUSD", build_ticks([
+                (datetime.datetime(2018, 1, 1, 12), 1.0),
+                (datetime.datetime(2018, 1, 1, 12), 1.1),
+                (datetime.datetime(2018, 1, 1, 12, 0, 5), 1.2),
+            ]))
+            # Stored ticks with the same datetimes are replaced, not mixed with the new ones.
+            self.assertEqual(db.addTicks("EURUSD", build_ticks([
+                (datetime.datetime(2018, 1, 1, 12), 2.0),
+                (datetime.datetime(2018, 1, 1, 12, 0, 2), 2.1),
+            ])), 2)
+            ticks = list(db.iterTicks("EURUSD"))
+            self.assertEqual([tick_.getBid() for tick_ in ticks], [2.0, 2.1, 1.2])
+            self.assertEqual([tick_.getDateTime().second for tick_ in ticks], [0, 2, 5])
+            db.disconnect()
+
+    def testRollbackOnError(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "ticks.txt")
+            with open(path, "w") as f:
+                f.write("1,1.1,2018.01.01 00:00:01\n1,1.1,2018.01.01 00:00:02\nbad,1.1,2018.01.01 00:00:03\n")
+            db = sqlitefeed.Database(os.path.join(tmpPath, "ticks.sqlite"))
+            with self.assertRaises(Exception):
+                db.addTicksFromTXT("EURUSD", path, chunkSize=30)
+            self.assertEqual(len(db.getTicks("EURUSD")), 0)
+            db.disconnect()
+
+    def testInstrumentsAddedInRolledBackTransaction(self):
+        with common.TmpDir() as tmpPath:
+            dbPath = os.path.join(tmpPath, "ticks.sqlite")
+            db = sqlitefeed.Database(dbPath)
+            timestamps = [dt.datetime_to_epoch_ns(datetime.datetime(2018, 1, 1, 0, 0, i)) for i in range(2)]
+            with self.assertRaises(sqlite3.IntegrityError):
+                db.addTicks("EURUSD", tick.TickArrays(timestamps, [1, None], [1.1, 1.1]))
+            # The instrument was rolled back, so it gets added again.
+            self.assertEqual(db.addTicks("EURUSD", tick.TickArrays(timestamps, [1, 1], [1.1, 1.1])), 2)
+            db.disconnect()
+
+            db = sqlitefeed.Database(dbPath)
+            self.assertEqual(len(db.getTicks("EURUSD")), 2)
+            db.disconnect()
+
+    def testSameFileAsBars(self):
+        with common.TmpDir() as tmpPath:
+            dbPath = os.path.join(tmpPath, "market.sqlite")
+            timestamps = [dt.datetime_to_epoch_ns(datetime.datetime(2018, 1, 1, 0, 0, i)) for i in range(2)]
+            # The tick store is opened first, so the file already exists when the bar store is opened.
+            tickDb = sqlitefeed.Database(dbPath)
+            self.assertEqual(tickDb.addTicks("EURUSD", tick.TickArrays(timestamps, [1, 1], [1.1, 1.1])), 2)
+            barDb = barsqlitefeed.Database(dbPath)
+            bar_ = bar.BasicBar(datetime.datetime(2018, 1, 1), 1, 1.2, 0.9, 1.1, 100, None, bar.Frequency.DAY)
+            barDb.addBar("EURUSD", bar_, bar.Frequency.DAY)
+            self.assertEqual(len(barDb.getBars("EURUSD", bar.Frequency.DAY)), 1)
+            self.assertEqual(len(tickDb.getTicks("EURUSD")), 2)
+            barDb.disconnect()
+            tickDb.disconnect()
+
+    def testClusteredPrimaryKey(self):
+        with common.TmpDir() as tmpPath:
+            dbPath, files = self.__buildDatabase(tmpPath)
+            connection = sqlite3.connect(dbPath)
+            sql = connection.execute("select sql from sqlite_master where name = 'tick'").fetchone()[0]
+            self.assertTrue(sql.lower().endswith("without rowid"))
+            plan = " ".join(str(row) for row in connection.execute(
+                "explain query plan select timestamp, bid, ask from tick where instrument_id = 1 "
+                "and timestamp >= 0 and timestamp <= 1 order by timestamp asc, seq asc"
+            ))
+            self.assertTrue("PRIMARY KEY" in plan)
+            self.assertFalse("TEMP B-TREE" in plan)
+            connection.close()
@@ -0,0 +1,156 @@
+
+"""
+.. moduleauthor:: zkn <zkn@outlook.com>
+"""
+
+import datetime
+
+import numpy as np
+
+from . import common
+
+from pyalgotrade import tick
+from pyalgotrade import tickstrategy
+from pyalgotrade.tickfeed import memtf
+from pyalgotrade.utils import dt
+
+
+INSTRUMENT = "EURUSD"
+
+
+def build_tick_arrays(count):
+    timestamps = dt.datetime_to_epoch_ns(datetime.datetime(2018, 1, 1)) + np.arange(count, dtype=np.int64) * 10**9
+    bids = np.round(1.2 + np.sin(np.arange(count) / 50.0) * 0.01, 5)
+    return tick.TickArrays(timestamps, bids, bids + 0.0002)
+
+
+def build_feed(count):
+    ret = memtf.TickFeed()
+    ret.addTicksFromArrays(INSTRUMENT, build_tick_arrays(count))
+    return ret
+
+
+def order_event(order):
+    executionInfo = order.getExecutionInfo()
+    if executionInfo is not None:
+        executionInfo = (executionInfo.getDateTime(), executionInfo.getPrice(), executionInfo.getQuantity())
+    return (order.getId(), order.getState(), order.getFilled(), executionInfo)
+
+
+class OnTicksStrategy(tickstrategy.BacktestingTickStrategy):
+    def __init__(self, tickFeed, orders):
+        super(OnTicksStrategy, self).__init__(tickFeed)
+        self.setDebugMode(False)
+        self.__orders = orders
+        self.__pos = 0
+        self.orderEvents = []
+
+    def onOrderUpdated(self, order):
+        self.orderEvents.append(order_event(order))
+
+    def onTicks(self, ticks):
+        for pos, quantity in self.__orders:
+            if pos == self.__pos:
+                self.marketOrder(INSTRUMENT, quantity)
+        self.__pos += 1
+
+
+class OrdersOnFirstTickStrategy(tickstrategy.BacktestingTickStrategy):
+    def __init__(self, tickFeed, orders):
+        super(OrdersOnFirstTickStrategy, self).__init__(tickFeed)
+        self.setDebugMode(False)
+        self.__orders = orders
+        self.orders = []
+
+    def onTicks(self, ticks):
+        if len(self.orders) == 0:
+            for instrument, quantity in self.__orders:
+                self.orders.append(self.marketOrder(instrument, quantity))
+
+
+class BatchStrategy(tickstrategy.BatchedBacktestingTickStrategy):
+    def __init__(self, tickFeed, orders, batchSize):
+        super(BatchStrategy, self).__init__(tickFeed, batchSize=batchSize)
+        self.setDebugMode(False)
+        self.__orders = orders
+        self.__begin = 0
+        self.orderEvents = []
+        self.batches = []
+
+    def onOrderUpdated(self, order):
+        self.orderEvents.append(order_event(order))
+
+    def onTickBatch(self, timestamps, bids, asks):
+        self.batches.append((self.__begin, len(timestamps)))
+        end = self.__begin + len(timestamps)
+        ret = [(pos - self.__begin, quantity) for pos, quantity in self.__orders if self.__begin <= pos < end]
+        self.__begin = end
+        return ret
+
+
+class BatchedBacktestingTickStrategyTestCase(common.TestCase):
+    TICKS = 5000
+    # (position, quantity) pairs. Orders are submitted on the batch boundaries, more than one on the same tick, and for
+    # more shares than the broker can fill in a single tick.
+    ORDERS = [(99, 10), (100, -10), (250, 5), (250, 5), (3000, 25000), (3500, -25010), (4999, 1)]
+
+    def testSameAsOnTicks(self):
+        expected = OnTicksStrategy(build_feed(self.TICKS), self.ORDERS)
+        expected.run()
+
+        for batchSize in [1, 100, 1000, self.TICKS * 2]:
+            strat = BatchStrategy(build_feed(self.TICKS), self.ORDERS, batchSize)
+            strat.run()
+            self.assertEqual(strat.orderEvents, expected.orderEvents)
+            self.assertEqual(strat.getBroker().getCash(), expected.getBroker().getCash())
+            self.assertEqual(strat.getResult(), expected.getResult())
+            self.assertEqual(
+                strat.getFeed().getCurrentDateTime(), expected.getFeed().getCurrentDateTime()
+            )
+
+    def testOnlyOrderTicksAreDispatched(self):
+        feed = build_feed(self.TICKS)
+        strat = BatchStrategy(feed, [(1000, 10)], 100)
+        dispatched = []
+        strat.getTicksProcessedEvent().subscribe(lambda strat_, ticks: dispatched.append(ticks.getDateTime()))
+        strat.run()
+
+        tickArrays = build_tick_arrays(self.TICKS)
+        # The first tick, the one where the order is submitted, the one where it gets filled and the last one.
+        self.assertEqual(dispatched, [tickArrays[pos].getDateTime() for pos in [0, 1000, 1001, self.TICKS - 1]])
+        self.assertEqual(strat.batches, [(begin, 100) for begin in range(0, self.TICKS, 100)])
+        self.assertEqual(len(feed[INSTRUMENT]), 4)
+        self.assertEqual(strat.getBroker().getShares(INSTRUMENT), 10)
+
+    def testInvalidPosition(self):
+        strat = BatchStrategy(build_feed(10), [], 100)
+        strat.onTickBatch = lambda timestamps, bids, asks: [(len(timestamps), 1)]
+        with self.assertRaisesRegexp(Exception, "Invalid position 10 for a batch with 10 ticks"):
+            strat.run()
+
+    def testTicksFromSequence(self):
+        feed = memtf.TickFeed()
+        feed.addTicksFromSequence(INSTRUMENT, [tick.BasicTick(datetime.datetime(2018, 1, 1), 1, 1.0002)])
+        strat = BatchStrategy(feed, [], 100)
+        with self.assertRaisesRegexp(Exception, "Ticks should be added using addTicksFromArrays"):
+            strat.run()
+
+
+class TickBrokerTestCase(common.TestCase):
+    def testOrdersFillOnTheInstrumentTicks(self):
+        second = lambda i: datetime.datetime(2018, 1, 1, 0, 0, i)
+        feed = memtf.TickFeed()
+        feed.addTicksFromSequence(INSTRUMENT, [tick.BasicTick(second(i), 1 + i * 0.1, 1.0002 + i * 0.1) for i in range(5)])
+        feed.addTicksFromSequence("USDJPY", [tick.BasicTick(second(i), 100 + i, 100.02 + i) for i in range(0, 5, 2)])
+        strat = OrdersOnFirstTickStrategy(feed, [("USDJPY", 10), (INSTRUMENT, 20)])
+        strat.run()
+
+        # The EURUSD order gets filled with the next tick, that is the only one for that second. The USDJPY one waits
+        # for the next USDJPY tick.
+        usdjpyOrder, eurusdOrder = strat.orders
+        self.assertEqual(eurusdOrder.getExecutionInfo().getDateTime(), second(1))
+        self.assertEqual(eurusdOrder.getAvgFillPrice(), 1.1)
+        self.assertEqual(usdjpyOrder.getExecutionInfo().getDateTime(), second(2))
+        self.assertEqual(usdjpyOrder.getAvgFillPrice(), 102)
+        self.assertEqual(strat.getBroker().getShares("USDJPY"), 10)
+        self.assertEqual(strat.getBroker().getShares(INSTRUMENT), 20)
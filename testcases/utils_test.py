@@ -19,14 +19,22 @@
 """
 
 import datetime
+import os
 
+import numpy as np
+import pytz
 from six.moves import xrange
 
 from . import common
 
 from pyalgotrade import utils
+from pyalgotrade.utils import arraycache
 from pyalgotrade.utils import collections
 from pyalgotrade.utils import dt
+from pyalgotrade.utils import dtfilter
+from pyalgotrade.utils import dtparser
+from pyalgotrade.utils import fileutils
+from pyalgotrade.utils import tickcodec
 
 
 class UtilsTestCase(common.TestCase):
@@ -301,6 +309,17 @@ class NumPyDequeTestCase(CollectionTestCaseBase):
             d.append(i)
         self.assertEqual(d[0:3].sum(), 3)
 
+    def testSlidingWindow(self):
+        for maxLen in [1, 2, 3, 10]:
+            d = collections.NumPyDeque(maxLen)
+            for i in xrange(maxLen * 5):
+                d.append(i)
+                expected = list(xrange(max(0, i + 1 - maxLen), i + 1))
+                self.assertEqual(len(d), len(expected))
+                self.assertEqual(d.data().tolist(), expected)
+                self.assertEqual(d[-1], i)
+                self.assertTrue(d.data().flags["C_CONTIGUOUS"])
+
 
 class ListDequeTestCase(CollectionTestCaseBase):
     def buildCollection(self, maxLen):
@@ -315,6 +334,55 @@ class ListDequeTestCase(CollectionTestCaseBase):
     def testResizeEmpty(self):
         CollectionTestCaseBase._testResizeEmptyImpl(self)
 
+    def testWrappedSeqLikeOps(self):
+        d = collections.ListDeque(10)
+        seq = []
+        for i in xrange(25):
+            d.append(i)
+            seq.append(i)
+            seq = seq[-10:]
+
+            self.assertEqual(len(d), len(seq))
+            for j in xrange(-len(seq), len(seq)):
+                self.assertEqual(d[j], seq[j])
+            for step in xrange(1, 4):
+                for j in xrange(-12, 12):
+                    self.assertEqual(d[j::step], seq[j::step])
+                    self.assertEqual(d[:j:step], seq[:j:step])
+
+        with self.assertRaises(IndexError):
+            d[10]
+        with self.assertRaises(IndexError):
+            d[-11]
+        with self.assertRaises(TypeError):
+            d["invalid"]
+
+    def testWrappedData(self):
+        d = collections.ListDeque(3)
+        for i in xrange(5):
+            d.append(i)
+        self.assertEqual(d.data(), [2, 3, 4])
+        d.append(5)
+        self.assertEqual(d[0], 3)
+        self.assertEqual(d.data(), [3, 4, 5])
+
+        d.append(6)
+        d.resize(2)
+        self.assertEqual(d.data(), [5, 6])
+        d.append(7)
+        self.assertEqual(d.data(), [6, 7])
+
+    def testWrappedDataIsReusedUntilAppend(self):
+        d = collections.ListDeque(3)
+        for i in xrange(4):
+            d.append(i)
+        data = d.data()
+        self.assertEqual(data, [1, 2, 3])
+        self.assertIs(d.data(), data)
+        d.append(4)
+        self.assertEqual(d.data(), [2, 3, 4])
+        self.assertEqual(data, [1, 2, 3])
+
 
 class DateTimeTestCase(common.TestCase):
     def testTimeStampConversions(self):
@@ -338,3 +406,379 @@ class DateTimeTestCase(common.TestCase):
     def testGetLastMonday(self):
         self.assertEquals(dt.get_last_monday(2010), datetime.date(2010, 12, 27))
         self.assertEquals(dt.get_last_monday(2011), datetime.date(2011, 12, 26))
+
+
+class FixedWidthParserTestCase(common.TestCase):
+    def testParseArray(self):
+        for dateTimeFormat in ["%Y.%m.%d %H:%M:%S", "%Y-%m-%d", "%Y%m%d %H%M%S.%f", "%d/%m/%Y %H:%M"]:
+            parser = dtparser.FixedWidthParser(dateTimeFormat)
+            dateTimes = [
+                datetime.datetime(1969, 12, 31, 23, 59, 59, 999999),
+                datetime.datetime(2000, 2, 29, 1, 2, 3, 4),
+                datetime.datetime(2018, 12, 31, 12, 30, 45, 500000),
+            ]
+            # Truncate to what the format can hold.
+            dateTimes = [datetime.datetime.strptime(dateTime.strftime(dateTimeFormat), dateTimeFormat) for dateTime in dateTimes]
+            values = [dateTime.strftime(dateTimeFormat).encode("ascii") for dateTime in dateTimes]
+            timestamps = parser.parseArray(values)
+            self.assertEqual([dt.epoch_ns_to_datetime(timestamp) for timestamp in timestamps], dateTimes)
+            self.assertEqual(list(parser.parseArray([value.decode("ascii") for value in values])), list(timestamps))
+
+    def testEmpty(self):
+        self.assertEqual(len(dtparser.FixedWidthParser("%Y-%m-%d").parseArray([])), 0)
+
+    def testInvalidValues(self):
+        parser = dtparser.FixedWidthParser("%Y.%m.%d %H:%M:%S")
+        for value in [b"2018.02.30 00:00:00", b"2018-01-02 00:00:00", b"2018.01.02 0:00:00", b"2018.13.02 00:00:00", b"2018.01.02 24:00:00", b"2018.01.0a 00:00:00",
+                      b"2018.01.02 23:59:60"]:
+            with self.assertRaisesRegexp(ValueError, "time data .* does not match format .*"):
+                parser.parseArray([b"2018.01.01 00:00:00", value])
+
+    def testUnsupportedFormats(self):
+        for dateTimeFormat in ["%Y-%b-%d", "%H:%M:%S", "%Y-%m-%d %I:%M %p", "%Y-%m-%d %Y"]:
+            self.assertFalse(dtparser.is_fixed_width(dateTimeFormat))
+            with self.assertRaises(ValueError):
+                dtparser.FixedWidthParser(dateTimeFormat)
+        self.assertTrue(dtparser.is_fixed_width("%Y.%m.%d %H:%M:%S"))
+
+
+class DateTimeParserTestCase(common.TestCase):
+    def testSameAsStrptime(self):
+        for dateTimeFormat in ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%Y%m%d %H%M%S", "%d/%m/%Y %H:%M", "%Y%m%d %H%M%S.%f"]:
+            parser = dtparser.get_parser(dateTimeFormat)
+            self.assertTrue(isinstance(parser, dtparser.SlicingParser))
+            dateTime = datetime.datetime(2000, 2, 28, 23, 59, 59, 123456)
+            for i in xrange(200):
+                value = dateTime.strftime(dateTimeFormat)
+                self.assertEqual(parser.parse(value), datetime.datetime.strptime(value, dateTimeFormat))
+                dateTime += datetime.timedelta(minutes=17)
+
+    def testInvalidValues(self):
+        parser = dtparser.get_parser("%Y-%m-%d %H:%M:%S")
+        self.assertEqual(parser.parse("2018-01-01 00:00:00"), datetime.datetime(2018, 1, 1))
+        # Not fixed width, but strptime accepts it.
+        self.assertEqual(parser.parse("2018-01-01 1:00:00"), datetime.datetime(2018, 1, 1, 1))
+        for value in ["2018-02-30 00:00:00", "2018-01-01 24:00:00", "2018-01-01 +1:00:00", "2018/01/01 00:00:00", "-018-01-01 00:00:00"]:
+            with self.assertRaisesRegexp(ValueError, ".*does not match format.*|.*out of range.*"):
+                parser.parse(value)
+
+    def testFallbackToStrptime(self):
+        parser = dtparser.get_parser("%d-%b-%y")
+        self.assertTrue(isinstance(parser, dtparser.StrptimeParser))
+        self.assertEqual(parser.parse("3-Dec-05"), datetime.datetime(2005, 12, 3))
+
+
+class LocalizerTestCase(common.TestCase):
+    def testLocalizeSameAsPytz(self):
+        timezone = pytz.timezone("US/Eastern")
+        localizer = dtparser.Localizer(timezone)
+        # Cover both DST transitions in 2018.
+        dateTime = datetime.datetime(2018, 3, 10)
+        while dateTime < datetime.datetime(2018, 11, 5):
+            expected = dt.localize(dateTime, timezone)
+            localized = localizer.localize(dateTime)
+            self.assertEqual(localized, expected)
+            self.assertEqual(localized.utcoffset(), expected.utcoffset())
+            self.assertEqual(localized.tzname(), expected.tzname())
+            dateTime += datetime.timedelta(minutes=30)
+            if dateTime.month not in [3, 11]:
+                dateTime += datetime.timedelta(days=7)
+
+    def testFromUTCSameAsPytz(self):
+        timezone = pytz.timezone("US/Eastern")
+        localizer = dtparser.Localizer(timezone)
+        dateTime = datetime.datetime(2018, 3, 10)
+        while dateTime < datetime.datetime(2018, 11, 5):
+            expected = dt.localize(pytz.utc.localize(dateTime), timezone)
+            converted = localizer.fromUTC(dateTime)
+            self.assertEqual(converted, expected)
+            self.assertEqual(converted.utcoffset(), expected.utcoffset())
+            self.assertEqual(converted.replace(tzinfo=None), expected.replace(tzinfo=None))
+            dateTime += datetime.timedelta(minutes=30)
+            if dateTime.month not in [3, 11]:
+                dateTime += datetime.timedelta(days=7)
+
+    def testDailyAndIntradaySameAsPytz(self):
+        for timezone in [pytz.timezone(name) for name in ["US/Eastern", "Europe/London", "Australia/Sydney", "Asia/Kolkata"]] + [pytz.utc]:
+            localizer = dtparser.Localizer(timezone)
+            # Days are seen once first, like daily bars, and then again every hour, like intraday bars.
+            for hours in [[16], range(0, 24)]:
+                date = datetime.datetime(2017, 1, 1)
+                while date < datetime.datetime(2019, 1, 1):
+                    for hour in hours:
+                        dateTime = date + datetime.timedelta(hours=hour, minutes=30)
+                        localized = localizer.localize(dateTime)
+                        expected = dt.localize(dateTime, timezone)
+                        self.assertEqual(localized, expected)
+                        self.assertEqual(localized.tzname(), expected.tzname())
+                        converted = localizer.fromUTC(dateTime)
+                        expected = dt.localize(pytz.utc.localize(dateTime), timezone)
+                        self.assertEqual(converted.replace(tzinfo=None), expected.replace(tzinfo=None))
+                        self.assertEqual(converted.tzname(), expected.tzname())
+                    date += datetime.timedelta(days=1)
+
+    def testTimestampsSameAsPytz(self):
+        timezone = pytz.timezone("US/Eastern")
+        # Unsorted timestamps, every 20 minutes, around both DST transitions in 2018.
+        dateTimes = []
+        for begin in [datetime.datetime(2018, 3, 9), datetime.datetime(2018, 11, 2)]:
+            dateTimes.extend([begin + datetime.timedelta(minutes=20*i) for i in xrange(4 * 72)])
+        dateTimes.reverse()
+        timestamps = np.array([dt.datetime_to_epoch_ns(dateTime) for dateTime in dateTimes], dtype=np.int64)
+
+        localized = dtparser.Localizer(timezone).localizeTimestamps(timestamps)
+        expected = [dt.datetime_to_epoch_ns(dt.localize(dateTime, timezone)) for dateTime in dateTimes]
+        self.assertEqual(localized.tolist(), expected)
+
+        converted = dtparser.Localizer(timezone).toLocalTimestamps(timestamps)
+        expected = [
+            dt.datetime_to_epoch_ns(dt.localize(pytz.utc.localize(dateTime), timezone).replace(tzinfo=None))
+            for dateTime in dateTimes
+        ]
+        self.assertEqual(converted.tolist(), expected)
+
+    def testAwareDateTime(self):
+        localizer = dtparser.Localizer(pytz.timezone("US/Eastern"))
+        dateTime = pytz.utc.localize(datetime.datetime(2018, 1, 1, 15))
+        self.assertEqual(localizer.localize(dateTime).replace(tzinfo=None), datetime.datetime(2018, 1, 1, 10))
+
+
+class DateTimeFilterTestCase(common.TestCase):
+    def __buildDateTimes(self):
+        # Every 37 minutes, covering both DST transitions and weekends.
+        ret = []
+        dateTime = datetime.datetime(2018, 3, 8)
+        while dateTime < datetime.datetime(2018, 11, 8):
+            ret.append(dateTime)
+            dateTime += datetime.timedelta(minutes=37)
+            if dateTime.month not in [3, 11]:
+                dateTime += datetime.timedelta(days=3)
+        return ret
+
+    def testDateRangeMask(self):
+        dateTimes = self.__buildDateTimes()
+        timestamps = np.array([dt.datetime_to_epoch_ns(dateTime) for dateTime in dateTimes])
+        fromDate = datetime.datetime(2018, 3, 11, 2, 35)
+        toDate = datetime.datetime(2018, 6, 1)
+        for fromDate, toDate in [(fromDate, toDate), (None, toDate), (fromDate, None), (None, None)]:
+            mask = dtfilter.date_range_mask(timestamps, fromDate, toDate)
+            expected = [
+                (fromDate is None or dateTime >= fromDate) and (toDate is None or dateTime <= toDate)
+                for dateTime in dateTimes
+            ]
+            self.assertEqual(mask.tolist(), expected)
+
+    def testSessionMask(self):
+        eastern = pytz.timezone("US/Eastern")
+        fromTime = datetime.time(9, 30)
+        toTime = datetime.time(16)
+
+        def in_session(dateTime):
+            localTime = dt.localize(dateTime, eastern).time()
+            return dateTime.weekday() <= 4 and localTime >= fromTime and localTime <= toTime
+
+        dateTimes = self.__buildDateTimes()
+        dateTimes.append(datetime.datetime(2018, 3, 9, 9, 30))
+        dateTimes.append(datetime.datetime(2018, 3, 9, 16))
+        dateTimes.append(datetime.datetime(2018, 3, 9, 16, 0, 0, 1))
+        naiveTimestamps = np.array([dt.datetime_to_epoch_ns(dateTime) for dateTime in dateTimes])
+        mask = dtfilter.session_mask(naiveTimestamps, None, eastern, fromTime, toTime)
+        self.assertEqual(mask.tolist(), [in_session(dateTime) for dateTime in dateTimes])
+
+        # Datetimes in other timezones.
+        for timezone in [eastern, pytz.timezone("Asia/Tokyo"), pytz.utc]:
+            localized = [dt.localize(dateTime, timezone) for dateTime in dateTimes]
+            timestamps = np.array([dt.datetime_to_epoch_ns(dateTime) for dateTime in localized])
+            mask = dtfilter.session_mask(timestamps, timezone, eastern, fromTime, toTime)
+            self.assertEqual(mask.tolist(), [in_session(dateTime) for dateTime in localized])
+
+        self.assertEqual(len(dtfilter.session_mask([], None, eastern, fromTime, toTime)), 0)
+
+
+class FileUtilsTestCase(common.TestCase):
+    def testOpenCompressedFiles(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "data.txt")
+            with open(path, "w") as f:
+                for i in xrange(100000):
+                    f.write("%d,line %d\n" % (i, i))
+            with open(path, "r") as f:
+                expectedText = f.read()
+            with open(path, "rb") as f:
+                expectedBytes = f.read()
+
+            self.assertFalse(fileutils.is_compressed(path))
+            for extension in [".gz", ".bz2", ".xz", ".GZ"]:
+                compressedPath = path + extension
+                common.compress_file(path, compressedPath.lower())
+                if extension != extension.lower():
+                    os.rename(compressedPath.lower(), compressedPath)
+                self.assertTrue(fileutils.is_compressed(compressedPath))
+
+                with fileutils.open_file(compressedPath, bufferSize=1000) as f:
+                    self.assertEqual(f.read(), expectedText)
+                with fileutils.open_file(compressedPath) as f:
+                    self.assertEqual(list(f), expectedText.splitlines(True))
+                with fileutils.open_file(compressedPath, "rb") as f:
+                    self.assertEqual(f.read(1000) + f.read(), expectedBytes)
+
+
+class ArrayCacheTestCase(common.TestCase):
+    def testWriteAndRead(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "columns")
+            arraycache.write_columns(path, [
+                ("timestamp", np.array([1, 2, 3], dtype=np.int64)),
+                ("price", np.array([1.5, np.nan, 3.5])),
+            ])
+            columns = arraycache.read_columns(path)
+            self.assertEqual(sorted(columns.keys()), ["price", "timestamp"])
+            self.assertTrue(isinstance(columns["timestamp"], np.memmap))
+            self.assertEqual(columns["timestamp"].dtype, np.int64)
+            self.assertEqual(columns["timestamp"].tolist(), [1, 2, 3])
+            self.assertEqual(columns["price"][0], 1.5)
+            self.assertTrue(np.isnan(columns["price"][1]))
+            # Columns are read-only.
+            with self.assertRaises(ValueError):
+                columns["price"][0] = 1
+
+            # Empty columns.
+            arraycache.write_columns(path, [("timestamp", np.array([], dtype=np.int64))])
+            self.assertEqual(len(arraycache.read_columns(path)["timestamp"]), 0)
+
+    def testInvalidFiles(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "columns")
+            with self.assertRaisesRegexp(ValueError, "All columns should have the same length"):
+                arraycache.write_columns(path, [("a", np.zeros(1)), ("b", np.zeros(2))])
+            self.assertFalse(os.path.exists(path))
+
+            with open(path, "wb") as f:
+                f.write(b"not a column file")
+            with self.assertRaisesRegexp(ValueError, ".* is not a valid column file"):
+                arraycache.read_columns(path)
+
+            arraycache.write_columns(path, [("a", np.zeros(100))])
+            with open(path, "r+b") as f:
+                f.truncate(200)
+            with self.assertRaisesRegexp(ValueError, ".* is truncated"):
+                arraycache.read_columns(path)
+
+    def testCache(self):
+        with common.TmpDir() as tmpPath:
+            sourcePath = os.path.join(tmpPath, "source.txt")
+            with open(sourcePath, "w") as f:
+                f.write("1")
+
+            cache = arraycache.ArrayCache(os.path.join(tmpPath, "cache"))
+            self.assertEqual(cache.load(sourcePath, "settings"), None)
+            cache.save(sourcePath, "settings", [("a", np.arange(10))])
+            self.assertEqual(cache.load(sourcePath, "settings")["a"].tolist(), list(range(10)))
+            self.assertTrue(cache.getCachePath(sourcePath, "settings").startswith(os.path.join(tmpPath, "cache")))
+
+            # Different settings.
+            self.assertEqual(cache.load(sourcePath, "other settings"), None)
+            self.assertNotEqual(cache.getCachePath(sourcePath, "settings"), cache.getCachePath(sourcePath, "other settings"))
+
+            # The source file changed.
+            with open(sourcePath, "w") as f:
+                f.write("12")
+            self.assertEqual(cache.load(sourcePath, "settings"), None)
+
+            # Invalid cached files are ignored.
+            with open(cache.getCachePath(sourcePath, "settings"), "w") as f:
+                f.write("invalid")
+            self.assertEqual(cache.load(sourcePath, "settings"), None)
+
+            # Cached files along with the source file.
+            cache = arraycache.ArrayCache()
+            self.assertEqual(os.path.dirname(cache.getCachePath(sourcePath, "settings")), tmpPath)
+
+    def testEviction(self):
+        with common.TmpDir() as tmpPath:
+            sourcePaths = []
+            for i in range(3):
+                sourcePaths.append(os.path.join(tmpPath, "source-%d.txt" % i))
+                with open(sourcePaths[-1], "w") as f:
+                    f.write(str(i))
+
+            # Room for two files with 1000 floats.
+            cache = arraycache.ArrayCache(os.path.join(tmpPath, "cache"), maxSize=20000)
+            columns = [("a", np.zeros(1000))]
+            cache.save(sourcePaths[0], "settings", columns)
+            cache.save(sourcePaths[1], "settings", columns)
+            # Make the first file the least recently used one, and then use it.
+            os.utime(cache.getCachePath(sourcePaths[0], "settings"), (1, 1))
+            os.utime(cache.getCachePath(sourcePaths[1], "settings"), (2, 2))
+            self.assertNotEqual(cache.load(sourcePaths[0], "settings"), None)
+
+            cache.save(sourcePaths[2], "settings", columns)
+            self.assertNotEqual(cache.load(sourcePaths[0], "settings"), None)
+            self.assertEqual(cache.load(sourcePaths[1], "settings"), None)
+            self.assertNotEqual(cache.load(sourcePaths[2], "settings"), None)
+            self.assertEqual(len(os.listdir(os.path.join(tmpPath, "cache"))), 2)
+
+            self.assertEqual(cache.evict(0), 2)
+            self.assertEqual(os.listdir(os.path.join(tmpPath, "cache")), [])
+
+            with self.assertRaisesRegexp(Exception, "maxSize can only be set along with cacheDir"):
+                arraycache.ArrayCache(maxSize=1000)
+
+
+class TickCodecTestCase(common.TestCase):
+    def testVarints(self):
+        values = np.array([0, 1, 127, 128, 300, 16383, 16384, 2**63 - 1, 2**64 - 1], dtype=np.uint64)
+        encoded = tickcodec.varint_encode(values)
+        self.assertEqual(encoded[:5], b"\x00\x01\x7f\x80\x01")
+        self.assertEqual(tickcodec.varint_decode(encoded, len(values)).tolist(), values.tolist())
+        self.assertEqual(tickcodec.varint_decode(b"", 0).tolist(), [])
+        with self.assertRaises(ValueError):
+            tickcodec.varint_decode(encoded, len(values) + 1)
+        with self.assertRaises(ValueError):
+            tickcodec.varint_decode(encoded[:-1], len(values))
+
+    def testZigzag(self):
+        values = np.array([0, -1, 1, -2, 2, -2**63, 2**63 - 1], dtype=np.int64)
+        encoded = tickcodec.zigzag_encode(values)
+        self.assertEqual(encoded[:5].tolist(), [0, 1, 2, 3, 4])
+        self.assertEqual(tickcodec.zigzag_decode(encoded).tolist(), values.tolist())
+
+    def testEncodeDecode(self):
+        timestamps = dt.datetime_to_epoch_ns(datetime.datetime(2018, 1, 2)) + np.array(
+            [0, 250, 250, 1000, 500, 3000], dtype=np.int64
+        ) * 1000000
+        bids = np.array([1.20001, 1.20003, 1.19998, 1.2, 1.25, 0.99999])
+        asks = np.array([1.20011, 1.20013, 1.20008, 1.2001, 1.2501, 1.00001])
+        for pipSize in [None, 0.00001, 0.000001]:
+            encoded = tickcodec.encode_ticks(timestamps, bids, asks, pipSize)
+            self.assertTrue(tickcodec.is_encoded(encoded))
+            decodedTimestamps, decodedBids, decodedAsks = tickcodec.decode_ticks(encoded)
+            self.assertEqual(decodedTimestamps.tolist(), timestamps.tolist())
+            self.assertEqual(decodedBids.tolist(), bids.tolist())
+            self.assertEqual(decodedAsks.tolist(), asks.tolist())
+
+        for values in [[], [0]]:
+            decoded = tickcodec.decode_ticks(tickcodec.encode_ticks(values, values, values))
+            self.assertEqual([column.tolist() for column in decoded], [values, values, values])
+
+        with self.assertRaisesRegexp(ValueError, "not a multiple of the pip size"):
+            tickcodec.encode_ticks(timestamps, bids, asks, 0.0001)
+        with self.assertRaises(ValueError):
+            tickcodec.decode_ticks(encoded[:-1])
+        with self.assertRaises(ValueError):
+            tickcodec.decode_ticks(b"garbage")
+
+    def testGuessPipSize(self):
+        self.assertEqual(tickcodec.guess_pip_size([1, 2, 3]), 1)
+        self.assertEqual(tickcodec.guess_pip_size([1.5, 112.25]), 0.01)
+        self.assertEqual(tickcodec.guess_pip_size([1.20001, 1.2]), 0.00001)
+        with self.assertRaises(ValueError):
+            tickcodec.guess_pip_size([1 / 3.0])
+
+    def testFiles(self):
+        with common.TmpDir() as tmpPath:
+            path = os.path.join(tmpPath, "ticks")
+            tickcodec.write_ticks(path, [1, 5, 6], [1.1, 1.2, 1.3], [1.2, 1.3, 1.4], 0.1)
+            self.assertEqual([column.tolist() for column in tickcodec.read_ticks(path)], [
+                [1, 5, 6], [1.1, 1.2, 1.3], [1.2, 1.3, 1.4]
+            ])
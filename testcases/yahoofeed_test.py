@@ -27,6 +27,8 @@ from . import feed_test
 from pyalgotrade.utils import dt
 from pyalgotrade.barfeed import yahoofeed
 from pyalgotrade.barfeed import csvfeed
+from pyalgotrade.dataseries import bards
+from pyalgotrade.technical import ma
 from pyalgotrade import bar
 from pyalgotrade import marketsession
 
@@ -258,3 +260,27 @@ class FeedTestCase(common.TestCase):
         for i in range(len(ds)):
             self.assertEqual(ds[i].getDateTime(), reloadedDs[i].getDateTime())
             self.assertEqual(ds[i].getClose(), reloadedDs[i].getClose())
+
+    def testColumnarDataSeries(self):
+        def load(dataSeriesClass):
+            barFeed = yahoofeed.Feed()
+            if dataSeriesClass is not None:
+                barFeed.setDataSeriesClass(dataSeriesClass)
+            barFeed.addBarsFromCSV(FeedTestCase.TestInstrument, common.get_data_file_path("orcl-2000-yahoofinance.csv"))
+            sma = ma.SMA(barFeed[FeedTestCase.TestInstrument].getCloseDataSeries(), 20)
+            barFeed.loadAll()
+            return barFeed[FeedTestCase.TestInstrument], sma
+
+        ds, sma = load(None)
+        columnarDs, columnarSma = load(bards.ColumnarBarDataSeries)
+        self.assertTrue(isinstance(columnarDs, bards.ColumnarBarDataSeries))
+        self.assertEqual(len(columnarDs), len(ds))
+        self.assertEqual(columnarDs.getDateTimes(), ds.getDateTimes())
+        self.assertEqual(columnarDs[-1].getAdjClose(), ds[-1].getAdjClose())
+        self.assertEqual(columnarSma[:], sma[:])
+
+    def testSetDataSeriesClassAfterRegistering(self):
+        barFeed = yahoofeed.Feed()
+        barFeed.addBarsFromCSV(FeedTestCase.TestInstrument, common.get_data_file_path("orcl-2000-yahoofinance.csv"))
+        with self.assertRaisesRegexp(Exception, "The dataseries class must be set before.*"):
+            barFeed.setDataSeriesClass(bards.ColumnarBarDataSeries)